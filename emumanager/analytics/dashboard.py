@@ -12,9 +12,13 @@ from __future__ import annotations
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable
 
 from emumanager.library import LibraryDB, LibraryEntry
 
+# Colunas lidas pelo relatório (o path é sempre incluído)
+ANALYTICS_FIELDS = ("system", "status", "size")
+
 
 @dataclass
 class SystemStats:
@@ -105,21 +109,17 @@ class AnalyticsDashboard:
         """Gera relatório completo da coleção."""
         analytics = CollectionAnalytics()
         
-        # Obter todas as entradas
-        entries = self.db.get_all_entries()
-        
-        # Processar por sistema
-        by_system = defaultdict(list)
-        for entry in entries:
-            by_system[entry.system].append(entry)
+        # Agregação em streaming: só as colunas necessárias, sem materializar a tabela
+        for entry in self.db.iter_entries(columns=ANALYTICS_FIELDS):
+            stats = analytics.systems.get(entry.system)
+            if stats is None:
+                stats = analytics.systems[entry.system] = SystemStats(system=entry.system)
+            self._accumulate_entry(stats, entry)
         
-        analytics.total_systems = len(by_system)
-        analytics.total_roms = len(entries)
+        analytics.total_systems = len(analytics.systems)
         
-        # Análise por sistema
-        for system, system_entries in by_system.items():
-            stats = self._analyze_system(system, system_entries)
-            analytics.systems[system] = stats
+        for stats in analytics.systems.values():
+            analytics.total_roms += stats.total_roms
             analytics.total_verified += stats.verified_roms
             analytics.total_size_bytes += stats.total_size_bytes
             
@@ -132,29 +132,32 @@ class AnalyticsDashboard:
         
         return analytics
     
-    def _analyze_system(self, system: str, entries: list[LibraryEntry]) -> SystemStats:
+    def _analyze_system(self, system: str, entries: Iterable[LibraryEntry]) -> SystemStats:
         """Analisa um sistema específico."""
         stats = SystemStats(system=system)
-        
-        stats.total_roms = len(entries)
-        
         for entry in entries:
-            # Status
-            if entry.status == "VERIFIED":
-                stats.verified_roms += 1
-            else:
-                stats.unverified_roms += 1
-            
-            # Tamanho
-            stats.total_size_bytes += entry.size
-            
-            # Formato (extensão)
-            ext = Path(entry.path).suffix.lower()
-            if ext:
-                stats.compression_formats[ext] = stats.compression_formats.get(ext, 0) + 1
-        
+            self._accumulate_entry(stats, entry)
         return stats
     
+    @staticmethod
+    def _accumulate_entry(stats: SystemStats, entry: LibraryEntry) -> None:
+        """Soma uma entrada às estatísticas do seu sistema."""
+        stats.total_roms += 1
+        
+        # Status
+        if entry.status == "VERIFIED":
+            stats.verified_roms += 1
+        else:
+            stats.unverified_roms += 1
+        
+        # Tamanho
+        stats.total_size_bytes += entry.size or 0
+        
+        # Formato (extensão)
+        ext = Path(entry.path).suffix.lower()
+        if ext:
+            stats.compression_formats[ext] = stats.compression_formats.get(ext, 0) + 1
+    
     def _find_missing_roms(self) -> dict[str, list[str]]:
         """Encontra ROMs faltantes baseado em DATs."""
         missing = {}
@@ -165,8 +168,12 @@ class AnalyticsDashboard:
         for system in systems:
             # Obter entradas verificadas
             verified = {
-                entry.dat_name for entry in self.db.get_all_entries()
-                if entry.system == system and entry.status == "VERIFIED" and entry.dat_name
+                entry.dat_name
+                for entry in self.db.iter_entries(
+                    columns=("dat_name",),
+                    where={"system": system, "status": "VERIFIED"},
+                    require=("dat_name",),
+                )
             }
             
             # Obter todos os games do DAT
@@ -182,10 +189,10 @@ class AnalyticsDashboard:
         """Retorna lista de sistemas que têm DATs carregados."""
         # Implementação simplificada - pode ser melhorada
         # consultando a tabela de DATs se existir
-        systems = set()
-        for entry in self.db.get_all_entries():
-            if entry.dat_name:
-                systems.add(entry.system)
+        systems = {
+            entry.system
+            for entry in self.db.iter_entries(columns=("system",), require=("dat_name",))
+        }
         return list(systems)
     
     def _get_dat_games(self, system: str) -> list[str]:
@@ -193,10 +200,14 @@ class AnalyticsDashboard:
         # Esta é uma implementação simplificada
         # O ideal seria ter uma tabela separada para DATs
         # Por enquanto, retornamos apenas os jogos verificados
-        games = set()
-        for entry in self.db.get_all_entries():
-            if entry.system == system and entry.dat_name:
-                games.add(entry.dat_name)
+        games = {
+            entry.dat_name
+            for entry in self.db.iter_entries(
+                columns=("dat_name",),
+                where={"system": system},
+                require=("dat_name",),
+            )
+        }
         return list(games)
     
     def get_storage_breakdown(self) -> dict[str, dict]:
@@ -209,23 +220,20 @@ class AnalyticsDashboard:
             'total_tb': 0,
         }
         
-        entries = self.db.get_all_entries()
-        
-        # Por sistema
         by_system = defaultdict(int)
-        for entry in entries:
-            by_system[entry.system] += entry.size
-            breakdown['total_bytes'] += entry.size
-        
-        breakdown['by_system'] = dict(by_system)
-        
-        # Por formato
         by_format = defaultdict(int)
-        for entry in entries:
+        for entry in self.db.iter_entries(columns=("system", "size")):
+            size = entry.size or 0
+            # Por sistema
+            by_system[entry.system] += size
+            breakdown['total_bytes'] += size
+            
+            # Por formato
             ext = Path(entry.path).suffix.lower()
             if ext:
-                by_format[ext] += entry.size
+                by_format[ext] += size
         
+        breakdown['by_system'] = dict(by_system)
         breakdown['by_format'] = dict(by_format)
         
         # Conversões
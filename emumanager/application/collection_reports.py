@@ -6,7 +6,7 @@ from pathlib import Path
 from emumanager.analytics import AnalyticsDashboard
 from emumanager.deduplication import AdvancedDeduplication
 from emumanager.library import LibraryDB
-from emumanager.quality import QualityController, QualityLevel
+from emumanager.quality import QualityEngine, QualityLevel, RomQuality
 
 
 @dataclass(slots=True)
@@ -25,9 +25,8 @@ class CollectionReportService:
         self.db = db
 
     def build_advanced_dedup_report(self) -> OperationReport:
-        dedup = AdvancedDeduplication(self.db)
-        groups = dedup.find_all_duplicates()
-        stats = dedup.get_statistics()
+        analysis = AdvancedDeduplication(self.db).analyze()
+        groups, stats = analysis.groups, analysis.statistics
 
         lines = [
             "[bold cyan]🔎 Analisando duplicados...[/]",
@@ -101,9 +100,18 @@ class CollectionReportService:
         )
 
     def build_quality_report(self) -> OperationReport:
-        quality_controller = QualityController(self.db)
-        stats = quality_controller.get_quality_statistics()
-        results = quality_controller.analyze_library()
+        # Uma só passagem: estatísticas agregadas e só as primeiras ROMs danificadas em memória
+        damaged_roms: list[RomQuality] = []
+
+        def _collect_damaged(quality: RomQuality) -> None:
+            if len(damaged_roms) < 10 and quality.quality_level in {
+                QualityLevel.DAMAGED,
+                QualityLevel.CORRUPT,
+            }:
+                damaged_roms.append(quality)
+
+        quality_stats = QualityEngine(self.db).run(on_result=_collect_damaged)
+        stats = quality_stats.as_dict()
         total = stats["total"]
         playable_percent = (stats["playable"] / total * 100) if total else 0.0
         damaged_percent = (stats["damaged"] / total * 100) if total else 0.0
@@ -150,21 +158,18 @@ class CollectionReportService:
                 lines.append(f"  {issue_names.get(issue_type, issue_type):30} {count:4}")
 
         lines.append("\n[bold red]ATENÇÃO - ROMs CORROMPIDAS:[/]")
-        damaged_roms = [
-            (path, quality)
-            for path, quality in results.items()
-            if quality.quality_level in {QualityLevel.DAMAGED, QualityLevel.CORRUPT}
-        ]
         if not damaged_roms:
             lines.append("  [green]Nenhuma ROM corrompida encontrada! ✓[/]")
         else:
-            for path, quality in damaged_roms[:10]:
-                lines.append(f"  [{quality.color}]{quality.icon}[/] {Path(path).name[:60]}")
+            for quality in damaged_roms:
+                lines.append(f"  [{quality.color}]{quality.icon}[/] {Path(quality.path).name[:60]}")
                 critical = quality.get_critical_issues()
                 if critical:
                     lines.append(f"     → {critical[0].description}")
-            if len(damaged_roms) > 10:
-                lines.append(f"  ... e mais {len(damaged_roms) - 10} ROMs com problemas")
+            if quality_stats.damaged > len(damaged_roms):
+                lines.append(
+                    f"  ... e mais {quality_stats.damaged - len(damaged_roms)} ROMs com problemas"
+                )
 
         return OperationReport(
             summary=f"Quality check complete: {total} ROMs analyzed",
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Callable, Optional, Sequence
 
 from emumanager.common.formatting import human_readable_size
 from emumanager.library import LibraryDB, LibraryEntry
@@ -17,6 +19,9 @@ STATUS_PREFIXES = {
 DEFAULT_STATUS_PREFIX = "?"
 UNTRACKED_PREFIX = " "
 QUALITY_FALLBACK_MARKUP = "[dim]?[/]"
+QUALITY_REFRESH_WORKERS = 4
+
+logger = logging.getLogger(__name__)
 
 
 def format_status_prefixed_name(filename: str, status: Optional[str]) -> str:
@@ -112,8 +117,11 @@ class LibraryInsightsService:
     def __init__(self, db: LibraryDB):
         self.db = db
         self._quality_controller = QualityController(db)
+        self._quality_pool: Optional[ThreadPoolExecutor] = None
+        self._quality_refreshes: list[Future] = []
 
     def set_database(self, db: LibraryDB) -> None:
+        self.cancel_quality_refresh()
         self.db = db
         self._quality_controller = QualityController(db)
 
@@ -175,31 +183,79 @@ class LibraryInsightsService:
         system: str,
         *,
         include_quality: bool = False,
+        on_quality: Optional[Callable[[RomBrowserRow], None]] = None,
     ) -> list[RomBrowserRow]:
+        """Rows for ``system``; quality comes from the persisted results only.
+
+        Rows whose result is missing or stale are returned without an icon and
+        re-analyzed in a background pool. Each refreshed row is updated in place
+        and passed to ``on_quality`` (called from a worker thread).
+        """
+        entries = self.db.get_entries_by_system(system)
+        cached: dict[str, RomQuality] = {}
+        if include_quality:
+            # Só interessa o sistema aberto mais recentemente
+            self.cancel_quality_refresh()
+            cached = self._quality_controller.get_cached_qualities(entries, system)
+
         rows: list[RomBrowserRow] = []
-        for entry in self.db.get_entries_by_system(system):
-            quality: Optional[RomQuality] = None
-            if include_quality:
-                quality = self._safe_analyze_quality(entry)
-            rows.append(
-                RomBrowserRow(
-                    filename=Path(entry.path).name,
-                    path=entry.path,
-                    status=entry.status or "UNKNOWN",
-                    quality_icon=quality.icon if quality else None,
-                    quality_color=quality.color if quality else None,
-                    ra_compatible=bool(entry.extra_metadata.get("ra_compatible")),
-                    entry=entry,
-                )
+        stale: list[RomBrowserRow] = []
+        for entry in entries:
+            quality = cached.get(entry.path)
+            row = RomBrowserRow(
+                filename=Path(entry.path).name,
+                path=entry.path,
+                status=entry.status or "UNKNOWN",
+                quality_icon=quality.icon if quality else None,
+                quality_color=quality.color if quality else None,
+                ra_compatible=bool(entry.extra_metadata.get("ra_compatible")),
+                entry=entry,
             )
+            rows.append(row)
+            if include_quality and quality is None:
+                stale.append(row)
+
+        if stale:
+            self._refresh_quality(stale, on_quality)
         return rows
 
+    def cancel_quality_refresh(self) -> None:
+        """Drop background re-analyses that have not started yet."""
+        for future in self._quality_refreshes:
+            future.cancel()
+        self._quality_refreshes = []
+
+    def _refresh_quality(
+        self,
+        rows: list[RomBrowserRow],
+        on_quality: Optional[Callable[[RomBrowserRow], None]],
+    ) -> None:
+        if self._quality_pool is None:
+            self._quality_pool = ThreadPoolExecutor(
+                max_workers=QUALITY_REFRESH_WORKERS,
+                thread_name_prefix="quality-refresh",
+            )
+        controller = self._quality_controller
+
+        def _refresh(row: RomBrowserRow) -> None:
+            try:
+                quality = controller.analyze_and_store(row.entry)
+            except Exception as exc:
+                logger.debug("Quality refresh failed for %s: %s", row.path, exc)
+                return
+            row.quality_icon = quality.icon
+            row.quality_color = quality.color
+            if on_quality:
+                on_quality(row)
+
+        self._quality_refreshes = [self._quality_pool.submit(_refresh, row) for row in rows]
+
     def get_rom_inspection(self, path_str: str) -> Optional[RomInspectionSnapshot]:
         entry = self.db.get_entry(path_str)
         if not entry:
             return None
 
-        quality = self._safe_analyze_quality(entry)
+        quality = self._safe_get_quality(entry)
         quality_label = QUALITY_FALLBACK_MARKUP + " UNKNOWN"
         quality_score = "N/A"
         quality_summary = "ROM não verificada"
@@ -235,7 +291,7 @@ class LibraryInsightsService:
             dat_name=dat_name,
             path=entry.path,
             ra_label=ra_label,
-            metadata_lines=self._build_metadata_lines(entry),
+            metadata_lines=self._build_metadata_lines(entry, quality),
             issues=issues,
         )
 
@@ -249,13 +305,13 @@ class LibraryInsightsService:
         entries = self.db.get_all_entries()
         return len(entries), sum(entry.size for entry in entries)
 
-    def _safe_analyze_quality(self, entry: LibraryEntry) -> Optional[RomQuality]:
+    def _safe_get_quality(self, entry: LibraryEntry) -> Optional[RomQuality]:
         try:
-            return self._quality_controller.analyze_rom(entry)
+            return self._quality_controller.get_quality(entry)
         except Exception:
             return None
 
-    def _build_metadata_lines(self, entry: LibraryEntry) -> list[str]:
+    def _build_metadata_lines(self, entry: LibraryEntry, quality: Optional[RomQuality]) -> list[str]:
         lines = [
             "─" * 60,
             "📋 ROM METADATA:",
@@ -291,7 +347,6 @@ class LibraryInsightsService:
         if extra.get("ra_compatible"):
             lines.append("  RetroAchievements: ✓ Compatible")
 
-        quality = self._safe_analyze_quality(entry)
         if quality:
             lines.append(
                 f"  Quality: {quality.quality_level.value} "
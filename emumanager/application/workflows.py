@@ -35,6 +35,19 @@ CORE_WORKFLOWS: dict[str, WorkflowSpec] = {
         supports_dry_run=True,
         refresh_library=True,
     ),
+    "verify_integrity": WorkflowSpec(
+        id="verify_integrity",
+        method_name="verify_integrity",
+        supports_progress=True,
+        supports_cancel=True,
+        refresh_library=True,
+    ),
+    "quality_sweep": WorkflowSpec(
+        id="quality_sweep",
+        method_name="sweep_quality",
+        supports_progress=True,
+        supports_cancel=True,
+    ),
     "transcode": WorkflowSpec(
         id="transcode",
         method_name="bulk_transcode",
@@ -157,6 +157,79 @@ def cmd_maintain(
     )
     console.print(f"\n[bold yellow]✔[/bold yellow] Manutenção finalizada. [dim]({stats})[/dim]")
 
+@app.command("verify-integrity")
+def cmd_verify_integrity(
+    base: Path = typer.Option(Path(BASE_DEFAULT), help=HELP_ACERVO_DIR),
+    force: bool = typer.Option(False, "--force", help="Reverifica todos os ficheiros, mesmo os recentes."),
+    max_age_days: float = typer.Option(30, "--max-age-days", help="Idade máxima de uma verificação válida."),
+    workers: int = typer.Option(0, "--workers", help="Processos em paralelo (0 = automático).")
+):
+    """
+    [bold green]🛡  Verificação de Integridade[/bold green]
+
+    Corre chdman/dolphin-tool verify apenas em ficheiros alterados ou cuja
+    última verificação expirou, num pool de processos limitado.
+    """
+    _print_banner()
+    orch = _get_orch(base)
+    with console.status("[bold green]A verificar integridade..."):
+        stats = orch.verify_integrity(
+            force=force,
+            revalidate_days=max_age_days,
+            max_workers=workers or None,
+        )
+    console.print(f"\n[bold green]✔[/bold green] Verificação concluída. [dim]({stats})[/dim]")
+
+@app.command("quality-sweep")
+def cmd_quality_sweep(
+    base: Path = typer.Option(Path(BASE_DEFAULT), help=HELP_ACERVO_DIR),
+    force: bool = typer.Option(False, "--force", help="Reanalisa também as ROMs com resultado válido."),
+    system: str = typer.Option("", "--system", help="Limita a análise a um sistema."),
+    workers: int = typer.Option(0, "--workers", help="Processos em paralelo (0 = automático).")
+):
+    """
+    [bold cyan]🏥 Varrimento de Qualidade[/bold cyan]
+
+    Analisa a qualidade de toda a biblioteca num pool de processos e grava
+    os resultados; ROMs inalteradas reutilizam o resultado anterior.
+    """
+    _print_banner()
+    orch = _get_orch(base)
+    with console.status("[bold cyan]A analisar qualidade..."):
+        stats = orch.sweep_quality(
+            force=force,
+            max_workers=workers or None,
+            system=system or None,
+        )
+    console.print(
+        f"\n[bold cyan]✔[/bold cyan] {stats['total']} ROMs "
+        f"({stats['analyzed']} analisadas, {stats['cached']} em cache), "
+        f"score médio {stats['average_score']:.1f}, {stats['damaged']} danificadas."
+    )
+
+@app.command("calibrate-io")
+def cmd_calibrate_io(
+    base: Path = typer.Option(Path(BASE_DEFAULT), help=HELP_ACERVO_DIR),
+):
+    """
+    [bold magenta]💽 Calibração de I/O[/bold magenta]
+
+    Mede readinto, mmap e fadvise num ficheiro do acervo e grava a
+    estratégia de leitura mais rápida para este disco (usada no hashing).
+    """
+    from .verification.io_strategy import calibrate
+
+    _print_banner()
+    with console.status("[bold magenta]A medir estratégias de leitura..."):
+        result = calibrate(base)
+    table = Table(title=f"I/O em {result['mount']}")
+    table.add_column("Estratégia")
+    table.add_column("MB/s", justify="right")
+    for name, speed in result["mb_per_sec"].items():
+        table.add_row(name, f"{speed:.1f}")
+    console.print(table)
+    console.print(f"[bold magenta]✔[/bold magenta] Estratégia gravada: [bold]{result['strategy']}[/bold]")
+
 @app.command("transcode")
 def cmd_transcode(
     base: Path = typer.Option(Path(BASE_DEFAULT), help=HELP_ACERVO_DIR),
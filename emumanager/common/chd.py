@@ -0,0 +1,687 @@
+"""Leitor nativo de CHD v5 (MAME) para extração de metadados sem ``chdman``.
+
+Lê o cabeçalho, o mapa de hunks (codificado com Huffman) e os metadados, e
+descomprime só os hunks pedidos com os codecs ``zlib``/``lzma``/``zstd`` e as
+variantes de CD (``cdzl``/``cdlz``/``cdzs``). ``ChdFile`` é um ficheiro
+binário de acesso aleatório sobre os dados lógicos; ``open_chd_image`` devolve
+a vista de setores da primeira faixa de dados (CD) ou o próprio ``ChdFile``
+(DVD/HD), pronta para o leitor ISO9660.
+
+Codecs sem implementação nativa (``huff``, ``flac``), CHDs com pai e versões
+anteriores à v5 levantam ``DependencyError``: quem chama recorre ao ``chdman``.
+"""
+
+from __future__ import annotations
+
+import binascii
+import hashlib
+import io
+import lzma
+import re
+import struct
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+from .exceptions import CorruptedFileError, DependencyError
+
+try:
+    import zstandard
+except ImportError:  # codec opcional (zstd/cdzs)
+    zstandard = None
+
+CHD_MAGIC = b"MComprHD"
+CHD_V5_HEADER = struct.Struct(">8sII4I3QII20s20s20s")
+CHD_MAP_HEADER = struct.Struct(">I6sHBBBx")
+CHD_METADATA_HEADER = struct.Struct(">4sIQ")
+CHD_MDFLAGS_CHECKSUM = 0x01
+DEFAULT_HUNK_CACHE = 8
+
+# Tipos de compressão no mapa v5 (os pseudo-tipos só existem no mapa codificado)
+COMPRESSION_TYPE_0 = 0
+COMPRESSION_TYPE_3 = 3
+COMPRESSION_NONE = 4
+COMPRESSION_SELF = 5
+COMPRESSION_PARENT = 6
+COMPRESSION_RLE_SMALL = 7
+COMPRESSION_RLE_LARGE = 8
+COMPRESSION_SELF_0 = 9
+COMPRESSION_SELF_1 = 10
+COMPRESSION_PARENT_SELF = 11
+COMPRESSION_PARENT_0 = 12
+COMPRESSION_PARENT_1 = 13
+MAP_ENTRY_SIZE = 12
+
+CD_FRAME_SIZE = 2448
+CD_SECTOR_SIZE = 2352
+CD_SUBCODE_SIZE = 96
+CD_TRACK_PADDING = 4
+CD_SYNC_HEADER = b"\x00" + b"\xff" * 10 + b"\x00"
+CD_TRACK_TAGS = ("CHT2", "CHTR", "CHGD")
+# Bytes de dados guardados por frame, conforme o TYPE da faixa
+CD_TRACK_DATA_SIZES = {
+    "MODE1": 2048,
+    "MODE1/2048": 2048,
+    "MODE1_RAW": 2352,
+    "MODE1/2352": 2352,
+    "MODE2": 2336,
+    "MODE2/2336": 2336,
+    "MODE2_FORM1": 2048,
+    "MODE2/2048": 2048,
+    "MODE2_FORM2": 2324,
+    "MODE2/2324": 2324,
+    "MODE2_FORM_MIX": 2336,
+    "MODE2_RAW": 2352,
+    "MODE2/2352": 2352,
+    "AUDIO": 2352,
+}
+_TRACK_FIELD_RE = re.compile(r"(\w+):(\S+)")
+
+# ECC de setores CD (Reed-Solomon P/Q, como em MAME cdrom.cpp)
+_ECC_P_OFFSET = 2076
+_ECC_Q_OFFSET = 2248
+_ECC_LOW = bytes(((i << 1) ^ (0x11D if i & 0x80 else 0)) & 0xFF for i in range(256))
+_ECC_HIGH = bytearray(256)
+for _i in range(256):
+    _ECC_HIGH[_i ^ _ECC_LOW[_i]] = _i
+_ECC_P_ROWS = tuple(tuple(byte + 86 * comp for comp in range(24)) for byte in range(86))
+_ECC_Q_ROWS = tuple(
+    tuple(((byte // 2) * 86 + comp * 88) % 2236 + (byte & 1) for comp in range(43))
+    for byte in range(52)
+)
+
+
+def _ecc_row(sector: bytes, row: tuple[int, ...], mode2: bool) -> tuple[int, int]:
+    val1 = val2 = 0
+    for offset in row:
+        # Em Mode2 o cabeçalho (MSF + modo) entra no cálculo como zeros
+        byte = 0 if mode2 and offset < 4 else sector[12 + offset]
+        val1 = _ECC_LOW[val1 ^ byte]
+        val2 ^= byte
+    val1 = _ECC_HIGH[_ECC_LOW[val1] ^ val2]
+    return val1, val2 ^ val1
+
+
+def ecc_generate(sector: bytearray) -> None:
+    """Recalcula no lugar os bytes ECC P e Q de um setor raw de 2352 bytes."""
+    mode2 = sector[15] == 2
+    for byte, row in enumerate(_ECC_P_ROWS):
+        low, high = _ecc_row(sector, row, mode2)
+        sector[_ECC_P_OFFSET + byte] = low
+        sector[_ECC_P_OFFSET + 86 + byte] = high
+    for byte, row in enumerate(_ECC_Q_ROWS):
+        low, high = _ecc_row(sector, row, mode2)
+        sector[_ECC_Q_OFFSET + byte] = low
+        sector[_ECC_Q_OFFSET + 52 + byte] = high
+
+
+class _BitReader:
+    """Leitura MSB-first; para lá do fim devolve zeros (como o ``bitstream_in`` do MAME)."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    def peek(self, count: int) -> int:
+        start = self._pos >> 3
+        end = (self._pos + count + 7) >> 3
+        chunk = self._data[start:end].ljust(end - start, b"\x00")
+        shift = (end - start) * 8 - (self._pos & 7) - count
+        return (int.from_bytes(chunk, "big") >> shift) & ((1 << count) - 1)
+
+    def skip(self, count: int) -> None:
+        self._pos += count
+
+    def read(self, count: int) -> int:
+        if not count:
+            return 0
+        value = self.peek(count)
+        self._pos += count
+        return value
+
+    @property
+    def overflowed(self) -> bool:
+        return self._pos > len(self._data) * 8
+
+
+class _HuffmanDecoder:
+    """Descodificador Huffman canónico do MAME (árvore importada em RLE)."""
+
+    def __init__(self, num_codes: int, max_bits: int):
+        self.num_codes = num_codes
+        self.max_bits = max_bits
+        self._lookup: list[Optional[tuple[int, int]]] = []
+
+    def import_tree_rle(self, bits: _BitReader) -> None:
+        field_bits = 5 if self.max_bits >= 16 else 4 if self.max_bits >= 8 else 3
+        lengths: list[int] = []
+        while len(lengths) < self.num_codes:
+            value = bits.read(field_bits)
+            if value != 1:
+                lengths.append(value)
+                continue
+            # 1 é o código de escape: "1 1" é um 1 literal, senão valor + repetições
+            value = bits.read(field_bits)
+            if value == 1:
+                lengths.append(value)
+            else:
+                lengths.extend([value] * (bits.read(field_bits) + 3))
+        if len(lengths) != self.num_codes or bits.overflowed:
+            raise ValueError("árvore Huffman inválida")
+        self._build(lengths)
+
+    def _build(self, lengths: list[int]) -> None:
+        histogram = [0] * 33
+        for length in lengths:
+            if length > self.max_bits:
+                raise ValueError("comprimento de código Huffman inválido")
+            histogram[length] += 1
+        start = 0
+        for length in range(32, 0, -1):
+            next_start = (start + histogram[length]) >> 1
+            if length != 1 and next_start * 2 != start + histogram[length]:
+                raise ValueError("árvore Huffman inconsistente")
+            histogram[length] = start
+            start = next_start
+        self._lookup = [None] * (1 << self.max_bits)
+        for symbol, length in enumerate(lengths):
+            if not length:
+                continue
+            code = histogram[length]
+            histogram[length] += 1
+            shift = self.max_bits - length
+            for index in range(code << shift, (code + 1) << shift):
+                self._lookup[index] = (symbol, length)
+
+    def decode_one(self, bits: _BitReader) -> int:
+        entry = self._lookup[bits.peek(self.max_bits)]
+        if entry is None:
+            raise ValueError("código Huffman inválido")
+        bits.skip(entry[1])
+        return entry[0]
+
+
+def _inflate(data: bytes, size: int) -> bytes:
+    return zlib.decompressobj(-zlib.MAX_WBITS).decompress(data, size)
+
+
+def _lzma_dict_size(size: int) -> int:
+    """Dicionário do ``LzmaEncProps_Normalize`` (nível 9, reduceSize = tamanho do hunk)."""
+    dict_size = 1 << 26
+    for shift in range(11, 31):
+        if size <= 2 << shift:
+            return min(dict_size, 2 << shift)
+        if size <= 3 << shift:
+            return min(dict_size, 3 << shift)
+    return dict_size
+
+
+def _unlzma(data: bytes, size: int) -> bytes:
+    # Stream LZMA1 sem cabeçalho: reconstruir um cabeçalho .lzma com tamanho conhecido
+    header = struct.pack("<BIQ", 0x5D, _lzma_dict_size(size), size)
+    return lzma.LZMADecompressor(format=lzma.FORMAT_ALONE).decompress(header + data, size)
+
+
+def _unzstd(data: bytes, size: int) -> bytes:
+    if zstandard is None:
+        raise DependencyError("zstandard", "Codec CHD zstd requer o módulo opcional 'zstandard'")
+    return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+
+
+def _decompress_cd(
+    base: Callable[[bytes, int], bytes],
+    subcode: Callable[[bytes, int], bytes],
+    data: bytes,
+    size: int,
+) -> bytes:
+    frames = size // CD_FRAME_SIZE
+    ecc_bytes = (frames + 7) // 8
+    header_bytes = ecc_bytes + (2 if size < 65536 else 3)
+    base_length = int.from_bytes(data[ecc_bytes:header_bytes], "big")
+    sectors = base(data[header_bytes : header_bytes + base_length], frames * CD_SECTOR_SIZE)
+    subcodes = subcode(data[header_bytes + base_length :], frames * CD_SUBCODE_SIZE)
+    out = bytearray(size)
+    for frame in range(frames):
+        sector = bytearray(sectors[frame * CD_SECTOR_SIZE : (frame + 1) * CD_SECTOR_SIZE])
+        if data[frame // 8] & (1 << (frame % 8)):
+            # Sync e ECC foram removidos na compressão por serem recalculáveis
+            sector[: len(CD_SYNC_HEADER)] = CD_SYNC_HEADER
+            ecc_generate(sector)
+        base_offset = frame * CD_FRAME_SIZE
+        out[base_offset : base_offset + CD_SECTOR_SIZE] = sector
+        out[base_offset + CD_SECTOR_SIZE : base_offset + CD_FRAME_SIZE] = subcodes[
+            frame * CD_SUBCODE_SIZE : (frame + 1) * CD_SUBCODE_SIZE
+        ]
+    return bytes(out)
+
+
+CHD_CODECS: dict[str, Callable[[bytes, int], bytes]] = {
+    "zlib": _inflate,
+    "lzma": _unlzma,
+    "zstd": _unzstd,
+    "cdzl": partial(_decompress_cd, _inflate, _inflate),
+    "cdlz": partial(_decompress_cd, _unlzma, _inflate),
+    "cdzs": partial(_decompress_cd, _unzstd, _unzstd),
+}
+
+
+def _hex_or_none(raw: bytes) -> Optional[str]:
+    return raw.hex() if any(raw) else None
+
+
+@dataclass(slots=True)
+class ChdHeader:
+    """Campos do cabeçalho v5 (SHA1 em hexadecimal; ``None`` quando a zeros)."""
+
+    version: int
+    compressors: tuple[Optional[str], ...]
+    logical_bytes: int
+    map_offset: int
+    meta_offset: int
+    hunk_bytes: int
+    unit_bytes: int
+    raw_sha1: Optional[str]
+    sha1: Optional[str]
+    parent_sha1: Optional[str]
+
+    @property
+    def hunk_count(self) -> int:
+        return (self.logical_bytes + self.hunk_bytes - 1) // self.hunk_bytes
+
+    @property
+    def compressed(self) -> bool:
+        return self.compressors[0] is not None
+
+    @classmethod
+    def parse(cls, raw: bytes, path: str = "") -> "ChdHeader":
+        if len(raw) < 16 or raw[:8] != CHD_MAGIC:
+            raise CorruptedFileError(path, "assinatura CHD inválida")
+        _, _, version = struct.unpack_from(">8sII", raw)
+        if version != 5:
+            raise DependencyError("chdman", f"CHD v{version} não suportado nativamente: {path}")
+        if len(raw) < CHD_V5_HEADER.size:
+            raise CorruptedFileError(path, "cabeçalho CHD truncado")
+        (_, _, _, c0, c1, c2, c3, logical, map_offset, meta_offset, hunk_bytes, unit_bytes,
+         raw_sha1, sha1, parent_sha1) = CHD_V5_HEADER.unpack_from(raw)
+        if not hunk_bytes:
+            raise CorruptedFileError(path, "tamanho de hunk inválido")
+        compressors = tuple(
+            value.to_bytes(4, "big").decode("ascii", errors="replace") if value else None
+            for value in (c0, c1, c2, c3)
+        )
+        return cls(
+            version=version,
+            compressors=compressors,
+            logical_bytes=logical,
+            map_offset=map_offset,
+            meta_offset=meta_offset,
+            hunk_bytes=hunk_bytes,
+            unit_bytes=unit_bytes,
+            raw_sha1=_hex_or_none(raw_sha1),
+            sha1=_hex_or_none(sha1),
+            parent_sha1=_hex_or_none(parent_sha1),
+        )
+
+
+@dataclass(slots=True)
+class ChdMetadata:
+    tag: str
+    flags: int
+    data: bytes
+
+
+@dataclass(slots=True)
+class ChdTrack:
+    """Faixa de CD descrita nos metadados ``CHT2``/``CHTR``/``CHGD``."""
+
+    number: int
+    type: str
+    frames: int
+    start_frame: int
+    pregap: int = 0
+
+    @property
+    def data_size(self) -> int:
+        return CD_TRACK_DATA_SIZES.get(self.type, CD_SECTOR_SIZE)
+
+    @property
+    def is_audio(self) -> bool:
+        return self.type == "AUDIO"
+
+
+def read_chd_header(path: Union[str, Path]) -> ChdHeader:
+    """Só o cabeçalho (uma leitura de 124 bytes)."""
+    with open(path, "rb") as fh:
+        return ChdHeader.parse(fh.read(CHD_V5_HEADER.size), str(path))
+
+
+class _RandomAccessReader(io.RawIOBase):
+    """Ficheiro binário só de leitura com ``seek``; as subclasses fornecem ``_read_at``."""
+
+    size = 0
+
+    def __init__(self):
+        super().__init__()
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        data = self._read_at(self._pos, min(len(buffer), max(0, self.size - self._pos)))
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        raise NotImplementedError
+
+
+class ChdFile(_RandomAccessReader):
+    """Dados lógicos de um CHD v5 com descompressão por hunk e uma pequena cache LRU."""
+
+    def __init__(self, path: Union[str, Path], cache_hunks: int = DEFAULT_HUNK_CACHE):
+        super().__init__()
+        self.path = str(path)
+        self._file = open(path, "rb")
+        try:
+            self.header = ChdHeader.parse(self._file.read(CHD_V5_HEADER.size), self.path)
+            self.size = self.header.logical_bytes
+            self._codecs = [self._resolve_codec(name) for name in self.header.compressors]
+            self._map = self._load_map()
+            self.metadata = self._load_metadata()
+            self.tracks = self._load_tracks()
+        except Exception:
+            self._file.close()
+            raise
+        self._cache: OrderedDict[int, bytes] = OrderedDict()
+        self._cache_hunks = max(1, cache_hunks)
+        self.hunks_decompressed = 0
+
+    def close(self) -> None:
+        if not self.closed and hasattr(self, "_file"):
+            self._file.close()
+        super().close()
+
+    def _resolve_codec(self, name: Optional[str]) -> Optional[Callable[[bytes, int], bytes]]:
+        if name is None:
+            return None
+        codec = CHD_CODECS.get(name)
+        if codec is None:
+            # Só falha se algum hunk usar o codec (ver read_hunk)
+            return partial(self._unsupported_codec, name)
+        return codec
+
+    def _unsupported_codec(self, name: str, data: bytes, size: int) -> bytes:
+        raise DependencyError(
+            "chdman", f"Codec CHD '{name}' não suportado nativamente: {self.path}"
+        )
+
+    def _read_file(self, offset: int, size: int) -> bytes:
+        self._file.seek(offset)
+        data = self._file.read(size)
+        if len(data) != size:
+            raise CorruptedFileError(self.path, f"leitura truncada em {offset}")
+        return data
+
+    def _load_map(self) -> bytearray:
+        """Mapa descodificado: 12 bytes por hunk (tipo, comprimento u24, offset u48, crc16)."""
+        header = self.header
+        count = header.hunk_count
+        if not header.compressed:
+            raw = self._read_file(header.map_offset, count * 4)
+            rawmap = bytearray(count * MAP_ENTRY_SIZE)
+            for hunk, (block,) in enumerate(struct.iter_unpack(">I", raw)):
+                entry = hunk * MAP_ENTRY_SIZE
+                rawmap[entry] = COMPRESSION_NONE
+                rawmap[entry + 4 : entry + 10] = (block * header.hunk_bytes).to_bytes(6, "big")
+            return rawmap
+
+        map_header = self._read_file(header.map_offset, CHD_MAP_HEADER.size)
+        map_bytes, first_offset, map_crc, length_bits, self_bits, parent_bits = (
+            CHD_MAP_HEADER.unpack(map_header)
+        )
+        bits = _BitReader(self._read_file(header.map_offset + CHD_MAP_HEADER.size, map_bytes))
+        try:
+            types = self._decode_map_types(bits, count)
+        except ValueError as exc:
+            raise CorruptedFileError(self.path, f"mapa CHD inválido: {exc}") from exc
+
+        rawmap = bytearray(count * MAP_ENTRY_SIZE)
+        cur_offset = int.from_bytes(first_offset, "big")
+        last_self = 0
+        last_parent = 0
+        units_per_hunk = header.hunk_bytes // max(1, header.unit_bytes)
+        for hunk, comp in enumerate(types):
+            offset = cur_offset
+            length = 0
+            crc = 0
+            if comp <= COMPRESSION_TYPE_3:
+                length = bits.read(length_bits)
+                cur_offset += length
+                crc = bits.read(16)
+            elif comp == COMPRESSION_NONE:
+                length = header.hunk_bytes
+                cur_offset += length
+                crc = bits.read(16)
+            elif comp == COMPRESSION_SELF:
+                offset = last_self = bits.read(self_bits)
+            elif comp == COMPRESSION_PARENT:
+                offset = last_parent = bits.read(parent_bits)
+            elif comp in (COMPRESSION_SELF_0, COMPRESSION_SELF_1):
+                if comp == COMPRESSION_SELF_1:
+                    last_self += 1
+                comp, offset = COMPRESSION_SELF, last_self
+            elif comp == COMPRESSION_PARENT_SELF:
+                comp = COMPRESSION_PARENT
+                offset = last_parent = hunk * units_per_hunk
+            elif comp in (COMPRESSION_PARENT_0, COMPRESSION_PARENT_1):
+                if comp == COMPRESSION_PARENT_1:
+                    last_parent += units_per_hunk
+                comp, offset = COMPRESSION_PARENT, last_parent
+            else:
+                raise CorruptedFileError(self.path, f"tipo de hunk desconhecido: {comp}")
+            entry = hunk * MAP_ENTRY_SIZE
+            rawmap[entry] = comp
+            rawmap[entry + 1 : entry + 4] = length.to_bytes(3, "big")
+            rawmap[entry + 4 : entry + 10] = offset.to_bytes(6, "big")
+            rawmap[entry + 10 : entry + 12] = crc.to_bytes(2, "big")
+
+        if binascii.crc_hqx(rawmap, 0xFFFF) != map_crc:
+            raise CorruptedFileError(self.path, "CRC do mapa CHD não confere")
+        return rawmap
+
+    @staticmethod
+    def _decode_map_types(bits: _BitReader, count: int) -> list[int]:
+        decoder = _HuffmanDecoder(16, 8)
+        decoder.import_tree_rle(bits)
+        types: list[int] = []
+        last = 0
+        while len(types) < count:
+            value = decoder.decode_one(bits)
+            if value == COMPRESSION_RLE_SMALL:
+                repeat = 3 + decoder.decode_one(bits)
+            elif value == COMPRESSION_RLE_LARGE:
+                repeat = 3 + 16 + (decoder.decode_one(bits) << 4)
+                repeat += decoder.decode_one(bits)
+            else:
+                types.append(value)
+                last = value
+                continue
+            types.extend([last] * min(repeat, count - len(types)))
+        return types
+
+    def _load_metadata(self) -> list[ChdMetadata]:
+        entries: list[ChdMetadata] = []
+        offset = self.header.meta_offset
+        seen: set[int] = set()
+        while offset and offset not in seen:
+            seen.add(offset)
+            tag, flags_length, next_offset = CHD_METADATA_HEADER.unpack(
+                self._read_file(offset, CHD_METADATA_HEADER.size)
+            )
+            length = flags_length & 0xFFFFFF
+            entries.append(
+                ChdMetadata(
+                    tag=tag.decode("ascii", errors="replace"),
+                    flags=flags_length >> 24,
+                    data=self._read_file(offset + CHD_METADATA_HEADER.size, length),
+                )
+            )
+            offset = next_offset
+        return entries
+
+    def _load_tracks(self) -> list[ChdTrack]:
+        tracks: list[ChdTrack] = []
+        chd_frame = 0
+        for meta in self.metadata:
+            if meta.tag not in CD_TRACK_TAGS:
+                continue
+            text = meta.data.rstrip(b"\x00").decode("ascii", errors="replace")
+            fields = dict(_TRACK_FIELD_RE.findall(text))
+            try:
+                frames = int(fields["FRAMES"])
+                pregap = int(fields.get("PREGAP", 0))
+                number = int(fields["TRACK"])
+            except (KeyError, ValueError) as exc:
+                raise CorruptedFileError(
+                    self.path, f"metadados de faixa inválidos: {exc}"
+                ) from exc
+            # O pregap só está nos dados quando PGTYPE começa por 'V'
+            stored_pregap = pregap if fields.get("PGTYPE", "").startswith("V") else 0
+            tracks.append(
+                ChdTrack(
+                    number=number,
+                    type=fields.get("TYPE", "MODE1_RAW"),
+                    frames=frames - stored_pregap,
+                    start_frame=chd_frame + stored_pregap,
+                    pregap=pregap,
+                )
+            )
+            if meta.tag == "CHGD":
+                padding = int(fields.get("PAD", 0))
+            else:
+                padding = -frames % CD_TRACK_PADDING
+            chd_frame += frames + padding
+        return tracks
+
+    def _map_entry(self, hunk: int) -> tuple[int, int, int, int]:
+        entry = hunk * MAP_ENTRY_SIZE
+        raw = self._map[entry : entry + MAP_ENTRY_SIZE]
+        return (
+            raw[0],
+            int.from_bytes(raw[1:4], "big"),
+            int.from_bytes(raw[4:10], "big"),
+            int.from_bytes(raw[10:12], "big"),
+        )
+
+    def read_hunk(self, hunk: int) -> bytes:
+        """Conteúdo descomprimido do hunk ``hunk`` (``hunk_bytes`` bytes)."""
+        cached = self._cache.get(hunk)
+        if cached is not None:
+            self._cache.move_to_end(hunk)
+            return cached
+        if not 0 <= hunk < self.header.hunk_count:
+            raise CorruptedFileError(self.path, f"hunk fora do intervalo: {hunk}")
+
+        hunk_bytes = self.header.hunk_bytes
+        comp, length, offset, crc = self._map_entry(hunk)
+        if comp <= COMPRESSION_TYPE_3:
+            codec = self._codecs[comp]
+            if codec is None:
+                raise CorruptedFileError(self.path, f"hunk {hunk} usa um codec inexistente")
+            try:
+                data = codec(self._read_file(offset, length), hunk_bytes)
+            except (zlib.error, lzma.LZMAError, IndexError) as exc:
+                raise CorruptedFileError(self.path, f"hunk {hunk} corrompido: {exc}") from exc
+        elif comp == COMPRESSION_NONE:
+            data = self._read_file(offset, hunk_bytes) if offset else bytes(hunk_bytes)
+        elif comp == COMPRESSION_SELF:
+            return self.read_hunk(offset)
+        else:
+            raise DependencyError("chdman", f"CHD com pai não suportado nativamente: {self.path}")
+
+        if len(data) != hunk_bytes:
+            raise CorruptedFileError(self.path, f"hunk {hunk} com tamanho inválido")
+        if self.header.compressed and binascii.crc_hqx(data, 0xFFFF) != crc:
+            raise CorruptedFileError(self.path, f"CRC do hunk {hunk} não confere")
+        self.hunks_decompressed += 1
+        self._cache[hunk] = data
+        if len(self._cache) > self._cache_hunks:
+            self._cache.popitem(last=False)
+        return data
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        hunk_bytes = self.header.hunk_bytes
+        chunks = []
+        end = min(offset + size, self.size)
+        while offset < end:
+            hunk, start = divmod(offset, hunk_bytes)
+            chunk = self.read_hunk(hunk)[start : start + end - offset]
+            chunks.append(chunk)
+            offset += len(chunk)
+        return b"".join(chunks)
+
+
+class ChdTrackReader(_RandomAccessReader):
+    """Setores de uma faixa de CD (sem subcódigo nem padding), como numa imagem BIN/ISO."""
+
+    def __init__(self, chd: ChdFile, track: ChdTrack):
+        super().__init__()
+        self.chd = chd
+        self.track = track
+        self.sector_size = track.data_size
+        self.size = track.frames * self.sector_size
+
+    def close(self) -> None:
+        self.chd.close()
+        super().close()
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        chunks = []
+        end = min(offset + size, self.size)
+        while offset < end:
+            frame, start = divmod(offset, self.sector_size)
+            length = min(self.sector_size - start, end - offset)
+            frame_offset = (self.track.start_frame + frame) * CD_FRAME_SIZE
+            chunks.append(self.chd._read_at(frame_offset + start, length))
+            offset += length
+        return b"".join(chunks)
+
+
+def open_chd_image(path: Union[str, Path]) -> _RandomAccessReader:
+    """Vista para o leitor ISO9660: primeira faixa de dados (CD) ou dados lógicos (DVD/HD)."""
+    chd = ChdFile(path)
+    data_track = next((track for track in chd.tracks if not track.is_audio), None)
+    if data_track is None:
+        return chd
+    return ChdTrackReader(chd, data_track)
+
+
+def compute_overall_sha1(raw_sha1: bytes, metadata: Sequence[ChdMetadata]) -> bytes:
+    """SHA1 combinado do cabeçalho: SHA1 raw + (tag, SHA1) ordenados dos metadados com checksum."""
+    hashes = sorted(
+        meta.tag.encode("ascii") + hashlib.sha1(meta.data).digest()
+        for meta in metadata
+        if meta.flags & CHD_MDFLAGS_CHECKSUM
+    )
+    return hashlib.sha1(raw_sha1 + b"".join(hashes)).digest()
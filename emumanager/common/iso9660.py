@@ -0,0 +1,248 @@
+"""Leitor mínimo de ISO9660 para localizar ficheiros de arranque em imagens de disco.
+
+Lê o descritor de volume primário (setor 16), a path table e apenas os
+registos de diretoria e setores do ficheiro pedido (``SYSTEM.CNF``,
+``PSP_GAME/PARAM.SFO``...). Funciona sobre setores ISO de 2048 bytes e sobre
+setores raw de 2352 bytes (BIN Mode1 e Mode2/XA Form1), também dentro de CHD
+(``common.chd``), por isso a extração de metadados lê alguns KB em vez de
+varrer megabytes à procura de padrões.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import struct
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+from .chd import open_chd_image
+from .exceptions import EmuManagerError
+
+logger = logging.getLogger(__name__)
+
+SECTOR_DATA_SIZE = 2048
+PVD_SECTOR = 16
+PVD_MAGIC = b"\x01CD001"
+DEFAULT_MAX_FILE_SIZE = 64 * 1024
+# Limites de sanidade contra imagens truncadas ou corrompidas
+MAX_PATH_TABLE_SIZE = 1024 * 1024
+MAX_DIRECTORY_SIZE = 1024 * 1024
+
+DIR_FLAG_DIRECTORY = 0x02
+
+
+class SectorLayout(NamedTuple):
+    """Tamanho do setor físico e offset dos 2048 bytes de dados de utilizador."""
+
+    sector_size: int
+    data_offset: int
+
+
+# Ordem de deteção: ISO, BIN Mode2/XA (PSX) e BIN Mode1
+SECTOR_LAYOUTS = (
+    SectorLayout(2048, 0),
+    SectorLayout(2352, 24),
+    SectorLayout(2352, 16),
+)
+
+
+class IsoRecord(NamedTuple):
+    """Registo de diretoria (nome sem a versão ``;1``)."""
+
+    name: str
+    extent: int
+    size: int
+    is_dir: bool
+
+
+def _normalize_name(raw: bytes) -> str:
+    name = raw.decode("ascii", errors="replace").upper()
+    name = name.split(";", 1)[0]
+    return name.rstrip(".")
+
+
+def _parse_record(data: bytes, offset: int) -> Optional[IsoRecord]:
+    length = data[offset]
+    if length < 34 or offset + length > len(data):
+        return None
+    name_len = data[offset + 32]
+    raw_name = data[offset + 33 : offset + 33 + name_len]
+    if raw_name in (b"\x00", b"\x01"):
+        name = "." if raw_name == b"\x00" else ".."
+    else:
+        name = _normalize_name(raw_name)
+    extent, size = struct.unpack_from("<I4xI", data, offset + 2)
+    return IsoRecord(name, extent, size, bool(data[offset + 25] & DIR_FLAG_DIRECTORY))
+
+
+class Iso9660Image:
+    """Sistema de ficheiros ISO9660 sobre um ficheiro binário já aberto.
+
+    ``bytes_read`` conta os bytes efetivamente lidos do ficheiro (incluindo os
+    cabeçalhos dos setores raw).
+    """
+
+    def __init__(self, fileobj: BinaryIO, layout: SectorLayout, pvd: bytes):
+        self._file = fileobj
+        self.layout = layout
+        self.bytes_read = 0
+        self.volume_id = pvd[40:72].decode("ascii", errors="replace").strip()
+        self._root = _parse_record(pvd, 156)
+        self._path_table_size, self._path_table_lba = struct.unpack_from("<I4xI", pvd, 132)
+        self._directories: Optional[dict[str, int]] = None
+
+    @classmethod
+    def open(cls, fileobj: BinaryIO) -> Optional["Iso9660Image"]:
+        """Deteta o formato dos setores; devolve ``None`` se não for ISO9660."""
+        for layout in SECTOR_LAYOUTS:
+            fileobj.seek(PVD_SECTOR * layout.sector_size + layout.data_offset)
+            pvd = fileobj.read(SECTOR_DATA_SIZE)
+            if len(pvd) == SECTOR_DATA_SIZE and pvd.startswith(PVD_MAGIC):
+                image = cls(fileobj, layout, pvd)
+                image.bytes_read = len(pvd)
+                if image._root is None:
+                    return None
+                return image
+        return None
+
+    def read_sectors(self, lba: int, count: int) -> bytes:
+        """Dados de utilizador de ``count`` setores a partir de ``lba``."""
+        sector_size, data_offset = self.layout
+        if sector_size == SECTOR_DATA_SIZE:
+            self._file.seek(lba * SECTOR_DATA_SIZE)
+            data = self._file.read(count * SECTOR_DATA_SIZE)
+            self.bytes_read += len(data)
+            return data
+        chunks = []
+        self._file.seek(lba * sector_size)
+        for _ in range(count):
+            raw = self._file.read(sector_size)
+            self.bytes_read += len(raw)
+            if len(raw) < data_offset + SECTOR_DATA_SIZE:
+                break
+            chunks.append(raw[data_offset : data_offset + SECTOR_DATA_SIZE])
+        return b"".join(chunks)
+
+    def _read_extent(self, lba: int, size: int) -> bytes:
+        sectors = (size + SECTOR_DATA_SIZE - 1) // SECTOR_DATA_SIZE
+        return self.read_sectors(lba, sectors)[:size]
+
+    def _load_path_table(self) -> dict[str, int]:
+        """Caminho da diretoria (maiúsculas, separado por ``/``) -> LBA do extent."""
+        directories: dict[str, int] = {}
+        size = self._path_table_size
+        if not size or size > MAX_PATH_TABLE_SIZE:
+            return directories
+        table = self._read_extent(self._path_table_lba, size)
+        paths: list[str] = []
+        offset = 0
+        while offset + 8 <= len(table):
+            name_len = table[offset]
+            if not name_len:
+                break
+            extent, parent = struct.unpack_from("<IH", table, offset + 2)
+            raw_name = table[offset + 8 : offset + 8 + name_len]
+            if not paths:
+                path = ""
+            else:
+                if not 1 <= parent <= len(paths):
+                    break
+                parent_path = paths[parent - 1]
+                name = _normalize_name(raw_name)
+                path = f"{parent_path}/{name}" if parent_path else name
+            paths.append(path)
+            directories[path] = extent
+            offset += 8 + name_len + (name_len & 1)
+        return directories
+
+    def list_directory(self, lba: int) -> list[IsoRecord]:
+        """Registos da diretoria cujo extent começa em ``lba`` (o tamanho vem de ``.``)."""
+        first = self.read_sectors(lba, 1)
+        record = _parse_record(first, 0) if first else None
+        if record is None or not record.is_dir:
+            return []
+        size = min(record.size, MAX_DIRECTORY_SIZE)
+        data = first
+        if size > SECTOR_DATA_SIZE:
+            data += self._read_extent(lba + 1, size - SECTOR_DATA_SIZE)
+        records = []
+        offset = 0
+        while offset < min(size, len(data)):
+            if data[offset] == 0:
+                # Os registos não atravessam setores: saltar para o próximo
+                offset = (offset // SECTOR_DATA_SIZE + 1) * SECTOR_DATA_SIZE
+                continue
+            parsed = _parse_record(data, offset)
+            if parsed is None:
+                break
+            if parsed.name not in (".", ".."):
+                records.append(parsed)
+            offset += data[offset]
+        return records
+
+    def _directory_lba(self, path: str) -> Optional[int]:
+        if not path:
+            return self._root.extent
+        if self._directories is None:
+            self._directories = self._load_path_table()
+        lba = self._directories.get(path)
+        if lba is not None:
+            return lba
+        # Path table ausente ou inválida: descer pelos registos de diretoria
+        lba = self._root.extent
+        for part in path.split("/"):
+            match = next((r for r in self.list_directory(lba) if r.is_dir and r.name == part), None)
+            if match is None:
+                return None
+            lba = match.extent
+        return lba
+
+    def find(self, path: str) -> Optional[IsoRecord]:
+        """Resolve ``path`` (ex.: ``PSP_GAME/PARAM.SFO``), sem distinguir maiúsculas."""
+        parts = [
+            _normalize_name(part.encode("ascii", errors="replace"))
+            for part in path.replace("\\", "/").split("/")
+            if part
+        ]
+        if not parts:
+            return None
+        lba = self._directory_lba("/".join(parts[:-1]))
+        if lba is None:
+            return None
+        return next((r for r in self.list_directory(lba) if r.name == parts[-1]), None)
+
+    def read_file(self, path: str, max_size: int = DEFAULT_MAX_FILE_SIZE) -> Optional[bytes]:
+        """Conteúdo de ``path`` (até ``max_size`` bytes) ou ``None`` se não existir."""
+        record = self.find(path)
+        if record is None or record.is_dir:
+            return None
+        return self._read_extent(record.extent, min(record.size, max_size))
+
+
+def read_image_file(
+    image_path: Path,
+    member: str,
+    max_size: int = DEFAULT_MAX_FILE_SIZE,
+) -> Optional[bytes]:
+    """Lê ``member`` de uma imagem ISO/BIN/CHD (também ``.gz``).
+
+    Devolve ``None`` se não for ISO9660, se o ficheiro não existir na imagem
+    ou se o CHD precisar do ``chdman`` (codec/versão sem suporte nativo).
+    """
+    suffix = image_path.suffix.lower()
+    try:
+        if suffix == ".chd":
+            opener = open_chd_image(image_path)
+        elif suffix == ".gz":
+            opener = gzip.open(image_path, "rb")
+        else:
+            opener = open(image_path, "rb")
+        with opener as fh:
+            image = Iso9660Image.open(fh)
+            if image is None:
+                return None
+            return image.read_file(member, max_size)
+    except EmuManagerError as exc:
+        logger.debug("Leitura nativa de %s falhou: %s", image_path, exc)
+        return None
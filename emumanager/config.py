@@ -35,6 +35,9 @@ DATE_FMT = "%d/%m/%Y às %H:%M"
 # PERFORMANCE & RESOURCE LIMITS
 # ============================================================================
 
+IO_STRATEGY_CHOICES = ("auto", "readinto", "mmap", "fadvise")
+
+
 @dataclass
 class PerformanceConfig:
     """Configurações de performance e recursos."""
@@ -42,8 +45,14 @@ class PerformanceConfig:
     # Número máximo de workers paralelos (None = auto-detectar)
     max_workers: Optional[int] = None
     
-    # Tamanho do buffer para operações de I/O (bytes)
-    io_buffer_size: int = 64 * 1024  # 64 KB
+    # Tamanho do buffer para operações de I/O (bytes), usado no hashing
+    io_buffer_size: int = 1024 * 1024  # 1 MB
+    
+    # Estratégia de leitura no hashing: auto (calibrada por mount), readinto, mmap, fadvise
+    io_strategy: str = "auto"
+    
+    # Libertar o page cache dos ficheiros depois de hasheados (leituras em massa)
+    io_drop_cache: bool = True
     
     # Tamanho máximo de chunk para processar em memória (bytes)
     max_chunk_size: int = 100 * 1024 * 1024  # 100 MB
@@ -63,6 +72,8 @@ class PerformanceConfig:
             raise ValueError(f"max_workers must be >= 1, got {self.max_workers}")
         if self.io_buffer_size < 1024:
             raise ValueError(f"io_buffer_size too small: {self.io_buffer_size}")
+        if self.io_strategy not in IO_STRATEGY_CHOICES:
+            raise ValueError(f"Invalid io_strategy: {self.io_strategy}. Must be one of {IO_STRATEGY_CHOICES}")
         if self.max_chunk_size < 1024 * 1024:
             raise ValueError(f"max_chunk_size too small: {self.max_chunk_size}")
         if self.default_timeout < 1:
@@ -275,6 +286,7 @@ def load_config_from_env():
     - EMUMANAGER_LOG_LEVEL: Nível de log (DEBUG, INFO, WARNING, ERROR)
     - EMUMANAGER_MAX_WORKERS: Número máximo de workers
     - EMUMANAGER_TIMEOUT: Timeout padrão para operações (segundos)
+    - EMUMANAGER_IO_STRATEGY: Estratégia de leitura no hashing (auto, readinto, mmap, fadvise)
     """
     perf_config = get_performance_config()
     log_config = get_logging_config()
@@ -301,6 +313,11 @@ def load_config_from_env():
             perf_config.default_timeout = int(timeout)
         except ValueError:
             pass
+    
+    # I/O strategy
+    if io_strategy := os.getenv("EMUMANAGER_IO_STRATEGY"):
+        if io_strategy.lower() in IO_STRATEGY_CHOICES:
+            perf_config.io_strategy = io_strategy.lower()
 
 
 # Auto-load configuration from environment on module import
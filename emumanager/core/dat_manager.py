@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 from emumanager.logging_cfg import get_logger
 from emumanager.verification.dat_downloader import DatDownloader, SOURCES
+from emumanager.verification.dat_index import CompiledDatIndex, DatIndexCache
+from emumanager.verification.dat_parser import DatDb
+from emumanager.verification.hash_index import GlobalHashIndex, IdentifyResult
 
 
 class DATManager:
@@ -14,6 +17,8 @@ class DATManager:
         self.dats_root = dats_root
         self.downloader = DatDownloader(dats_root)
         self.logger = get_logger("core.dat_manager")
+        self.index_cache = DatIndexCache()
+        self.hash_index = GlobalHashIndex(dats_root)
 
     def update_all_sources(self, progress_cb: Optional[Callable[[float, str], None]] = None):
         """Atualiza todas as fontes de DATs suportadas (No-Intro e Redump)."""
@@ -59,3 +64,24 @@ class DATManager:
         """Tenta encontrar o ficheiro DAT mais adequado para um sistema."""
         from emumanager.verification.dat_manager import find_dat_for_system
         return find_dat_for_system(self.dats_root, system_id)
+
+    def load_dat(self, dat_path: Path) -> CompiledDatIndex | DatDb:
+        """Devolve o índice compilado do DAT (só recompila se o ficheiro mudou).
+
+        Se a pasta dos DATs não for gravável, devolve o DAT carregado em memória.
+        """
+        return self.index_cache.load(dat_path)
+
+    def prefetch_systems(self, system_ids: Iterable[str]) -> None:
+        """Compila/abre em segundo plano os índices DAT dos sistemas indicados."""
+        dat_paths = [
+            dat_path
+            for dat_path in (self.find_dat_for_system(system_id) for system_id in system_ids)
+            if dat_path
+        ]
+        if dat_paths:
+            self.index_cache.prefetch(dat_paths)
+
+    def identify_many(self, paths: Iterable[Path], cancel_event: Any = None) -> list[IdentifyResult]:
+        """Identifica ficheiros contra todos os DATs (sistema, DAT e título) com um hash por ficheiro."""
+        return self.hash_index.identify_many(paths, cancel_event=cancel_event)
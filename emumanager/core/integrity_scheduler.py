@@ -0,0 +1,203 @@
+"""Verificação profunda de integridade agendada (``chdman verify`` / ``dolphin-tool verify``).
+
+O scan fica só com metadados; esta verificação corre à parte, num pool de
+processos limitado, e só para ficheiros alterados ou cuja última verificação
+já passou da idade de revalidação.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from emumanager.logging_cfg import get_logger
+
+DOLPHIN_SYSTEMS = ("gamecube", "wii", "dolphin")
+PSX_SYSTEMS = ("psx", "ps1", "playstation")
+DEFAULT_REVALIDATE_DAYS = 30
+VERIFY_BASE_TIMEOUT = 60
+# Débito mínimo assumido para o chdman: um CHD de DVD (~4.7 GB) recebe ~6 minutos
+VERIFY_MIN_THROUGHPUT = 16 * 1024 * 1024
+INTEGRITY_FAILURE_LABEL = "Failed integrity check"
+
+logger = get_logger("core.integrity_scheduler")
+
+
+def integrity_tool_for(path: Path, system: str) -> Optional[str]:
+    """Ferramenta de verificação aplicável ao ficheiro (``"rvz"``, ``"chd"``) ou ``None``."""
+    ext = path.suffix.lower()
+    if system in DOLPHIN_SYSTEMS and ext == ".rvz":
+        return "rvz"
+    if ext == ".chd" and (system == "ps2" or system in PSX_SYSTEMS):
+        return "chd"
+    return None
+
+
+def verify_timeout(size: int) -> float:
+    return VERIFY_BASE_TIMEOUT + size / VERIFY_MIN_THROUGHPUT
+
+
+def verify_file_integrity(path: str, system: str, size: int) -> tuple[Optional[bool], str]:
+    """Corre a verificação externa; ``None`` significa ferramenta indisponível ou erro."""
+    file_path = Path(path)
+    tool = integrity_tool_for(file_path, system)
+    try:
+        if tool == "rvz":
+            from emumanager.converters.dolphin_converter import DolphinConverter
+
+            converter = DolphinConverter(logger=logger)
+            if not converter.check_tool():
+                return None, "dolphin-tool não disponível"
+            ok = converter.verify_rvz(file_path)
+            return ok, "RVZ verificado" if ok else "dolphin-tool verify falhou"
+
+        if tool == "chd":
+            from emumanager.common.execution import find_tool, run_cmd
+
+            chdman = find_tool("chdman")
+            if not chdman:
+                return None, "chdman não disponível"
+            result = run_cmd(
+                [str(chdman), "verify", "-i", str(file_path)],
+                timeout=verify_timeout(size),
+            )
+            if result.returncode == 0:
+                return True, "CHD verificado"
+            return False, f"chdman verify falhou (código {result.returncode})"
+    except Exception as exc:
+        return None, f"Erro ao verificar: {exc}"
+    return None, "Formato sem verificação profunda"
+
+
+@dataclass(slots=True)
+class IntegrityTask:
+    path: str
+    system: str
+    size: int
+    mtime_ns: int
+    status: Optional[str] = None
+    match_name: Optional[str] = None
+
+
+class IntegrityScheduler:
+    """Escolhe os ficheiros em dívida e verifica-os num pool de processos limitado."""
+
+    def __init__(
+        self,
+        db: Any,
+        max_workers: Optional[int] = None,
+        revalidate_days: float = DEFAULT_REVALIDATE_DAYS,
+        mp_context: Optional[Any] = None,
+        verify_fn: Callable[[str, str, int], tuple[Optional[bool], str]] = verify_file_integrity,
+    ):
+        self.db = db
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.revalidate_after = revalidate_days * 24 * 3600
+        self.mp_context = mp_context or multiprocessing.get_context()
+        self.verify_fn = verify_fn
+
+    def due_tasks(self, force: bool = False, now: Optional[float] = None) -> list[IntegrityTask]:
+        checks = {} if force else self.db.get_integrity_checks()
+        tasks: list[IntegrityTask] = []
+        for entry in self.db.iter_entries(columns=("system", "status", "match_name")):
+            if not integrity_tool_for(Path(entry.path), entry.system or ""):
+                continue
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                continue
+            check = checks.get(entry.path)
+            if check and check.is_current(stat.st_size, stat.st_mtime_ns, self.revalidate_after, now):
+                continue
+            tasks.append(
+                IntegrityTask(
+                    entry.path,
+                    entry.system,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    entry.status,
+                    entry.match_name,
+                )
+            )
+        return tasks
+
+    def run(
+        self,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+        cancel_event: Optional[Any] = None,
+        force: bool = False,
+    ) -> dict[str, int]:
+        tasks = self.due_tasks(force=force)
+        stats = {"due": len(tasks), "passed": 0, "failed": 0, "inconclusive": 0}
+        if not tasks:
+            return stats
+
+        logger.info("Verificação de integridade: %s ficheiros em dívida", len(tasks))
+        done_count = 0
+        with self.db.batch_writer() as writer:
+            for task, result, detail in self._execute(tasks, cancel_event):
+                self._record(writer, task, result, detail, stats)
+                done_count += 1
+                if progress_cb:
+                    progress_cb(done_count / len(tasks), f"Integridade: {Path(task.path).name}")
+        return stats
+
+    def _execute(
+        self,
+        tasks: list[IntegrityTask],
+        cancel_event: Optional[Any],
+    ) -> Iterator[tuple[IntegrityTask, Optional[bool], str]]:
+        pending = iter(tasks)
+        in_flight: dict[Future, IntegrityTask] = {}
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self.mp_context)
+        try:
+            while True:
+                # Janela limitada: nunca mais do que 2x workers tarefas submetidas
+                while len(in_flight) < self.max_workers * 2:
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    future = pool.submit(self.verify_fn, task.path, task.system, task.size)
+                    in_flight[future] = task
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    try:
+                        result, detail = future.result()
+                    except Exception as exc:
+                        result, detail = None, f"Erro ao verificar: {exc}"
+                    yield task, result, detail
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _record(
+        self,
+        writer: Any,
+        task: IntegrityTask,
+        result: Optional[bool],
+        detail: str,
+        stats: dict[str, int],
+    ) -> None:
+        self.db.record_integrity_check(
+            task.path, task.size, task.mtime_ns, result, detail, writer=writer
+        )
+        if result is None:
+            stats["inconclusive"] += 1
+            logger.debug("Verificação inconclusiva para %s: %s", task.path, detail)
+        elif result:
+            stats["passed"] += 1
+            if task.status == "CORRUPT" and task.match_name == INTEGRITY_FAILURE_LABEL:
+                writer.update_fields(task.path, status="UNKNOWN", match_name=None)
+        else:
+            stats["failed"] += 1
+            logger.warning("Integridade falhou: %s (%s)", Path(task.path).name, detail)
+            writer.update_fields(task.path, status="CORRUPT", match_name=INTEGRITY_FAILURE_LABEL)
+            writer.log_action(task.path, "INTEGRITY_FAIL", detail)
@@ -150,25 +150,27 @@ Wiki: {info.get('wiki', 'N/A')}
         if ext == ".chd":
             from emumanager.workers.psx import PSXWorker
 
-            worker = PSXWorker(self.session.base_path, self.logger.info, None, None)
+            worker = PSXWorker(self.session.base_path, self.logger.info, None, None, db=self.db)
             return worker._process_item(path) == "success"
         return False
 
     def identify_single_file(self, path: Path) -> dict[str, Any]:
-        """Tenta identificar um ficheiro específico contra os DATs carregados."""
-        provider = registry.find_provider_for_file(path)
-        system_id = provider.system_id if provider else "unknown"
-
-        dat_path = self.dat_manager.find_dat_for_system(system_id)
-        from emumanager.verification import dat_parser, hasher
+        """Identifica um ficheiro contra todos os DATs, independentemente da pasta onde está."""
+        match = self.dat_manager.identify_many([path])[0].match
+        provider = registry.get_provider(match.system_id) if match and match.system_id else None
+        if provider is None:
+            provider = registry.find_provider_for_file(path)
 
         metadata = provider.extract_metadata(path) if provider else {}
-        if dat_path:
-            db = dat_parser.parse_dat_file(dat_path)
-            hashes = hasher.calculate_hashes(path, algorithms=("crc32", "sha1"))
-            matches = db.lookup(crc=hashes.get("crc32"), sha1=hashes.get("sha1"))
-            if matches:
-                metadata.update({"match": matches[0].game_name, "verified": True})
+        if match:
+            metadata.update(
+                {
+                    "match": match.game_name,
+                    "verified": True,
+                    "system": match.system_id,
+                    "dat_name": match.dat_name,
+                }
+            )
 
         return metadata
 
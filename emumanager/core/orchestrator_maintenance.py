@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import csv
+from itertools import groupby
 from pathlib import Path
 from typing import Any, Callable, Optional
 
 from emumanager.common.registry import registry
+from emumanager.core.integrity_scheduler import DEFAULT_REVALIDATE_DAYS, IntegrityScheduler
 from emumanager.logging_cfg import set_correlation_id
+from emumanager.quality import QualityEngine
 
 
 class OrchestratorMaintenanceMixin:
@@ -20,9 +23,47 @@ class OrchestratorMaintenanceMixin:
         d_stats = self.cleanup_duplicates(dry_run)
         return {**q_stats, **d_stats}
 
+    def verify_integrity(
+        self,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+        cancel_event: Any = None,
+        force: bool = False,
+        revalidate_days: float = DEFAULT_REVALIDATE_DAYS,
+        max_workers: Optional[int] = None,
+    ) -> dict[str, int]:
+        """Workflow de Integridade: corre chdman/dolphin-tool só para ficheiros em dívida."""
+        set_correlation_id()
+        scheduler = IntegrityScheduler(
+            self.db,
+            max_workers=max_workers,
+            revalidate_days=revalidate_days,
+        )
+        return scheduler.run(progress_cb=progress_cb, cancel_event=cancel_event, force=force)
+
+    def sweep_quality(
+        self,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+        cancel_event: Any = None,
+        force: bool = False,
+        max_workers: Optional[int] = None,
+        system: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Workflow de Qualidade: análise da biblioteca inteira num pool de processos."""
+        set_correlation_id()
+        engine = QualityEngine(self.db, max_workers=max_workers, use_cache=not force)
+        stats = engine.run(system, progress_cb=progress_cb, cancel_event=cancel_event)
+        return {
+            **stats.as_dict(),
+            "analyzed": stats.analyzed,
+            "cached": stats.cached,
+            "cancelled": stats.cancelled,
+        }
+
     def quarantine_corrupt_files(self, dry_run: bool = False) -> dict[str, int]:
         """Isola ficheiros marcados como corrompidos."""
-        entries = [entry for entry in self.db.get_all_entries() if entry.status == "CORRUPT"]
+        entries = list(
+            self.db.iter_entries(columns=("path", "system", "status"), where={"status": "CORRUPT"})
+        )
         stats = {"quarantined": 0, "errors": 0}
 
         for entry in entries:
@@ -64,22 +105,24 @@ class OrchestratorMaintenanceMixin:
     def cleanup_duplicates(self, dry_run: bool = False) -> dict[str, int]:
         """Remove duplicados baseados em hash, preservando a melhor versão."""
         self.logger.info("Verificando duplicados globais...")
-        entries = self.db.get_all_entries()
-        by_hash = {}
-        for entry in entries:
-            if entry.sha1:
-                by_hash.setdefault(entry.sha1, []).append(entry)
+        # Stream ordenado por SHA1: só um grupo vive em memória de cada vez
+        entries = self.db.iter_entries(
+            columns=("path", "size", "sha1"),
+            require=("sha1",),
+            order_by=("sha1",),
+        )
 
         stats = {"removed": 0, "errors": 0}
-        for _sha1, group in by_hash.items():
+        to_remove = []
+        for _sha1, grouped in groupby(entries, key=lambda entry: entry.sha1):
+            group = list(grouped)
             if len(group) <= 1:
                 continue
 
             group.sort(key=self._score_duplicate_entry, reverse=True)
             keep = group[0]
-            to_remove = group[1:]
 
-            for entry in to_remove:
+            for entry in group[1:]:
                 if dry_run:
                     self.logger.info(
                         "[DRY-RUN] Duplicado removido: "
@@ -87,7 +130,11 @@ class OrchestratorMaintenanceMixin:
                     )
                     stats["removed"] += 1
                 else:
-                    self._remove_duplicate_entry(entry, stats)
+                    to_remove.append(entry)
+
+        # Remoções só depois de fechar o cursor de leitura
+        for entry in to_remove:
+            self._remove_duplicate_entry(entry, stats)
 
         return stats
 
@@ -119,10 +166,9 @@ class OrchestratorMaintenanceMixin:
         set_correlation_id()
         self.logger.info("Iniciando transcoding massivo...")
 
-        entries = self.db.get_all_entries()
         to_convert = {}
 
-        for entry in entries:
+        for entry in self.db.iter_entries(columns=("path", "system")):
             provider = registry.get_provider(entry.system)
             if provider:
                 try:
@@ -166,6 +212,7 @@ class OrchestratorMaintenanceMixin:
                     self.logger.info,
                     progress_cb,
                     None,
+                    db=self.db,
                 )
                 res = worker.run(paths, task_label=f"Transcoding {sys_id}", parallel=True)
                 total["converted"] += res.success_count
@@ -179,7 +226,9 @@ class OrchestratorMaintenanceMixin:
     def generate_compliance_report(self, output_path: Path) -> bool:
         """Gera um diagnóstico completo do acervo em CSV."""
         self.logger.info(f"A gerar relatório de conformidade: {output_path}")
-        entries = self.db.get_all_entries()
+        entries = self.db.iter_entries(
+            columns=("system", "status", "match_name", "dat_name", "size", "sha1"),
+        )
         try:
             with open(output_path, "w", newline="", encoding="utf-8") as file_obj:
                 writer = csv.writer(file_obj)
@@ -187,19 +236,17 @@ class OrchestratorMaintenanceMixin:
                     ["Sistema", "Status", "Título", "ID/Serial", "Tamanho", "Caminho", "SHA1"]
                 )
                 for entry in entries:
-                    full = self.db.get_entry(entry.path)
-                    if full:
-                        writer.writerow(
-                            [
-                                full.system,
-                                full.status,
-                                full.match_name,
-                                full.dat_name,
-                                full.size,
-                                full.path,
-                                full.sha1,
-                            ]
-                        )
+                    writer.writerow(
+                        [
+                            entry.system,
+                            entry.status,
+                            entry.match_name,
+                            entry.dat_name,
+                            entry.size,
+                            entry.path,
+                            entry.sha1,
+                        ]
+                    )
             return True
         except Exception as e:
             self.logger.error(f"Erro relatório: {e}")
@@ -29,7 +29,9 @@ class OrchestratorOrganizationMixin:
                     hashlib.sha512(data).hexdigest()
                 return "success"
 
-        worker = BenchmarkWorker(self.session.base_path, self.logger.info, progress_cb, None)
+        worker = BenchmarkWorker(
+            self.session.base_path, self.logger.info, progress_cb, None, db=self.db
+        )
         items = [Path(f"virtual_task_{i}") for i in range(50)]
 
         start = datetime.now()
@@ -173,6 +175,7 @@ class OrchestratorOrganizationMixin:
             log_cb=self.logger.info,
             progress_cb=progress_cb,
             library_db=self.db,
+            hash_index=self.dat_manager.hash_index,
         )
 
         result.success_count += dist_result.success_count
@@ -8,7 +8,7 @@ from emumanager.core.intelligence import MatchEngine
 from emumanager.metadata_providers.retroachievements import RetroAchievementsProvider
 from emumanager.core.scanner_discovery import ScannerDiscoveryMixin
 from emumanager.core.scanner_entries import ScannerEntriesMixin
-from emumanager.core.scanner_verification import ScannerVerificationMixin
+from emumanager.core.scanner_verification import VERIFY_LEAN, ScannerVerificationMixin
 
 
 class Scanner(
@@ -24,3 +24,7 @@ class Scanner(
         self.intelligence = MatchEngine()
         self.ra_provider = RetroAchievementsProvider()
         self.logger = get_logger("core.scanner")
+        self._writer = None
+        self.verify_cache_fingerprint = True
+        self.verification_mode = VERIFY_LEAN
+        self._prehashed: dict = {}
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 from emumanager.common.registry import registry
+from emumanager.common.walker import LibraryWalker, WalkRecord, WalkRules, group_by_root
 from emumanager.common.validation import validate_path_exists
 from emumanager.common.exceptions import ValidationError
+from emumanager.library import SCAN_ENTRY_FIELDS
+
+# Ficheiros começados por "_" também ficam de fora do catálogo
+SCANNER_WALK_RULES = WalkRules(ignored_files=(".*", "_*"))
 
 
 class ScannerDiscoveryMixin:
@@ -25,34 +30,60 @@ class ScannerDiscoveryMixin:
         if not root.exists():
             return stats
 
-        existing_entries = {entry.path: entry for entry in self.db.get_all_entries()}
+        existing_entries = {
+            entry.path: entry for entry in self.db.iter_entries(columns=SCAN_ENTRY_FIELDS)
+        }
         found_paths: set[str] = set()
         systems = self._get_system_directories(root)
         total_systems = len(systems)
+        positions = {system_dir: index for index, system_dir in enumerate(systems)}
+        self._prefetch_dats(systems)
+        batches = LibraryWalker(SCANNER_WALK_RULES).walk(systems, cancel_event=cancel_event)
 
-        for index, system_dir in enumerate(systems):
-            if cancel_event and cancel_event.is_set():
-                break
-            if progress_cb and total_systems > 0:
-                progress_cb(index / total_systems, f"Scanning {system_dir.name}...")
-            self._process_system(
-                system_dir,
-                deep_scan,
-                stats,
-                found_paths,
-                existing_entries,
-                cancel_event,
-            )
+        with self.db.batch_writer() as writer:
+            self._writer = writer
+            try:
+                for system_dir, records in group_by_root(batches):
+                    if cancel_event and cancel_event.is_set():
+                        break
+                    if progress_cb and total_systems > 0:
+                        progress_cb(
+                            positions.get(system_dir, 0) / total_systems,
+                            f"Scanning {system_dir.name}...",
+                        )
+                    self._process_system(
+                        system_dir,
+                        records,
+                        deep_scan,
+                        stats,
+                        found_paths,
+                        existing_entries,
+                        cancel_event,
+                    )
 
-        self._cleanup_removed_entries(existing_entries, found_paths, stats)
+                if not (cancel_event and cancel_event.is_set()):
+                    # Um scan interrompido não viu a biblioteca toda: não apagar entradas
+                    self._cleanup_removed_entries(existing_entries, found_paths, stats)
+            finally:
+                self._writer = None
         return stats
 
+    def _prefetch_dats(self, systems: list[Path]) -> None:
+        """Carrega os índices DAT em paralelo enquanto o walker percorre o disco."""
+        if not self.dat_manager:
+            return
+        try:
+            self.dat_manager.prefetch_systems([system_dir.name for system_dir in systems])
+        except Exception as exc:
+            self.logger.debug("Pré-carregamento de DATs indisponível: %s", exc)
+
     def _get_system_directories(self, root: Path) -> list[Path]:
         return [entry for entry in root.iterdir() if entry.is_dir() and not entry.name.startswith(".")]
 
     def _process_system(
         self,
         system_dir: Path,
+        records: Iterable[WalkRecord],
         deep_scan: bool,
         stats: dict,
         found_paths: set[str],
@@ -62,13 +93,17 @@ class ScannerDiscoveryMixin:
         system_name = system_dir.name
         provider = registry.get_provider(system_name)
         dat_db = self._load_dat(system_name)
+        if dat_db:
+            # O hashing paralelo precisa de ver todos os ficheiros do sistema antes do catálogo
+            records = list(records)
+            self._prehash_records(records, dat_db, deep_scan, existing_entries, cancel_event)
 
-        for file_path in system_dir.rglob("*"):
-            if cancel_event and cancel_event.is_set():
-                break
-            if self._is_valid_rom_file(file_path):
+        try:
+            for record in records:
+                if cancel_event and cancel_event.is_set():
+                    break
                 self._process_file(
-                    file_path,
+                    record.path,
                     system_name,
                     provider,
                     dat_db,
@@ -76,10 +111,10 @@ class ScannerDiscoveryMixin:
                     stats,
                     found_paths,
                     existing_entries,
+                    stat=record.stat,
                 )
-
-    def _is_valid_rom_file(self, path: Path) -> bool:
-        return path.is_file() and not path.name.startswith(".") and not path.name.startswith("_")
+        finally:
+            self._prehashed = {}
 
     def _cleanup_removed_entries(
         self,
@@ -89,5 +124,5 @@ class ScannerDiscoveryMixin:
     ):
         for path in existing_entries:
             if path not in found_paths:
-                self.db.remove_entry(path)
+                self._discard_entry(path)
                 stats["removed"] += 1
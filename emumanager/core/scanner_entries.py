@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import os
+import stat as stat_module
 import time
 from pathlib import Path
 from typing import Any, Optional
 
-from emumanager.library import LibraryEntry
-from emumanager.verification import dat_parser
+from emumanager.common.exceptions import UnsupportedFormatError, ValidationError
+from emumanager.library import FileIdentity, LibraryEntry
+from emumanager.verification import hasher
 
 METADATA_RETRIES = 3
 METADATA_RETRY_DELAY = 0.5
+# Falhas que se repetem sempre para o mesmo ficheiro: sem retry e com cache negativa
+DETERMINISTIC_METADATA_ERRORS = (UnsupportedFormatError, ValidationError)
 
 
 class ScannerEntriesMixin:
@@ -21,7 +26,7 @@ class ScannerEntriesMixin:
             return None
 
         try:
-            dat_db = dat_parser.parse_dat_file(dat_path)
+            dat_db = self.dat_manager.load_dat(dat_path)
             self.logger.info("DAT carregado para %s: %s", system_name, dat_path.name)
             return dat_db
         except Exception as exc:
@@ -38,14 +43,26 @@ class ScannerEntriesMixin:
         stats: dict,
         found_paths: set[str],
         existing_entries: dict,
+        stat: Optional[os.stat_result] = None,
     ):
-        abs_path = str(file_path.resolve())
+        # Registos do walker já trazem caminho absoluto e stat: evita resolve()/stat() por ficheiro
+        abs_path = str(file_path) if stat is not None else str(file_path.resolve())
         found_paths.add(abs_path)
 
-        stat = file_path.stat()
+        if stat is None:
+            stat = file_path.stat()
         entry = existing_entries.get(abs_path)
         needs_hashing = self._check_needs_hashing(file_path, stat, entry, deep_scan)
-        metadata = self._extract_provider_metadata(file_path, provider)
+        if stat_module.S_ISDIR(stat.st_mode):
+            # Pastas-jogo (ex.: PS3 JB) são catalogadas como item único, sem hashing
+            needs_hashing = False
+        metadata = self._cached_provider_metadata(abs_path, file_path, provider, stat, deep_scan)
+        if file_path.suffix.lower() == ".chd":
+            # Leitura O(1) do cabeçalho: fica em extra_metadata mesmo sem rehash
+            chd_raw_sha1 = hasher.read_chd_raw_sha1(file_path)
+            if chd_raw_sha1:
+                metadata = {**metadata, hasher.CHD_RAW_SHA1_KEY: chd_raw_sha1}
+        identity = FileIdentity.from_stat(stat)
         hashes, match_info = self._handle_verification(
             file_path,
             entry,
@@ -53,6 +70,9 @@ class ScannerEntriesMixin:
             needs_hashing,
             metadata,
             system_name,
+            identity=identity,
+            size=stat.st_size,
+            deep_scan=deep_scan,
         )
 
         status = match_info.get("status", entry.status if entry else "UNKNOWN")
@@ -65,7 +85,7 @@ class ScannerEntriesMixin:
             entry.dat_name if entry else metadata.get("serial"),
         )
 
-        self.db.update_entry(
+        self._persist_entry(
             LibraryEntry(
                 path=abs_path,
                 system=system_name,
@@ -80,8 +100,38 @@ class ScannerEntriesMixin:
                 extra_metadata=metadata,
             )
         )
+        if match_info.get("hashed") or not needs_hashing:
+            # Hashes novos sobrescrevem a cache; entradas inalteradas só preenchem lacunas
+            self._remember_hashes(
+                file_path,
+                identity,
+                hashes,
+                status,
+                match_name,
+                dat_name,
+                fresh=bool(match_info.get("hashed")),
+            )
         stats["added" if not entry else "updated"] += 1
 
+    def _persist_entry(self, entry: LibraryEntry) -> None:
+        """Grava a entrada no buffer do scan ativo ou diretamente na DB."""
+        writer = getattr(self, "_writer", None)
+        if writer is not None:
+            writer.upsert(entry)
+        else:
+            self.db.update_entry(entry)
+
+    def _discard_entry(self, path: str) -> None:
+        writer = getattr(self, "_writer", None)
+        if writer is not None:
+            writer.remove(path)
+        else:
+            self.db.remove_entry(path)
+        try:
+            self.db.remove_cached_metadata(path, writer=writer)
+        except Exception as exc:
+            self.logger.debug("Falha ao limpar cache de metadados de %s: %s", path, exc)
+
     def _check_needs_hashing(
         self,
         path: Path,
@@ -94,13 +144,62 @@ class ScannerEntriesMixin:
             return True
         return entry.size != stat.st_size or abs(entry.mtime - stat.st_mtime) >= 1.0
 
+    def _cached_provider_metadata(
+        self,
+        abs_path: str,
+        path: Path,
+        provider: Any,
+        stat: os.stat_result,
+        deep_scan: bool,
+    ) -> dict:
+        """Metadados do provider, reaproveitados enquanto tamanho e mtime não mudarem."""
+        if not provider:
+            return {}
+
+        if not deep_scan:
+            try:
+                cached = self.db.get_cached_metadata(abs_path, stat.st_size, stat.st_mtime_ns)
+            except Exception as exc:
+                self.logger.debug("Cache de metadados indisponível para %s: %s", path.name, exc)
+                cached = None
+            if cached is not None:
+                return dict(cached.metadata)
+
+        metadata, error = self._try_extract_metadata(path, provider)
+        if metadata is None and error is None:
+            # Falha transitória: não guardar, tentar de novo no próximo scan
+            return {}
+        try:
+            self.db.store_cached_metadata(
+                abs_path,
+                stat.st_size,
+                stat.st_mtime_ns,
+                metadata,
+                error,
+                writer=getattr(self, "_writer", None),
+            )
+        except Exception as exc:
+            self.logger.debug("Falha ao guardar cache de metadados de %s: %s", path.name, exc)
+        return metadata or {}
+
     def _extract_provider_metadata(self, path: Path, provider: Any) -> dict:
         if not provider:
             return {}
+        metadata, _error = self._try_extract_metadata(path, provider)
+        return metadata or {}
 
+    def _try_extract_metadata(
+        self,
+        path: Path,
+        provider: Any,
+    ) -> tuple[Optional[dict], Optional[str]]:
+        """Devolve ``(metadados, erro determinístico)``; ``(None, None)`` se a falha for transitória."""
         for attempt in range(METADATA_RETRIES):
             try:
-                return provider.extract_metadata(path)
+                return provider.extract_metadata(path), None
+            except DETERMINISTIC_METADATA_ERRORS as exc:
+                self.logger.debug("Metadados indisponíveis para %s: %s", path.name, exc)
+                return None, type(exc).__name__
             except Exception as exc:
                 if attempt < METADATA_RETRIES - 1:
                     self.logger.debug(
@@ -118,7 +217,7 @@ class ScannerEntriesMixin:
                         path.name,
                         exc,
                     )
-                    return {}
+        return None, None
 
     def _build_entry(self, path: Path, system: str, metadata: dict) -> LibraryEntry:
         stat = path.stat()
@@ -2,74 +2,163 @@ from __future__ import annotations
 
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
-from emumanager.library import LibraryEntry
-from emumanager.verification import hasher
+from emumanager.common.walker import WalkRecord
+from emumanager.library import FileIdentity, HashCacheRecord, LibraryEntry
+from emumanager.verification import hash_engine, hasher
 
 HASH_RETRIES = 2
 HASH_RETRY_DELAY = 0.5
-VERIFY_TIMEOUT_SECONDS = 60
-DOLPHIN_SYSTEMS = ("gamecube", "wii", "dolphin")
-PSX_SYSTEMS = ("psx", "ps1", "playstation")
+ALL_HASHES = ("crc32", "sha1", "md5")
+
+# "full": crc32+sha1+md5 de todos os ficheiros; "lean": pré-filtro por tamanho
+# e apenas os hashes que o DAT do sistema consegue confirmar.
+VERIFY_FULL = "full"
+VERIFY_LEAN = "lean"
+# Até este tamanho o ficheiro fica em cache após a passagem CRC32, por isso
+# vale a pena confirmar candidatos numa segunda leitura em vez de ler tudo junto.
+CRC_FIRST_MAX_SIZE = 64 * 1024 * 1024
+
+
+def plan_dat_hashes(counts: dict[str, int]) -> tuple[str, ...]:
+    """CRC32 (passagem barata) mais o hash mais forte que todas as entradas do DAT têm."""
+    total = counts.get("total", 0)
+    plan = ["crc32"] if counts.get("crc32") else []
+    strong = next((algo for algo in ("sha1", "md5") if total and counts.get(algo) == total), None)
+    if strong:
+        plan.append(strong)
+    else:
+        # DAT misto: só os hashes que existem em alguma entrada
+        plan.extend(algo for algo in ("sha1", "md5") if counts.get(algo))
+    return tuple(plan) or ALL_HASHES
+
+
+def first_pass_hashes(plan: tuple[str, ...], size: int) -> tuple[str, ...]:
+    """Hashes da primeira leitura: só CRC32 em ficheiros pequenos com hash forte planeado."""
+    if "crc32" in plan and len(plan) > 1 and size <= CRC_FIRST_MAX_SIZE:
+        return ("crc32",)
+    return plan
 
 
 class ScannerVerificationMixin:
-    def _verify_system_specific_integrity(
+    def _prehash_records(
         self,
-        path: Path,
-        system_name: str,
-    ) -> Optional[bool]:
-        ext = path.suffix.lower()
-        if system_name in DOLPHIN_SYSTEMS and ext == ".rvz":
-            try:
-                from emumanager.converters.dolphin_converter import DolphinConverter
-
-                converter = DolphinConverter(logger=self.logger)
-                if not converter.check_tool():
-                    self.logger.debug("dolphin-tool não disponível - pulando verificação RVZ")
-                    return None
-                self.logger.info("Verificando integridade RVZ: %s", path.name)
-                result = converter.verify_rvz(path)
-                if result:
-                    self.logger.info("RVZ verificado com sucesso: %s", path.name)
-                else:
-                    self.logger.warning("RVZ falhou na verificação: %s", path.name)
-                return result
-            except Exception as exc:
-                self.logger.warning("Erro ao verificar RVZ %s: %s", path.name, exc)
-                return None
+        records: Iterable[WalkRecord],
+        dat_db: Any,
+        deep_scan: bool,
+        existing_entries: dict,
+        cancel_event: Optional[Any] = None,
+    ) -> None:
+        """Calcula em paralelo (hash_many) os hashes que a verificação de cada ficheiro vai pedir."""
+        self._prehashed = {}
+        if not dat_db:
+            return
+        # O deep scan usa sempre o plano completo (ver _handle_verification)
+        lean = (
+            self.verification_mode == VERIFY_LEAN and hasattr(dat_db, "has_size") and not deep_scan
+        )
+        plan = plan_dat_hashes(dat_db.hash_counts()) if lean else ALL_HASHES
 
-        if system_name == "ps2" and ext == ".chd":
-            return self._verify_chd(path, "CHD")
+        jobs = []
+        for record in records:
+            if record.is_dir:
+                continue
+            entry = existing_entries.get(str(record.path))
+            if not self._check_needs_hashing(record.path, record.stat, entry, deep_scan):
+                continue
+            size = record.stat.st_size
+            if lean and not dat_db.has_size(size):
+                continue
+            if self._has_cached_hashes(FileIdentity.from_stat(record.stat)):
+                continue
+            if record.path.suffix.lower() == ".chd" and self._chd_header_in_dat(record.path, dat_db):
+                # _handle_verification confirma pelo cabeçalho: não ler o contentor
+                continue
+            algorithms = first_pass_hashes(plan, size) if lean else plan
+            # Se houver segunda leitura (candidato CRC), o ficheiro deve continuar em cache
+            jobs.append(hash_engine.HashJob(record.path, algorithms, drop_cache=False if algorithms != plan else None))
 
-        if system_name in PSX_SYSTEMS and ext == ".chd":
-            return self._verify_chd(path, "CHD PSX")
+        if len(jobs) < 2:
+            return
+        self.logger.debug("Hashing paralelo de %s ficheiros", len(jobs))
+        results = hash_engine.hash_many(jobs, cancel_event=cancel_event)
+        self._prehashed = {path: result.hashes for path, result in results.items() if result.ok}
 
-        return None
+    @staticmethod
+    def _chd_header_in_dat(path: Path, dat_db: Any) -> bool:
+        chd_raw_sha1 = hasher.read_chd_raw_sha1(path)
+        try:
+            return bool(chd_raw_sha1 and dat_db.lookup(sha1=chd_raw_sha1))
+        except Exception:
+            return False
 
-    def _verify_chd(self, path: Path, label: str) -> Optional[bool]:
+    def _has_cached_hashes(self, identity: FileIdentity) -> bool:
         try:
-            from emumanager.common.execution import find_tool, run_cmd
+            cached = self.db.get_cached_hashes(identity)
+        except Exception:
+            return False
+        return bool(cached and cached.has_hashes)
 
-            chdman = find_tool("chdman")
-            if not chdman:
-                self.logger.debug("chdman não disponível - pulando verificação %s", label)
+    def _lookup_hash_cache(
+        self,
+        path: Path,
+        identity: FileIdentity,
+    ) -> Optional[HashCacheRecord]:
+        """Procura hashes já calculados para o mesmo conteúdo (ex.: ficheiro renomeado)."""
+        try:
+            cached = self.db.get_cached_hashes(identity)
+        except Exception as exc:
+            self.logger.debug("Cache de hashes indisponível para %s: %s", path.name, exc)
+            return None
+        if not cached or not cached.has_hashes:
+            return None
+        if cached.fingerprint and self.verify_cache_fingerprint:
+            try:
+                if hasher.calculate_fingerprint(path) != cached.fingerprint:
+                    return None
+            except OSError:
                 return None
+        return cached
 
-            self.logger.info("Verificando integridade %s: %s", label, path.name)
-            result = run_cmd(
-                [str(chdman), "verify", "-i", str(path)],
-                timeout=VERIFY_TIMEOUT_SECONDS,
+    def _remember_hashes(
+        self,
+        path: Path,
+        identity: FileIdentity,
+        hashes: dict,
+        status: Optional[str],
+        match_name: Optional[str],
+        dat_name: Optional[str],
+        fresh: bool,
+    ) -> None:
+        """Guarda hashes/correspondência DAT na cache por identidade do ficheiro."""
+        if not any(hashes.get(algo) for algo in ("crc32", "md5", "sha1")):
+            return
+        fingerprint = None
+        if fresh and self.verify_cache_fingerprint:
+            try:
+                fingerprint = hasher.calculate_fingerprint(path)
+            except OSError:
+                fingerprint = None
+        record = HashCacheRecord(
+            crc32=hashes.get("crc32"),
+            md5=hashes.get("md5"),
+            sha1=hashes.get("sha1"),
+            status=status,
+            match_name=match_name,
+            dat_name=dat_name,
+            fingerprint=fingerprint,
+            path=str(path),
+        )
+        try:
+            self.db.store_cached_hashes(
+                identity,
+                record,
+                writer=getattr(self, "_writer", None),
+                overwrite=fresh,
             )
-            if result.returncode == 0:
-                self.logger.info("%s verificado com sucesso: %s", label, path.name)
-                return True
-            self.logger.warning("%s falhou na verificação: %s", label, path.name)
-            return False
         except Exception as exc:
-            self.logger.warning("Erro ao verificar %s %s: %s", label, path.name, exc)
-            return None
+            self.logger.debug("Falha ao atualizar cache de hashes para %s: %s", path.name, exc)
 
     def _handle_verification(
         self,
@@ -79,8 +168,12 @@ class ScannerVerificationMixin:
         needs_hashing: bool,
         metadata: dict,
         system_name: str,
+        identity: Optional[FileIdentity] = None,
+        size: Optional[int] = None,
+        deep_scan: bool = False,
     ) -> tuple[dict, dict]:
-        del metadata
+        # A verificação profunda (chdman/dolphin-tool) corre no IntegrityScheduler, fora do scan
+        del system_name
         hashes = {
             "crc32": entry.crc32 if entry else None,
             "md5": entry.md5 if entry else None,
@@ -88,54 +181,156 @@ class ScannerVerificationMixin:
         }
         match_info: dict[str, Any] = {}
 
-        integrity_check = self._verify_system_specific_integrity(path, system_name)
-        if integrity_check is False:
-            return hashes, {"status": "CORRUPT", "match_name": "Failed integrity check"}
-        if integrity_check is True:
-            match_info["integrity_verified"] = True
+        chd_raw_sha1 = metadata.get(hasher.CHD_RAW_SHA1_KEY)
+        if needs_hashing and dat_db and chd_raw_sha1:
+            if self._match_chd_raw_sha1(path, dat_db, chd_raw_sha1, match_info):
+                # O SHA1 do cabeçalho basta: não reler gigabytes do contentor. Os hashes
+                # da entrada antiga já não descrevem o ficheiro alterado
+                return {}, match_info
+
+        cached = self._lookup_hash_cache(path, identity) if needs_hashing and identity else None
+        if cached:
+            # Mesmo conteúdo já visto noutro caminho: reaproveitar em vez de reler o ficheiro
+            self.logger.debug("Hashes reaproveitados da cache para %s", path.name)
+            hashes = {algo: cached.hashes[algo] for algo in ("crc32", "md5", "sha1")}
+            match_info["hash_cache_hit"] = True
+            if cached.status == "VERIFIED":
+                match_info.update(
+                    {
+                        "status": cached.status,
+                        "match_name": cached.match_name,
+                        "dat_name": cached.dat_name,
+                    }
+                )
+            if not dat_db:
+                return hashes, match_info
+
+        if cached and dat_db:
+            self._match_against_dat(path, dat_db, hashes, match_info)
+        elif needs_hashing and dat_db:
+            # O modo lean precisa do tamanho (vem do stat do walker); o deep scan
+            # hasheia tudo, incluindo os ficheiros que o modo lean adiou
+            lean = self.verification_mode == VERIFY_LEAN and hasattr(dat_db, "has_size")
+            if size is not None and lean and not deep_scan:
+                return self._verify_lean(path, dat_db, size, match_info)
 
-        if needs_hashing and dat_db:
             self.logger.debug("Calculando hashes para %s...", path.name)
-            for attempt in range(HASH_RETRIES):
-                try:
-                    hashes = hasher.calculate_hashes(
-                        path,
-                        algorithms=("crc32", "sha1", "md5"),
-                    )
-                    break
-                except Exception as exc:
-                    if attempt < HASH_RETRIES - 1:
-                        self.logger.warning(
-                            "Tentativa %s/%s falhou ao hashear %s: %s",
-                            attempt + 1,
-                            HASH_RETRIES,
-                            path.name,
-                            exc,
-                        )
-                        time.sleep(HASH_RETRY_DELAY)
-                    else:
-                        self.logger.error(
-                            "Erro crítico ao calcular hash após %s tentativas: %s",
-                            HASH_RETRIES,
-                            path.name,
-                        )
-                        return hashes, {"status": "ERROR"}
+            hashes = self._calculate_hashes(path, ALL_HASHES)
+            if hashes is None:
+                return {}, {"status": "ERROR"}
+            match_info["hashed"] = True
+            self._match_against_dat(path, dat_db, hashes, match_info)
+
+        return hashes, match_info
 
+    def _verify_lean(self, path: Path, dat_db: Any, size: int, match_info: dict) -> tuple[dict, dict]:
+        """Só hasheia ficheiros com tamanho presente no DAT e só com os hashes que o DAT tem."""
+        if not dat_db.has_size(size):
+            # Nenhuma entrada do DAT tem este tamanho: adiar o hashing até um deep scan
+            self.logger.debug("Sem entrada DAT com %s bytes, hashing adiado: %s", size, path.name)
+            match_info.update({"status": "UNKNOWN", "hash_deferred": True})
+            return {}, match_info
+
+        plan = plan_dat_hashes(dat_db.hash_counts())
+        strong = tuple(algo for algo in plan if algo != "crc32")
+        self.logger.debug("Calculando %s para %s...", "+".join(plan), path.name)
+        if first_pass_hashes(plan, size) == ("crc32",):
+            hashes = self._calculate_hashes(path, ("crc32",), drop_cache=False)
+            if hashes is None:
+                return {}, {"status": "ERROR"}
+            match_info["hashed"] = True
+            if not self._crc_candidates(dat_db, hashes["crc32"], size):
+                match_info["status"] = "UNKNOWN"
+                return hashes, match_info
+            strong_hashes = self._calculate_hashes(path, strong)
+            if strong_hashes is None:
+                return {}, {"status": "ERROR"}
+            hashes.update(strong_hashes)
+        else:
+            hashes = self._calculate_hashes(path, plan)
+            if hashes is None:
+                return {}, {"status": "ERROR"}
+            match_info["hashed"] = True
+
+        self._match_against_dat(path, dat_db, hashes, match_info, size=size)
+        if "status" not in match_info:
+            match_info["status"] = "UNKNOWN"
+        return hashes, match_info
+
+    @staticmethod
+    def _crc_candidates(dat_db: Any, crc: Optional[str], size: int) -> list:
+        return [rom for rom in dat_db.lookup(crc=crc) if rom.size == size] if crc else []
+
+    def _calculate_hashes(
+        self, path: Path, algorithms: tuple[str, ...], drop_cache: Optional[bool] = None
+    ) -> Optional[dict]:
+        prehashed = getattr(self, "_prehashed", None)
+        if prehashed:
+            known = prehashed.pop(path, None)
+            if known and all(known.get(algo) for algo in algorithms):
+                return {algo: known[algo] for algo in algorithms}
+        for attempt in range(HASH_RETRIES):
             try:
-                matches = dat_db.lookup(
-                    crc=hashes.get("crc32"),
-                    sha1=hashes.get("sha1"),
-                    md5=hashes.get("md5"),
+                return hasher.calculate_hashes(
+                    path,
+                    algorithms=algorithms,
+                    crc_workers=hasher.PARALLEL_CRC_WORKERS,
+                    drop_cache=drop_cache,
                 )
-                if matches:
-                    match = matches[0]
-                    match_info = {
-                        "status": "VERIFIED",
-                        "match_name": match.name,
-                        "dat_name": match.serial or match.name,
-                    }
-                    self.logger.debug("Correspondência DAT encontrada: %s", match.name)
             except Exception as exc:
-                self.logger.warning("Erro ao consultar DAT para %s: %s", path.name, exc)
+                if attempt < HASH_RETRIES - 1:
+                    self.logger.warning(
+                        "Tentativa %s/%s falhou ao hashear %s: %s",
+                        attempt + 1,
+                        HASH_RETRIES,
+                        path.name,
+                        exc,
+                    )
+                    time.sleep(HASH_RETRY_DELAY)
+                else:
+                    self.logger.error(
+                        "Erro crítico ao calcular hash após %s tentativas: %s",
+                        HASH_RETRIES,
+                        path.name,
+                    )
+        return None
 
-        return hashes, match_info
+    def _match_chd_raw_sha1(
+        self, path: Path, dat_db: Any, chd_raw_sha1: str, match_info: dict
+    ) -> bool:
+        """Procura no DAT o SHA1 dos dados descomprimidos guardado no cabeçalho do CHD."""
+        try:
+            matches = dat_db.lookup(sha1=chd_raw_sha1)
+        except Exception as exc:
+            self.logger.warning("Erro ao consultar DAT para %s: %s", path.name, exc)
+            return False
+        if not matches:
+            return False
+        match_info.update({"status": "VERIFIED", "match_name": matches[0].game_name})
+        self.logger.debug("Correspondência DAT pelo cabeçalho CHD: %s", matches[0].game_name)
+        return True
+
+    def _match_against_dat(
+        self,
+        path: Path,
+        dat_db: Any,
+        hashes: dict,
+        match_info: dict,
+        size: Optional[int] = None,
+    ) -> None:
+        try:
+            matches = dat_db.lookup(
+                crc=hashes.get("crc32"),
+                sha1=hashes.get("sha1"),
+                md5=hashes.get("md5"),
+            )
+            if size is not None and not (hashes.get("sha1") or hashes.get("md5")):
+                # Só CRC32: exigir também o tamanho para evitar colisões
+                matches = [rom for rom in matches if rom.size == size]
+            if matches:
+                match = matches[0]
+                # RomInfo não traz serial: dat_name continua a vir dos metadados do provider
+                match_info.update({"status": "VERIFIED", "match_name": match.game_name})
+                self.logger.debug("Correspondência DAT encontrada: %s", match.game_name)
+        except Exception as exc:
+            self.logger.warning("Erro ao consultar DAT para %s: %s", path.name, exc)
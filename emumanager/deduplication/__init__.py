@@ -1,5 +1,12 @@
 """Deduplication module - Advanced duplicate detection."""
 
-from .advanced import AdvancedDeduplication, AdvancedDuplicateGroup
+from .advanced import AdvancedDedupResult, AdvancedDeduplication, AdvancedDuplicateGroup
+from .staged import StagedDedupStats, StagedDuplicateFinder
 
-__all__ = ['AdvancedDeduplication', 'AdvancedDuplicateGroup']
+__all__ = [
+    'AdvancedDedupResult',
+    'AdvancedDeduplication',
+    'AdvancedDuplicateGroup',
+    'StagedDedupStats',
+    'StagedDuplicateFinder',
+]
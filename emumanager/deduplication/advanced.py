@@ -11,10 +11,21 @@ import re
 from dataclasses import dataclass
 from difflib import SequenceMatcher
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Sequence
 
+from emumanager.deduplication.fuzzy_index import FuzzyNameIndex
 from emumanager.library import LibraryDB, LibraryEntry, DuplicateGroup, normalize_game_name
 
+# Projeção usada pelos detectores: tudo o que os grupos e recomendações leem, sem o extra_json
+DEDUP_FIELDS = ("system", "size", "mtime", "status", "sha1", "match_name", "dat_name")
+
+_VERSION_TAG_RE = re.compile(r'\(v\d+\.?\d*\)|Rev\s*\d+|\[v\d+\.?\d*\]|v\d+\.?\d*', re.IGNORECASE)
+_VERSION_INFO_RES = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (r'(v\d+\.?\d*)', r'(Rev\s*\d+)', r'\((v\d+\.?\d*)\)')
+)
+_VERSION_NUMBER_RE = re.compile(r'(\d+\.?\d*)')
+
 
 @dataclass
 class AdvancedDuplicateGroup(DuplicateGroup):
@@ -63,6 +74,26 @@ class AdvancedDuplicateGroup(DuplicateGroup):
         return "unknown"
 
 
+@dataclass(slots=True)
+class _DedupRecord:
+    """Entrada do snapshot com as chaves de agrupamento já calculadas."""
+
+    entry: LibraryEntry
+    name_key: str
+    region_key: str
+    version_key: str
+    region: Optional[str]
+    version: Optional[str]
+
+
+@dataclass
+class AdvancedDedupResult:
+    """Grupos de uma análise e as estatísticas calculadas a partir deles."""
+
+    groups: list[AdvancedDuplicateGroup]
+    statistics: dict
+
+
 class AdvancedDeduplication:
     """Sistema avançado de detecção de duplicados."""
     
@@ -86,24 +117,67 @@ class AdvancedDeduplication:
             'U': 9, 'E': 8, 'J': 7, 'W': 10,
             'Asia': 6, 'Australia': 5, 'Brazil': 4
         }
-    
-    def find_all_duplicates(self) -> list[AdvancedDuplicateGroup]:
-        """Encontra todos os tipos de duplicados."""
+
+        # Regexes de região compiladas uma vez (dependem de region_tags)
+        tags = '|'.join(self.region_tags)
+        self._region_paren_re = re.compile(r'\([^)]*(?:' + tags + r')[^)]*\)', re.IGNORECASE)
+        self._region_bracket_re = re.compile(r'\[[^\]]*(?:' + tags + r')[^\]]*\]', re.IGNORECASE)
+        self._region_extract_re = re.compile(
+            r'[\(\[]([^\)\]]*(?:' + tags + r')[^\)\]]*)[\ )\]]', re.IGNORECASE
+        )
+        self._regions_longest_first = sorted(self.region_tags, key=len, reverse=True)
+        # (região, versão) por path, preenchido pelo snapshot e reutilizado pelas recomendações
+        self._path_tags: dict[str, tuple[Optional[str], Optional[str]]] = {}
+
+    def _iter_entries(self) -> Iterator[LibraryEntry]:
+        """Stream projetado das entradas da biblioteca."""
+        return self.db.iter_entries(columns=DEDUP_FIELDS)
+
+    def _snapshot(self) -> list[_DedupRecord]:
+        """Lê a biblioteca uma vez e pré-calcula as chaves de todos os detectores."""
+        keys: dict[str, tuple[str, str, str]] = {}
+        records = []
+        for entry in self._iter_entries():
+            name = entry.match_name or Path(entry.path).name
+            name_keys = keys.get(name)
+            if name_keys is None:
+                name_keys = keys[name] = (
+                    normalize_game_name(name),
+                    normalize_game_name(self._remove_region_tags(name)),
+                    normalize_game_name(self._remove_version_tags(name)),
+                )
+            region, version = self._tags_for(entry.path)
+            records.append(_DedupRecord(entry, *name_keys, region, version))
+        return records
+
+    def _tags_for(self, path: str) -> tuple[Optional[str], Optional[str]]:
+        tags = self._path_tags.get(path)
+        if tags is None:
+            tags = self._path_tags[path] = (self._extract_region(path), self._extract_version_info(path))
+        return tags
+
+    def analyze(self) -> AdvancedDedupResult:
+        """Uma passagem: snapshot único, todos os tipos de grupo e as estatísticas."""
+        snapshot = self._snapshot()
         results = []
-        
+
         # 1. Duplicados exatos (hash)
         results.extend(self._find_exact_duplicates())
-        
+
         # 2. Cross-region duplicates
-        results.extend(self._find_cross_region_duplicates())
-        
+        results.extend(self._find_cross_region_duplicates(snapshot))
+
         # 3. Version duplicates
-        results.extend(self._find_version_duplicates())
-        
+        results.extend(self._find_version_duplicates(snapshot))
+
         # 4. Fuzzy name duplicates
-        results.extend(self._find_fuzzy_duplicates())
-        
-        return results
+        results.extend(self._find_fuzzy_duplicates(snapshot))
+
+        return AdvancedDedupResult(groups=results, statistics=self.summarize(results))
+
+    def find_all_duplicates(self) -> list[AdvancedDuplicateGroup]:
+        """Encontra todos os tipos de duplicados."""
+        return self.analyze().groups
     
     def _find_exact_duplicates(self) -> list[AdvancedDuplicateGroup]:
         """Encontra duplicados por hash (já implementado na LibraryDB)."""
@@ -127,34 +201,28 @@ class AdvancedDeduplication:
         
         return results
     
-    def _find_cross_region_duplicates(self) -> list[AdvancedDuplicateGroup]:
+    def _find_cross_region_duplicates(
+        self, snapshot: Optional[Sequence[_DedupRecord]] = None
+    ) -> list[AdvancedDuplicateGroup]:
         """Encontra mesmo jogo em diferentes regiões."""
-        entries = self.db.get_all_entries()
-        
         # Agrupar por nome base (sem region tags)
-        by_base_name = {}
-        for entry in entries:
-            base_name = self._remove_region_tags(entry.match_name or Path(entry.path).name)
-            base_name = normalize_game_name(base_name)
-            
-            if base_name:
-                by_base_name.setdefault(base_name, []).append(entry)
+        by_base_name: dict[str, list[_DedupRecord]] = {}
+        for record in self._snapshot() if snapshot is None else snapshot:
+            if record.region_key:
+                by_base_name.setdefault(record.region_key, []).append(record)
         
         results = []
-        for base_name, group_entries in by_base_name.items():
-            if len(group_entries) <= 1:
+        for base_name, records in by_base_name.items():
+            if len(records) <= 1:
                 continue
+            group_entries = [record.entry for record in records]
             
             # Verificar se são realmente cross-region (tamanho similar)
             if not self._are_similar_sizes(group_entries):
                 continue
             
             # Verificar se têm diferentes region tags
-            regions = set()
-            for entry in group_entries:
-                region = self._extract_region(entry.path)
-                if region:
-                    regions.add(region)
+            regions = {record.region for record in records if record.region}
             
             if len(regions) > 1:  # Múltiplas regiões
                 adv_group = AdvancedDuplicateGroup(
@@ -170,30 +238,24 @@ class AdvancedDeduplication:
         
         return results
     
-    def _find_version_duplicates(self) -> list[AdvancedDuplicateGroup]:
+    def _find_version_duplicates(
+        self, snapshot: Optional[Sequence[_DedupRecord]] = None
+    ) -> list[AdvancedDuplicateGroup]:
         """Encontra diferentes versões do mesmo jogo."""
-        entries = self.db.get_all_entries()
-        
         # Agrupar por nome base (sem versão)
-        by_base_name = {}
-        for entry in entries:
-            base_name = self._remove_version_tags(entry.match_name or Path(entry.path).name)
-            base_name = normalize_game_name(base_name)
-            
-            if base_name:
-                by_base_name.setdefault(base_name, []).append(entry)
+        by_base_name: dict[str, list[_DedupRecord]] = {}
+        for record in self._snapshot() if snapshot is None else snapshot:
+            if record.version_key:
+                by_base_name.setdefault(record.version_key, []).append(record)
         
         results = []
-        for base_name, group_entries in by_base_name.items():
-            if len(group_entries) <= 1:
+        for base_name, records in by_base_name.items():
+            if len(records) <= 1:
                 continue
+            group_entries = [record.entry for record in records]
             
             # Verificar se têm diferentes versões
-            versions = set()
-            for entry in group_entries:
-                version = self._extract_version_info(entry.path)
-                if version:
-                    versions.add(version)
+            versions = {record.version for record in records if record.version}
             
             if len(versions) > 1:  # Múltiplas versões
                 adv_group = AdvancedDuplicateGroup(
@@ -209,43 +271,49 @@ class AdvancedDeduplication:
         
         return results
     
-    def _find_fuzzy_duplicates(self) -> list[AdvancedDuplicateGroup]:
-        """Encontra duplicados por fuzzy matching de nome."""
-        entries = self.db.get_all_entries()
-        
-        # Normalizar todos os nomes
-        normalized = []
-        for entry in entries:
-            name = normalize_game_name(entry.match_name or Path(entry.path).name)
-            if name:
-                normalized.append((name, entry))
-        
-        # Comparar todos com todos (otimizado)
+    def _find_fuzzy_duplicates(
+        self, snapshot: Optional[Sequence[_DedupRecord]] = None
+    ) -> list[AdvancedDuplicateGroup]:
+        """Encontra duplicados por fuzzy matching de nome.
+
+        Só compara nomes do mesmo sistema e só os pares propostos pelo índice
+        de trigramas (``FuzzyNameIndex``); o critério final continua a ser
+        ``_calculate_similarity >= fuzzy_threshold`` com tamanhos semelhantes.
+        """
+        by_system: dict[str, list[tuple[str, LibraryEntry]]] = {}
+        for record in self._snapshot() if snapshot is None else snapshot:
+            if record.name_key:
+                by_system.setdefault(record.entry.system or "", []).append((record.name_key, record.entry))
+
         results = []
-        processed = set()
-        
-        for i, (name1, entry1) in enumerate(normalized):
-            if entry1.path in processed:
+        for items in by_system.values():
+            if len(items) > 1:
+                results.extend(self._fuzzy_groups(items))
+        return results
+
+    def _fuzzy_groups(self, items: list[tuple[str, LibraryEntry]]) -> list[AdvancedDuplicateGroup]:
+        index = FuzzyNameIndex([name for name, _ in items], self.fuzzy_threshold)
+        results = []
+        processed: set[int] = set()
+
+        for i, (name1, entry1) in enumerate(items):
+            if i in processed:
                 continue
-            
+
             matches = [entry1]
-            
-            for name2, entry2 in normalized[i+1:]:
-                if entry2.path in processed:
+            for j in index.candidates(i):
+                if j in processed or not index.could_match(i, j):
                     continue
-                
-                # Fuzzy matching
-                similarity = self._calculate_similarity(name1, name2)
-                
-                if similarity >= self.fuzzy_threshold:
-                    # Verificar tamanho similar
-                    if self._are_similar_sizes([entry1, entry2]):
-                        matches.append(entry2)
-                        processed.add(entry2.path)
-            
+                name2, entry2 = items[j]
+                if not self._are_similar_sizes([entry1, entry2]):
+                    continue
+                if self._calculate_similarity(name1, name2) >= self.fuzzy_threshold:
+                    matches.append(entry2)
+                    processed.add(j)
+
             if len(matches) > 1:
-                processed.add(entry1.path)
-                
+                processed.add(i)
+
                 adv_group = AdvancedDuplicateGroup(
                     key=name1,
                     kind="fuzzy",
@@ -256,7 +324,7 @@ class AdvancedDeduplication:
                 )
                 adv_group.recommended_keep = self._select_best_version(matches)
                 results.append(adv_group)
-        
+
         return results
     
     def _select_best_version(self, entries: list[LibraryEntry]) -> str:
@@ -274,15 +342,14 @@ class AdvancedDeduplication:
                 score += 100
             
             # 2. Região preferida
-            region = self._extract_region(entry.path)
+            region, version = self._tags_for(entry.path)
             score += self.region_priority.get(region, 0) * 10
             
             # 3. Versão mais recente
-            version = self._extract_version_info(entry.path)
             if version:
                 # Extrair número da versão
                 try:
-                    ver_num = float(re.search(r'(\d+\.?\d*)', version).group(1))
+                    ver_num = float(_VERSION_NUMBER_RE.search(version).group(1))
                     score += ver_num * 5
                 except (AttributeError, ValueError):
                     pass
@@ -299,46 +366,32 @@ class AdvancedDeduplication:
     def _remove_region_tags(self, name: str) -> str:
         """Remove tags de região do nome."""
         # Remove (USA), (Europe), etc
-        name = re.sub(r'\([^)]*(?:' + '|'.join(self.region_tags) + r')[^)]*\)', '', name, flags=re.IGNORECASE)
+        name = self._region_paren_re.sub('', name)
         # Remove [USA], [Europe], etc
-        name = re.sub(r'\[[^\]]*(?:' + '|'.join(self.region_tags) + r')[^\]]*\]', '', name, flags=re.IGNORECASE)
+        name = self._region_bracket_re.sub('', name)
         return name.strip()
     
     def _remove_version_tags(self, name: str) -> str:
         """Remove tags de versão do nome."""
         # Remove (v1.0), Rev 1, etc
-        patterns = [
-            r'\(v\d+\.?\d*\)',
-            r'Rev\s*\d+',
-            r'\[v\d+\.?\d*\]',
-            r'v\d+\.?\d*',
-        ]
-        for pattern in patterns:
-            name = re.sub(pattern, '', name, flags=re.IGNORECASE)
-        return name.strip()
+        return _VERSION_TAG_RE.sub('', name).strip()
     
     def _extract_region(self, path: str) -> Optional[str]:
         """Extrai região do path."""
         # Procura por tags de região completas em parênteses ou colchetes
-        import re
-        match = re.search(r'[\(\[]([^\)\]]*(?:' + '|'.join(self.region_tags) + r')[^\)\]]*)[\ )\]]', path, re.IGNORECASE)
+        match = self._region_extract_re.search(path)
         if match:
             # Extrair a tag de região exata do grupo encontrado
             group = match.group(1)
-            for region in sorted(self.region_tags, key=len, reverse=True):  # Mais longas primeiro
+            for region in self._regions_longest_first:  # Mais longas primeiro
                 if region in group:
                     return region
         return None
     
     def _extract_version_info(self, path: str) -> Optional[str]:
         """Extrai informação de versão do path."""
-        patterns = [
-            r'(v\d+\.?\d*)',
-            r'(Rev\s*\d+)',
-            r'\((v\d+\.?\d*)\)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, path, re.IGNORECASE)
+        for pattern in _VERSION_INFO_RES:
+            match = pattern.search(path)
             if match:
                 return match.group(1)
         return None
@@ -364,9 +417,12 @@ class AdvancedDeduplication:
         return SequenceMatcher(None, str1, str2).ratio()
     
     def get_statistics(self) -> dict:
-        """Retorna estatísticas de duplicados."""
-        all_duplicates = self.find_all_duplicates()
-        
+        """Retorna estatísticas de duplicados (use ``analyze`` se também precisa dos grupos)."""
+        return self.analyze().statistics
+
+    @staticmethod
+    def summarize(all_duplicates: list[AdvancedDuplicateGroup]) -> dict:
+        """Estatísticas de um conjunto de grupos já calculado."""
         total_duplicates = len(all_duplicates)
         total_wasted_space = sum(g.space_savings for g in all_duplicates)
         
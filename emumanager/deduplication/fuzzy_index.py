@@ -0,0 +1,125 @@
+"""Candidate generation for fuzzy name matching.
+
+Comparing every name with every other one with ``SequenceMatcher`` is
+O(n²). ``FuzzyNameIndex`` only proposes pairs that can still reach the
+threshold:
+
+- Names are split into padded character trigrams. Repeats are numbered,
+  so each name is a set of tokens.
+- If the matching blocks give ``ratio >= r``, then the names share at
+  least ``(2.5r - 2)(l1 + l2) - 2`` trigram occurrences. Each block of
+  length ``b`` contributes ``b - 2`` of them, and there are at most
+  ``l1 + l2 - 2M + 1`` blocks.
+- Prefix filtering: each name's tokens are ordered rarest first and only
+  the first ``len - t + 1`` are indexed and probed. The common trigrams
+  ("the", "er ") therefore never produce candidates.
+- That bound alone is weak for short names at 0.85 (about 5 shared trigrams
+  out of 25). ``min_overlap`` additionally asks for a fraction of each
+  name's trigrams to be shared. The default of 0.3 lost no pair against the
+  all-pairs comparison in our benchmarks (``scripts/bench_fuzzy_dedup.py``),
+  and ``min_overlap=0`` keeps the index exact.
+- Surviving pairs still go through the length-ratio and character-multiset
+  bounds (what ``quick_ratio`` computes) before the exact ratio is scored.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Iterator, Sequence
+
+# Fração mínima de trigramas partilhados pedida aos candidatos (0 = só o limite exato)
+DEFAULT_MIN_OVERLAP = 0.3
+PAD_LEFT = "  "
+PAD_RIGHT = " "
+
+
+def _tokens(name: str) -> list[str]:
+    padded = f"{PAD_LEFT}{name}{PAD_RIGHT}"
+    seen: Counter[str] = Counter()
+    tokens = []
+    for i in range(len(padded) - 2):
+        gram = padded[i : i + 3]
+        occurrence = seen[gram]
+        seen[gram] += 1
+        tokens.append(gram if not occurrence else f"{gram}{occurrence}")
+    return tokens
+
+
+class FuzzyNameIndex:
+    """Trigram prefix index over ``names``; ``candidates(i)`` yields plausible ``j > i``."""
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        threshold: float = 0.85,
+        min_overlap: float = DEFAULT_MIN_OVERLAP,
+    ):
+        self.names = list(names)
+        self.threshold = threshold
+        self.min_overlap = min_overlap
+        self.pairs_probed = 0
+        self.pairs_bounded = 0
+        self._lengths = [len(name) for name in self.names]
+        # Contagem de caracteres como vetor sobre o alfabeto do índice (limite via map(min) em C)
+        alphabet = {char: pos for pos, char in enumerate(sorted(set().union(*self.names)))}
+        self._char_counts: list[tuple[int, ...]] = []
+        for name in self.names:
+            counts = [0] * len(alphabet)
+            for char in name:
+                counts[alphabet[char]] += 1
+            self._char_counts.append(tuple(counts))
+
+        token_lists = [_tokens(name) for name in self.names]
+        frequency: Counter[str] = Counter()
+        for tokens in token_lists:
+            frequency.update(tokens)
+
+        self._prefixes: list[list[str]] = []
+        self._index: dict[str, list[int]] = {}
+        for i, tokens in enumerate(token_lists):
+            tokens.sort(key=lambda token: (frequency[token], token))
+            required = max(self._min_overlap(len(self.names[i])), math.ceil(self.min_overlap * len(tokens)))
+            prefix = tokens[: max(1, len(tokens) - required + 1)]
+            self._prefixes.append(prefix)
+            for token in prefix:
+                self._index.setdefault(token, []).append(i)
+
+    def _min_overlap(self, length: int) -> int:
+        """Shared trigrams any partner of a name of ``length`` must have (at least 1)."""
+        r = self.threshold
+        if r >= 2 or length == 0:
+            return 1
+        # Parceiro mais curto admissível pela razão de comprimentos
+        shortest_total = length * 2 / (2 - r)
+        return max(1, math.ceil((2.5 * r - 2) * shortest_total - 2))
+
+    def candidates(self, i: int) -> Iterator[int]:
+        """Indices ``j > i`` sharing a prefix token with name ``i`` and of admissible length."""
+        found: set[int] = set()
+        for token in self._prefixes[i]:
+            found.update(self._index[token])
+        # ratio <= 2*min/(l1+l2): o parceiro tem de ter comprimento em [l*r/(2-r), l*(2-r)/r]
+        length = self._lengths[i]
+        r = self.threshold
+        low = length * r / (2 - r) if r < 2 else 0
+        high = length * (2 - r) / r if r > 0 else math.inf
+        lengths = self._lengths
+        found = [j for j in found if j > i and low <= lengths[j] <= high]
+        self.pairs_probed += len(found)
+        found.sort()
+        return iter(found)
+
+    def could_match(self, i: int, j: int) -> bool:
+        """Cheap upper bounds of ``SequenceMatcher.ratio`` (length ratio, then character multiset)."""
+        a, b = self.names[i], self.names[j]
+        total = len(a) + len(b)
+        if not total:
+            return True
+        needed = self.threshold * total
+        if 2 * min(len(a), len(b)) < needed:
+            return False
+        if 2 * sum(map(min, self._char_counts[i], self._char_counts[j])) < needed:
+            return False
+        self.pairs_bounded += 1
+        return True
@@ -0,0 +1,239 @@
+"""Staged byte-identical duplicate detection.
+
+Unverified files have no SHA1 in the library, so ``find_duplicates_by_hash``
+never sees them. This finder narrows the candidates down in three stages,
+so that only a small fraction of the bytes is ever read:
+
+1. Group library entries by exact size (SQL only, no I/O).
+2. For size collisions, compute a head/middle/tail fingerprint
+   (``hasher.calculate_fingerprint(middle=True)``, at most 192 KiB per file).
+3. Fully hash (SHA1) only the files whose fingerprints still collide.
+
+Fingerprints and full hashes are cached per file identity, and the
+resulting groups are stored in the library DB (``content_duplicates``).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from emumanager.library import ContentFingerprint, DuplicateGroup, FileIdentity, LibraryDB
+from emumanager.verification import hash_engine, hasher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_WORKERS = 8
+
+
+@dataclass
+class StagedDedupStats:
+    """Per-stage counters of one run (``bytes_read`` excludes cache hits)."""
+
+    files_considered: int = 0
+    size_groups: int = 0
+    sampled: int = 0
+    fully_hashed: int = 0
+    bytes_read: int = 0
+    groups: int = 0
+    wasted_bytes: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass(slots=True)
+class _Candidate:
+    path: Path
+    identity: FileIdentity
+    library_sha1: Optional[str]
+    cached: Optional[ContentFingerprint]
+    sample: Optional[str] = None
+    sha1: Optional[str] = None
+
+
+class StagedDuplicateFinder:
+    """Find byte-identical files: size, then sampled fingerprint, then full SHA1."""
+
+    def __init__(
+        self,
+        db: LibraryDB,
+        sample_size: int = hasher.FINGERPRINT_SAMPLE_SIZE,
+        max_workers: int = DEFAULT_SAMPLE_WORKERS,
+    ):
+        self.db = db
+        self.sample_size = sample_size
+        self.max_workers = max_workers
+        self.stats = StagedDedupStats()
+
+    def run(
+        self,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+        cancel_event: Any = None,
+    ) -> list[DuplicateGroup]:
+        """Run all stages, persist the groups and return them from the DB."""
+        start = time.perf_counter()
+        self.stats = StagedDedupStats()
+
+        def _cancelled() -> bool:
+            return bool(cancel_event is not None and cancel_event.is_set())
+
+        # 1. Tamanho (apenas SQL)
+        if progress_cb:
+            progress_cb(0.0, "Grouping files by size...")
+        size_groups = [
+            group for group in (self._stat_group(rows) for _size, rows in self.db.iter_size_collisions())
+            if len(group) > 1
+        ]
+        self.stats.size_groups = len(size_groups)
+        self.stats.files_considered = sum(len(group) for group in size_groups)
+        if _cancelled():
+            return []
+
+        # 2. Fingerprint parcial (início/meio/fim) só para colisões de tamanho
+        if progress_cb:
+            progress_cb(0.2, f"Sampling {self.stats.files_considered} size-colliding files...")
+        self._sample(candidate for group in size_groups for candidate in group if not candidate.sample)
+        if _cancelled():
+            return []
+
+        by_sample: dict[tuple[int, str], list[_Candidate]] = {}
+        for group in size_groups:
+            for candidate in group:
+                if candidate.sample:
+                    by_sample.setdefault((candidate.identity.size, candidate.sample), []).append(candidate)
+        colliding = [group for group in by_sample.values() if len(group) > 1]
+
+        # 3. Hash completo só para fingerprints que continuam a colidir
+        if progress_cb:
+            progress_cb(0.5, "Hashing files with matching fingerprints...")
+        self._full_hash(
+            [candidate for group in colliding for candidate in group if not candidate.sha1],
+            progress_cb,
+            cancel_event,
+        )
+        if _cancelled():
+            return []
+
+        by_sha1: dict[str, list[_Candidate]] = {}
+        for group in colliding:
+            for candidate in group:
+                if candidate.sha1:
+                    by_sha1.setdefault(candidate.sha1, []).append(candidate)
+
+        self._persist(size_groups)
+        self.db.replace_content_duplicates(
+            (sha1, group[0].identity.size, [str(candidate.path) for candidate in group])
+            for sha1, group in by_sha1.items()
+            if len(group) > 1
+        )
+        groups = self.db.find_duplicates_by_content()
+        self.stats.groups = len(groups)
+        self.stats.wasted_bytes = sum(group.wasted_bytes for group in groups)
+        self.stats.elapsed = time.perf_counter() - start
+        if progress_cb:
+            progress_cb(1.0, f"Found {len(groups)} byte-identical groups")
+        logger.info(
+            "Duplicados por conteúdo: %s grupos; %s amostrados, %s hasheados, %.1f MB lidos",
+            self.stats.groups,
+            self.stats.sampled,
+            self.stats.fully_hashed,
+            self.stats.bytes_read / (1024 * 1024),
+        )
+        return groups
+
+    def _stat_group(self, rows: list[tuple[str, Optional[str], float]]) -> list[_Candidate]:
+        group: list[_Candidate] = []
+        seen: set[tuple[int, int]] = set()
+        for path, library_sha1, library_mtime in rows:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if library_mtime != st.st_mtime:
+                # Reescrito desde o último scan (mesmo tamanho): o SHA1 da biblioteca já não vale
+                library_sha1 = None
+            # Hardlinks partilham o inode: não ocupam espaço extra
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            identity = FileIdentity.from_stat(st)
+            cached = self.db.get_content_fingerprint(identity)
+            candidate = _Candidate(Path(path), identity, library_sha1, cached)
+            if cached:
+                candidate.sample, candidate.sha1 = cached.sample, cached.sha1
+            group.append(candidate)
+        if len({candidate.identity.size for candidate in group}) > 1:
+            # A entrada da biblioteca está desatualizada; reagrupar pelo tamanho real
+            sizes: dict[int, list[_Candidate]] = {}
+            for candidate in group:
+                sizes.setdefault(candidate.identity.size, []).append(candidate)
+            group = max(sizes.values(), key=len)
+        return group
+
+    def _sample(self, candidates) -> None:
+        candidates = list(candidates)
+        if not candidates:
+            return
+
+        def _fingerprint(candidate: _Candidate) -> None:
+            try:
+                sample, complete = hasher.calculate_fingerprint(
+                    candidate.path, self.sample_size, middle=True
+                )
+            except OSError as e:
+                logger.debug("Fingerprint falhou para %s: %s", candidate.path.name, e)
+                return
+            candidate.sample = sample
+            if complete:
+                # Ficheiro lido por inteiro: o fingerprint já é o SHA1
+                candidate.sha1 = sample
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="dedup-sample") as pool:
+            list(pool.map(_fingerprint, candidates))
+        self.stats.sampled += len(candidates)
+        self.stats.bytes_read += sum(min(c.identity.size, 3 * self.sample_size) for c in candidates)
+
+    def _full_hash(self, candidates: list[_Candidate], progress_cb, cancel_event) -> None:
+        pending = []
+        for candidate in candidates:
+            if candidate.library_sha1:
+                candidate.sha1 = candidate.library_sha1.lower()
+            else:
+                pending.append(candidate)
+        if not pending:
+            return
+
+        def _on_progress(progress: hash_engine.HashProgress) -> None:
+            if progress_cb:
+                progress_cb(0.5 + 0.45 * progress.fraction, f"Hashing duplicates: {progress.describe()}")
+
+        results = hash_engine.hash_many(
+            [hash_engine.HashJob(candidate.path, ("sha1",)) for candidate in pending],
+            progress_cb=_on_progress,
+            cancel_event=cancel_event,
+        )
+        for candidate in pending:
+            result = results.get(candidate.path)
+            if result and result.ok:
+                candidate.sha1 = result.hashes["sha1"]
+                self.stats.fully_hashed += 1
+                self.stats.bytes_read += result.size
+
+    def _persist(self, size_groups: list[list[_Candidate]]) -> None:
+        with self.db.batch_writer() as writer:
+            for group in size_groups:
+                for candidate in group:
+                    cached = candidate.cached
+                    if not candidate.sample or (
+                        cached and (cached.sample, cached.sha1) == (candidate.sample, candidate.sha1)
+                    ):
+                        continue
+                    self.db.store_content_fingerprint(
+                        candidate.identity,
+                        ContentFingerprint(sample=candidate.sample, sha1=candidate.sha1),
+                        writer=writer,
+                    )
@@ -48,12 +48,46 @@ class MainWindowVerificationRehashMixin:
         out = self._run_identify_single_worker(path, dat_path, log_cb, None)
         return str(path), out
 
-    def _recalculate_hashes_to_db(self, path: Path):
-        algos = ("crc32", "sha1")
+    def _rehash_algorithms(self) -> tuple[str, ...]:
         if getattr(self, "chk_deep_verify", None) and self.chk_deep_verify.isChecked():
-            algos = ("crc32", "md5", "sha1", "sha256")
+            return ("crc32", "md5", "sha1", "sha256")
+        return ("crc32", "sha1")
 
-        hashes = self._calculate_hashes_for_path(path, algorithms=algos)
+    def _rehash_many(self, targets: list[Any]) -> list[tuple[str, str]]:
+        """Re-hash sem DAT: todos os ficheiros num só hash_many, com progresso em bytes/s."""
+        from emumanager.verification.hash_engine import hash_many
+
+        results: list[tuple[str, str]] = []
+        paths = []
+        for target in targets:
+            path = Path(target.full_path) if getattr(target, "full_path", None) else None
+            if not path or not path.exists():
+                results.append((str(path), "missing"))
+            else:
+                paths.append(path)
+
+        def _on_progress(progress):
+            self.progress_hook(progress.fraction, f"Rehash: {progress.describe()}")
+
+        hashed = hash_many(
+            paths,
+            algorithms=self._rehash_algorithms(),
+            progress_cb=_on_progress,
+            cancel_event=getattr(self, "_cancel_event", None),
+        )
+        for path in paths:
+            result = hashed.get(path)
+            if result is None:
+                results.append((str(path), "cancelled"))
+            elif not result.ok:
+                results.append((str(path), f"error:{result.error}"))
+            else:
+                results.append(self._recalculate_hashes_to_db(path, result.hashes))
+        return results
+
+    def _recalculate_hashes_to_db(self, path: Path, hashes: Optional[dict[str, str]] = None):
+        if hashes is None:
+            hashes = self._calculate_hashes_for_path(path, algorithms=self._rehash_algorithms())
         try:
             from emumanager.library import LibraryEntry
 
@@ -105,7 +139,9 @@ class MainWindowVerificationRehashMixin:
         dat_path = getattr(self, "_current_dat_path", None)
 
         def _work():
-            return [self._rehash_single_item(target, dat_path) for target in targets]
+            if dat_path:
+                return [self._rehash_single_item(target, dat_path) for target in targets]
+            return self._rehash_many(targets)
 
         def _done(res):
             self._set_ui_enabled(True)
@@ -83,10 +83,10 @@ worker_dolphin_verify = _not_imp
 DOLPHIN_CONVERTIBLE_EXTENSIONS = {".iso", ".gcm", ".wbfs"}
 
 def worker_identify_single_file(file_path: Path, dat_path: Path, log_cb: Callable, progress_cb: Optional[Callable] = None) -> str:
-    from emumanager.verification import dat_parser
+    from emumanager.verification.dat_index import load_dat_index
     from emumanager.workers.verification import HashVerifyWorker
     try:
-        db = dat_parser.parse_dat_file(dat_path)
+        db = load_dat_index(dat_path)
         worker = HashVerifyWorker(file_path.parent, log_cb, progress_cb, None, db)
         return worker._process_item(file_path)
     except Exception as e:
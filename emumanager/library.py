@@ -1,18 +1,46 @@
 from __future__ import annotations
 
-from .library_db_core import LibraryDbCoreMixin
+from .library_db_core import (
+    ENTRY_FIELDS,
+    SCAN_ENTRY_FIELDS,
+    LibraryDbCoreMixin,
+    LibraryWriteBuffer,
+)
+from .library_db_content import ContentFingerprint, LibraryDbContentMixin
 from .library_db_duplicates import LibraryDbDuplicateMixin
-from .library_models import DuplicateGroup, LibraryEntry, normalize_game_name
+from .library_db_hash_cache import HashCacheRecord, LibraryDbHashCacheMixin
+from .library_db_integrity import IntegrityCheck, LibraryDbIntegrityMixin
+from .library_db_metadata_cache import CachedMetadata, LibraryDbMetadataCacheMixin
+from .library_db_quality import CachedQuality, LibraryDbQualityMixin
+from .library_models import DuplicateGroup, DuplicateSummary, FileIdentity, LibraryEntry, normalize_game_name
 
 
-class LibraryDB(LibraryDbCoreMixin, LibraryDbDuplicateMixin):
+class LibraryDB(
+    LibraryDbCoreMixin,
+    LibraryDbDuplicateMixin,
+    LibraryDbContentMixin,
+    LibraryDbHashCacheMixin,
+    LibraryDbMetadataCacheMixin,
+    LibraryDbQualityMixin,
+    LibraryDbIntegrityMixin,
+):
     """Facade for the library persistence and deduplication APIs."""
 
 
 __all__ = [
+    "CachedMetadata",
+    "CachedQuality",
+    "ContentFingerprint",
+    "ENTRY_FIELDS",
+    "SCAN_ENTRY_FIELDS",
     "DuplicateGroup",
+    "DuplicateSummary",
+    "FileIdentity",
+    "HashCacheRecord",
+    "IntegrityCheck",
     "LibraryDB",
     "LibraryEntry",
+    "LibraryWriteBuffer",
     "normalize_game_name",
 ]
                 
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any, Iterable, Iterator, Optional
+
+from .common.exceptions import DatabaseError
+from .library_models import DuplicateGroup, FileIdentity
+
+CONTENT_FINGERPRINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS content_fingerprints (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sample TEXT,
+    sha1 TEXT,
+    updated REAL,
+    PRIMARY KEY (dev, ino, size, mtime_ns)
+)
+"""
+CONTENT_DUPLICATES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS content_duplicates (
+    path TEXT PRIMARY KEY,
+    sha1 TEXT NOT NULL,
+    size INTEGER,
+    found_at REAL
+)
+"""
+CONTENT_DUPLICATES_INDEX = "CREATE INDEX IF NOT EXISTS idx_content_dup_sha1 ON content_duplicates(sha1)"
+CONTENT_FINGERPRINT_UPSERT_SQL = """
+INSERT INTO content_fingerprints (dev, ino, size, mtime_ns, sample, sha1, updated)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (dev, ino, size, mtime_ns) DO UPDATE SET
+    sample = COALESCE(excluded.sample, content_fingerprints.sample),
+    sha1 = COALESCE(excluded.sha1, content_fingerprints.sha1),
+    updated = excluded.updated
+"""
+
+
+@dataclass(slots=True)
+class ContentFingerprint:
+    """Sampled (head/middle/tail) fingerprint and, once computed, the full SHA1."""
+
+    sample: Optional[str] = None
+    sha1: Optional[str] = None
+
+
+class LibraryDbContentMixin:
+    """Persisted state of the staged byte-identical duplicate finder.
+
+    ``content_fingerprints`` is keyed by file identity, like ``hash_cache``,
+    so later runs skip re-reading unchanged files. ``content_duplicates``
+    holds the groups from the last run.
+    """
+
+    SCHEMA_STATEMENTS = (CONTENT_FINGERPRINT_SCHEMA, CONTENT_DUPLICATES_SCHEMA, CONTENT_DUPLICATES_INDEX)
+
+    def iter_size_collisions(
+        self, min_size: int = 1
+    ) -> Iterator[tuple[int, list[tuple[str, Optional[str], float]]]]:
+        """Yield ``(size, [(path, sha1, mtime), ...])`` for every size shared by 2+ entries.
+
+        ``mtime`` lets callers check that the stored ``sha1`` still describes the file on disk.
+        """
+        try:
+            cursor = self._get_conn().execute(
+                """
+                SELECT size, path, sha1, mtime FROM library
+                WHERE size IN (
+                    SELECT size FROM library WHERE size >= ? GROUP BY size HAVING COUNT(*) > 1
+                )
+                ORDER BY size
+                """,
+                (min_size,),
+            )
+            for size, rows in groupby(cursor, key=lambda row: row[0]):
+                yield size, [(path, sha1, mtime) for _size, path, sha1, mtime in rows]
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to group entries by size: {exc}") from exc
+
+    def get_content_fingerprint(self, identity: FileIdentity) -> Optional[ContentFingerprint]:
+        try:
+            row = self._get_conn().execute(
+                """
+                SELECT sample, sha1 FROM content_fingerprints
+                WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?
+                """,
+                (identity.dev, identity.ino, identity.size, identity.mtime_ns),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to read content fingerprint: {exc}") from exc
+        return ContentFingerprint(*row) if row else None
+
+    def store_content_fingerprint(
+        self,
+        identity: FileIdentity,
+        fingerprint: ContentFingerprint,
+        writer: Optional[Any] = None,
+    ) -> None:
+        """Upsert ``fingerprint``; ``None`` fields keep the stored value."""
+        params = (
+            identity.dev,
+            identity.ino,
+            identity.size,
+            identity.mtime_ns,
+            fingerprint.sample,
+            fingerprint.sha1,
+            time.time(),
+        )
+        if writer is not None:
+            writer.execute(CONTENT_FINGERPRINT_UPSERT_SQL, params)
+            return
+        try:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(CONTENT_FINGERPRINT_UPSERT_SQL, params)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to store content fingerprint: {exc}") from exc
+
+    def replace_content_duplicates(self, groups: Iterable[tuple[str, int, Iterable[str]]]) -> None:
+        """Replace the stored groups with ``(sha1, size, paths)`` tuples."""
+        now = time.time()
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM content_duplicates")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO content_duplicates (path, sha1, size, found_at) VALUES (?, ?, ?, ?)",
+                    ((path, sha1, size, now) for sha1, size, paths in groups for path in paths),
+                )
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to store content duplicates: {exc}") from exc
+
+    def find_duplicates_by_content(self) -> list[DuplicateGroup]:
+        """Groups from the last staged run, restricted to paths still in the library."""
+        try:
+            cursor = self._get_conn().execute(
+                """
+                SELECT d.sha1, l.* FROM content_duplicates d
+                JOIN library l ON l.path = d.path
+                ORDER BY d.sha1, l.path
+                """
+            )
+            description = cursor.description[1:]
+            groups = []
+            for sha1, rows in groupby(cursor.fetchall(), key=lambda row: row[0]):
+                entries = [self._row_to_entry(row[1:], description) for row in rows]
+                if len(entries) > 1:
+                    groups.append(DuplicateGroup(key=sha1, kind="content", entries=entries))
+            return groups
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to read content duplicates: {exc}") from exc
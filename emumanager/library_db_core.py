@@ -5,10 +5,11 @@ import sqlite3
 import threading
 import time
 from contextlib import closing, contextmanager
+from itertools import groupby
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
-from .common.exceptions import DatabaseConnectionError, DatabaseError
+from .common.exceptions import DatabaseConnectionError, DatabaseError, ValidationError
 from .common.validation import validate_not_empty
 from .library_models import LibraryEntry
 
@@ -30,10 +31,15 @@ CREATE TABLE IF NOT EXISTS library (
 """
 LIBRARY_INDEXES = (
     "CREATE INDEX IF NOT EXISTS idx_system ON library(system)",
-    "CREATE INDEX IF NOT EXISTS idx_sha1 ON library(sha1) WHERE sha1 IS NOT NULL",
-    "CREATE INDEX IF NOT EXISTS idx_sha256 ON library(sha256) WHERE sha256 IS NOT NULL",
-    "CREATE INDEX IF NOT EXISTS idx_md5 ON library(md5) WHERE md5 IS NOT NULL",
-    "CREATE INDEX IF NOT EXISTS idx_crc32 ON library(crc32) WHERE crc32 IS NOT NULL",
+    # (hash, size) covers both lookups by hash and the duplicate summaries
+    "DROP INDEX IF EXISTS idx_sha1",
+    "DROP INDEX IF EXISTS idx_sha256",
+    "DROP INDEX IF EXISTS idx_md5",
+    "DROP INDEX IF EXISTS idx_crc32",
+    "CREATE INDEX IF NOT EXISTS idx_sha1_size ON library(sha1, size) WHERE sha1 IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_sha256_size ON library(sha256, size) WHERE sha256 IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_md5_size ON library(md5, size) WHERE md5 IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_crc32_size ON library(crc32, size) WHERE crc32 IS NOT NULL",
     "CREATE INDEX IF NOT EXISTS idx_status ON library(status)",
     "CREATE INDEX IF NOT EXISTS idx_match_name ON library(match_name)",
     "CREATE INDEX IF NOT EXISTS idx_system_status ON library(system, status)",
@@ -47,6 +53,32 @@ CREATE TABLE IF NOT EXISTS library_actions (
     ts REAL
 )
 """
+UPSERT_ENTRY_SQL = """
+INSERT OR REPLACE INTO library
+(path, system, size, mtime, status, crc32, md5, sha1, sha256, match_name, dat_name, extra_json)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+DELETE_ENTRY_SQL = "DELETE FROM library WHERE path = ?"
+LOG_ACTION_SQL = "INSERT INTO library_actions (path, action, detail, ts) VALUES (?, ?, ?, ?)"
+DEFAULT_WRITE_BATCH_SIZE = 500
+DEFAULT_READ_BATCH_SIZE = 1000
+ENTRY_FIELDS = (
+    "path",
+    "system",
+    "size",
+    "mtime",
+    "status",
+    "crc32",
+    "md5",
+    "sha1",
+    "sha256",
+    "match_name",
+    "dat_name",
+    "extra_metadata",
+)
+_REQUIRED_ENTRY_FIELDS = ("system", "size", "mtime")
+# Projection used for path -> entry maps during scans (extra_json is rewritten anyway).
+SCAN_ENTRY_FIELDS = tuple(name for name in ENTRY_FIELDS if name != "extra_metadata")
 VALID_UPDATE_FIELDS = frozenset(
     {
         "system",
@@ -64,9 +96,145 @@ VALID_UPDATE_FIELDS = frozenset(
 )
 
 
+def _entry_params(entry: LibraryEntry) -> tuple:
+    return (
+        entry.path,
+        entry.system,
+        entry.size,
+        entry.mtime,
+        entry.status,
+        entry.crc32,
+        entry.md5,
+        entry.sha1,
+        entry.sha256,
+        entry.match_name,
+        entry.dat_name,
+        json.dumps(entry.extra_metadata),
+    )
+
+
+def _update_fields_statement(path: str, fields: dict[str, Any]) -> Optional[tuple[str, tuple]]:
+    safe_fields = {key: value for key, value in fields.items() if key in VALID_UPDATE_FIELDS}
+    if not safe_fields:
+        return None
+    set_clause = ", ".join(f"{key} = ?" for key in sorted(safe_fields))
+    values = tuple(safe_fields[key] for key in sorted(safe_fields)) + (path,)
+    return f"UPDATE library SET {set_clause} WHERE path = ?", values
+
+
+def _field_column(field_name: str) -> str:
+    if field_name not in ENTRY_FIELDS:
+        raise ValidationError(f"Unknown library column: {field_name}")
+    return "extra_json" if field_name == "extra_metadata" else field_name
+
+
+def _entry_factory(fields: tuple[str, ...]) -> Callable[[tuple], LibraryEntry]:
+    """Build a row decoder for a fixed projection, resolved once per query."""
+    placeholders = {name: None for name in _REQUIRED_ENTRY_FIELDS if name not in fields}
+    decode_extra = "extra_metadata" in fields
+
+    def build(row: tuple) -> LibraryEntry:
+        values = dict(zip(fields, row))
+        if decode_extra:
+            raw = values["extra_metadata"]
+            values["extra_metadata"] = json.loads(raw) if raw else {}
+        return LibraryEntry(**placeholders, **values)
+
+    return build
+
+
+def _where_clause(
+    where: Optional[dict[str, Any]],
+    require: Iterable[str],
+) -> tuple[str, list[Any]]:
+    conditions: list[str] = []
+    params: list[Any] = []
+    for field_name, value in (where or {}).items():
+        column = _field_column(field_name)
+        if value is None:
+            conditions.append(f"{column} IS NULL")
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            values = list(value)
+            if not values:
+                conditions.append("0")
+                continue
+            conditions.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        else:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    for field_name in require:
+        column = _field_column(field_name)
+        conditions.append(f"{column} IS NOT NULL AND {column} != ''")
+    return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+class LibraryWriteBuffer:
+    """Buffered writer that applies library mutations in batched transactions.
+
+    Mutations are queued in order and flushed with ``executemany`` once
+    ``batch_size`` operations are pending, so a full scan costs one commit per
+    batch instead of one commit per file. Consecutive operations that share the
+    same SQL statement are grouped together, which keeps write ordering intact.
+    """
+
+    def __init__(self, db: "LibraryDbCoreMixin", batch_size: int = DEFAULT_WRITE_BATCH_SIZE):
+        self.db = db
+        self.batch_size = max(1, int(batch_size))
+        self._pending: list[tuple[str, tuple]] = []
+        self.written = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def upsert(self, entry: LibraryEntry) -> None:
+        self._queue(UPSERT_ENTRY_SQL, _entry_params(entry))
+
+    def update_fields(self, path: str, **fields) -> None:
+        validate_not_empty(path, "path")
+        statement = _update_fields_statement(path, fields)
+        if statement:
+            self._queue(*statement)
+
+    def remove(self, path: str) -> None:
+        validate_not_empty(path, "path")
+        self._queue(DELETE_ENTRY_SQL, (path,))
+
+    def execute(self, sql: str, params: tuple) -> None:
+        """Queue a parametrised statement owned by another library mixin."""
+        self._queue(sql, params)
+
+    def log_action(self, path: str, action: str, detail: Optional[str] = None) -> None:
+        validate_not_empty(path, "path")
+        validate_not_empty(action, "action")
+        self._queue(LOG_ACTION_SQL, (path, action, detail, time.time()))
+
+    def _queue(self, sql: str, params: tuple) -> None:
+        self._pending.append((sql, params))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+        try:
+            conn = self.db._get_conn()
+            with conn:
+                for sql, group in groupby(pending, key=lambda item: item[0]):
+                    conn.executemany(sql, [params for _sql, params in group])
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to flush {len(pending)} library writes: {exc}") from exc
+        self.written += len(pending)
+        return len(pending)
+
+
 class LibraryDbCoreMixin:
     """SQLite-backed library persistence with thread-local connections."""
 
+    # Each mixin may declare its own SCHEMA_STATEMENTS; _init_db applies all of them.
+    SCHEMA_STATEMENTS: tuple[str, ...] = (LIBRARY_SCHEMA, *LIBRARY_INDEXES, ACTION_LOG_SCHEMA)
+
     def __init__(self, db_path: Path = Path("library.db")):
         self.db_path = db_path
         self._local = threading.local()
@@ -97,14 +265,16 @@ class LibraryDbCoreMixin:
     def _init_db(self):
         try:
             with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.execute(LIBRARY_SCHEMA)
-                for statement in LIBRARY_INDEXES:
+                for statement in self._schema_statements():
                     conn.execute(statement)
-                conn.execute(ACTION_LOG_SCHEMA)
                 conn.commit()
         except sqlite3.Error as exc:
             raise DatabaseError(f"Failed to initialize database schema: {exc}") from exc
 
+    def _schema_statements(self) -> Iterator[str]:
+        for klass in reversed(type(self).__mro__):
+            yield from vars(klass).get("SCHEMA_STATEMENTS", ())
+
     def _row_to_entry(self, row, description) -> LibraryEntry:
         row_dict = dict(zip([col[0] for col in description], row))
         return LibraryEntry(
@@ -128,45 +298,47 @@ class LibraryDbCoreMixin:
         try:
             conn = self._get_conn()
             with conn:
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO library
-                    (path, system, size, mtime, status, crc32, md5, sha1, sha256, match_name, dat_name, extra_json)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        entry.path,
-                        entry.system,
-                        entry.size,
-                        entry.mtime,
-                        entry.status,
-                        entry.crc32,
-                        entry.md5,
-                        entry.sha1,
-                        entry.sha256,
-                        entry.match_name,
-                        entry.dat_name,
-                        json.dumps(entry.extra_metadata),
-                    ),
-                )
+                conn.execute(UPSERT_ENTRY_SQL, _entry_params(entry))
         except sqlite3.Error as exc:
             raise DatabaseError(f"Failed to update entry {entry.path}: {exc}") from exc
 
+    def update_entries(
+        self,
+        entries: Iterable[LibraryEntry],
+        batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+    ) -> int:
+        """Upsert many entries, committing once per ``batch_size`` rows."""
+        with self.batch_writer(batch_size) as writer:
+            for entry in entries:
+                writer.upsert(entry)
+        return writer.written
+
+    @contextmanager
+    def batch_writer(
+        self,
+        batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+    ) -> Iterator[LibraryWriteBuffer]:
+        """Yield a write buffer whose pending writes are flushed when the block exits."""
+        writer = LibraryWriteBuffer(self, batch_size)
+        try:
+            yield writer
+        finally:
+            writer.flush()
+
     def update_entry_fields(self, path: str, **fields) -> None:
         validate_not_empty(path, "path")
         if not fields:
             return
 
-        safe_fields = {key: value for key, value in fields.items() if key in VALID_UPDATE_FIELDS}
-        if not safe_fields:
+        statement = _update_fields_statement(path, fields)
+        if not statement:
             return
 
-        set_clause = ", ".join(f"{key} = ?" for key in safe_fields.keys())
-        values = list(safe_fields.values()) + [path]
+        sql, values = statement
         try:
             conn = self._get_conn()
             with conn:
-                conn.execute(f"UPDATE library SET {set_clause} WHERE path = ?", values)
+                conn.execute(sql, values)
         except sqlite3.Error as exc:
             raise DatabaseError(f"Failed to update fields for {path}: {exc}") from exc
 
@@ -181,29 +353,66 @@ class LibraryDbCoreMixin:
             raise DatabaseError(f"Failed to get entry {path}: {exc}") from exc
 
     def get_all_entries(self, limit: Optional[int] = None) -> list[LibraryEntry]:
+        return list(self.iter_entries(limit=limit))
+
+    def iter_entries(
+        self,
+        columns: Optional[Iterable[str]] = None,
+        where: Optional[dict[str, Any]] = None,
+        require: Iterable[str] = (),
+        order_by: Iterable[str] = (),
+        batch: int = DEFAULT_READ_BATCH_SIZE,
+        limit: Optional[int] = None,
+    ) -> Iterator[LibraryEntry]:
+        """Stream entries from a cursor, decoding only the projected columns.
+
+        ``columns`` takes ``LibraryEntry`` field names; ``path`` is always
+        included and unprojected fields keep their defaults (``None`` for
+        ``system``/``size``/``mtime``). ``extra_json`` is only decoded when
+        ``extra_metadata`` is requested. ``where`` maps columns to a value
+        (``None`` means ``IS NULL``, a collection means ``IN``) and ``require``
+        lists columns that must be non-empty.
+        """
+        fields = tuple(columns) if columns is not None else ENTRY_FIELDS
+        if "path" not in fields:
+            fields = ("path", *fields)
+        select = ", ".join(_field_column(name) for name in fields)
+        clause, params = _where_clause(where, require)
+        query = f"SELECT {select} FROM library{clause}"
+        order = [_field_column(name) for name in order_by]
+        if order:
+            query += f" ORDER BY {', '.join(order)}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        build = _entry_factory(fields)
         try:
-            conn = self._get_conn()
-            query = "SELECT * FROM library"
-            if limit:
-                query += f" LIMIT {int(limit)}"
-            cursor = conn.execute(query)
-            return [self._row_to_entry(row, cursor.description) for row in cursor.fetchall()]
+            cursor = self._get_conn().execute(query, params)
+            while rows := cursor.fetchmany(max(1, int(batch))):
+                for row in rows:
+                    yield build(row)
         except sqlite3.Error as exc:
-            raise DatabaseError(f"Failed to get all entries: {exc}") from exc
+            raise DatabaseError(f"Failed to iterate entries: {exc}") from exc
 
     def get_entries_by_system(
         self,
         system: str,
-        limit: int = 1000,
+        limit: Optional[int] = None,
         offset: int = 0,
     ) -> list[LibraryEntry]:
+        """All entries of ``system`` unless ``limit`` is given (no implicit cap)."""
         conn = self._get_conn()
         cursor = conn.execute(
             "SELECT * FROM library WHERE system = ? LIMIT ? OFFSET ?",
-            (system, limit, offset),
+            (system, -1 if limit is None else limit, offset),
         )
         return [self._row_to_entry(row, cursor.description) for row in cursor.fetchall()]
 
+    def get_entry_count(self) -> int:
+        conn = self._get_conn()
+        result = conn.execute("SELECT COUNT(*) FROM library").fetchone()
+        return result[0] if result else 0
+
     def get_system_count(self, system: str) -> int:
         conn = self._get_conn()
         result = conn.execute(
@@ -217,7 +426,7 @@ class LibraryDbCoreMixin:
         try:
             conn = self._get_conn()
             with conn:
-                conn.execute("DELETE FROM library WHERE path = ?", (path,))
+                conn.execute(DELETE_ENTRY_SQL, (path,))
         except sqlite3.Error as exc:
             raise DatabaseError(f"Failed to remove entry {path}: {exc}") from exc
 
@@ -227,10 +436,7 @@ class LibraryDbCoreMixin:
         try:
             conn = self._get_conn()
             with conn:
-                conn.execute(
-                    "INSERT INTO library_actions (path, action, detail, ts) VALUES (?, ?, ?, ?)",
-                    (path, action, detail, time.time()),
-                )
+                conn.execute(LOG_ACTION_SQL, (path, action, detail, time.time()))
         except sqlite3.Error as exc:
             raise DatabaseError(f"Failed to log action {action} for {path}: {exc}") from exc
 
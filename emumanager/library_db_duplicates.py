@@ -2,13 +2,21 @@ from __future__ import annotations
 
 import logging
 import sqlite3
+from itertools import chain, groupby
+from operator import itemgetter
 from pathlib import Path
 
 from .common.exceptions import DatabaseError
-from .library_models import DuplicateGroup, LibraryEntry, normalize_game_name
+from .library_models import DuplicateGroup, DuplicateSummary, LibraryEntry, normalize_game_name
 
 logger = logging.getLogger(__name__)
 HASH_COLUMNS = frozenset({"sha1", "sha256", "md5", "crc32"})
+DUPLICATE_FETCH_SIZE = 1000
+
+
+def _agrees(entry: LibraryEntry, signature: dict[str, str]) -> bool:
+    """True if each column in ``signature`` is empty or equal on ``entry``."""
+    return all(getattr(entry, column) in (None, "", value) for column, value in signature.items())
 
 
 class LibraryDbDuplicateMixin:
@@ -16,41 +24,112 @@ class LibraryDbDuplicateMixin:
         self,
         prefer: tuple[str, ...] = ("sha1",),
     ) -> list[DuplicateGroup]:
+        """Group entries sharing a hash, one streamed query per column in ``prefer``.
+
+        Each entry is reported at most once: when a later column groups an
+        entry already grouped by an earlier one, the group's other (ungrouped)
+        entries join that earlier group instead of forming a new one, but only
+        if every column that formed the group is empty or equal on them.
+        """
         groups: list[DuplicateGroup] = []
+        signatures: list[dict[str, str]] = []
+        owner: dict[str, int] = {}
         try:
             conn = self._get_conn()
-            for column in prefer:
-                if column not in HASH_COLUMNS:
-                    logger.warning("Invalid hash column '%s' ignored", column)
-                    continue
+            for column in self._valid_hash_columns(prefer):
+                cursor = conn.execute(
+                    f"""
+                    SELECT l.* FROM library l
+                    JOIN (
+                        SELECT {column} AS dup_key FROM library
+                        WHERE {column} IS NOT NULL AND {column} != ''
+                        GROUP BY {column} HAVING COUNT(*) > 1
+                    ) d ON l.{column} = d.dup_key
+                    ORDER BY l.{column}, l.size DESC, l.path
+                    """
+                )
+                description = cursor.description
+                key_index = next(i for i, col in enumerate(description) if col[0] == column)
+                rows = iter(lambda: cursor.fetchmany(DUPLICATE_FETCH_SIZE), [])
+                for hash_value, group_rows in groupby(chain.from_iterable(rows), key=itemgetter(key_index)):
+                    entries = [self._row_to_entry(row, description) for row in group_rows]
+                    self._claim_group(groups, signatures, owner, column, str(hash_value), entries)
+            return groups
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to find duplicates by hash: {exc}") from exc
 
+    @staticmethod
+    def _claim_group(
+        groups: list[DuplicateGroup],
+        signatures: list[dict[str, str]],
+        owner: dict[str, int],
+        kind: str,
+        key: str,
+        entries: list[LibraryEntry],
+    ) -> None:
+        owners = list(dict.fromkeys(owner[entry.path] for entry in entries if entry.path in owner))
+        fresh = [entry for entry in entries if entry.path not in owner]
+        claimed: dict[int, list[LibraryEntry]] = {}
+        rejected = []
+        for entry in fresh:
+            # Um hash fraco partilhado não basta se um hash mais forte do grupo discorda
+            target = next(
+                (index for index in owners if _agrees(entry, signatures[index])),
+                None,
+            )
+            if target is None:
+                rejected.append(entry)
+            else:
+                claimed.setdefault(target, []).append(entry)
+        for target, members in claimed.items():
+            groups[target].entries.extend(members)
+            signatures[target].setdefault(kind, key)
+            for entry in members:
+                owner[entry.path] = target
+        if len(rejected) > 1:
+            target = len(groups)
+            groups.append(DuplicateGroup(key=key, kind=kind, entries=rejected))
+            signatures.append({kind: key})
+            for entry in rejected:
+                owner[entry.path] = target
+
+    def summarize_duplicates_by_hash(
+        self,
+        prefer: tuple[str, ...] = ("sha1",),
+    ) -> list[DuplicateSummary]:
+        """Keys, counts and wasted bytes only, answered from the ``(hash, size)`` indexes.
+
+        Unlike ``find_duplicates_by_hash`` each column is summarized on its
+        own, so an entry may be counted under several columns.
+        """
+        summaries: list[DuplicateSummary] = []
+        try:
+            conn = self._get_conn()
+            for column in self._valid_hash_columns(prefer):
                 cursor = conn.execute(
                     f"""
-                    SELECT {column} FROM library
+                    SELECT {column}, COUNT(*), SUM(size) - MAX(size) FROM library
                     WHERE {column} IS NOT NULL AND {column} != ''
                     GROUP BY {column} HAVING COUNT(*) > 1
                     """
                 )
-                for (hash_value,) in cursor.fetchall():
-                    entries_cursor = conn.execute(
-                        f"SELECT * FROM library WHERE {column} = ?",
-                        (hash_value,),
-                    )
-                    entries = [
-                        self._row_to_entry(row, entries_cursor.description)
-                        for row in entries_cursor.fetchall()
-                    ]
-                    if len(entries) > 1:
-                        groups.append(
-                            DuplicateGroup(
-                                key=str(hash_value),
-                                kind=column,
-                                entries=entries,
-                            )
-                        )
-            return groups
+                summaries.extend(
+                    DuplicateSummary(key=str(key), kind=column, count=count, wasted_bytes=wasted or 0)
+                    for key, count, wasted in cursor
+                )
+            return summaries
         except sqlite3.Error as exc:
-            raise DatabaseError(f"Failed to find duplicates by hash: {exc}") from exc
+            raise DatabaseError(f"Failed to summarize duplicates by hash: {exc}") from exc
+
+    @staticmethod
+    def _valid_hash_columns(prefer: tuple[str, ...]) -> list[str]:
+        columns = []
+        for column in prefer:
+            if column not in HASH_COLUMNS:
+                logger.warning("Invalid hash column '%s' ignored", column)
+            elif column not in columns:
+                columns.append(column)
+        return columns
 
     def find_duplicates_by_normalized_name(self) -> list[DuplicateGroup]:
         grouped_entries: dict[str, list[LibraryEntry]] = {}
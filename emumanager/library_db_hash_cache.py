@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .common.exceptions import DatabaseError
+from .library_models import FileIdentity
+
+HASH_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hash_cache (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    fingerprint TEXT,
+    crc32 TEXT,
+    md5 TEXT,
+    sha1 TEXT,
+    sha256 TEXT,
+    status TEXT,
+    match_name TEXT,
+    dat_name TEXT,
+    path TEXT,
+    updated REAL,
+    PRIMARY KEY (dev, ino, size, mtime_ns)
+)
+"""
+HASH_CACHE_COLUMNS = (
+    "dev",
+    "ino",
+    "size",
+    "mtime_ns",
+    "fingerprint",
+    "crc32",
+    "md5",
+    "sha1",
+    "sha256",
+    "status",
+    "match_name",
+    "dat_name",
+    "path",
+    "updated",
+)
+_PLACEHOLDERS = ", ".join("?" for _ in HASH_CACHE_COLUMNS)
+HASH_CACHE_UPSERT_SQL = (
+    f"INSERT OR REPLACE INTO hash_cache ({', '.join(HASH_CACHE_COLUMNS)}) VALUES ({_PLACEHOLDERS})"
+)
+HASH_CACHE_BACKFILL_SQL = (
+    f"INSERT OR IGNORE INTO hash_cache ({', '.join(HASH_CACHE_COLUMNS)}) VALUES ({_PLACEHOLDERS})"
+)
+
+
+@dataclass(slots=True)
+class HashCacheRecord:
+    """Hashes and DAT match data remembered for one file identity."""
+
+    crc32: Optional[str] = None
+    md5: Optional[str] = None
+    sha1: Optional[str] = None
+    sha256: Optional[str] = None
+    status: Optional[str] = None
+    match_name: Optional[str] = None
+    dat_name: Optional[str] = None
+    fingerprint: Optional[str] = None
+    path: Optional[str] = None
+
+    @property
+    def hashes(self) -> dict[str, Optional[str]]:
+        return {"crc32": self.crc32, "md5": self.md5, "sha1": self.sha1, "sha256": self.sha256}
+
+    @property
+    def has_hashes(self) -> bool:
+        return any(self.hashes.values())
+
+
+def _cache_params(identity: FileIdentity, record: HashCacheRecord) -> tuple:
+    return (
+        identity.dev,
+        identity.ino,
+        identity.size,
+        identity.mtime_ns,
+        record.fingerprint,
+        record.crc32,
+        record.md5,
+        record.sha1,
+        record.sha256,
+        record.status,
+        record.match_name,
+        record.dat_name,
+        record.path,
+        time.time(),
+    )
+
+
+class LibraryDbHashCacheMixin:
+    """Content-identity hash cache that survives renames and moves.
+
+    Rows are keyed by ``(st_dev, st_ino, size, mtime_ns)``. A rename keeps all
+    four values, so the scanner can carry hashes and DAT matches to the new
+    path without re-reading the file. An optional head/tail fingerprint guards
+    against inode reuse after a delete.
+    """
+
+    SCHEMA_STATEMENTS = (HASH_CACHE_SCHEMA,)
+
+    def get_cached_hashes(self, identity: FileIdentity) -> Optional[HashCacheRecord]:
+        try:
+            row = self._get_conn().execute(
+                """
+                SELECT crc32, md5, sha1, sha256, status, match_name, dat_name, fingerprint, path
+                FROM hash_cache WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?
+                """,
+                (identity.dev, identity.ino, identity.size, identity.mtime_ns),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to read hash cache: {exc}") from exc
+        return HashCacheRecord(*row) if row else None
+
+    def store_cached_hashes(
+        self,
+        identity: FileIdentity,
+        record: HashCacheRecord,
+        writer: Optional[Any] = None,
+        overwrite: bool = True,
+    ) -> None:
+        """Remember ``record`` for ``identity``, optionally via a batch writer.
+
+        With ``overwrite=False`` an existing row is kept, which lets unchanged
+        files backfill the cache without clobbering fingerprinted rows.
+        """
+        sql = HASH_CACHE_UPSERT_SQL if overwrite else HASH_CACHE_BACKFILL_SQL
+        params = _cache_params(identity, record)
+        if writer is not None:
+            writer.execute(sql, params)
+            return
+        try:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(sql, params)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to update hash cache: {exc}") from exc
+
+    def prune_hash_cache(self, older_than: float) -> int:
+        """Drop cache rows not refreshed since the ``older_than`` timestamp."""
+        try:
+            conn = self._get_conn()
+            with conn:
+                cursor = conn.execute("DELETE FROM hash_cache WHERE updated < ?", (older_than,))
+            return cursor.rowcount
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to prune hash cache: {exc}") from exc
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .common.exceptions import DatabaseError
+from .common.validation import validate_not_empty
+
+INTEGRITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS integrity_checks (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    result INTEGER,
+    detail TEXT,
+    checked_at REAL NOT NULL
+)
+"""
+INTEGRITY_UPSERT_SQL = """
+INSERT OR REPLACE INTO integrity_checks (path, size, mtime_ns, result, detail, checked_at)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+@dataclass(slots=True)
+class IntegrityCheck:
+    """Last deep verification (``chdman``/``dolphin-tool``) of one file signature.
+
+    ``result`` is ``None`` when the tool was unavailable or inconclusive.
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    result: Optional[bool]
+    detail: Optional[str]
+    checked_at: float
+
+    def is_current(self, size: int, mtime_ns: int, max_age: float, now: Optional[float] = None) -> bool:
+        """True when the file is unchanged and the check is younger than ``max_age`` seconds."""
+        if (self.size, self.mtime_ns) != (size, mtime_ns) or self.result is None:
+            return False
+        return (now if now is not None else time.time()) - self.checked_at < max_age
+
+
+class LibraryDbIntegrityMixin:
+    """Persisted integrity-verification results used by the scheduler."""
+
+    SCHEMA_STATEMENTS = (INTEGRITY_SCHEMA,)
+
+    def get_integrity_checks(self) -> dict[str, IntegrityCheck]:
+        try:
+            rows = self._get_conn().execute(
+                "SELECT path, size, mtime_ns, result, detail, checked_at FROM integrity_checks"
+            ).fetchall()
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to read integrity checks: {exc}") from exc
+        return {
+            row[0]: IntegrityCheck(
+                row[0], row[1], row[2], None if row[3] is None else bool(row[3]), row[4], row[5]
+            )
+            for row in rows
+        }
+
+    def record_integrity_check(
+        self,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        result: Optional[bool],
+        detail: Optional[str] = None,
+        writer: Optional[Any] = None,
+    ) -> None:
+        validate_not_empty(path, "path")
+        params = (
+            path,
+            size,
+            mtime_ns,
+            None if result is None else int(result),
+            detail,
+            time.time(),
+        )
+        if writer is not None:
+            writer.execute(INTEGRITY_UPSERT_SQL, params)
+            return
+        try:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(INTEGRITY_UPSERT_SQL, params)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to record integrity check: {exc}") from exc
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .common.exceptions import DatabaseError
+from .common.validation import validate_not_empty
+
+METADATA_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata_cache (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    metadata_json TEXT,
+    error TEXT,
+    updated REAL
+)
+"""
+METADATA_CACHE_UPSERT_SQL = """
+INSERT OR REPLACE INTO metadata_cache (path, size, mtime_ns, metadata_json, error, updated)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+METADATA_CACHE_DELETE_SQL = "DELETE FROM metadata_cache WHERE path = ?"
+
+
+@dataclass(slots=True)
+class CachedMetadata:
+    """Provider metadata remembered for one file signature.
+
+    ``error`` holds the exception name of a deterministic failure (negative
+    cache entry); ``metadata`` is empty in that case.
+    """
+
+    metadata: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class LibraryDbMetadataCacheMixin:
+    """Provider metadata cache keyed by path and ``(size, mtime_ns)``.
+
+    Lets incremental scans skip provider extraction (``chdman``, Dolphin
+    tooling, header parsing) for files whose signature has not changed.
+    """
+
+    SCHEMA_STATEMENTS = (METADATA_CACHE_SCHEMA,)
+
+    def get_cached_metadata(
+        self,
+        path: str,
+        size: int,
+        mtime_ns: int,
+    ) -> Optional[CachedMetadata]:
+        """Return the cached result for ``path`` when its signature still matches."""
+        validate_not_empty(path, "path")
+        try:
+            row = self._get_conn().execute(
+                "SELECT metadata_json, error FROM metadata_cache "
+                "WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to read metadata cache: {exc}") from exc
+        if not row:
+            return None
+        metadata_json, error = row
+        return CachedMetadata(json.loads(metadata_json) if metadata_json else {}, error)
+
+    def store_cached_metadata(
+        self,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        metadata: Optional[dict[str, Any]] = None,
+        error: Optional[str] = None,
+        writer: Optional[Any] = None,
+    ) -> None:
+        """Remember a provider result (or a deterministic ``error``) for ``path``."""
+        validate_not_empty(path, "path")
+        params = (
+            path,
+            size,
+            mtime_ns,
+            None if error else json.dumps(metadata or {}),
+            error,
+            time.time(),
+        )
+        self._execute_metadata_cache(METADATA_CACHE_UPSERT_SQL, params, writer)
+
+    def remove_cached_metadata(self, path: str, writer: Optional[Any] = None) -> None:
+        validate_not_empty(path, "path")
+        self._execute_metadata_cache(METADATA_CACHE_DELETE_SQL, (path,), writer)
+
+    def _execute_metadata_cache(self, sql: str, params: tuple, writer: Optional[Any]) -> None:
+        if writer is not None:
+            writer.execute(sql, params)
+            return
+        try:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(sql, params)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to update metadata cache: {exc}") from exc
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from .common.exceptions import DatabaseError
+from .common.validation import validate_not_empty
+
+QUALITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quality_results (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    status TEXT,
+    checker_version INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    issues_json TEXT,
+    checks_json TEXT,
+    updated REAL
+)
+"""
+QUALITY_UPSERT_SQL = """
+INSERT OR REPLACE INTO quality_results
+    (path, size, mtime_ns, status, checker_version, level, score, issues_json, checks_json, updated)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+QUALITY_COLUMNS = (
+    "q.path, q.size, q.mtime_ns, q.status, q.checker_version, q.level, q.score, "
+    "q.issues_json, q.checks_json, q.updated"
+)
+
+
+@dataclass(slots=True)
+class CachedQuality:
+    """Quality analysis remembered for one file signature.
+
+    The signature is ``(size, mtime_ns)`` plus the library ``status`` (DAT
+    verification changes the score) and the checker version that produced
+    it. ``issues`` holds plain dicts so the DB layer stays independent of
+    ``emumanager.quality``.
+    """
+
+    size: int
+    mtime_ns: int
+    status: Optional[str]
+    checker_version: int
+    level: str
+    score: int
+    issues: list[dict[str, Any]] = field(default_factory=list)
+    checks: list[str] = field(default_factory=list)
+    updated: Optional[float] = None
+
+    def is_current(self, size: int, mtime_ns: int, status: Optional[str], checker_version: int) -> bool:
+        return (self.size, self.mtime_ns, self.status, self.checker_version) == (
+            size,
+            mtime_ns,
+            status,
+            checker_version,
+        )
+
+
+class LibraryDbQualityMixin:
+    """Persisted ``QualityController`` results, served to the UIs without touching the files."""
+
+    SCHEMA_STATEMENTS = (QUALITY_SCHEMA,)
+
+    def get_quality_result(self, path: str) -> Optional[CachedQuality]:
+        validate_not_empty(path, "path")
+        try:
+            row = self._get_conn().execute(
+                f"SELECT {QUALITY_COLUMNS} FROM quality_results q WHERE q.path = ?",
+                (path,),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to read quality result: {exc}") from exc
+        return self._decode_quality_row(row)[1] if row else None
+
+    def get_quality_results(
+        self,
+        system: Optional[str] = None,
+        paths: Optional[Sequence[str]] = None,
+    ) -> dict[str, CachedQuality]:
+        """Stored results by path, optionally only for ``system`` entries or for ``paths``."""
+        sql = f"SELECT {QUALITY_COLUMNS} FROM quality_results q"
+        params: tuple = ()
+        if system is not None:
+            sql += " JOIN library l ON l.path = q.path WHERE l.system = ?"
+            params = (system,)
+        elif paths is not None:
+            if not paths:
+                return {}
+            sql += f" WHERE q.path IN ({', '.join('?' * len(paths))})"
+            params = tuple(paths)
+        try:
+            rows = self._get_conn().execute(sql, params).fetchall()
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to read quality results: {exc}") from exc
+        return dict(self._decode_quality_row(row) for row in rows)
+
+    def store_quality_result(
+        self,
+        path: str,
+        result: CachedQuality,
+        writer: Optional[Any] = None,
+    ) -> None:
+        validate_not_empty(path, "path")
+        params = (
+            path,
+            result.size,
+            result.mtime_ns,
+            result.status,
+            result.checker_version,
+            result.level,
+            result.score,
+            json.dumps(result.issues),
+            json.dumps(result.checks),
+            time.time(),
+        )
+        if writer is not None:
+            writer.execute(QUALITY_UPSERT_SQL, params)
+            return
+        try:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(QUALITY_UPSERT_SQL, params)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to store quality result: {exc}") from exc
+
+    @staticmethod
+    def _decode_quality_row(row: tuple) -> tuple[str, CachedQuality]:
+        path, size, mtime_ns, status, version, level, score, issues_json, checks_json, updated = row
+        return path, CachedQuality(
+            size=size,
+            mtime_ns=mtime_ns,
+            status=status,
+            checker_version=version,
+            level=level,
+            score=score,
+            issues=json.loads(issues_json) if issues_json else [],
+            checks=json.loads(checks_json) if checks_json else [],
+            updated=updated,
+        )
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from .common.exceptions import DatabaseError
+from .common.validation import validate_not_empty
+from .library_db_core import DEFAULT_WRITE_BATCH_SIZE, LibraryWriteBuffer, _entry_factory
+from .library_models import LibraryEntry
+
+logger = logging.getLogger(__name__)
+
+_STOP = None
+
+
+@dataclass(slots=True)
+class WriterAck:
+    """Acknowledgement summary returned when a writer service is drained."""
+
+    committed: int = 0
+    failed: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+class LibraryWriterService:
+    """Single writer that owns the session database on behalf of worker processes.
+
+    Worker processes send mutations through ``queue`` (see ``LibraryWriteProxy``).
+    A background thread drains the queue, coalesces whatever is available into
+    one ``LibraryWriteBuffer`` flush and counts committed and failed operations.
+    ``stop()`` waits for every queued mutation and returns a ``WriterAck``.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        mp_context: Optional[Any] = None,
+    ):
+        self.db = db
+        self.batch_size = max(1, int(batch_size))
+        self.mp_context = mp_context or multiprocessing.get_context()
+        self.queue = self.mp_context.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._applied = 0
+        self._ack = WriterAck()
+
+    @property
+    def acknowledged(self) -> int:
+        return self._ack.committed
+
+    def proxy(self) -> "LibraryWriteProxy":
+        return LibraryWriteProxy(self.queue, self.db.db_path)
+
+    def start(self) -> "LibraryWriterService":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name="library-writer",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> WriterAck:
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        return self._ack
+
+    def __enter__(self) -> "LibraryWriterService":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        writer = LibraryWriteBuffer(self.db, self.batch_size)
+        stopping = False
+        while not stopping:
+            message = self.queue.get()
+            pending = 0
+            while True:
+                if message is _STOP:
+                    stopping = True
+                    break
+                self._apply(writer, message)
+                pending += 1
+                if pending >= self.batch_size or self.queue.empty():
+                    break
+                message = self.queue.get()
+            self._flush(writer)
+
+    def _apply(self, writer: LibraryWriteBuffer, message: tuple) -> None:
+        self._applied += 1
+        try:
+            op, args, kwargs = message
+            if op not in {"upsert", "update_fields", "remove", "log_action"}:
+                raise ValueError(f"Unknown writer operation: {op}")
+            getattr(writer, op)(*args, **kwargs)
+        except Exception as exc:
+            self._record_error(exc)
+        self._ack.committed = writer.written
+
+    def _flush(self, writer: LibraryWriteBuffer) -> None:
+        try:
+            writer.flush()
+        except Exception as exc:
+            self._record_error(exc)
+        self._ack.committed = writer.written
+        self._ack.failed = self._applied - writer.written - len(writer)
+
+    def _record_error(self, exc: Exception) -> None:
+        logger.error("Library writer operation failed: %s", exc)
+        if len(self._ack.errors) < 100:
+            self._ack.errors.append(str(exc))
+
+
+class LibraryWriteProxy:
+    """Picklable LibraryDB stand-in for worker processes.
+
+    Mutations are forwarded to the parent's ``LibraryWriterService`` queue and
+    reads go through a lazily opened read-only connection, so child processes
+    never create the schema or contend for the SQLite write lock.
+    """
+
+    def __init__(self, queue: Any, db_path: Path | str):
+        self.queue = queue
+        self.db_path = Path(db_path).resolve()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"queue": self.queue, "db_path": self.db_path, "_conn": None}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+    def _send(self, op: str, *args, **kwargs) -> None:
+        self.queue.put((op, args, kwargs))
+
+    def update_entry(self, entry: LibraryEntry) -> None:
+        self._send("upsert", entry)
+
+    def update_entry_fields(self, path: str, **fields) -> None:
+        validate_not_empty(path, "path")
+        if fields:
+            self._send("update_fields", path, **fields)
+
+    def remove_entry(self, path: str) -> None:
+        validate_not_empty(path, "path")
+        self._send("remove", path)
+
+    def log_action(self, path: str, action: str, detail: Optional[str] = None) -> None:
+        validate_not_empty(path, "path")
+        validate_not_empty(action, "action")
+        self._send("log_action", path, action, detail)
+
+    def _read_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                f"{self.db_path.as_uri()}?mode=ro",
+                uri=True,
+                timeout=30,
+            )
+        return self._conn
+
+    def get_entry(self, path: str) -> Optional[LibraryEntry]:
+        validate_not_empty(path, "path")
+        try:
+            cursor = self._read_conn().execute("SELECT * FROM library WHERE path = ?", (path,))
+            row = cursor.fetchone()
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Failed to get entry {path}: {exc}") from exc
+        if not row:
+            return None
+        fields = tuple(
+            "extra_metadata" if column[0] == "extra_json" else column[0]
+            for column in cursor.description
+        )
+        return _entry_factory(fields)(row)
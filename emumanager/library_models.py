@@ -22,6 +22,25 @@ class LibraryEntry:
     extra_metadata: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass(frozen=True, slots=True)
+class FileIdentity:
+    """Filesystem identity of a file's content, stable across renames on one device."""
+
+    dev: int
+    ino: int
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def from_stat(cls, stat: Any) -> "FileIdentity":
+        return cls(
+            dev=int(stat.st_dev),
+            ino=int(stat.st_ino),
+            size=int(stat.st_size),
+            mtime_ns=int(stat.st_mtime_ns),
+        )
+
+
 @dataclass
 class DuplicateGroup:
     key: str
@@ -40,6 +59,16 @@ class DuplicateGroup:
         return sum(sizes[1:])
 
 
+@dataclass(frozen=True, slots=True)
+class DuplicateSummary:
+    """Aggregate of one duplicate group without its entries (dashboard view)."""
+
+    key: str
+    kind: str
+    count: int
+    wasted_bytes: int
+
+
 def normalize_game_name(name: str) -> str:
     """Remove tags and normalize a name for fuzzy duplicate comparison."""
     normalized = Path(name).stem
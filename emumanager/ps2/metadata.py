@@ -5,7 +5,10 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+from ..common.chd import open_chd_image
+from ..common.exceptions import EmuManagerError
 from ..common.execution import find_tool
+from ..common.iso9660 import read_image_file
 
 # Regex for PS2 Serial: 4 letters, underscore/dash, 3 digits, dot, 2 digits
 # e.g. SLUS_200.02, SLES-50003
@@ -84,12 +87,19 @@ def _extract_chd_full(file_path: Path, size: int, chdman: Path, logger: logging.
 
 
 def _read_header_chd(file_path: Path, size: int) -> bytes:
+    logger = logging.getLogger(__name__)
+
+    # Strategy 0: Native CHD reader (only the hunks covering the first bytes)
+    try:
+        with open_chd_image(file_path) as fh:
+            return fh.read(size)
+    except EmuManagerError as e:
+        logger.debug(f"Native CHD read failed, falling back to chdman: {e}")
+
     chdman = find_tool("chdman")
     if not chdman:
         return b""
     
-    logger = logging.getLogger(__name__)
-    
     # Strategy 1: Fast partial extraction
     data = _extract_chd_partial(file_path, size, chdman, logger)
     if data:
@@ -99,15 +109,28 @@ def _read_header_chd(file_path: Path, size: int) -> bytes:
     return _extract_chd_full(file_path, size, chdman, logger)
 
 
+def _format_serial(match: re.Match) -> str:
+    prefix = match.group(1).decode("ascii")
+    part1 = match.group(2).decode("ascii")
+    part2 = match.group(3).decode("ascii")
+    return f"{prefix}-{part1}{part2}"
+
+
 def get_ps2_serial(file_path: Path) -> Optional[str]:
     """
     Attempts to find the PS2 Game Serial (e.g. SLUS-20002) in the file.
-    Reads the first 4MB of the file to find the pattern.
-    Supports .iso, .bin, .gz, and .chd.
+    ISO9660 images (.iso/.bin/.gz/.chd) are resolved through SYSTEM.CNF,
+    reading only a few sectors; otherwise the first 4MB are scanned for the
+    pattern. Supports .iso, .bin, .gz, and .chd.
     """
     data = b""
     try:
         suffix = file_path.suffix.lower()
+        system_cnf = read_image_file(file_path, "SYSTEM.CNF")
+        match = BOOT2_RE.search(system_cnf) if system_cnf else None
+        if match:
+            return _format_serial(match)
+
         if suffix == ".gz":
             with gzip.open(file_path, "rb") as f:
                 data = f.read(4 * 1024 * 1024)
@@ -123,19 +146,12 @@ def get_ps2_serial(file_path: Path) -> Optional[str]:
         # Try finding BOOT2 first (more accurate)
         match = BOOT2_RE.search(data)
         if match:
-            prefix = match.group(1).decode("ascii")
-            part1 = match.group(2).decode("ascii")
-            part2 = match.group(3).decode("ascii")
-            return f"{prefix}-{part1}{part2}"
+            return _format_serial(match)
 
-        # Fallback to raw serial search
+        # Fallback to raw serial search (normalized to XXXX-YYYYY format)
         match = SERIAL_RE.search(data)
         if match:
-            # Normalize to XXXX-YYYYY format
-            prefix = match.group(1).decode("ascii")
-            part1 = match.group(2).decode("ascii")
-            part2 = match.group(3).decode("ascii")
-            return f"{prefix}-{part1}{part2}"
+            return _format_serial(match)
     except Exception:
         pass
     return None
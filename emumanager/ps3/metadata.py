@@ -1,38 +1,48 @@
 import re
 from pathlib import Path
 
+from emumanager.common.iso9660 import read_image_file
 from emumanager.common.sfo import SfoParser
 
 # Regex for PS3 Serial: 4 letters + optional separator + 5 digits
 SERIAL_RE = re.compile(r"([A-Z]{4})[_-]?(\d{5})")
 
 
-def _parse_sfo_file(sfo_path: Path) -> dict:
+def _parse_sfo(data: bytes) -> dict:
     meta = {}
+    parser = SfoParser(data)
+    if parser.get("TITLE_ID"):
+        meta["serial"] = parser.get("TITLE_ID")
+    if parser.get("TITLE"):
+        meta["title"] = parser.get("TITLE")
+    if parser.get("VERSION"):
+        meta["version"] = parser.get("VERSION")
+    return meta
+
+
+def _parse_sfo_file(sfo_path: Path) -> dict:
     try:
         with open(sfo_path, "rb") as f:
-            data = f.read()
-            parser = SfoParser(data)
-            if parser.get("TITLE_ID"):
-                meta["serial"] = parser.get("TITLE_ID")
-            if parser.get("TITLE"):
-                meta["title"] = parser.get("TITLE")
-            if parser.get("VERSION"):
-                meta["version"] = parser.get("VERSION")
+            return _parse_sfo(f.read())
     except Exception:
-        pass
-    return meta
+        return {}
 
 
 def _scan_for_sfo(file_path: Path, max_size: int = 10 * 1024 * 1024) -> dict:
     """
-    Scans a binary file (ISO/PKG) for the PARAM.SFO header and extracts metadata.
-    Scans up to max_size bytes (default 10MB).
+    Extracts metadata from the PARAM.SFO of a binary file (ISO/PKG).
+    ISO9660 images resolve PS3_GAME/PARAM.SFO through the directory records;
+    other files are scanned for the SFO header up to max_size bytes
+    (default 10MB).
     """
-    meta = {}
     magic = b"\x00PSF\x01\x01\x00\x00"
 
     try:
+        if file_path.suffix.lower() in (".iso", ".bin"):
+            sfo_data = read_image_file(file_path, "PS3_GAME/PARAM.SFO")
+            if sfo_data and sfo_data.startswith(magic[:4]):
+                return _parse_sfo(sfo_data)
+
         with open(file_path, "rb") as f:
             # Read the beginning of the file
             data = f.read(max_size)
@@ -40,19 +50,11 @@ def _scan_for_sfo(file_path: Path, max_size: int = 10 * 1024 * 1024) -> dict:
 
             if idx != -1:
                 # SFO found. Take 4KB slice which is usually enough for SFO
-                sfo_data = data[idx : idx + 4096]
-                parser = SfoParser(sfo_data)
-
-                if parser.get("TITLE_ID"):
-                    meta["serial"] = parser.get("TITLE_ID")
-                if parser.get("TITLE"):
-                    meta["title"] = parser.get("TITLE")
-                if parser.get("VERSION"):
-                    meta["version"] = parser.get("VERSION")
+                return _parse_sfo(data[idx : idx + 4096])
     except Exception:
         pass
 
-    return meta
+    return {}
 
 
 def get_metadata(path: Path) -> dict:
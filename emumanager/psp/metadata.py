@@ -1,6 +1,7 @@
 import re
 from pathlib import Path
 
+from emumanager.common.iso9660 import read_image_file
 from emumanager.common.sfo import SfoParser
 
 # Regex for PSP Serial: 4 letters + 5 digits (e.g. ULUS10041)
@@ -8,15 +9,37 @@ from emumanager.common.sfo import SfoParser
 SERIAL_RE = re.compile(r"([A-Z]{4})[_-]?(\d{5})")
 
 
+def _parse_sfo(sfo_data: bytes) -> dict:
+    meta = {}
+    parser = SfoParser(sfo_data)
+
+    if parser.get("DISC_ID"):
+        meta["serial"] = parser.get("DISC_ID")
+    elif parser.get("TITLE_ID"):
+        meta["serial"] = parser.get("TITLE_ID")
+
+    if parser.get("TITLE"):
+        meta["title"] = parser.get("TITLE")
+    if parser.get("VERSION"):
+        meta["version"] = parser.get("VERSION")
+    return meta
+
+
 def _scan_for_sfo(file_path: Path, max_size: int = 5 * 1024 * 1024) -> dict:
     """
-    Scans a binary file (ISO/CSO) for the PARAM.SFO header and extracts metadata.
-    Scans up to max_size bytes (default 5MB).
+    Extracts metadata from the PARAM.SFO of a binary file (ISO/CSO).
+    Plain ISOs resolve PSP_GAME/PARAM.SFO through the ISO9660 directory
+    records; other files are scanned for the SFO header up to max_size bytes
+    (default 5MB).
     """
-    meta = {}
     magic = b"\x00PSF\x01\x01\x00\x00"
 
     try:
+        if file_path.suffix.lower() == ".iso":
+            sfo_data = read_image_file(file_path, "PSP_GAME/PARAM.SFO")
+            if sfo_data and sfo_data.startswith(magic[:4]):
+                return _parse_sfo(sfo_data)
+
         with open(file_path, "rb") as f:
             # Read the beginning of the file
             data = f.read(max_size)
@@ -24,22 +47,11 @@ def _scan_for_sfo(file_path: Path, max_size: int = 5 * 1024 * 1024) -> dict:
 
             if idx != -1:
                 # SFO found. Take 4KB slice which is usually enough for SFO
-                sfo_data = data[idx : idx + 4096]
-                parser = SfoParser(sfo_data)
-
-                if parser.get("DISC_ID"):
-                    meta["serial"] = parser.get("DISC_ID")
-                elif parser.get("TITLE_ID"):
-                    meta["serial"] = parser.get("TITLE_ID")
-
-                if parser.get("TITLE"):
-                    meta["title"] = parser.get("TITLE")
-                if parser.get("VERSION"):
-                    meta["version"] = parser.get("VERSION")
+                return _parse_sfo(data[idx : idx + 4096])
     except Exception:
         pass
 
-    return meta
+    return {}
 
 
 def get_metadata(path: Path) -> dict:
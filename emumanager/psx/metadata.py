@@ -6,7 +6,10 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+from ..common.chd import open_chd_image
+from ..common.exceptions import EmuManagerError
 from ..common.execution import find_tool
+from ..common.iso9660 import read_image_file
 
 # PS1 boot line typically in SYSTEM.CNF as: BOOT = cdrom:\SLUS_005.94;1
 PSX_BOOT_RE = re.compile(
@@ -17,6 +20,11 @@ SERIAL_RE = re.compile(rb"([A-Z]{4})[_-](\d{3})\.?((?:\d{2})?)")
 
 
 def _read_header_chd(file_path: Path, size: int) -> bytes:
+    try:
+        with open_chd_image(file_path) as fh:
+            return fh.read(size)
+    except EmuManagerError:
+        pass
     chdman = find_tool("chdman")
     if not chdman:
         return b""
@@ -39,13 +47,19 @@ def _read_header_chd(file_path: Path, size: int) -> bytes:
 def get_psx_serial(file_path: Path) -> Optional[str]:
     """Attempt to extract PS1 serial (e.g., SLUS-00594) from image.
 
-    Supports .bin/.iso/.gz/.chd. Reads up to 8MB from start to locate SYSTEM.CNF
-    or raw serial tokens. Returns normalized form XXXX-YYYYY.
+    Supports .bin/.iso/.gz/.chd. ISO9660 images (2048-byte or raw 2352-byte
+    sectors, also inside CHD) are resolved through SYSTEM.CNF; otherwise reads
+    up to 8MB from start to locate the boot line or raw serial tokens. Returns
+    normalized form XXXX-YYYYY.
     """
     data = b""
     try:
         suffix = file_path.suffix.lower()
-        if suffix == ".gz":
+        system_cnf = read_image_file(file_path, "SYSTEM.CNF")
+        m = PSX_BOOT_RE.search(system_cnf) if system_cnf else None
+        if m:
+            data = system_cnf
+        elif suffix == ".gz":
             with gzip.open(file_path, "rb") as f:
                 data = f.read(8 * 1024 * 1024)
         elif suffix == ".chd":
@@ -56,9 +70,8 @@ def get_psx_serial(file_path: Path) -> Optional[str]:
         if not data:
             return None
 
-        m = PSX_BOOT_RE.search(data)
         if not m:
-            m = SERIAL_RE.search(data)
+            m = PSX_BOOT_RE.search(data) or SERIAL_RE.search(data)
         if m:
             prefix = m.group(1).decode("ascii")
             part1 = m.group(2).decode("ascii")
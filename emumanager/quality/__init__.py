@@ -7,6 +7,7 @@ from .controller import (
     QualityLevel,
     IssueType,
 )
+from .engine import QualityEngine, QualityStats
 from .checkers import (
     BaseHealthChecker,
     PS2HealthChecker,
@@ -23,6 +24,8 @@ __all__ = [
     'QualityIssue',
     'QualityLevel',
     'IssueType',
+    'QualityEngine',
+    'QualityStats',
     'BaseHealthChecker',
     'PS2HealthChecker',
     'PSXHealthChecker',
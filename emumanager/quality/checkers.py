@@ -6,6 +6,10 @@ import struct
 from pathlib import Path
 from typing import Optional
 
+from emumanager.common.chd import open_chd_image
+from emumanager.common.exceptions import DependencyError
+from emumanager.common.iso9660 import Iso9660Image
+
 from .controller import QualityIssue, RomQuality, IssueType
 
 
@@ -23,14 +27,14 @@ class PS2HealthChecker(BaseHealthChecker):
     def check(self, path: Path, quality: RomQuality) -> None:
         quality.checks_performed.append("PS2 ISO structure")
         
-        # PS2 ISOs são baseados em ISO9660
+        # PS2 ISOs são baseados em ISO9660 (CHD lido nativamente, sem chdman)
+        is_chd = path.suffix.lower() == '.chd'
         try:
-            with open(path, 'rb') as f:
-                # Verificar Volume Descriptor ISO9660
-                f.seek(0x8000)  # Setor 16
-                descriptor = f.read(6)
+            with (open_chd_image(path) if is_chd else open(path, 'rb')) as f:
+                # Verificar Volume Descriptor ISO9660 (setor 16, ISO ou BIN raw)
+                image = Iso9660Image.open(f)
                 
-                if descriptor[1:6] != b'CD001':
+                if image is None:
                     quality.issues.append(QualityIssue(
                         issue_type=IssueType.INVALID_HEADER,
                         severity='critical',
@@ -41,22 +45,20 @@ class PS2HealthChecker(BaseHealthChecker):
                     quality.score -= 50
                     return
                 
-                # Verificar SYSTEM.CNF (marca de PS2)
-                # Simplificado - em implementação completa, ler filesystem
-                f.seek(0)
-                sample = f.read(1024 * 1024)  # Primeiro MB
+                # Verificar SYSTEM.CNF (marca de PS2) pelo registo de diretoria
+                system_cnf = image.read_file("SYSTEM.CNF")
                 
-                if b'SYSTEM.CNF' not in sample and b'BOOT2' not in sample:
+                if not system_cnf or b'BOOT2' not in system_cnf.upper():
                     quality.issues.append(QualityIssue(
                         issue_type=IssueType.SUSPICIOUS_SIZE,
                         severity='medium',
-                        description="Markers de PS2 não encontrados no início da ISO",
+                        description="SYSTEM.CNF de PS2 (BOOT2) não encontrado na raiz da ISO",
                         recommendation="Verificar se é realmente uma ISO de PS2"
                     ))
                     quality.score -= 20
                 
-                # Verificar tamanho (PS2 ISOs são geralmente 700MB-8.5GB)
-                size = path.stat().st_size
+                # Verificar tamanho (PS2 ISOs: 700MB-8.5GB); no CHD conta o tamanho lógico
+                size = f.size if is_chd else path.stat().st_size
                 if size < 100 * 1024 * 1024:  # < 100MB
                     quality.issues.append(QualityIssue(
                         issue_type=IssueType.SUSPICIOUS_SIZE,
@@ -72,6 +74,9 @@ class PS2HealthChecker(BaseHealthChecker):
                     ))
                     quality.score -= 10
                 
+        except DependencyError:
+            # Codec/versão CHD sem leitor nativo: estrutura não verificável aqui
+            return
         except Exception as e:
             quality.issues.append(QualityIssue(
                 issue_type=IssueType.HEADER_CORRUPTION,
@@ -266,6 +271,9 @@ class GBAHealthChecker(BaseHealthChecker):
                     ))
                     quality.score -= 10
                 
+        except DependencyError:
+            # Codec/versão CHD sem leitor nativo: estrutura não verificável aqui
+            return
         except Exception as e:
             quality.issues.append(QualityIssue(
                 issue_type=IssueType.HEADER_CORRUPTION,
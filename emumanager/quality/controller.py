@@ -3,15 +3,20 @@
 from __future__ import annotations
 
 import logging
+import os
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
-from emumanager.library import LibraryDB, LibraryEntry
+from emumanager.common.exceptions import DatabaseError
+from emumanager.library import CachedQuality, LibraryDB, LibraryEntry
 
 logger = logging.getLogger(__name__)
 
+# Incrementar sempre que as regras ou os checkers mudarem: invalida os resultados persistidos
+QUALITY_CHECKER_VERSION = 3
+
 
 class QualityLevel(Enum):
     """Níveis de qualidade de ROM."""
@@ -122,6 +127,50 @@ class RomQuality:
         else:
             return "ROM não verificada"
 
+    def to_cached(self, size: int, mtime_ns: int, status: Optional[str]) -> CachedQuality:
+        """Forma persistível deste resultado para a assinatura dada."""
+        return CachedQuality(
+            size=size,
+            mtime_ns=mtime_ns,
+            status=status,
+            checker_version=QUALITY_CHECKER_VERSION,
+            level=self.quality_level.value,
+            score=self.score,
+            issues=[
+                {
+                    "type": issue.issue_type.value,
+                    "severity": issue.severity,
+                    "description": issue.description,
+                    "location": issue.location,
+                    "recommendation": issue.recommendation,
+                }
+                for issue in self.issues
+            ],
+            checks=list(self.checks_performed),
+        )
+
+    @classmethod
+    def from_cached(cls, entry: LibraryEntry, cached: CachedQuality) -> "RomQuality":
+        """Reconstrói o resultado persistido para ``entry``."""
+        return cls(
+            path=entry.path,
+            quality_level=QualityLevel(cached.level),
+            score=cached.score,
+            issues=[
+                QualityIssue(
+                    issue_type=IssueType(issue["type"]),
+                    severity=issue["severity"],
+                    description=issue["description"],
+                    location=issue.get("location"),
+                    recommendation=issue.get("recommendation"),
+                )
+                for issue in cached.issues
+            ],
+            checks_performed=list(cached.checks),
+            dat_verified=(entry.status == "VERIFIED"),
+            system=entry.system,
+        )
+
 
 class QualityController:
     """Controlador principal de qualidade de ROMs."""
@@ -168,6 +217,82 @@ class QualityController:
         
         return quality
     
+    def get_cached_quality(
+        self,
+        entry: LibraryEntry,
+        cached: Optional[CachedQuality] = None,
+    ) -> Optional[RomQuality]:
+        """Resultado persistido se o ficheiro, o estado DAT e os checkers não mudaram.
+
+        Só faz ``stat`` ao ficheiro; ``cached`` evita a consulta quando o
+        chamador já carregou os resultados em lote (``get_cached_qualities``).
+        """
+        if cached is None:
+            try:
+                cached = self.db.get_quality_result(entry.path)
+            except DatabaseError as e:
+                logger.debug(f"Quality cache unavailable for {entry.path}: {e}")
+                return None
+            if cached is None:
+                return None
+        try:
+            st = os.stat(entry.path)
+        except OSError:
+            return None
+        if not cached.is_current(st.st_size, st.st_mtime_ns, entry.status, QUALITY_CHECKER_VERSION):
+            return None
+        try:
+            return RomQuality.from_cached(entry, cached)
+        except (KeyError, ValueError):
+            # Resultado gravado por uma versão com outros tipos de issue
+            return None
+
+    def get_cached_qualities(
+        self,
+        entries: Iterable[LibraryEntry],
+        system: Optional[str] = None,
+    ) -> dict[str, RomQuality]:
+        """Resultados persistidos ainda válidos, por path, com uma só consulta."""
+        entries = list(entries)
+        try:
+            if system is not None:
+                stored = self.db.get_quality_results(system)
+            else:
+                stored = self.db.get_quality_results(paths=[entry.path for entry in entries])
+        except DatabaseError as e:
+            logger.debug(f"Quality cache unavailable: {e}")
+            return {}
+        results = {}
+        for entry in entries:
+            cached = stored.get(entry.path)
+            if cached is None:
+                continue
+            quality = self.get_cached_quality(entry, cached)
+            if quality is not None:
+                results[entry.path] = quality
+        return results
+
+    def analyze_and_store(self, entry: LibraryEntry) -> RomQuality:
+        """Analisa a ROM e persiste o resultado com a assinatura lida antes da análise."""
+        try:
+            st = os.stat(entry.path)
+        except OSError:
+            st = None
+        quality = self.analyze_rom(entry)
+        if st is not None:
+            try:
+                self.db.store_quality_result(
+                    entry.path, quality.to_cached(st.st_size, st.st_mtime_ns, entry.status)
+                )
+            except DatabaseError as e:
+                logger.warning(f"Could not store quality result for {entry.path}: {e}")
+        return quality
+
+    def get_quality(self, entry: LibraryEntry) -> RomQuality:
+        """Resultado persistido quando válido; caso contrário analisa e persiste."""
+        cached = self.get_cached_quality(entry)
+        return cached if cached is not None else self.analyze_and_store(entry)
+
     def _check_file_basics(self, path: Path, quality: RomQuality) -> None:
         """Verificações básicas de arquivo."""
         quality.checks_performed.append("file_basics")
@@ -249,54 +374,27 @@ class QualityController:
         else:
             quality.quality_level = QualityLevel.UNKNOWN
     
-    def analyze_library(self, system: Optional[str] = None) -> dict[str, RomQuality]:
-        """Analisa todas as ROMs da biblioteca."""
-        results = {}
-        
-        if system:
-            entries = self.db.get_entries_by_system(system)
-        else:
-            entries = self.db.get_all_entries()
-        
-        for entry in entries:
-            quality = self.analyze_rom(entry)
-            results[entry.path] = quality
-        
-        return results
-    
-    def get_quality_statistics(self, system: Optional[str] = None) -> dict:
-        """Estatísticas de qualidade da coleção."""
-        results = self.analyze_library(system)
-        
-        stats = {
-            'total': len(results),
-            'by_level': {},
-            'playable': 0,
-            'damaged': 0,
-            'average_score': 0,
-            'issues_by_type': {},
-        }
-        
-        for quality in results.values():
-            # Por nível
-            level = quality.quality_level.value
-            stats['by_level'][level] = stats['by_level'].get(level, 0) + 1
-            
-            # Jogáveis vs danificadas
-            if quality.is_playable:
-                stats['playable'] += 1
-            if quality.quality_level in [QualityLevel.DAMAGED, QualityLevel.CORRUPT]:
-                stats['damaged'] += 1
-            
-            # Score médio
-            stats['average_score'] += quality.score
-            
-            # Issues por tipo
-            for issue in quality.issues:
-                issue_type = issue.issue_type.value
-                stats['issues_by_type'][issue_type] = stats['issues_by_type'].get(issue_type, 0) + 1
-        
-        if stats['total'] > 0:
-            stats['average_score'] /= stats['total']
-        
-        return stats
+    def analyze_library(
+        self,
+        system: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> dict[str, RomQuality]:
+        """Analisa todas as ROMs da biblioteca (em paralelo, sem limite de linhas).
+
+        Devolve todos os resultados em memória; para a coleção inteira prefira
+        ``QualityEngine.iter_results`` ou ``get_quality_statistics``.
+        """
+        from .engine import QualityEngine
+
+        engine = QualityEngine(self.db, max_workers=max_workers)
+        return {quality.path: quality for quality in engine.iter_results(system)}
+
+    def get_quality_statistics(
+        self,
+        system: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> dict:
+        """Estatísticas de qualidade da coleção, agregadas à medida que os resultados chegam."""
+        from .engine import QualityEngine
+
+        return QualityEngine(self.db, max_workers=max_workers).run(system).as_dict()
@@ -0,0 +1,215 @@
+"""Quality Engine - Parallel library-wide quality analysis.
+
+``QualityEngine`` streams the whole library (no row cap), reuses results
+still valid in ``quality_results`` and shards the remaining entries across
+a process pool. Results come back shard by shard, are persisted through one
+batch writer and folded into ``QualityStats`` as they arrive, so a full
+sweep never holds every ``RomQuality`` in memory.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from emumanager.library import LibraryDB, LibraryEntry
+
+from .controller import QualityController, QualityLevel, RomQuality
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_SIZE = 64
+QUALITY_ENTRY_FIELDS = ("system", "status")
+
+# Controller por processo do pool (os checkers ficam em cache entre shards)
+_WORKER_CONTROLLER: Optional[QualityController] = None
+
+
+@dataclass
+class QualityStats:
+    """Agregado incremental de uma análise (mesmas chaves de ``get_quality_statistics``)."""
+
+    total: int = 0
+    by_level: dict[str, int] = field(default_factory=dict)
+    playable: int = 0
+    damaged: int = 0
+    score_sum: int = 0
+    issues_by_type: dict[str, int] = field(default_factory=dict)
+    analyzed: int = 0
+    cached: int = 0
+    cancelled: bool = False
+
+    @property
+    def average_score(self) -> float:
+        return self.score_sum / self.total if self.total else 0
+
+    def add(self, quality: RomQuality) -> None:
+        self.total += 1
+        level = quality.quality_level.value
+        self.by_level[level] = self.by_level.get(level, 0) + 1
+        if quality.is_playable:
+            self.playable += 1
+        if quality.quality_level in (QualityLevel.DAMAGED, QualityLevel.CORRUPT):
+            self.damaged += 1
+        self.score_sum += quality.score
+        for issue in quality.issues:
+            issue_type = issue.issue_type.value
+            self.issues_by_type[issue_type] = self.issues_by_type.get(issue_type, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {
+            'total': self.total,
+            'by_level': dict(self.by_level),
+            'playable': self.playable,
+            'damaged': self.damaged,
+            'average_score': self.average_score,
+            'issues_by_type': dict(self.issues_by_type),
+        }
+
+
+def _analyze_shard(
+    shard: list[tuple[str, str, Optional[str]]],
+) -> list[tuple[Optional[tuple[int, int]], RomQuality]]:
+    """Corre no processo do pool: assinatura (lida antes) e resultado de cada entrada."""
+    global _WORKER_CONTROLLER
+    if _WORKER_CONTROLLER is None:
+        # analyze_rom não usa a base de dados
+        _WORKER_CONTROLLER = QualityController(None)
+    results = []
+    for path, system, status in shard:
+        try:
+            st = os.stat(path)
+            signature: Optional[tuple[int, int]] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            signature = None
+        entry = LibraryEntry(path=path, system=system, size=0, mtime=0.0, status=status)
+        results.append((signature, _WORKER_CONTROLLER.analyze_rom(entry)))
+    return results
+
+
+class QualityEngine:
+    """Analisa a biblioteca inteira num pool de processos, em shards, com resultados em stream."""
+
+    def __init__(
+        self,
+        db: LibraryDB,
+        max_workers: Optional[int] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        mp_context: Optional[Any] = None,
+        use_cache: bool = True,
+    ):
+        self.db = db
+        self.max_workers = max(1, max_workers or (os.cpu_count() or 2))
+        self.shard_size = max(1, int(shard_size))
+        self.mp_context = mp_context or multiprocessing.get_context()
+        self.use_cache = use_cache
+        self.stats = QualityStats()
+        self._controller = QualityController(db)
+
+    def run(
+        self,
+        system: Optional[str] = None,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+        cancel_event: Optional[Any] = None,
+        on_result: Optional[Callable[[RomQuality], None]] = None,
+    ) -> QualityStats:
+        """Analisa tudo (ou só ``system``) e devolve as estatísticas agregadas."""
+        for quality in self.iter_results(system, progress_cb, cancel_event):
+            if on_result:
+                on_result(quality)
+        return self.stats
+
+    def iter_results(
+        self,
+        system: Optional[str] = None,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+        cancel_event: Optional[Any] = None,
+    ) -> Iterator[RomQuality]:
+        """Stream de ``RomQuality``; os novos resultados são persistidos à medida que chegam."""
+        self.stats = QualityStats()
+        total = self.db.get_system_count(system) if system else self.db.get_entry_count()
+
+        def _cancelled() -> bool:
+            return bool(cancel_event is not None and cancel_event.is_set())
+
+        with self.db.batch_writer() as writer:
+            for quality in self._execute(system, writer, _cancelled):
+                self.stats.add(quality)
+                if progress_cb and total:
+                    progress_cb(
+                        min(1.0, self.stats.total / total),
+                        f"Qualidade: {self.stats.total}/{total} ({Path(quality.path).name})",
+                    )
+                yield quality
+        self.stats.cancelled = _cancelled()
+        logger.info(
+            "Análise de qualidade: %s ROMs (%s analisadas, %s em cache)%s",
+            self.stats.total,
+            self.stats.analyzed,
+            self.stats.cached,
+            " - cancelada" if self.stats.cancelled else "",
+        )
+
+    def _shards(self, system: Optional[str]) -> Iterator[list[LibraryEntry]]:
+        shard: list[LibraryEntry] = []
+        where = {"system": system} if system else None
+        for entry in self.db.iter_entries(columns=QUALITY_ENTRY_FIELDS, where=where):
+            shard.append(entry)
+            if len(shard) >= self.shard_size:
+                yield shard
+                shard = []
+        if shard:
+            yield shard
+
+    def _execute(
+        self,
+        system: Optional[str],
+        writer: Any,
+        cancelled: Callable[[], bool],
+    ) -> Iterator[RomQuality]:
+        shards = self._shards(system)
+        in_flight: dict[Future, list[LibraryEntry]] = {}
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self.mp_context)
+        try:
+            while True:
+                # Janela limitada: nunca mais do que 2x workers shards submetidos
+                while len(in_flight) < self.max_workers * 2 and not cancelled():
+                    shard = next(shards, None)
+                    if shard is None:
+                        break
+                    cached = self._controller.get_cached_qualities(shard) if self.use_cache else {}
+                    self.stats.cached += len(cached)
+                    yield from cached.values()
+                    pending = [entry for entry in shard if entry.path not in cached]
+                    if pending:
+                        future = pool.submit(
+                            _analyze_shard,
+                            [(entry.path, entry.system, entry.status) for entry in pending],
+                        )
+                        in_flight[future] = pending
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entries = in_flight.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as exc:
+                        logger.error("Shard de qualidade falhou (%s ROMs): %s", len(entries), exc)
+                        continue
+                    for entry, (signature, quality) in zip(entries, results):
+                        self.stats.analyzed += 1
+                        if signature is not None:
+                            self.db.store_quality_result(
+                                entry.path, quality.to_cached(*signature, entry.status), writer=writer
+                            )
+                        yield quality
+                if cancelled():
+                    return
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
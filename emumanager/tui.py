@@ -15,6 +15,7 @@ from emumanager.application import (
     RomBrowserRow,
 )
 from textual.app import App
+from textual.widgets.data_table import RowKey
 
 from .manager import get_orchestrator
 from .core.config_manager import ConfigManager
@@ -50,6 +51,7 @@ class AsyncFeedbackTui(
         self._workflow_in_progress = False
         self._sys_id_map: dict[str, str] = {}
         self._rom_path_map: dict[str, str] = {}
+        self._rom_row_keys: dict[str, RowKey] = {}
         self._loaded_rom_rows: list[RomBrowserRow] = []
         self._selected_system: Optional[str] = None
         self._selected_rom_path: Optional[str] = None
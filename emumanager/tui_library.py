@@ -4,7 +4,9 @@ import asyncio
 import re
 
 from textual import on
+from textual.coordinate import Coordinate
 from textual.widgets import DataTable, Input, Label, ListItem, ListView, Switch
+from textual.widgets.data_table import RowDoesNotExist
 
 from emumanager.application import RomBrowserRow
 
@@ -82,13 +84,29 @@ class TuiLibraryMixin:
             self.library_insights.get_system_rom_rows,
             system,
             include_quality=True,
+            on_quality=self._on_quality_refreshed,
         )
         self._loaded_rom_rows = rows
         self._render_rom_rows(rows)
 
+    def _on_quality_refreshed(self, row: RomBrowserRow) -> None:
+        # Chamado pelos workers de qualidade: a tabela só pode ser tocada na thread da app
+        self.call_from_thread(self._update_quality_cell, row)
+
+    def _update_quality_cell(self, row: RomBrowserRow) -> None:
+        row_key = self._rom_row_keys.get(row.path)
+        if row_key is None:
+            return
+        try:
+            coordinate = Coordinate(self.roms_table.get_row_index(row_key), 0)
+        except RowDoesNotExist:
+            return
+        self.roms_table.update_cell_at(coordinate, row.quality_markup)
+
     def _render_rom_rows(self, rows: list[RomBrowserRow]) -> None:
         self.roms_table.clear()
         self._rom_path_map.clear()
+        self._rom_row_keys.clear()
         for row in rows:
             ra_icon = "🏆" if row.ra_compatible else ""
             row_key = self.roms_table.add_row(
@@ -98,6 +116,7 @@ class TuiLibraryMixin:
                 ra_icon,
             )
             self._rom_path_map[str(row_key)] = row.path
+            self._rom_row_keys[row.path] = row_key
 
     @on(DataTable.RowSelected)
     def on_row_selected(self, event: DataTable.RowSelected) -> None:
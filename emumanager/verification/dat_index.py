@@ -0,0 +1,318 @@
+"""Compiled DAT indexes persisted next to the source DATs.
+
+Parsing a large Redump/No-Intro DAT is far more expensive than opening a
+pre-built SQLite index, so each DAT is compiled once into
+``<dat dir>/.index/<key>.sqlite`` and reused until the source file's size or
+mtime changes. Indexes are opened read-only with ``mmap_size`` so lookups hit
+the page cache instead of Python objects.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from emumanager.common.exceptions import DATParseError
+from emumanager.verification.dat_parser import DatDb, RomInfo, parse_dat_file
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIRNAME = ".index"
+INDEX_FORMAT_VERSION = "2"
+INDEX_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_PREFETCH_WORKERS = 4
+
+_INDEX_SCHEMA = (
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+    """
+    CREATE TABLE roms (
+        game_name TEXT,
+        rom_name TEXT,
+        size INTEGER,
+        crc TEXT,
+        md5 TEXT,
+        sha1 TEXT
+    )
+    """,
+)
+_INDEX_INDEXES = (
+    "CREATE INDEX roms_crc ON roms(crc)",
+    "CREATE INDEX roms_md5 ON roms(md5)",
+    "CREATE INDEX roms_sha1 ON roms(sha1)",
+    "CREATE INDEX roms_size ON roms(size)",
+)
+
+
+def _source_signature(dat_path: Path) -> dict[str, str]:
+    stat = dat_path.stat()
+    return {
+        "format": INDEX_FORMAT_VERSION,
+        "source": str(dat_path.resolve()),
+        "size": str(stat.st_size),
+        "mtime_ns": str(stat.st_mtime_ns),
+    }
+
+
+def index_path_for(dat_path: Path) -> Path:
+    """Location of the compiled index for ``dat_path`` (under its own ``dats/`` folder)."""
+    key = hashlib.sha1(str(dat_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return dat_path.parent / INDEX_DIRNAME / f"{dat_path.stem[:48]}.{key}.sqlite"
+
+
+def _read_meta(index_path: Path) -> dict[str, str]:
+    try:
+        conn = sqlite3.connect(f"{index_path.as_uri()}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+
+def build_dat_index(dat_path: Path, index_path: Optional[Path] = None) -> Path:
+    """Parse ``dat_path`` and write its compiled index atomically.
+
+    Raises ``DATParseError`` when the DAT cannot be read completely or holds
+    neither a header nor any ROM (e.g. an HTML error page saved as ``.dat``);
+    the existing index (if any) is left untouched so a broken download is not
+    cached as an empty DAT.
+    """
+    index_path = index_path or index_path_for(dat_path)
+    signature = _source_signature(dat_path)
+    # Pasta só de leitura: falhar antes do parse (load_dat_index recorre à memória)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    if not os.access(index_path.parent, os.W_OK):
+        raise PermissionError(f"Index directory is not writable: {index_path.parent}")
+    db = parse_dat_file(dat_path, strict=True)
+    if not db.name and not len(db):
+        raise DATParseError(str(dat_path), "no DAT header or ROM entries found")
+
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        _write_index(tmp_path, signature, db)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    logger.info("Índice DAT compilado: %s", index_path.name)
+    return index_path
+
+
+def _write_index(tmp_path: Path, signature: dict[str, str], db: DatDb) -> None:
+    conn = sqlite3.connect(tmp_path)
+    try:
+        with conn:
+            for statement in _INDEX_SCHEMA:
+                conn.execute(statement)
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [*signature.items(), ("name", db.name), ("version", db.version)],
+            )
+            conn.executemany(
+                "INSERT INTO roms VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        rom.game_name,
+                        rom.rom_name,
+                        rom.size,
+                        rom.crc.lower() if rom.crc else None,
+                        rom.md5.lower() if rom.md5 else None,
+                        rom.sha1.lower() if rom.sha1 else None,
+                    )
+                    for rom in db.iter_roms()
+                ),
+            )
+            for statement in _INDEX_INDEXES:
+                conn.execute(statement)
+    finally:
+        conn.close()
+
+
+class CompiledDatIndex:
+    """Read-only, lazily opened ``DatDb`` stand-in backed by a compiled index.
+
+    Connections are per thread and per process, so the object can be shared
+    with scanner threads and forked verification workers.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self._local = threading.local()
+        meta = _read_meta(self.index_path)
+        self.name: str = meta.get("name", "")
+        self.version: str = meta.get("version", "")
+        self._hash_counts: Optional[dict[str, int]] = None
+
+    def __getstate__(self) -> dict:
+        return {"index_path": self.index_path, "name": self.name, "version": self.version}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._hash_counts = None
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(f"{self.index_path.as_uri()}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA mmap_size={INDEX_MMAP_SIZE}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _rows_to_roms(self, rows: Iterable[tuple]) -> List[RomInfo]:
+        return [
+            RomInfo(
+                game_name=game_name,
+                rom_name=rom_name,
+                size=size,
+                crc=crc,
+                md5=md5,
+                sha1=sha1,
+                dat_name=self.name,
+            )
+            for game_name, rom_name, size, crc, md5, sha1 in rows
+        ]
+
+    def lookup(self, crc: str = None, md5: str = None, sha1: str = None) -> List[RomInfo]:
+        if sha1:
+            column, value = "sha1", sha1
+        elif md5:
+            column, value = "md5", md5
+        elif crc:
+            column, value = "crc", crc
+        else:
+            return []
+        rows = self._conn().execute(
+            f"SELECT game_name, rom_name, size, crc, md5, sha1 FROM roms WHERE {column} = ?",
+            (value.lower(),),
+        )
+        return self._rows_to_roms(rows)
+
+    def iter_roms(self) -> Iterator[RomInfo]:
+        cursor = self._conn().execute("SELECT game_name, rom_name, size, crc, md5, sha1 FROM roms")
+        while rows := cursor.fetchmany(1000):
+            yield from self._rows_to_roms(rows)
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM roms").fetchone()[0]
+
+    def has_size(self, size: int) -> bool:
+        return self._conn().execute("SELECT 1 FROM roms WHERE size = ? LIMIT 1", (size,)).fetchone() is not None
+
+    def hash_counts(self) -> dict[str, int]:
+        """Number of ROMs carrying each hash (and ``total``), computed once per instance."""
+        if self._hash_counts is None:
+            total, crc, md5, sha1 = self._conn().execute(
+                "SELECT COUNT(*), COUNT(crc), COUNT(md5), COUNT(sha1) FROM roms"
+            ).fetchone()
+            self._hash_counts = {"total": total, "crc32": crc, "md5": md5, "sha1": sha1}
+        return self._hash_counts
+
+
+def is_index_current(dat_path: Path, index_path: Optional[Path] = None) -> bool:
+    index_path = index_path or index_path_for(dat_path)
+    if not index_path.exists():
+        return False
+    meta = _read_meta(index_path)
+    return all(meta.get(key) == value for key, value in _source_signature(dat_path).items())
+
+
+def load_dat_index(dat_path: Path) -> CompiledDatIndex | DatDb:
+    """Open the compiled index for ``dat_path``, rebuilding it only when stale.
+
+    When the index cannot be written (read-only DAT folder, NAS share,
+    package-managed DATs) the DAT is parsed into an in-memory ``DatDb``
+    instead, so verification keeps working without the cache.
+    """
+    index_path = index_path_for(dat_path)
+    if not is_index_current(dat_path, index_path):
+        try:
+            build_dat_index(dat_path, index_path)
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning(
+                "Índice DAT não gravável (%s); a carregar %s em memória", exc, dat_path.name
+            )
+            return parse_dat_file(dat_path)
+    return CompiledDatIndex(index_path)
+
+
+class DatIndexCache:
+    """Per-session cache of compiled DAT indexes with background prefetch."""
+
+    def __init__(self, max_workers: int = DEFAULT_PREFETCH_WORKERS):
+        self.max_workers = max_workers
+        self._futures: dict[Path, Future] = {}
+        # Assinatura do DAT no momento do parse, para DATs carregados em memória
+        self._memory_signatures: dict[Path, dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _submit(self, dat_path: Path) -> Future:
+        key = dat_path.resolve()
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="dat-index",
+                    )
+                future = self._pool.submit(self._load_index, key)
+                self._futures[key] = future
+            return future
+
+    def _load_index(self, key: Path) -> CompiledDatIndex | DatDb:
+        signature = _source_signature(key)
+        index = load_dat_index(key)
+        if not isinstance(index, CompiledDatIndex):
+            with self._lock:
+                self._memory_signatures[key] = signature
+        return index
+
+    def _is_current(self, key: Path, index: CompiledDatIndex | DatDb) -> bool:
+        if isinstance(index, CompiledDatIndex):
+            return is_index_current(key, index.index_path)
+        with self._lock:
+            signature = self._memory_signatures.get(key)
+        return signature == _source_signature(key)
+
+    def prefetch(self, dat_paths: Iterable[Path]) -> None:
+        """Start compiling/opening indexes in the background."""
+        for dat_path in dat_paths:
+            self._submit(Path(dat_path))
+
+    def load(self, dat_path: Path) -> CompiledDatIndex | DatDb:
+        """Return the index for ``dat_path``, waiting for a prefetch if one is running.
+
+        Falls back to an in-memory ``DatDb`` when the index cannot be written
+        (see ``load_dat_index``).
+        """
+        key = Path(dat_path).resolve()
+        future = self._submit(key)
+        try:
+            index = future.result()
+        except Exception:
+            with self._lock:
+                self._futures.pop(key, None)
+            raise
+        if not self._is_current(key, index):
+            # O DAT mudou durante a sessão: recompilar
+            with self._lock:
+                self._futures.pop(key, None)
+            return self.load(key)
+        return index
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 SYSTEM_TO_DAT_KEYWORDS = {
     "nes": ["Nintendo - Nintendo Entertainment System"],
@@ -26,33 +26,61 @@ SYSTEM_TO_DAT_KEYWORDS = {
     "xbox": ["Microsoft - Xbox"],
     "xbox360": ["Microsoft - Xbox 360"],
     "neogeo": ["SNK - Neo Geo"],
+    "3ds": ["Nintendo - Nintendo 3DS"],
 }
 
+# Sistemas de DAT que partilham uma pasta na biblioteca
+DAT_SYSTEM_TO_LIBRARY = {"gamecube": "dolphin", "wii": "dolphin"}
+
+
+DAT_FILE_PATTERNS = ("*.dat", "*.dat.gz", "*.zip")
+
+
+def _iter_dat_files(source_dir: Path):
+    for pattern in DAT_FILE_PATTERNS:
+        yield from source_dir.glob(pattern)
+
+
+def iter_dat_files(dats_root: Path) -> Iterator[Path]:
+    """Yield every DAT in the root, no-intro and redump folders."""
+    for source_dir in (dats_root, dats_root / "no-intro", dats_root / "redump"):
+        if source_dir.is_dir():
+            yield from _iter_dat_files(source_dir)
+
+
+def system_for_dat_name(name: str) -> Optional[str]:
+    """
+    Map a DAT name to its system id, preferring the longest keyword so that
+    "Sony - PlayStation 2" is not mistaken for "Sony - PlayStation".
+    """
+    best, best_len = None, 0
+    for system_id, keywords in SYSTEM_TO_DAT_KEYWORDS.items():
+        for kw in keywords:
+            if kw in name and len(kw) > best_len:
+                best, best_len = system_id, len(kw)
+    return best
+
+
+def library_system_for(dat_system: Optional[str]) -> Optional[str]:
+    """Library folder for a DAT system id (GameCube and Wii share ``dolphin``)."""
+    return DAT_SYSTEM_TO_LIBRARY.get(dat_system, dat_system)
+
 
 def find_dat_for_system(dats_root: Path, system_name: str) -> Optional[Path]:
     """
     Find the best matching DAT file for a given system name.
     Searches in root, no-intro and redump subfolders.
     """
-    keywords = SYSTEM_TO_DAT_KEYWORDS.get(system_name.lower())
-    if not keywords:
+    system_name = system_name.lower()
+    if system_name not in SYSTEM_TO_DAT_KEYWORDS:
         return None
 
     # Search locations: root, no-intro, redump
-    search_dirs = [dats_root]
-    search_dirs.extend([dats_root / sub for sub in ["no-intro", "redump"]])
-
-    candidates = []
-    for source_dir in search_dirs:
-        if not source_dir.exists():
-            continue
-
-        for dat_file in source_dir.glob("*.dat"):
-            name = dat_file.stem
-            for kw in keywords:
-                if kw in name:
-                    candidates.append(dat_file)
-                    break
+    candidates = [
+        dat_file
+        for dat_file in iter_dat_files(dats_root)
+        if system_for_dat_name(dat_file.stem) == system_name
+    ]
 
     if not candidates:
         return None
@@ -1,22 +1,24 @@
+import codecs
+import gzip
+import io
 import logging
 import re
+import sys
 import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import contextmanager
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Iterator
+from typing import BinaryIO, Dict, List, Optional, Iterator, Tuple
 
-logger = logging.getLogger(__name__)
+from emumanager.common.exceptions import DATParseError
 
-# Common Regex Patterns
-RE_NAME = re.compile(r'name\s+"([^"]+)"')
-RE_VERSION = re.compile(r'version\s+"([^"]+)"')
-RE_SIZE = re.compile(r"size\s+(\d+)")
-RE_CRC = re.compile(r"crc\s+([0-9A-Fa-f]+)")
-RE_MD5 = re.compile(r"md5\s+([0-9A-Fa-f]+)")
-RE_SHA1 = re.compile(r"sha1\s+([0-9A-Fa-f]+)")
+logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class RomInfo:
     game_name: str
     rom_name: str
@@ -27,199 +29,444 @@ class RomInfo:
     dat_name: Optional[str] = None
 
 
+CRC_KIND, MD5_KIND, SHA1_KIND = "crc", "md5", "sha1"
+DIGEST_SIZES = {MD5_KIND: 16, SHA1_KIND: 20}
+_KIND_FLAGS = {CRC_KIND: 1, MD5_KIND: 2, SHA1_KIND: 4}
+
+
+def parse_crc(value: Optional[str]) -> Optional[int]:
+    try:
+        crc = int(value, 16)
+    except (TypeError, ValueError):
+        return None
+    return crc if 0 <= crc <= 0xFFFFFFFF else None
+
+
+def parse_digest(value: Optional[str], size: int) -> Optional[bytes]:
+    if not value or len(value) > size * 2:
+        return None
+    try:
+        return bytes.fromhex(value.rjust(size * 2, "0"))
+    except ValueError:
+        return None
+
+
 class DatDb:
+    """Column-oriented ROM table with sorted hash indexes.
+
+    Rows live in parallel arrays: CRC32 as integers, MD5/SHA1 as fixed-width
+    bytes and game/DAT names as ids into an interned name table, so a ROM
+    costs ~100 bytes instead of a ``RomInfo`` plus three hex strings. Each
+    hash index is a pair of sorted arrays (64-bit key prefix, row) searched
+    with ``bisect`` and rebuilt lazily after rows are added; ``RomInfo``
+    objects are only materialised for lookup results.
+    """
+
     def __init__(self):
-        self.crc_index: Dict[str, List[RomInfo]] = {}
-        self.md5_index: Dict[str, List[RomInfo]] = {}
-        self.sha1_index: Dict[str, List[RomInfo]] = {}
         self.name: str = ""
         self.version: str = ""
+        self._names: List[Optional[str]] = [None]
+        self._name_ids: Dict[Optional[str], int] = {None: 0}
+        self._game_ids = array("I")
+        self._dat_ids = array("I")
+        self._rom_names: List[str] = []
+        self._sizes = array("Q")
+        self._flags = array("B")
+        self._crcs = array("I")
+        self._digests: Dict[str, bytearray] = {kind: bytearray() for kind in DIGEST_SIZES}
+        self._indexes: Dict[str, Tuple[array, array]] = {}
+        self._size_set: Optional[frozenset] = None
+        self._hash_counts: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._rom_names)
+
+    def _intern(self, name: Optional[str]) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(sys.intern(name))
+            self._name_ids[name] = name_id
+        return name_id
 
     def add_rom(self, rom: RomInfo):
-        if rom.crc:
-            crc = rom.crc.lower()
-            if crc not in self.crc_index:
-                self.crc_index[crc] = []
-            self.crc_index[crc].append(rom)
-
-        if rom.md5:
-            md5 = rom.md5.lower()
-            if md5 not in self.md5_index:
-                self.md5_index[md5] = []
-            self.md5_index[md5].append(rom)
-
-        if rom.sha1:
-            sha1 = rom.sha1.lower()
-            if sha1 not in self.sha1_index:
-                self.sha1_index[sha1] = []
-            self.sha1_index[sha1].append(rom)
+        crc = parse_crc(rom.crc)
+        digests = {kind: parse_digest(getattr(rom, kind), size) for kind, size in DIGEST_SIZES.items()}
+
+        flags = _KIND_FLAGS[CRC_KIND] if crc is not None else 0
+        for kind, size in DIGEST_SIZES.items():
+            digest = digests[kind]
+            if digest is not None:
+                flags |= _KIND_FLAGS[kind]
+            self._digests[kind] += digest or bytes(size)
+
+        self._game_ids.append(self._intern(rom.game_name))
+        self._dat_ids.append(self._intern(rom.dat_name))
+        self._rom_names.append(rom.rom_name)
+        self._sizes.append(max(rom.size or 0, 0))
+        self._flags.append(flags)
+        self._crcs.append(crc or 0)
+        self._invalidate()
+
+    def extend(self, other: "DatDb") -> None:
+        """Append every row of ``other``, re-interning its names into this table."""
+        remap = [self._intern(name) for name in other._names]
+        self._game_ids.extend(remap[name_id] for name_id in other._game_ids)
+        self._dat_ids.extend(remap[name_id] for name_id in other._dat_ids)
+        self._rom_names.extend(other._rom_names)
+        self._sizes.extend(other._sizes)
+        self._flags.extend(other._flags)
+        self._crcs.extend(other._crcs)
+        for kind in DIGEST_SIZES:
+            self._digests[kind] += other._digests[kind]
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._indexes.clear()
+        self._size_set = None
+        self._hash_counts = None
+
+    def has_size(self, size: int) -> bool:
+        if self._size_set is None:
+            self._size_set = frozenset(self._sizes)
+        return size in self._size_set
+
+    def hash_counts(self) -> Dict[str, int]:
+        """Number of ROMs carrying each hash (and ``total``)."""
+        if self._hash_counts is None:
+            counts = {"total": len(self), "crc32": 0, "md5": 0, "sha1": 0}
+            for flags in self._flags:
+                counts["crc32"] += bool(flags & _KIND_FLAGS[CRC_KIND])
+                counts["md5"] += bool(flags & _KIND_FLAGS[MD5_KIND])
+                counts["sha1"] += bool(flags & _KIND_FLAGS[SHA1_KIND])
+            self._hash_counts = counts
+        return self._hash_counts
+
+    def _digest_at(self, kind: str, row: int) -> bytes:
+        size = DIGEST_SIZES[kind]
+        return bytes(self._digests[kind][row * size : (row + 1) * size])
+
+    def _key_at(self, kind: str, row: int) -> int:
+        if kind == CRC_KIND:
+            return self._crcs[row]
+        size = DIGEST_SIZES[kind]
+        return int.from_bytes(self._digests[kind][row * size : row * size + 8], "big")
+
+    def _index(self, kind: str) -> Tuple[array, array]:
+        index = self._indexes.get(kind)
+        if index is None:
+            flag = _KIND_FLAGS[kind]
+            rows = [row for row, flags in enumerate(self._flags) if flags & flag]
+            keys = [self._key_at(kind, row) for row in rows]
+            # sort estável: ROMs com a mesma chave mantêm a ordem de inserção
+            order = sorted(range(len(rows)), key=keys.__getitem__)
+            index = (array("Q", (keys[i] for i in order)), array("I", (rows[i] for i in order)))
+            self._indexes[kind] = index
+        return index
+
+    def _rom_at(self, row: int) -> RomInfo:
+        flags = self._flags[row]
+        return RomInfo(
+            game_name=self._names[self._game_ids[row]],
+            rom_name=self._rom_names[row],
+            size=self._sizes[row],
+            crc=f"{self._crcs[row]:08x}" if flags & _KIND_FLAGS[CRC_KIND] else None,
+            md5=self._digest_at(MD5_KIND, row).hex() if flags & _KIND_FLAGS[MD5_KIND] else None,
+            sha1=self._digest_at(SHA1_KIND, row).hex() if flags & _KIND_FLAGS[SHA1_KIND] else None,
+            dat_name=self._names[self._dat_ids[row]],
+        )
 
     def lookup(
         self, crc: str = None, md5: str = None, sha1: str = None
     ) -> List[RomInfo]:
-        # Return all matches
-        matches = []
+        # Return all matches for the strongest hash given
         if sha1:
-            matches.extend(self.sha1_index.get(sha1.lower(), []))
+            kind, value = SHA1_KIND, parse_digest(sha1, DIGEST_SIZES[SHA1_KIND])
         elif md5:
-            matches.extend(self.md5_index.get(md5.lower(), []))
+            kind, value = MD5_KIND, parse_digest(md5, DIGEST_SIZES[MD5_KIND])
         elif crc:
-            matches.extend(self.crc_index.get(crc.lower(), []))
-
-        # Deduplicate by object identity
-        return list({id(r): r for r in matches}.values())
-
-
-def parse_dat_file(dat_path: Path) -> DatDb:
-    # Check for XML signature
+            kind, value = CRC_KIND, parse_crc(crc)
+        else:
+            return []
+        if value is None:
+            return []
+
+        key = value if kind == CRC_KIND else int.from_bytes(value[:8], "big")
+        keys, rows = self._index(kind)
+        matches = []
+        pos = bisect_left(keys, key)
+        while pos < len(keys) and keys[pos] == key:
+            row = rows[pos]
+            if kind == CRC_KIND or self._digest_at(kind, row) == value:
+                matches.append(self._rom_at(row))
+            pos += 1
+        return matches
+
+    def iter_roms(self) -> Iterator[RomInfo]:
+        """Yield every ROM once, in insertion order."""
+        for row in range(len(self)):
+            yield self._rom_at(row)
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZIP_MAGIC = b"PK\x03\x04"
+DAT_MEMBER_SUFFIXES = (".dat", ".xml")
+XML_GAME_TAGS = frozenset({"game", "machine"})
+CLRMAMEPRO_CHUNK_SIZE = 1024 * 1024
+
+# Tokens ClrMamePro: string entre aspas, parêntese ou palavra; um '"' isolado
+# indica uma string que continua no próximo bloco lido.
+_CLRMAMEPRO_TOKEN = re.compile(r'"([^"]*)"|([()])|([^\s()"]+)|"')
+_OPEN = object()
+_CLOSE = object()
+
+
+@contextmanager
+def open_dat_stream(dat_path: Path) -> Iterator[BinaryIO]:
+    """Open a DAT as a binary stream, transparently decompressing gzip/zip files."""
+    with open(dat_path, "rb") as raw:
+        magic = raw.read(4)
+        raw.seek(0)
+        if magic.startswith(GZIP_MAGIC):
+            with gzip.GzipFile(fileobj=raw) as stream:
+                yield io.BufferedReader(stream)
+            return
+        if magic == ZIP_MAGIC:
+            with zipfile.ZipFile(raw) as archive:
+                members = [info for info in archive.infolist() if not info.is_dir()]
+                preferred = [
+                    info for info in members if info.filename.lower().endswith(DAT_MEMBER_SUFFIXES)
+                ]
+                if not (preferred or members):
+                    raise ValueError(f"Empty DAT archive: {dat_path}")
+                with archive.open((preferred or members)[0]) as stream:
+                    yield io.BufferedReader(stream)
+            return
+        yield raw
+
+
+def _looks_like_xml(head: bytes) -> bool:
+    return b"<?xml" in head or b"<datafile" in head or b"<mame" in head
+
+
+def parse_dat_file(dat_path: Path, strict: bool = False) -> DatDb:
+    """Parse an XML or ClrMamePro DAT (plain, gzip or zip).
+
+    Failures are logged and yield an empty or partial ``DatDb``; with
+    ``strict=True`` they raise ``DATParseError`` instead, so callers that
+    persist the result (compiled indexes) never store a truncated DAT.
+    """
     try:
-        with open(dat_path, "rb") as f:
-            head = f.read(512)
-        if b"<?xml" in head or b"<datafile>" in head:
-            return _parse_xml_dat(dat_path)
+        with open_dat_stream(dat_path) as stream:
+            # Check for XML signature
+            if _looks_like_xml(stream.peek(512)[:512]):
+                return _parse_xml_stream(stream, dat_path, strict=strict)
+            # Fallback to ClrMamePro
+            return _parse_clrmamepro_stream(stream, dat_path, strict=strict)
     except Exception as e:
-        logger.debug(f"Failed to read DAT header for {dat_path}: {e}")
-
-    # Fallback to ClrMamePro
-    return _parse_clrmamepro(dat_path)
+        if strict:
+            raise DATParseError(str(dat_path), str(e)) from e
+        logger.error(f"Failed to read DAT {dat_path}: {e}")
+        return DatDb()
 
 
 def _parse_xml_dat(dat_path: Path) -> DatDb:
+    with open_dat_stream(dat_path) as stream:
+        return _parse_xml_stream(stream, dat_path)
+
+
+def _parse_xml_stream(stream: BinaryIO, dat_path: Path, strict: bool = False) -> DatDb:
+    """Streaming parse: each game element is released as soon as it is indexed."""
     db = DatDb()
+    root = None
+    in_header = False
     try:
-        tree = ET.parse(dat_path)
-        root = tree.getroot()
-
-        # Parse Header
-        header = root.find("header")
-        if header is not None:
-            name_elem = header.find("name")
-            if name_elem is not None:
-                db.name = name_elem.text or ""
-            version_elem = header.find("version")
-            if version_elem is not None:
-                db.version = version_elem.text or ""
-
-        # Parse Games
-        for game in root.findall("game"):
-            game_name = game.get("name", "Unknown")
-
-            for rom in game.findall("rom"):
-                rom_name = rom.get("name", "Unknown")
-                size_str = rom.get("size", "0")
-                try:
-                    size = int(size_str)
-                except ValueError:
-                    size = 0
-
-                crc = rom.get("crc")
-                md5 = rom.get("md5")
-                sha1 = rom.get("sha1")
-
-                info = RomInfo(
-                    game_name=game_name,
-                    rom_name=rom_name,
-                    size=size,
-                    crc=crc,
-                    md5=md5,
-                    sha1=sha1,
-                    dat_name=db.name,
-                )
-                db.add_rom(info)
-
-    except Exception as e:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if root is None:
+                    root = elem
+                elif tag == "header":
+                    in_header = True
+                continue
+
+            if in_header:
+                if tag == "name":
+                    db.name = elem.text or ""
+                elif tag == "version":
+                    db.version = elem.text or ""
+                elif tag == "header":
+                    in_header = False
+                    root.clear()
+                continue
+
+            if tag in XML_GAME_TAGS:
+                _add_xml_game(db, elem)
+                # Liberta o jogo já indexado (e a referência do root) para manter memória constante
+                root.clear()
+    except ET.ParseError as e:
+        if strict:
+            raise
         logger.error(f"XML parsing failed for {dat_path}: {e}")
 
     return db
 
 
-def _extract_nested_blocks(content: str, pattern: str) -> Iterator[str]:
-    """Helper to extract balanced parenthesized blocks after a pattern."""
-    for match in re.finditer(pattern, content):
-        start = match.end()
-        depth = 1
-        end = start
-        while depth > 0 and end < len(content):
-            if content[end] == "(":
-                depth += 1
-            elif content[end] == ")":
-                depth -= 1
-            end += 1
-        
-        if depth == 0:
-            yield content[start : end - 1]
+def _add_xml_game(db: DatDb, game: ET.Element) -> None:
+    game_name = sys.intern(game.get("name", "Unknown"))
+    dat_name = db.name
+    for rom in game.iter("rom"):
+        try:
+            size = int(rom.get("size", "0"))
+        except ValueError:
+            size = 0
+
+        db.add_rom(
+            RomInfo(
+                game_name=game_name,
+                rom_name=rom.get("name", "Unknown"),
+                size=size,
+                crc=rom.get("crc"),
+                md5=rom.get("md5"),
+                sha1=rom.get("sha1"),
+                dat_name=dat_name,
+            )
+        )
+
+
+def _iter_clrmamepro_tokens(stream: BinaryIO, chunk_size: int = CLRMAMEPRO_CHUNK_SIZE) -> Iterator[object]:
+    """Tokenize a ClrMamePro DAT in one pass over fixed-size chunks.
+
+    Yields ``_OPEN``/``_CLOSE`` for parentheses and plain strings for bare
+    words and quoted values (quotes removed, parentheses inside them kept).
+    A token cut by a chunk boundary is carried over to the next chunk.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    pending = ""
+    eof = False
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        decoded = decoder.decode(chunk, final=eof)
+        if pending.startswith('"') and '"' not in decoded and not eof:
+            # String entre aspas ainda aberta: acumular sem voltar a varrer
+            pending += decoded
+            continue
+        text = pending + decoded
+        pending = ""
+        end = len(text)
+        for match in _CLRMAMEPRO_TOKEN.finditer(text):
+            quoted, paren, word = match.groups()
+            if quoted is not None:
+                yield quoted
+            elif paren is not None:
+                yield _OPEN if paren == "(" else _CLOSE
+            elif word is not None:
+                if match.end() == end and not eof:
+                    pending = word
+                    break
+                yield word
+            elif not eof:
+                # Aspas sem fecho neste bloco: a string continua no próximo
+                pending = text[match.start():]
+                break
+
+
+def _read_clrmamepro_block(tokens: Iterator[object]) -> Optional[List[tuple]]:
+    """Collect ``(key, value)`` pairs up to the matching ``)``.
+
+    Nested blocks become lists; ``None`` means the DAT ended mid-block.
+    """
+    items: List[tuple] = []
+    key = None
+    for token in tokens:
+        if token is _CLOSE:
+            return items
+        if token is _OPEN:
+            block = _read_clrmamepro_block(tokens)
+            if block is None:
+                return None
+            items.append((key, block))
+            key = None
+        elif key is None:
+            key = token
+        else:
+            items.append((key, token))
+            key = None
+    return None
 
 
 def _parse_clrmamepro(dat_path: Path) -> DatDb:
+    with open_dat_stream(dat_path) as stream:
+        return _parse_clrmamepro_stream(stream, dat_path)
+
+
+def _parse_clrmamepro_stream(stream: BinaryIO, dat_path: Path, strict: bool = False) -> DatDb:
     db = DatDb()
+    tokens = _iter_clrmamepro_tokens(stream)
+    key = None
     try:
-        content = dat_path.read_text(encoding="utf-8", errors="ignore")
-    except Exception as e:
+        for token in tokens:
+            if token is _OPEN:
+                block = _read_clrmamepro_block(tokens)
+                if block is None:
+                    if strict:
+                        raise DATParseError(str(dat_path), f"unexpected end of file inside '{key}'")
+                    break
+                if key == "clrmamepro":
+                    _apply_clrmamepro_header(db, block)
+                elif key == "game":
+                    _add_clrmamepro_game(db, block)
+                key = None
+            elif token is not _CLOSE:
+                key = token
+    except OSError as e:
+        if strict:
+            raise
         logger.error(f"Failed to read ClrMamePro file {dat_path}: {e}")
-        return db
-
-    # Extract header info
-    header_match = re.search(r"clrmamepro\s*\((.*?)\)", content, re.DOTALL)
-    if header_match:
-        header_content = header_match.group(1)
-        name_match = RE_NAME.search(header_content)
-        if name_match:
-            db.name = name_match.group(1)
-        version_match = RE_VERSION.search(header_content)
-        if version_match:
-            db.version = version_match.group(1)
-
-    # Process game blocks
-    for game_block in _extract_nested_blocks(content, r"game\s*\("):
-        _parse_game_block(db, game_block)
 
     return db
 
 
-def _parse_game_block(db, block_content):
-    name_match = RE_NAME.search(block_content)
-    game_name = name_match.group(1) if name_match else "Unknown"
-
-    for rom_content in _extract_nested_blocks(block_content, r"rom\s*\("):
-        _parse_rom(db, game_name, rom_content)
+def _apply_clrmamepro_header(db: DatDb, block: List[tuple]) -> None:
+    for key, value in block:
+        if key == "name" and isinstance(value, str):
+            db.name = value
+        elif key == "version" and isinstance(value, str):
+            db.version = value
 
 
-def _parse_rom(db, game_name, rom_content):
-    name_match = RE_NAME.search(rom_content)
-    rom_name = name_match.group(1) if name_match else "Unknown"
-
-    size_match = RE_SIZE.search(rom_content)
-    size = int(size_match.group(1)) if size_match else 0
+def _add_clrmamepro_game(db: DatDb, block: List[tuple]) -> None:
+    game_name = next(
+        (value for key, value in block if key == "name" and isinstance(value, str)),
+        "Unknown",
+    )
+    game_name = sys.intern(game_name)
+    for key, value in block:
+        if key == "rom" and isinstance(value, list):
+            _add_clrmamepro_rom(db, game_name, value)
 
-    crc_match = RE_CRC.search(rom_content)
-    md5_match = RE_MD5.search(rom_content)
-    sha1_match = RE_SHA1.search(rom_content)
 
-    info = RomInfo(
-        game_name=game_name,
-        rom_name=rom_name,
-        size=size,
-        crc=crc_match.group(1) if crc_match else None,
-        md5=md5_match.group(1) if md5_match else None,
-        sha1=sha1_match.group(1) if sha1_match else None,
-        dat_name=db.name,
+def _add_clrmamepro_rom(db: DatDb, game_name: str, block: List[tuple]) -> None:
+    fields = {key: value for key, value in reversed(block) if isinstance(value, str)}
+    try:
+        size = int(fields.get("size", "0"))
+    except ValueError:
+        size = 0
+
+    db.add_rom(
+        RomInfo(
+            game_name=game_name,
+            rom_name=fields.get("name", "Unknown"),
+            size=size,
+            crc=fields.get("crc"),
+            md5=fields.get("md5"),
+            sha1=fields.get("sha1"),
+            dat_name=db.name,
+        )
     )
-    db.add_rom(info)
 
 
 def merge_dbs(target: DatDb, source: DatDb):
     """Merge source DatDb into target DatDb."""
-    for crc, roms in source.crc_index.items():
-        if crc not in target.crc_index:
-            target.crc_index[crc] = []
-        target.crc_index[crc].extend(roms)
-
-    for md5, roms in source.md5_index.items():
-        if md5 not in target.md5_index:
-            target.md5_index[md5] = []
-        target.md5_index[md5].extend(roms)
-
-    for sha1, roms in source.sha1_index.items():
-        if sha1 not in target.sha1_index:
-            target.sha1_index[sha1] = []
-        target.sha1_index[sha1].extend(roms)
+    target.extend(source)
@@ -0,0 +1,275 @@
+"""Concurrent multi-file hashing with byte-level progress and cancellation.
+
+``hash_many`` hashes files in a thread pool (``hashlib`` and ``zlib``
+release the GIL on large buffers). A scheduler keeps the work bounded:
+- Each device gets at most ``per_device_limit`` readers, so one slow
+  disk cannot fill every worker.
+- Files are only started while their combined size stays within
+  ``max_inflight_bytes``.
+- Progress is aggregated from per-chunk counters and reported with real
+  bytes/sec figures.
+- Cancellation is checked between chunks, so a 40 GB image stops within
+  one buffer.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Union
+
+from emumanager.common.exceptions import WorkflowCancelledError
+from emumanager.verification import hasher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALGORITHMS = ("crc32", "sha1")
+DEFAULT_HASH_WORKERS = min(8, (os.cpu_count() or 2))
+DEFAULT_PER_DEVICE_LIMIT = 2
+DEFAULT_INFLIGHT_BYTES = 4 * 1024 * 1024 * 1024
+PROGRESS_INTERVAL = 0.2
+
+
+class HashJob(NamedTuple):
+    """A file plus the algorithms to compute for it.
+
+    ``drop_cache=False`` keeps the file in the page cache when a second read
+    is expected soon; ``None`` follows ``PerformanceConfig.io_drop_cache``.
+    """
+
+    path: Path
+    algorithms: tuple[str, ...] = DEFAULT_ALGORITHMS
+    drop_cache: Optional[bool] = None
+
+
+class HashResult(NamedTuple):
+    path: Path
+    hashes: dict[str, str]
+    size: int
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.hashes)
+
+
+class FileProgress(NamedTuple):
+    path: Path
+    done: int
+    size: int
+    bytes_per_sec: float
+
+
+class HashProgress(NamedTuple):
+    """Aggregate progress: bytes hashed so far and the files being read now."""
+
+    done_bytes: int
+    total_bytes: int
+    files_done: int
+    files_total: int
+    bytes_per_sec: float
+    active: tuple[FileProgress, ...]
+
+    @property
+    def fraction(self) -> float:
+        if self.total_bytes:
+            return min(1.0, self.done_bytes / self.total_bytes)
+        return self.files_done / self.files_total if self.files_total else 1.0
+
+    def describe(self) -> str:
+        """Short status line, e.g. ``3/10 · 412.5 MB/s · game.iso 45%``."""
+        text = f"{self.files_done}/{self.files_total} · {self.bytes_per_sec / (1024 * 1024):.1f} MB/s"
+        if self.active:
+            current = max(self.active, key=lambda item: item.size)
+            pct = 100 * current.done / current.size if current.size else 100
+            text += f" · {current.path.name} {pct:.0f}%"
+        return text
+
+
+class _Scheduled(NamedTuple):
+    job: HashJob
+    size: int
+    device: int
+
+
+class _Tracker:
+    """Per-file byte counters shared between hashing threads and the scheduler."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: dict[Path, list] = {}
+        self.finished_bytes = 0
+
+    def start(self, path: Path, size: int) -> None:
+        with self._lock:
+            self._active[path] = [0, size, time.perf_counter()]
+
+    def advance(self, path: Path, done: int) -> None:
+        with self._lock:
+            state = self._active.get(path)
+            if state is not None:
+                state[0] = done
+
+    def finish(self, path: Path, size: int) -> None:
+        with self._lock:
+            self._active.pop(path, None)
+            self.finished_bytes += size
+
+    def snapshot(self) -> tuple[int, tuple[FileProgress, ...]]:
+        now = time.perf_counter()
+        with self._lock:
+            active = tuple(
+                FileProgress(path, done, size, done / max(now - started, 1e-6))
+                for path, (done, size, started) in self._active.items()
+            )
+            return self.finished_bytes + sum(item.done for item in active), active
+
+
+def _as_job(item: Union[Path, str, HashJob], algorithms: tuple[str, ...]) -> HashJob:
+    if isinstance(item, HashJob):
+        return item
+    return HashJob(Path(item), algorithms)
+
+
+def hash_many(
+    items: Iterable[Union[Path, str, HashJob]],
+    algorithms: tuple[str, ...] = DEFAULT_ALGORITHMS,
+    max_workers: int = DEFAULT_HASH_WORKERS,
+    per_device_limit: int = DEFAULT_PER_DEVICE_LIMIT,
+    max_inflight_bytes: int = DEFAULT_INFLIGHT_BYTES,
+    chunk_size: Optional[int] = None,
+    progress_cb: Optional[Callable[[HashProgress], None]] = None,
+    cancel_event: Any = None,
+    crc_workers: int = 1,
+) -> dict[Path, HashResult]:
+    """Hash many files concurrently; returns one ``HashResult`` per finished file.
+
+    Items may be paths (hashed with ``algorithms``) or ``HashJob`` entries
+    with their own algorithm list. Files left unfinished by a cancellation
+    are omitted from the result. ``crc_workers`` is forwarded to
+    ``calculate_hashes`` so large CRC-only jobs can be split into ranges.
+    """
+    pending: dict[int, deque[_Scheduled]] = {}
+    results: dict[Path, HashResult] = {}
+    total_bytes = 0
+    files_total = 0
+    for item in items:
+        job = _as_job(item, algorithms)
+        try:
+            st = job.path.stat()
+        except OSError as exc:
+            results[job.path] = HashResult(job.path, {}, 0, 0.0, str(exc))
+            continue
+        pending.setdefault(st.st_dev, deque()).append(_Scheduled(job, st.st_size, st.st_dev))
+        total_bytes += st.st_size
+        files_total += 1
+    files_total += len(results)
+    if not pending:
+        return results
+
+    tracker = _Tracker()
+    started_at = time.perf_counter()
+    last_report = 0.0
+    per_device: dict[int, int] = {device: 0 for device in pending}
+    running: dict[Future, _Scheduled] = {}
+    inflight_bytes = 0
+    cancelled = False
+
+    def _cancel_requested() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    def _run(item: _Scheduled) -> HashResult:
+        path = item.job.path
+        tracker.start(path, item.size)
+        began = time.perf_counter()
+        hashes: dict[str, str] = {}
+        try:
+            hashes = hasher.calculate_hashes(
+                path,
+                algorithms=item.job.algorithms,
+                chunk_size=chunk_size,
+                progress_cb=lambda done: tracker.advance(path, done),
+                cancel_event=cancel_event,
+                crc_workers=crc_workers,
+                drop_cache=item.job.drop_cache,
+            )
+        finally:
+            # Ficheiros cancelados ou falhados não contam para os bytes concluídos
+            tracker.finish(path, item.size if hashes else 0)
+        error = None if hashes else "hash failed"
+        return HashResult(path, hashes, item.size, time.perf_counter() - began, error)
+
+    def _next_ready() -> Optional[_Scheduled]:
+        # Round-robin pelos dispositivos com capacidade livre
+        for device in list(pending):
+            queue = pending[device]
+            if per_device[device] >= per_device_limit:
+                continue
+            item = queue[0]
+            if running and inflight_bytes + item.size > max_inflight_bytes:
+                continue
+            queue.popleft()
+            if not queue:
+                del pending[device]
+            else:
+                pending[device] = pending.pop(device)
+            return item
+        return None
+
+    def _report(force: bool = False) -> None:
+        nonlocal last_report
+        if progress_cb is None:
+            return
+        now = time.perf_counter()
+        if not force and now - last_report < PROGRESS_INTERVAL:
+            return
+        last_report = now
+        done, active = tracker.snapshot()
+        progress_cb(
+            HashProgress(
+                done_bytes=done,
+                total_bytes=total_bytes,
+                files_done=len(results),
+                files_total=files_total,
+                bytes_per_sec=done / max(now - started_at, 1e-6),
+                active=active,
+            )
+        )
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_workers), thread_name_prefix="hash"
+    ) as pool:
+        while pending or running:
+            if _cancel_requested():
+                cancelled = True
+                pending.clear()
+            while len(running) < max_workers and (item := _next_ready()) is not None:
+                per_device[item.device] += 1
+                inflight_bytes += item.size
+                running[pool.submit(_run, item)] = item
+            if not running:
+                break
+
+            finished, _ = wait(running, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in finished:
+                item = running.pop(future)
+                per_device[item.device] -= 1
+                inflight_bytes -= item.size
+                try:
+                    results[item.job.path] = future.result()
+                except WorkflowCancelledError:
+                    cancelled = True
+                except Exception as exc:
+                    results[item.job.path] = HashResult(item.job.path, {}, item.size, 0.0, str(exc))
+            _report()
+
+    _report(force=True)
+    if cancelled:
+        logger.info("Hashing cancelado: %s/%s ficheiros concluídos", len(results), files_total)
+    return results
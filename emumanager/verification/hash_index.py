@@ -0,0 +1,299 @@
+"""Persisted hash index spanning every DAT under ``dats/``.
+
+The ROMs of all No-Intro/Redump DATs are copied into a single SQLite file
+(``dats/.index/global.sqlite``) keyed by CRC32+size, MD5 and SHA1, so a
+file can be resolved to its system, DAT and title without knowing which
+folder it belongs in. A DAT is re-imported only when its size or mtime
+changes, reading rows from its compiled per-DAT index instead of re-parsing.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+from emumanager.verification.dat_index import INDEX_DIRNAME, INDEX_MMAP_SIZE, load_dat_index
+from emumanager.verification.dat_manager import iter_dat_files, library_system_for, system_for_dat_name
+from emumanager.verification.dat_parser import DIGEST_SIZES, MD5_KIND, SHA1_KIND, RomInfo, parse_crc, parse_digest
+from emumanager.verification.hash_engine import hash_many
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_INDEX_NAME = "global.sqlite"
+GLOBAL_INDEX_FORMAT = "1"
+IDENTIFY_ALGORITHMS = ("crc32", "md5", "sha1")
+DEFAULT_HASH_WORKERS = 4
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    """
+    CREATE TABLE IF NOT EXISTS dats (
+        id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        name TEXT,
+        system_id TEXT,
+        size INTEGER,
+        mtime_ns INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS roms (
+        dat_id INTEGER NOT NULL,
+        game_name TEXT,
+        rom_name TEXT,
+        size INTEGER,
+        crc INTEGER,
+        md5 BLOB,
+        sha1 BLOB
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS roms_crc_size ON roms(crc, size)",
+    "CREATE INDEX IF NOT EXISTS roms_md5 ON roms(md5)",
+    "CREATE INDEX IF NOT EXISTS roms_sha1 ON roms(sha1)",
+    "CREATE INDEX IF NOT EXISTS roms_dat ON roms(dat_id)",
+    "CREATE INDEX IF NOT EXISTS roms_size ON roms(size)",
+)
+
+_MATCH_COLUMNS = "d.system_id, d.name, d.path, r.game_name, r.rom_name, r.size, r.crc, r.md5, r.sha1"
+
+
+class GlobalMatch(NamedTuple):
+    """A DAT entry matched by hash, with the library system it belongs to."""
+
+    system_id: Optional[str]
+    dat_name: str
+    dat_path: str
+    game_name: str
+    rom_name: str
+    size: int
+
+
+class IdentifyResult(NamedTuple):
+    path: Path
+    hashes: dict[str, str]
+    matches: List[GlobalMatch]
+
+    @property
+    def match(self) -> Optional[GlobalMatch]:
+        return self.matches[0] if self.matches else None
+
+
+class GlobalHashIndex:
+    """Cross-DAT hash index; also usable as a ``DatDb`` via ``lookup()``.
+
+    Connections are per thread and per process, so the object can be shared
+    with worker threads and pickled to verification processes.
+    """
+
+    def __init__(self, dats_root: Path, index_path: Optional[Path] = None):
+        self.dats_root = Path(dats_root)
+        self.index_path = index_path or self.dats_root / INDEX_DIRNAME / GLOBAL_INDEX_NAME
+        self.name = "All DATs"
+        self.version = ""
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        return {"dats_root": self.dats_root, "index_path": self.index_path, "name": self.name, "version": self.version}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={INDEX_MMAP_SIZE}")
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _reset_if_incompatible(self, conn: sqlite3.Connection) -> None:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'format'").fetchone()
+        if row and row[0] == GLOBAL_INDEX_FORMAT:
+            return
+        with conn:
+            conn.execute("DELETE FROM roms")
+            conn.execute("DELETE FROM dats")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('format', ?)",
+                (GLOBAL_INDEX_FORMAT,),
+            )
+
+    def refresh(self, progress_cb: Optional[Callable[[float, str], None]] = None) -> int:
+        """Import new or changed DATs and drop removed ones. Returns DATs imported."""
+        if not self.dats_root.is_dir():
+            return 0
+        with self._refresh_lock:
+            conn = self._conn()
+            self._reset_if_incompatible(conn)
+            known = {
+                path: (dat_id, size, mtime_ns)
+                for dat_id, path, size, mtime_ns in conn.execute("SELECT id, path, size, mtime_ns FROM dats")
+            }
+            current = {str(path.resolve()): path for path in iter_dat_files(self.dats_root)}
+
+            for path in known.keys() - current.keys():
+                self._drop_dat(conn, known[path][0])
+
+            imported = 0
+            total = len(current)
+            for i, (key, dat_path) in enumerate(sorted(current.items())):
+                stat = dat_path.stat()
+                previous = known.get(key)
+                if previous and previous[1:] == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                if progress_cb:
+                    progress_cb(i / total, f"Indexando DAT: {dat_path.name}")
+                try:
+                    self._import_dat(conn, key, dat_path, stat, previous[0] if previous else None)
+                    imported += 1
+                except Exception as e:
+                    logger.error(f"Falha ao indexar DAT {dat_path.name}: {e}")
+            if imported:
+                logger.info(f"Índice global de hashes atualizado ({imported} DATs)")
+            return imported
+
+    @staticmethod
+    def _drop_dat(conn: sqlite3.Connection, dat_id: int) -> None:
+        with conn:
+            conn.execute("DELETE FROM roms WHERE dat_id = ?", (dat_id,))
+            conn.execute("DELETE FROM dats WHERE id = ?", (dat_id,))
+
+    def _import_dat(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        dat_path: Path,
+        stat: os.stat_result,
+        dat_id: Optional[int],
+    ) -> None:
+        compiled = load_dat_index(dat_path)
+        system_id = system_for_dat_name(compiled.name) or system_for_dat_name(dat_path.stem)
+        with conn:
+            if dat_id is not None:
+                conn.execute("DELETE FROM roms WHERE dat_id = ?", (dat_id,))
+                conn.execute("DELETE FROM dats WHERE id = ?", (dat_id,))
+            dat_id = conn.execute(
+                "INSERT INTO dats (path, name, system_id, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                (key, compiled.name or dat_path.stem, system_id, stat.st_size, stat.st_mtime_ns),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO roms VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        dat_id,
+                        rom.game_name,
+                        rom.rom_name,
+                        rom.size,
+                        parse_crc(rom.crc),
+                        parse_digest(rom.md5, DIGEST_SIZES[MD5_KIND]),
+                        parse_digest(rom.sha1, DIGEST_SIZES[SHA1_KIND]),
+                    )
+                    for rom in compiled.iter_roms()
+                ),
+            )
+
+    def has_size(self, size: int) -> bool:
+        if not self.index_path.exists():
+            return False
+        return self._conn().execute("SELECT 1 FROM roms WHERE size = ? LIMIT 1", (size,)).fetchone() is not None
+
+    def hash_counts(self) -> dict[str, int]:
+        """Number of ROMs carrying each hash (and ``total``) across all DATs."""
+        if not self.index_path.exists():
+            return {"total": 0, "crc32": 0, "md5": 0, "sha1": 0}
+        total, crc, md5, sha1 = self._conn().execute(
+            "SELECT COUNT(*), COUNT(crc), COUNT(md5), COUNT(sha1) FROM roms"
+        ).fetchone()
+        return {"total": total, "crc32": crc, "md5": md5, "sha1": sha1}
+
+    def dat_count(self) -> int:
+        if not self.index_path.exists():
+            return 0
+        return self._conn().execute("SELECT COUNT(*) FROM dats").fetchone()[0]
+
+    def _query(self, crc: str = None, md5: str = None, sha1: str = None, size: Optional[int] = None) -> List[tuple]:
+        if sha1:
+            where, params = "r.sha1 = ?", (parse_digest(sha1, DIGEST_SIZES[SHA1_KIND]),)
+        elif md5:
+            where, params = "r.md5 = ?", (parse_digest(md5, DIGEST_SIZES[MD5_KIND]),)
+        elif crc and size is not None:
+            where, params = "r.crc = ? AND r.size = ?", (parse_crc(crc), size)
+        elif crc:
+            where, params = "r.crc = ?", (parse_crc(crc),)
+        else:
+            return []
+        if params[0] is None or not self.index_path.exists():
+            return []
+        return self._conn().execute(
+            f"SELECT {_MATCH_COLUMNS} FROM roms r JOIN dats d ON d.id = r.dat_id WHERE {where} ORDER BY d.id",
+            params,
+        ).fetchall()
+
+    def identify(self, hashes: dict[str, str], size: Optional[int] = None) -> List[GlobalMatch]:
+        """Resolve hashes (SHA1, then MD5, then CRC32+size) to DAT entries across all systems."""
+        rows = self._query(crc=hashes.get("crc32"), md5=hashes.get("md5"), sha1=hashes.get("sha1"), size=size)
+        return [
+            GlobalMatch(
+                system_id=library_system_for(system_id),
+                dat_name=dat_name,
+                dat_path=dat_path,
+                game_name=game_name,
+                rom_name=rom_name,
+                size=rom_size,
+            )
+            for system_id, dat_name, dat_path, game_name, rom_name, rom_size, *_ in rows
+        ]
+
+    def identify_many(
+        self,
+        paths: Iterable[Path],
+        max_workers: int = DEFAULT_HASH_WORKERS,
+        cancel_event: Any = None,
+    ) -> List[IdentifyResult]:
+        """Hash each file once and resolve it against every DAT, in input order."""
+        paths = [Path(p) for p in paths]
+        if not paths:
+            return []
+        self.refresh()
+        hashed = hash_many(
+            paths,
+            algorithms=IDENTIFY_ALGORITHMS,
+            max_workers=max_workers,
+            cancel_event=cancel_event,
+        )
+        results = []
+        for path in paths:
+            res = hashed.get(path)
+            hashes = res.hashes if res else {}
+            matches = self.identify(hashes, res.size) if hashes else []
+            results.append(IdentifyResult(path=path, hashes=hashes, matches=matches))
+        return results
+
+    def lookup(self, crc: str = None, md5: str = None, sha1: str = None) -> List[RomInfo]:
+        return [
+            RomInfo(
+                game_name=game_name,
+                rom_name=rom_name,
+                size=size,
+                crc=f"{rom_crc:08x}" if rom_crc is not None else None,
+                md5=rom_md5.hex() if rom_md5 else None,
+                sha1=rom_sha1.hex() if rom_sha1 else None,
+                dat_name=dat_name,
+            )
+            for _system, dat_name, _path, game_name, rom_name, size, rom_crc, rom_md5, rom_sha1 in self._query(
+                crc=crc, md5=md5, sha1=sha1
+            )
+        ]
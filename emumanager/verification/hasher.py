@@ -1,38 +1,206 @@
 from __future__ import annotations
 
 import hashlib
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Optional
 
-def calculate_hashes(
+from emumanager.common.chd import read_chd_header
+from emumanager.common.exceptions import EmuManagerError, WorkflowCancelledError
+from emumanager.config import get_performance_config
+from emumanager.verification import io_strategy as io_strategy_mod
+
+# CRC32 em paralelo só compensa em imagens grandes (ISO de PS2/Wii em NVMe)
+PARALLEL_CRC_MIN_SIZE = 256 * 1024 * 1024
+PARALLEL_CRC_WORKERS = min(4, os.cpu_count() or 1)
+
+_CRC32_POLY = 0xEDB88320
+# _CRC_ZERO_OPS[k]: matriz GF(2) que avança um CRC por 2**k bytes a zero
+_CRC_ZERO_OPS: list[list[int]] = []
+_CRC_OPS_LOCK = threading.Lock()
+
+
+def _gf2_times(mat: list[int], vec: int) -> int:
+    total = 0
+    i = 0
+    while vec:
+        if vec & 1:
+            total ^= mat[i]
+        vec >>= 1
+        i += 1
+    return total
+
+
+def _gf2_square(mat: list[int]) -> list[int]:
+    return [_gf2_times(mat, row) for row in mat]
+
+
+def _crc_zero_op(k: int) -> list[int]:
+    with _CRC_OPS_LOCK:
+        if not _CRC_ZERO_OPS:
+            # Operador para um único bit a zero, elevado ao quadrado até 8 bits
+            op = [_CRC32_POLY] + [1 << i for i in range(31)]
+            for _ in range(3):
+                op = _gf2_square(op)
+            _CRC_ZERO_OPS.append(op)
+        while len(_CRC_ZERO_OPS) <= k:
+            _CRC_ZERO_OPS.append(_gf2_square(_CRC_ZERO_OPS[-1]))
+        return _CRC_ZERO_OPS[k]
+
+
+def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+    """
+    CRC32 de ``A + B`` a partir de ``crc32(A)``, ``crc32(B)`` e ``len(B)``
+    (o mesmo algoritmo do ``crc32_combine`` do zlib, em Python puro).
+    """
+    k = 0
+    while len2 > 0:
+        if len2 & 1:
+            crc1 = _gf2_times(_crc_zero_op(k), crc1)
+        len2 >>= 1
+        k += 1
+    return (crc1 ^ crc2) & 0xFFFFFFFF
+
+
+def _crc32_range(
+    path: Path,
+    start: int,
+    length: int,
+    chunk_size: int,
+    advance: Callable[[int], None],
+    cancel_event: Any,
+    drop_cache: bool = False,
+) -> int:
+    crc = 0
+    buf = bytearray(min(chunk_size, max(length, 1)))
+    mv = memoryview(buf)
+    # Cada thread usa o seu próprio descritor (equivalente a pread sem partilhar offset)
+    with open(path, "rb", buffering=0) as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            if cancel_event is not None and cancel_event.is_set():
+                raise WorkflowCancelledError(f"hash {path.name}")
+            n = f.readinto(mv[: min(len(buf), remaining)])
+            if not n:
+                raise OSError(f"Leitura curta em {path} ({remaining} bytes em falta)")
+            crc = zlib.crc32(mv[:n], crc)
+            remaining -= n
+            advance(n)
+        if drop_cache:
+            io_strategy_mod.drop_cached_pages(f.fileno(), start, length)
+    return crc
+
+
+def parallel_crc32(
+    path: Path,
+    workers: int = PARALLEL_CRC_WORKERS,
+    chunk_size: int = 1024 * 1024,
+    progress_cb: Optional[Callable[[int], None]] = None,
+    cancel_event: Any = None,
+    drop_cache: bool = False,
+) -> str:
+    """
+    CRC32 de um único ficheiro dividido em ``workers`` intervalos lidos em
+    threads (``zlib.crc32`` liberta o GIL) e combinados com ``crc32_combine``.
+    O resultado é idêntico ao CRC sequencial.
+    """
+    size = Path(path).stat().st_size
+    workers = max(1, min(workers, size // chunk_size or 1))
+    span = -(-size // workers) if size else 0
+    ranges = [(start, min(span, size - start)) for start in range(0, size, span or 1)] or [(0, 0)]
+
+    lock = threading.Lock()
+    done = 0
 
+    def _advance(n: int) -> None:
+        nonlocal done
+        with lock:
+            done += n
+            current = done
+        if progress_cb:
+            progress_cb(current)
+
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="crc32") as pool:
+        futures = [
+            pool.submit(_crc32_range, path, start, length, chunk_size, _advance, cancel_event, drop_cache)
+            for start, length in ranges
+        ]
+        crcs = [future.result() for future in futures]
+
+    crc = crcs[0]
+    for (_, length), part in zip(ranges[1:], crcs[1:]):
+        crc = crc32_combine(crc, part, length)
+    return format(crc & 0xFFFFFFFF, "08x")
+
+
+def calculate_hashes(
     path: Path, 
     algorithms: tuple[str, ...] = ("crc32", "sha1"),
-    chunk_size: int = 1024 * 1024 # Buffer de 1MB para eficiência de cache L3
+    chunk_size: Optional[int] = None,
+    progress_cb: Optional[Callable[[int], None]] = None,
+    cancel_event: Any = None,
+    crc_workers: int = 1,
+    io_strategy: Optional[str] = None,
+    drop_cache: Optional[bool] = None,
 ) -> dict[str, str]:
     """
     Calcula múltiplos hashes em paralelo sobre o mesmo stream de leitura.
     Usa memoryview para reduzir overhead de memória em ficheiros gigantes.
+    ``progress_cb`` recebe os bytes lidos após cada bloco; ``cancel_event``
+    é verificado entre blocos e interrompe com ``WorkflowCancelledError``.
+    Com ``crc_workers > 1`` e apenas CRC32 pedido, ficheiros a partir de
+    ``PARALLEL_CRC_MIN_SIZE`` são divididos em intervalos (``parallel_crc32``).
+    Por omissão o buffer é ``PerformanceConfig.io_buffer_size``, a estratégia
+    de leitura a calibrada para o mount (``io_strategy.strategy_for``) e o
+    page cache é libertado no fim conforme ``io_drop_cache``.
     """
+    perf = get_performance_config()
+    chunk_size = chunk_size or perf.io_buffer_size
+    drop_cache = perf.io_drop_cache if drop_cache is None else drop_cache
+    strategy = io_strategy or io_strategy_mod.strategy_for(path)
+    if tuple(algorithms) == ("crc32",) and crc_workers > 1:
+        try:
+            if os.path.getsize(path) >= PARALLEL_CRC_MIN_SIZE:
+                crc = parallel_crc32(
+                    path,
+                    workers=crc_workers,
+                    chunk_size=chunk_size,
+                    progress_cb=progress_cb,
+                    cancel_event=cancel_event,
+                    drop_cache=drop_cache,
+                )
+                return {"crc32": crc}
+        except WorkflowCancelledError:
+            raise
+        except Exception as e:
+            import logging
+            logging.getLogger("verification.hasher").error(f"Erro ao calcular hashes de {path}: {e}")
+            return {}
+
     hash_objs = {alg: hashlib.new(alg) if alg != "crc32" else None for alg in algorithms}
     
     # Para CRC32 usamos zlib por ser ordens de magnitude mais rápido que hashlib
-    import zlib
     crc_val = 0
     
     try:
-        with open(path, "rb") as f:
-            # Buffer pré-alocado
-            buf = bytearray(chunk_size)
-            mv = memoryview(buf)
-            
-            while n := f.readinto(mv):
-                data = mv[:n]
+        with io_strategy_mod.open_chunks(path, strategy, chunk_size, drop_cache=drop_cache) as chunks:
+            done = 0
+            for data in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise WorkflowCancelledError(f"hash {path.name}")
                 if "crc32" in hash_objs:
                     crc_val = zlib.crc32(data, crc_val)
                 for alg, obj in hash_objs.items():
                     if obj:
                         obj.update(data)
-                        
+                done += len(data)
+                if progress_cb:
+                    progress_cb(done)
+
         results = {}
         if "crc32" in hash_objs:
             results["crc32"] = format(crc_val & 0xFFFFFFFF, "08x")
@@ -40,11 +208,63 @@ def calculate_hashes(
             if obj:
                 results[alg] = obj.hexdigest()
         return results
+    except WorkflowCancelledError:
+        raise
     except Exception as e:
         import logging
         logging.getLogger("verification.hasher").error(f"Erro ao calcular hashes de {path}: {e}")
         return {}
 
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+
+
+def calculate_fingerprint(
+    path: Path, sample_size: int = FINGERPRINT_SAMPLE_SIZE, middle: bool = False
+) -> str | tuple[str, bool]:
+    """
+    Impressão digital barata (SHA1 do tamanho + início + fim do ficheiro).
+    Lê no máximo 2 * sample_size bytes; não substitui um hash completo.
+
+    Com ``middle=True`` amostra também o meio (até 3 * sample_size bytes, para
+    separar ficheiros do mesmo tamanho) e devolve ``(fingerprint, completo)``:
+    ficheiros até 3 * sample_size são lidos inteiros e o fingerprint é o SHA1
+    normal do conteúdo (``completo=True``).
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        f.seek(0)
+        if middle and size <= 3 * sample_size:
+            return hashlib.sha1(f.read()).hexdigest(), True
+        h = hashlib.sha1()
+        h.update(size.to_bytes(8, "little"))
+        h.update(f.read(sample_size))
+        if middle:
+            offsets = ((size - sample_size) // 2, size - sample_size)
+        else:
+            offsets = (max(sample_size, size - sample_size),) if size > sample_size else ()
+        for offset in offsets:
+            f.seek(offset)
+            h.update(f.read(sample_size))
+    if middle:
+        return h.hexdigest(), False
+    return h.hexdigest()
+
+
+# Chave em extra_metadata: SHA1 dos dados descomprimidos, distinto do sha1 do contentor
+CHD_RAW_SHA1_KEY = "chd_raw_sha1"
+
+
+def read_chd_raw_sha1(path: Path) -> Optional[str]:
+    """
+    SHA1 dos dados descomprimidos gravado no cabeçalho CHD v5 (lê 124 bytes).
+    É comparável com o SHA1 de um DAT só quando a entrada foi calculada sobre o
+    mesmo fluxo (ex.: ISO de DVD); ``None`` se não for um CHD v5 legível.
+    """
+    try:
+        return read_chd_header(path).raw_sha1
+    except (OSError, EmuManagerError):
+        return None
+
 def get_file_hash(path: Path, algo: str = "sha1") -> str:
     """Legacy alias para o novo motor de hashing."""
     res = calculate_hashes(path, algorithms=(algo,))
@@ -0,0 +1,249 @@
+"""Sequential read strategies for hashing, with a per-mount calibration.
+
+Bulk hashing reads whole libraries once. Left alone, those reads fill the
+page cache and evict everything else on the host. Three strategies are
+available:
+- ``readinto``: plain reads into a reused buffer.
+- ``mmap``: a read-only mapping advised with ``MADV_SEQUENTIAL``.
+- ``fadvise``: ``readinto`` plus ``POSIX_FADV_SEQUENTIAL``. Pages already
+  hashed are released with ``POSIX_FADV_DONTNEED`` as the read advances.
+
+With ``drop_cache`` the other strategies also release the file's pages
+once it has been read. ``calibrate()`` times each strategy on a sample
+file and stores the fastest one per mount point in a small JSON profile.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from emumanager.common.exceptions import FileOperationError
+from emumanager.config import get_performance_config
+
+logger = logging.getLogger(__name__)
+
+IO_AUTO = "auto"
+IO_READINTO = "readinto"
+IO_MMAP = "mmap"
+IO_FADVISE = "fadvise"
+IO_STRATEGIES = (IO_READINTO, IO_MMAP, IO_FADVISE)
+
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+# Janela de páginas libertadas de cada vez pela estratégia fadvise
+DROP_WINDOW = 64 * 1024 * 1024
+CALIBRATION_SAMPLE = 256 * 1024 * 1024
+PROFILE_ENV = "EMUMANAGER_IO_PROFILE"
+
+_profile_lock = threading.Lock()
+_device_choice: dict[int, str] = {}
+
+
+def default_strategy() -> str:
+    return IO_FADVISE if HAS_FADVISE else IO_READINTO
+
+
+def drop_cached_pages(fd: int, offset: int = 0, length: int = 0) -> None:
+    """Ask the kernel to evict the page cache for a byte range (0 = to EOF)."""
+    if HAS_FADVISE:
+        try:
+            os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def _advise_sequential(fd: int) -> None:
+    if HAS_FADVISE:
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _read_chunks(f, chunk_size: int, drop_behind: bool) -> Iterator[memoryview]:
+    buf = bytearray(chunk_size)
+    mv = memoryview(buf)
+    fd = f.fileno()
+    done = dropped = 0
+    while n := f.readinto(mv):
+        chunk = mv[:n]
+        try:
+            yield chunk
+        finally:
+            chunk.release()
+        done += n
+        if drop_behind and done - dropped >= DROP_WINDOW:
+            drop_cached_pages(fd, dropped, done - dropped)
+            dropped = done
+
+
+def _mmap_chunks(f, size: int, chunk_size: int) -> Iterator[memoryview]:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        mv = memoryview(mapped)
+        try:
+            for offset in range(0, size, chunk_size):
+                chunk = mv[offset : offset + chunk_size]
+                try:
+                    yield chunk
+                finally:
+                    # O mapeamento só fecha sem vistas ativas sobre ele
+                    chunk.release()
+        finally:
+            mv.release()
+
+
+@contextmanager
+def open_chunks(
+    path: Path,
+    strategy: str = IO_READINTO,
+    chunk_size: int = 1024 * 1024,
+    drop_cache: bool = False,
+) -> Iterator[Iterator[memoryview]]:
+    """Open ``path`` and yield an iterator of sequential chunks.
+
+    Chunks are only valid until the next one is requested. With
+    ``drop_cache`` (always on for ``fadvise``) the file's cached pages are
+    released once reading ends.
+    """
+    with open(path, "rb", buffering=0) as f:
+        fd = f.fileno()
+        if strategy in (IO_FADVISE, IO_MMAP):
+            _advise_sequential(fd)
+        size = os.fstat(fd).st_size
+        try:
+            if strategy == IO_MMAP and size > 0:
+                yield _mmap_chunks(f, size, chunk_size)
+            else:
+                yield _read_chunks(f, chunk_size, drop_behind=strategy == IO_FADVISE)
+        finally:
+            if drop_cache or strategy == IO_FADVISE:
+                drop_cached_pages(fd)
+
+
+def profile_path() -> Path:
+    if custom := os.getenv(PROFILE_ENV):
+        return Path(custom)
+    cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "emumanager" / "io_profile.json"
+
+
+def mount_point(path: Path) -> Path:
+    path = Path(path).resolve()
+    while not os.path.ismount(path) and path.parent != path:
+        path = path.parent
+    return path
+
+
+def _load_profile() -> dict:
+    try:
+        return json.loads(profile_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_profile(profile: dict) -> None:
+    target = profile_path()
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(profile, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(target)
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar o perfil de I/O: {e}")
+
+
+def strategy_for(path: Path) -> str:
+    """Strategy for ``path``: the configured one, else the calibrated choice for its mount."""
+    configured = get_performance_config().io_strategy
+    if configured != IO_AUTO:
+        return configured
+    try:
+        device = os.stat(path).st_dev
+    except OSError:
+        return default_strategy()
+    choice = _device_choice.get(device)
+    if choice is None:
+        with _profile_lock:
+            entry = _load_profile().get(str(mount_point(path)), {})
+        choice = entry.get("strategy") if entry.get("strategy") in IO_STRATEGIES else default_strategy()
+        _device_choice[device] = choice
+    return choice
+
+
+def benchmark_strategies(
+    sample: Path,
+    chunk_size: Optional[int] = None,
+    strategies: tuple[str, ...] = IO_STRATEGIES,
+    limit: int = CALIBRATION_SAMPLE,
+) -> dict[str, float]:
+    """CRC32 the first ``limit`` bytes of ``sample`` once per strategy (cold cache when possible); returns MB/s."""
+    chunk_size = chunk_size or get_performance_config().io_buffer_size
+    results = {}
+    for strategy in strategies:
+        if strategy == IO_FADVISE and not HAS_FADVISE:
+            continue
+        with open(sample, "rb") as f:
+            drop_cached_pages(f.fileno())
+        start = time.perf_counter()
+        total = 0
+        with open_chunks(sample, strategy, chunk_size, drop_cache=True) as chunks:
+            for chunk in chunks:
+                # Tocar nos dados: com mmap o len() não chega a ler a página
+                zlib.crc32(chunk)
+                total += len(chunk)
+                if total >= limit:
+                    break
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        results[strategy] = total / elapsed / (1024 * 1024)
+    return results
+
+
+def _pick_sample(root: Path) -> Optional[Path]:
+    """Largest regular file under ``root`` (bounded walk)."""
+    best: Optional[Path] = None
+    best_size = -1
+    for seen, path in enumerate(root.rglob("*")):
+        if seen > 5000:
+            break
+        try:
+            if path.is_file() and (size := path.stat().st_size) > best_size:
+                best, best_size = path, size
+                if size >= CALIBRATION_SAMPLE:
+                    break
+        except OSError:
+            continue
+    return best
+
+
+def calibrate(root: Path, sample: Optional[Path] = None) -> dict:
+    """Benchmark the read strategies on ``root``'s mount and persist the fastest."""
+    root = Path(root)
+    sample = sample or _pick_sample(root)
+    if sample is None:
+        raise FileOperationError(str(root), f"Sem ficheiros para calibrar em {root}")
+    timings = benchmark_strategies(sample)
+    best = max(timings, key=timings.get)
+    mount = str(mount_point(root))
+    entry = {
+        "strategy": best,
+        "mb_per_sec": {name: round(value, 1) for name, value in timings.items()},
+        "sample": str(sample),
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with _profile_lock:
+        profile = _load_profile()
+        profile[mount] = entry
+        _save_profile(profile)
+    _device_choice.pop(os.stat(root).st_dev, None)
+    logger.info(f"Estratégia de I/O para {mount}: {best} ({entry['mb_per_sec']})")
+    return {"mount": mount, **entry}
@@ -13,6 +13,7 @@ from types import SimpleNamespace
 from typing import Any, Callable, Iterable, Optional
 
 from emumanager.library import LibraryDB
+from emumanager.library_db_writer import LibraryWriteProxy, LibraryWriterService
 from emumanager.logging_cfg import get_correlation_id, set_correlation_id, get_logger
 
 @dataclass(slots=True)
@@ -72,9 +73,34 @@ class WorkerResult:
                 f"Sucesso: {self.success_count}, Falhas: {self.failed_count}, "
                 f"Ignorados: {self.skipped_count}")
 
-def _mp_worker_init(cid: str | None):
+# Estado por processo filho: proxy de escrita e a instância do worker reutilizada entre itens
+_MP_DB: Optional[LibraryWriteProxy] = None
+_MP_WORKER: Optional["BaseWorker"] = None
+
+
+def _mp_worker_init(
+    cid: str | None,
+    write_queue: Any = None,
+    db_path: Optional[Path] = None,
+    worker_cls: Optional[type["BaseWorker"]] = None,
+    base_path: Optional[Path] = None,
+    mp_args: tuple = (),
+):
     """Inicializador para processos filhos."""
+    global _MP_DB, _MP_WORKER
     set_correlation_id(cid)
+    if write_queue is not None and db_path is not None:
+        _MP_DB = LibraryWriteProxy(write_queue, db_path)
+    if worker_cls is not None:
+        _MP_WORKER = worker_cls._build_mp_instance(base_path, *mp_args)
+
+
+def _mp_process_item(item: Path) -> tuple[str, float]:
+    """Processa um item no worker pré-construído deste processo filho."""
+    start = time.perf_counter()
+    status = _MP_WORKER._process_item(item)
+    return status, time.perf_counter() - start
+
 
 class BaseWorker(abc.ABC):
     """Motor de execução para tarefas em lote com suporte a Multiprocessing."""
@@ -84,14 +110,16 @@ class BaseWorker(abc.ABC):
         base_path: Path, 
         log_cb: Callable[[str], None], 
         progress_cb: Optional[Callable[[float, str], None]] = None, 
-        cancel_event: Optional[threading.Event] = None
+        cancel_event: Optional[threading.Event] = None,
+        db: Optional[LibraryDB] = None,
     ):
         self.base_path = Path(base_path).resolve()
         self.log_cb = log_cb
         self.progress_cb = progress_cb
         self.cancel_event = cancel_event or threading.Event()
         self.logger = get_logger(self.__class__.__name__)
-        self.db = LibraryDB()
+        # Processos filhos usam o proxy do escritor único em vez de abrir a DB
+        self.db = db or _MP_DB or LibraryDB()
         self._result = WorkerResult(task_name=self.__class__.__name__)
 
     def run(self, items: Iterable[Path], task_label: str = "Processando", parallel: bool = False, mp_args: tuple = ()) -> WorkerResult:
@@ -137,13 +165,22 @@ class BaseWorker(abc.ABC):
     def _run_parallel(self, items: list[Path], label: str, mp_args: tuple):
         total = len(items)
         max_workers = max(1, multiprocessing.cpu_count() - 1)
+        writer = LibraryWriterService(self.db)
         
-        with ProcessPoolExecutor(
+        with writer, ProcessPoolExecutor(
             max_workers=max_workers,
+            mp_context=writer.mp_context,
             initializer=_mp_worker_init,
-            initargs=(get_correlation_id(),)
+            initargs=(
+                get_correlation_id(),
+                writer.queue,
+                self.db.db_path,
+                self.__class__,
+                self.base_path,
+                mp_args,
+            ),
         ) as executor:
-            futures = {executor.submit(self.__class__._dispatch_mp, self.base_path, item, *mp_args): item for item in items}
+            futures = {executor.submit(_mp_process_item, item): item for item in items}
             
             for i, future in enumerate(as_completed(futures)):
                 if self.cancel_event.is_set():
@@ -161,14 +198,15 @@ class BaseWorker(abc.ABC):
                 except Exception as e:
                     self._result.add_error(item, str(e))
 
+        ack = writer.stop()
+        if ack.failed:
+            self.logger.error(f"{ack.failed} escritas na DB falharam durante {label}: {ack.errors[:3]}")
+
     @classmethod
-    def _dispatch_mp(cls, base_path: Path, item: Path, *args) -> tuple[str, float]:
-        """Ponto de entrada estático para o processo filho."""
-        start = time.perf_counter()
+    def _build_mp_instance(cls, base_path: Path, *args) -> "BaseWorker":
+        """Constrói a instância usada por um processo filho (uma vez por processo)."""
         # Inicializar sem cancel_event pois não é serializável
-        instance = cls(base_path, lambda x: None, None, None)
-        status = instance._process_item(item)
-        return status, time.perf_counter() - start
+        return cls(base_path, lambda x: None, None, None, *args)
 
 
     def _update_stats(self, status: str):
@@ -233,12 +271,12 @@ def find_tool(name: str) -> Optional[Path]:
 def _path_resolve(p: Optional[Path]) -> Optional[Path]:
     return p.resolve() if p and p.exists() else p
 
-def calculate_file_hash(path: Path, algo: str = "sha1", chunk_size: int = 1024 * 1024, progress_cb: Optional[Callable[[float], None]] = None) -> str:
+def calculate_file_hash(path: Path, algo: str = "sha1", chunk_size: Optional[int] = None, progress_cb: Optional[Callable[[float], None]] = None, cancel_event: Any = None) -> str:
     from emumanager.verification.hasher import calculate_hashes
-    # Simulação de progresso se progress_cb for passado
-    if progress_cb:
-        progress_cb(0.5)  # Simplificado
-    res = calculate_hashes(path, algorithms=(algo,), chunk_size=chunk_size)
+    size = path.stat().st_size if progress_cb else 0
+    # Progresso real por bloco lido (fração do tamanho do ficheiro)
+    on_chunk = (lambda done: progress_cb(done / size if size else 1.0)) if progress_cb else None
+    res = calculate_hashes(path, algorithms=(algo,), chunk_size=chunk_size, progress_cb=on_chunk, cancel_event=cancel_event)
     if progress_cb:
         progress_cb(1.0)
     return res.get(algo, "")
@@ -28,13 +28,23 @@ def _is_distributable_file(file_path: Path, logger: logging.Logger) -> bool:
     return True
 
 
-def _process_distribution_item(file_path: Path, base_path: Path, logger: logging.Logger, result: WorkerResult, library_db=None, cancel_event: Any = None):
+def _identify_systems(files: list[Path], hash_index: Any, logger: logging.Logger, cancel_event: Any = None) -> dict[Path, str]:
+    """Resolve o sistema de cada ficheiro pelo índice global de hashes (um hash por ficheiro)."""
+    try:
+        results = hash_index.identify_many(files, cancel_event=cancel_event)
+    except Exception as e:
+        logger.warning(f"Global DAT identification unavailable: {e}")
+        return {}
+    return {res.path: res.match.system_id for res in results if res.match and res.match.system_id}
+
+
+def _process_distribution_item(file_path: Path, base_path: Path, logger: logging.Logger, result: WorkerResult, library_db=None, cancel_event: Any = None, system: Optional[str] = None):
     """Detecta o sistema alvo e executa a movimentação física."""
     if cancel_event and cancel_event.is_set():
         return
     
     item_start = datetime.now()
-    system = guess_system_for_file(file_path)
+    system = system or guess_system_for_file(file_path)
     if not system:
         logger.warning(f"Could not determine system for: {file_path.name}")
         result.skipped_count += 1
@@ -81,10 +91,12 @@ def worker_distribute_root(
     progress_cb: Optional[Callable[[float, str], None]] = None,
     cancel_event: Any = None,
     library_db: Optional[Any] = None,
+    hash_index: Optional[Any] = None,
 ) -> WorkerResult:
     """
     Scans the root of base_path (roms folder) for files and moves them
-    to their respective system subfolders based on extension/heuristics.
+    to their respective system subfolders based on DAT hashes (when a
+    hash index is given) or extension/heuristics.
     
     Args:
         base_path: Root folder to scan for unorganized files
@@ -92,6 +104,7 @@ def worker_distribute_root(
         progress_cb: Progress callback
         cancel_event: Cancellation event
         library_db: Optional LibraryDB instance to update file paths in database
+        hash_index: Optional GlobalHashIndex used to route files by DAT match
     
     Returns WorkerResult with detailed stats.
     """
@@ -115,9 +128,17 @@ def worker_distribute_root(
         result.duration_ms = (datetime.now() - start_time).total_seconds() * 1000
         return result
 
-    total = len(root_files)
+    distributable = [f for f in root_files if _is_distributable_file(f, logger)]
+    result.skipped_count += len(root_files) - len(distributable)
+    total = len(distributable)
 
-    for i, file_path in enumerate(root_files):
+    systems: dict[Path, str] = {}
+    if hash_index is not None and distributable:
+        if progress_cb:
+            progress_cb(0.0, "Identifying files against DATs...")
+        systems = _identify_systems(distributable, hash_index, logger, cancel_event)
+
+    for i, file_path in enumerate(distributable):
         if cancel_event and cancel_event.is_set():
             logger.warning("Distribution cancelled by user.")
             break
@@ -125,10 +146,6 @@ def worker_distribute_root(
         if progress_cb:
             progress_cb(i / total, f"Distributing: {file_path.name}")
 
-        if not _is_distributable_file(file_path, logger):
-            result.skipped_count += 1
-            continue
-
         _process_distribution_item(
             file_path,
             base_path,
@@ -136,6 +153,7 @@ def worker_distribute_root(
             result,
             library_db=library_db,
             cancel_event=cancel_event,
+            system=systems.get(file_path),
         )
 
     result.duration_ms = (datetime.now() - start_time).total_seconds() * 1000
@@ -19,6 +19,7 @@ def _gather_duplicate_groups(
     progress_cb: Optional[Callable[[float, str], None]],
     log_cb: Optional[Callable[[str], None]],
     cancel_event: Any,
+    include_content: bool = True,
 ) -> list[DuplicateGroup]:
     groups: list[DuplicateGroup] = []
 
@@ -34,7 +35,22 @@ def _gather_duplicate_groups(
     if _is_canceled(cancel_event):
         return []
 
-    # 2. Name-based
+    # 2. Content-based (tamanho -> fingerprint parcial -> SHA1), apanha ficheiros sem hash
+    if include_content:
+        try:
+            content_groups = _find_content_duplicates(db, progress_cb, cancel_event)
+        except Exception as e:
+            content_groups = []
+            if log_cb:
+                log_cb(f"Duplicate scan (content) failed: {e}")
+        if _is_canceled(cancel_event):
+            return []
+        # Um grupo por conteúdo é um superconjunto do grupo sha1 com a mesma chave
+        content_keys = {g.key for g in content_groups}
+        groups = [g for g in groups if not (g.kind == "sha1" and g.key.lower() in content_keys)]
+        groups.extend(content_groups)
+
+    # 3. Name-based
     if include_name:
         if progress_cb:
             progress_cb(60.0, "Checking name duplicates...")
@@ -47,6 +63,20 @@ def _gather_duplicate_groups(
     return groups
 
 
+def _find_content_duplicates(
+    db: LibraryDB,
+    progress_cb: Optional[Callable[[float, str], None]],
+    cancel_event: Any,
+) -> list[DuplicateGroup]:
+    from emumanager.deduplication.staged import StagedDuplicateFinder
+
+    def _stage_progress(fraction: float, message: str) -> None:
+        if progress_cb:
+            progress_cb(20.0 + 40.0 * fraction, message)
+
+    return StagedDuplicateFinder(db).run(progress_cb=_stage_progress, cancel_event=cancel_event)
+
+
 def _serialize_groups(groups: list[DuplicateGroup]) -> list[dict[str, Any]]:
     return [
         {
@@ -69,6 +99,7 @@ def worker_find_duplicates(
     include_name: bool = True,
     filter_non_games: bool = True,
     hash_prefer: tuple[str, ...] = ("sha1", "md5", "crc32"),
+    include_content: bool = True,
 ) -> dict[str, Any]:
     """Find duplicates groups using the LibraryDB."""
     set_correlation_id()
@@ -80,7 +111,7 @@ def worker_find_duplicates(
         return {"groups": [], "total_groups": 0, "total_items": 0, "wasted_bytes": 0}
 
     groups = _gather_duplicate_groups(
-        db, hash_prefer, include_name, progress_cb, log_cb, cancel_event
+        db, hash_prefer, include_name, progress_cb, log_cb, cancel_event, include_content
     )
 
     if not groups and _is_canceled(cancel_event):
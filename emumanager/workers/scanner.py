@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
 
-from emumanager.library import LibraryEntry
+from emumanager.common.walker import LibraryWalker, WalkRecord, group_by_root
+from emumanager.library import SCAN_ENTRY_FIELDS, LibraryEntry
 from emumanager.workers.common import BaseWorker, set_correlation_id
 from emumanager.common.exceptions import (
     WorkflowError,
@@ -17,7 +19,9 @@ def is_compressed_file(p: Path) -> bool:
     return any(suffix.lower() in ARCHIVE_EXTS for suffix in p.suffixes)
 
 class ScannerWorker(BaseWorker):
-    def _process_file(self, f: Path) -> str:
+    _writer = None
+
+    def _process_item(self, f: Path) -> str:
         """
         Ponto de entrada padrão da BaseWorker não utilizado pelo ScannerWorker.
         A lógica de scan é orquestrada pelo método scan() e decomposta em métodos privados.
@@ -36,12 +40,22 @@ class ScannerWorker(BaseWorker):
         for path in existing_entries:
             if path not in found_paths:
                 try:
-                    self.db.remove_entry(path)
+                    if self._writer is not None:
+                        self._writer.remove(path)
+                    else:
+                        self.db.remove_entry(path)
                     self.stats["skipped"] += 1
                 except Exception as e:
                     self.logger.error(f"Erro ao remover entrada órfã {path}: {e}")
 
-    def _scan_single_file(self, file_path: Path, system_name: str, existing_entries: dict, found_paths: set):
+    def _scan_single_file(
+        self,
+        file_path: Path,
+        system_name: str,
+        existing_entries: dict,
+        found_paths: set,
+        stat: Optional[os.stat_result] = None,
+    ):
         """Analisa um ficheiro individual e atualiza a base de dados se necessário.
         
         Args:
@@ -49,12 +63,14 @@ class ScannerWorker(BaseWorker):
             system_name: Nome do sistema
             existing_entries: Entradas existentes na DB
             found_paths: Set de caminhos encontrados
+            stat: Stat já obtido pelo walker (o caminho é então absoluto)
         """
-        str_path = str(file_path.resolve())
+        str_path = str(file_path) if stat is not None else str(file_path.resolve())
         found_paths.add(str_path)
         
         try:
-            stat = file_path.stat()
+            if stat is None:
+                stat = file_path.stat()
             entry = existing_entries.get(str_path)
             
             # Skip se o ficheiro não mudou (performance optimization)
@@ -83,7 +99,10 @@ class ScannerWorker(BaseWorker):
                 match_name=entry.match_name if entry else None,
                 dat_name=entry.dat_name if entry else None,
             )
-            self.db.update_entry(new_entry)
+            if self._writer is not None:
+                self._writer.upsert(new_entry)
+            else:
+                self.db.update_entry(new_entry)
             self.stats["success"] += 1
         except OSError as e:
             self.logger.error(f"Erro ao ler ficheiro {file_path}: {e}")
@@ -95,14 +114,21 @@ class ScannerWorker(BaseWorker):
             self.logger.error(f"Erro inesperado ao processar ficheiro {file_path}: {e}")
             raise WorkflowError(f"Failed to process file: {e}") from e
 
-    def _process_system_directory(self, sys_dir: Path, existing_entries: dict, found_paths: set):
-        """Varre recursivamente os ficheiros de um sistema."""
+    def _process_system_directory(
+        self,
+        sys_dir: Path,
+        records: Iterable[WalkRecord],
+        existing_entries: dict,
+        found_paths: set,
+    ):
+        """Cataloga os ficheiros de um sistema encontrados pelo walker."""
         system_name = sys_dir.name
-        for file_path in sys_dir.rglob("*"):
+        for record in records:
             if self.cancel_event.is_set():
                 break
-            if file_path.is_file() and not file_path.name.startswith("."):
-                self._scan_single_file(file_path, system_name, existing_entries, found_paths)
+            self._scan_single_file(
+                record.path, system_name, existing_entries, found_paths, stat=record.stat
+            )
 
     def scan(self) -> dict:
         """Workflow mestre de auditoria de ficheiros."""
@@ -110,22 +136,35 @@ class ScannerWorker(BaseWorker):
         roms_dir = self._resolve_roms_dir()
         self.logger.info(f"Scanning library at {roms_dir}")
         
-        existing_entries = {entry.path: entry for entry in self.db.get_all_entries()}
+        self.stats = {"success": 0, "skipped": 0}
+        existing_entries = {
+            entry.path: entry for entry in self.db.iter_entries(columns=SCAN_ENTRY_FIELDS)
+        }
         found_paths = set()
         
-        system_dirs = [d for d in roms_dir.iterdir() if d.is_dir() and not d.name.startswith(".")]
+        walker = LibraryWalker()
+        system_dirs = [d for d in roms_dir.iterdir() if d.is_dir() and not walker.rules.skip_dir(d.name)]
         total_systems = len(system_dirs)
-
-        for i, sys_dir in enumerate(system_dirs):
-            if self.cancel_event.is_set():
-                break
-            
-            if self.progress_cb:
-                self.progress_cb(i / total_systems, f"Scanning {sys_dir.name}...")
-            
-            self._process_system_directory(sys_dir, existing_entries, found_paths)
-
-        self._cleanup_missing_files(existing_entries, found_paths)
+        positions = {sys_dir: i for i, sys_dir in enumerate(system_dirs)}
+        batches = walker.walk(system_dirs, cancel_event=self.cancel_event)
+
+        # Um único buffer de escrita por scan: uma transação por lote em vez de por ficheiro
+        with self.db.batch_writer() as writer:
+            self._writer = writer
+            try:
+                for sys_dir, records in group_by_root(batches):
+                    if self.cancel_event.is_set():
+                        break
+
+                    if self.progress_cb:
+                        self.progress_cb(positions[sys_dir] / total_systems, f"Scanning {sys_dir.name}...")
+
+                    self._process_system_directory(sys_dir, records, existing_entries, found_paths)
+
+                if not self.cancel_event.is_set():
+                    self._cleanup_missing_files(existing_entries, found_paths)
+            finally:
+                self._writer = None
 
         if self.progress_cb:
             self.progress_cb(1.0, "Scan complete")
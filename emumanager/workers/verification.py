@@ -1,38 +1,110 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterable, Optional
 
+from emumanager.common.exceptions import DATParseError
 from emumanager.common.models import VerifyReport
-from emumanager.verification import dat_parser, hasher
+from emumanager.library import LibraryDB
+from emumanager.verification import dat_parser, hash_engine, hasher
+from emumanager.verification.dat_index import CompiledDatIndex, load_dat_index
 from emumanager.verification.dat_manager import find_dat_for_system
+from emumanager.verification.hash_index import GlobalHashIndex
 from emumanager.workers.common import BaseWorker, set_correlation_id
 
+# Ordem igual aos argumentos de _lookup_and_save
+HASH_ALGORITHMS = ("crc32", "md5", "sha1")
+
+
 class HashVerifyWorker(BaseWorker):
-    """Worker especializado em verificação de integridade via DAT com Multiprocessing."""
+    """Worker especializado em verificação de integridade via DAT com hashing paralelo."""
 
-    def __init__(self, base_path: Path, log_cb: Callable, progress_cb: Optional[Callable], cancel_event: Any, dat_db: dat_parser.DatDb):
-        super().__init__(base_path, log_cb, progress_cb, cancel_event)
+    def __init__(self, base_path: Path, log_cb: Callable, progress_cb: Optional[Callable], cancel_event: Any, dat_db: dat_parser.DatDb | CompiledDatIndex | GlobalHashIndex, db: Optional[LibraryDB] = None):
+        super().__init__(base_path, log_cb, progress_cb, cancel_event, db=db)
         self.dat_db = dat_db
+        self._writer = None
+        self._prepared: dict[Path, tuple] = {}
+        self._chd_matches: dict[Path, tuple[str, dat_parser.RomInfo]] = {}
 
-    def _process_item(self, f: Path) -> str:
-        abs_path = str(f.resolve())
-        entry = self.db.get_entry(abs_path)
+    def run(self, items: Iterable[Path], task_label: str = "Processando", parallel: bool = False, mp_args: tuple = ()):
+        """Calcula os hashes em paralelo (hash_many) e depois consulta o DAT em lote.
+
+        ``parallel``/``mp_args`` ficam por compatibilidade: o hashing já corre num
+        pool de threads, e a consulta ao DAT é barata demais para justificar processos.
+        """
+        del parallel, mp_args
+        item_list = list(items)
+        with self.db.batch_writer() as writer:
+            self._writer = writer
+            try:
+                self._prepare_hashes(item_list, task_label)
+                return super().run(item_list, task_label=task_label)
+            finally:
+                self._writer = None
+                self._prepared = {}
+                self._chd_matches = {}
+
+    def _known_hashes(self, f: Path) -> Optional[tuple]:
+        """Hashes já na DB para o ficheiro, se tamanho e mtime não mudaram."""
+        entry = self.db.get_entry(str(f.resolve()))
         stat = f.stat()
-        
         if entry and entry.size == stat.st_size and abs(entry.mtime - stat.st_mtime) < 1.0:
             if entry.sha1 or entry.crc32:
-                return self._lookup_and_save(f, entry.crc32, entry.md5, entry.sha1)
+                return entry.crc32, entry.md5, entry.sha1
+        return None
 
-        algos = ("crc32", "md5", "sha1")
-        hashes = hasher.calculate_hashes(f, algorithms=algos)
-        
-        return self._lookup_and_save(
-            f, 
-            hashes.get("crc32"), 
-            hashes.get("md5"), 
-            hashes.get("sha1")
+    def _prepare_hashes(self, items: list[Path], task_label: str) -> None:
+        self._prepared = {}
+        self._chd_matches = {}
+        to_hash = []
+        for f in items:
+            if f.suffix.lower() == ".chd" and self._match_chd_header(f):
+                continue
+            try:
+                known = self._known_hashes(f)
+            except OSError:
+                continue
+            if known:
+                self._prepared[f] = known
+            else:
+                to_hash.append(f)
+        if not to_hash:
+            return
+
+        def _on_progress(progress: hash_engine.HashProgress) -> None:
+            if self.progress_cb:
+                self.progress_cb(progress.fraction, f"{task_label}: {progress.describe()}")
+
+        results = hash_engine.hash_many(
+            to_hash,
+            algorithms=HASH_ALGORITHMS,
+            progress_cb=_on_progress,
+            cancel_event=self.cancel_event,
         )
+        for f, result in results.items():
+            if result.ok:
+                self._prepared[f] = tuple(result.hashes.get(algo) for algo in HASH_ALGORITHMS)
+
+    def _match_chd_header(self, f: Path) -> bool:
+        """Verifica o CHD pelo SHA1 descomprimido do cabeçalho, sem hashear o contentor."""
+        raw_sha1 = hasher.read_chd_raw_sha1(f)
+        matches = self.dat_db.lookup(sha1=raw_sha1) if raw_sha1 else []
+        if not matches:
+            return False
+        self._chd_matches[f] = (raw_sha1, matches[0])
+        return True
+
+    def _process_item(self, f: Path) -> str:
+        chd_match = self._chd_matches.pop(f, None)
+        if chd_match:
+            return self._save_chd_match(f, *chd_match)
+        prepared = self._prepared.pop(f, None) or self._known_hashes(f)
+        if prepared:
+            return self._lookup_and_save(f, *prepared)
+
+        hashes = hasher.calculate_hashes(f, algorithms=HASH_ALGORITHMS, cancel_event=self.cancel_event)
+        return self._lookup_and_save(f, *(hashes.get(algo) for algo in HASH_ALGORITHMS))
 
     def _lookup_and_save(self, f: Path, crc: str | None, md5: str | None, sha1: str | None) -> str:
         matches = self.dat_db.lookup(crc=crc, md5=md5, sha1=sha1)
@@ -41,20 +113,25 @@ class HashVerifyWorker(BaseWorker):
         status = "VERIFIED" if match else "UNKNOWN"
         match_name = match.game_name if match else None
         
-        self.db.update_entry_fields(
-            str(f.resolve()),
-            status=status,
-            match_name=match_name,
-            crc32=crc,
-            md5=md5,
-            sha1=sha1
-        )
+        fields = dict(status=status, match_name=match_name, crc32=crc, md5=md5, sha1=sha1)
+        if self._writer is not None:
+            self._writer.update_fields(str(f.resolve()), **fields)
+        else:
+            self.db.update_entry_fields(str(f.resolve()), **fields)
         return "success" if match else "skipped"
 
-    @classmethod
-    def _dispatch_mp(cls, base_path: Path, item: Path, dat_db: Any) -> str:
-        instance = cls(base_path, lambda x: None, None, None, dat_db)
-        return instance._process_item(item)
+    def _save_chd_match(self, f: Path, raw_sha1: str, match: dat_parser.RomInfo) -> str:
+        # crc32/md5/sha1 continuam a ser os do contentor: o SHA1 raw vai só para extra_metadata
+        path = str(f.resolve())
+        entry = self.db.get_entry(path)
+        extra = dict(entry.extra_metadata) if entry else {}
+        extra[hasher.CHD_RAW_SHA1_KEY] = raw_sha1
+        fields = dict(status="VERIFIED", match_name=match.game_name, extra_json=json.dumps(extra))
+        if self._writer is not None:
+            self._writer.update_fields(path, **fields)
+        else:
+            self.db.update_entry_fields(path, **fields)
+        return "success"
 
 def worker_hash_verify(
     base_path: Path,
@@ -65,13 +142,20 @@ def worker_hash_verify(
     set_correlation_id()
     dat_root = getattr(args, "dats_root", base_path / "dats")
     dat_path = find_dat_for_system(Path(dat_root), base_path.name)
-    
-    if not dat_path or not dat_path.exists():
-        return VerifyReport(text="Erro: DAT não encontrado.")
 
-    dat_db = dat_parser.parse_dat_file(dat_path)
+    if dat_path and dat_path.exists():
+        try:
+            dat_db = load_dat_index(dat_path)
+        except DATParseError as exc:
+            return VerifyReport(text=f"Erro: {exc}")
+    else:
+        # Pasta sem sistema conhecido (raiz, pasta errada): verificar contra todos os DATs
+        dat_db = GlobalHashIndex(Path(dat_root))
+        dat_db.refresh()
+        if not dat_db.dat_count():
+            return VerifyReport(text="Erro: DAT não encontrado.")
     worker = HashVerifyWorker(base_path, log_cb, getattr(args, "progress_callback", None), getattr(args, "cancel_event", None), dat_db)
     
     files = list_files_fn(base_path)
-    result = worker.run(files, task_label="Verificação DAT", parallel=True, mp_args=(dat_db,))
+    result = worker.run(files, task_label="Verificação DAT")
     return VerifyReport(text=str(result))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark do parser de DATs: tempo de parse e pico de memória num DAT sintético.
+Usage: python3 scripts/bench_dat_parser.py [--format xml|clrmamepro] [--games N]
+       [--roms-per-game N] [--gzip]
+
+Cada formato é comparado com a implementação anterior (copiada abaixo).
+"""
+
+import argparse
+import gzip
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Ensure we can import from the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emumanager.verification import dat_parser  # noqa: E402
+
+
+def write_synthetic_xml_dat(path: Path, games: int, roms_per_game: int, compress: bool) -> None:
+    """Gera um DAT XML no estilo Redump/MAME com hashes únicos por ROM."""
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write('<?xml version="1.0"?>\n<datafile>\n')
+        f.write("  <header><name>Synthetic</name><version>1</version></header>\n")
+        for g in range(games):
+            f.write(f'  <game name="Game {g:07d} (World)">\n')
+            f.write(f"    <description>Game {g:07d} (World)</description>\n")
+            for r in range(roms_per_game):
+                n = g * roms_per_game + r
+                f.write(
+                    f'    <rom name="Game {g:07d} (Track {r:02d}).bin" size="{n * 2048}" '
+                    f'crc="{n & 0xFFFFFFFF:08x}" md5="{n:032x}" sha1="{n:040x}"/>\n'
+                )
+            f.write("  </game>\n")
+        f.write("</datafile>\n")
+
+
+def write_synthetic_clrmamepro_dat(
+    path: Path, games: int, roms_per_game: int, compress: bool
+) -> None:
+    """Gera um DAT ClrMamePro (No-Intro/TOSEC) equivalente ao XML sintético."""
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write('clrmamepro (\n\tname "Synthetic"\n\tversion "1"\n)\n\n')
+        for g in range(games):
+            f.write(f'game (\n\tname "Game {g:07d} (World)"\n')
+            f.write(f'\tdescription "Game {g:07d} (World)"\n')
+            for r in range(roms_per_game):
+                n = g * roms_per_game + r
+                f.write(
+                    f'\trom ( name "Game {g:07d} (Track {r:02d}).bin" size {n * 2048} '
+                    f"crc {n & 0xFFFFFFFF:08x} md5 {n:032x} sha1 {n:040x} )\n"
+                )
+            f.write(")\n\n")
+
+
+def _parse_xml_tree(dat_path: Path) -> dat_parser.DatDb:
+    """Implementação anterior (ET.parse da árvore completa), só para comparação."""
+    db = dat_parser.DatDb()
+    root = ET.parse(dat_path).getroot()
+    header = root.find("header")
+    if header is not None:
+        db.name = header.findtext("name") or ""
+        db.version = header.findtext("version") or ""
+    for game in root.findall("game"):
+        for rom in game.findall("rom"):
+            db.add_rom(
+                dat_parser.RomInfo(
+                    game_name=game.get("name", "Unknown"),
+                    rom_name=rom.get("name", "Unknown"),
+                    size=int(rom.get("size", "0")),
+                    crc=rom.get("crc"),
+                    md5=rom.get("md5"),
+                    sha1=rom.get("sha1"),
+                    dat_name=db.name,
+                )
+            )
+    return db
+
+
+# Implementação anterior do parser ClrMamePro (str completa + regex por ROM).
+_RE_NAME = re.compile(r'name\s+"([^"]+)"')
+_RE_VERSION = re.compile(r'version\s+"([^"]+)"')
+_RE_SIZE = re.compile(r"size\s+(\d+)")
+_RE_CRC = re.compile(r"crc\s+([0-9A-Fa-f]+)")
+_RE_MD5 = re.compile(r"md5\s+([0-9A-Fa-f]+)")
+_RE_SHA1 = re.compile(r"sha1\s+([0-9A-Fa-f]+)")
+
+
+def _extract_nested_blocks(content: str, pattern: str):
+    for match in re.finditer(pattern, content):
+        start = match.end()
+        depth = 1
+        end = start
+        while depth > 0 and end < len(content):
+            if content[end] == "(":
+                depth += 1
+            elif content[end] == ")":
+                depth -= 1
+            end += 1
+        if depth == 0:
+            yield content[start : end - 1]
+
+
+def _parse_clrmamepro_regex(dat_path: Path) -> dat_parser.DatDb:
+    db = dat_parser.DatDb()
+    content = dat_path.read_text(encoding="utf-8", errors="ignore")
+    header_match = re.search(r"clrmamepro\s*\((.*?)\)", content, re.DOTALL)
+    if header_match:
+        name_match = _RE_NAME.search(header_match.group(1))
+        if name_match:
+            db.name = name_match.group(1)
+        version_match = _RE_VERSION.search(header_match.group(1))
+        if version_match:
+            db.version = version_match.group(1)
+
+    for game_block in _extract_nested_blocks(content, r"game\s*\("):
+        name_match = _RE_NAME.search(game_block)
+        game_name = name_match.group(1) if name_match else "Unknown"
+        for rom_content in _extract_nested_blocks(game_block, r"rom\s*\("):
+            name_match = _RE_NAME.search(rom_content)
+            size_match = _RE_SIZE.search(rom_content)
+            crc_match = _RE_CRC.search(rom_content)
+            md5_match = _RE_MD5.search(rom_content)
+            sha1_match = _RE_SHA1.search(rom_content)
+            db.add_rom(
+                dat_parser.RomInfo(
+                    game_name=game_name,
+                    rom_name=name_match.group(1) if name_match else "Unknown",
+                    size=int(size_match.group(1)) if size_match else 0,
+                    crc=crc_match.group(1) if crc_match else None,
+                    md5=md5_match.group(1) if md5_match else None,
+                    sha1=sha1_match.group(1) if sha1_match else None,
+                    dat_name=db.name,
+                )
+            )
+    return db
+
+
+def measure(label: str, parse, dat_path: Path) -> dat_parser.DatDb:
+    # Tempo medido sem tracemalloc (que abranda muito a alocação); o pico de
+    # memória vem de uma segunda passagem instrumentada.
+    started = time.perf_counter()
+    db = parse(dat_path)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    parse(dat_path)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size_mb = dat_path.stat().st_size / (1024 * 1024)
+    print(
+        f"{label:<18} {elapsed:7.2f} s  {size_mb / elapsed:7.1f} MB/s  "
+        f"peak {peak / (1024 * 1024):8.1f} MB  roms {len(db)}"
+    )
+    return db
+
+
+def _records(db: dat_parser.DatDb) -> list:
+    return sorted(
+        (r.game_name, r.rom_name, r.size, r.crc, r.md5, r.sha1) for r in db.iter_roms()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DAT parsers")
+    parser.add_argument("--format", choices=("xml", "clrmamepro"), default="xml")
+    parser.add_argument("--games", type=int, default=50_000)
+    parser.add_argument("--roms-per-game", type=int, default=4)
+    parser.add_argument("--gzip", action="store_true", help="Compress the synthetic DAT")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dat_path = Path(tmp) / ("synthetic.dat.gz" if args.gzip else "synthetic.dat")
+        if args.format == "xml":
+            write_synthetic_xml_dat(dat_path, args.games, args.roms_per_game, args.gzip)
+            current, legacy = ("iterparse", dat_parser.parse_dat_file), ("ET.parse (old)", _parse_xml_tree)
+        else:
+            write_synthetic_clrmamepro_dat(dat_path, args.games, args.roms_per_game, args.gzip)
+            current, legacy = ("tokenizer", dat_parser.parse_dat_file), ("regex (old)", _parse_clrmamepro_regex)
+        print(f"DAT: {dat_path.name} ({dat_path.stat().st_size / (1024 * 1024):.1f} MB on disk)")
+        db = measure(*current, dat_path)
+        if not args.gzip:
+            old_db = measure(*legacy, dat_path)
+            same = _records(db) == _records(old_db)
+            print(f"Mesmos registos: {'sim' if same else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
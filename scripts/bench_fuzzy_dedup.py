@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark da deteção fuzzy de duplicados: índice de trigramas vs. O(n²).
+Usage: python3 scripts/bench_fuzzy_dedup.py [--sizes 10000,100000,1000000]
+       [--systems 10] [--legacy-max 5000] [--threshold 0.85] [--min-overlap 0.3]
+
+Gera nomes sintéticos no estilo No-Intro (com variantes com erros de
+digitação e tags de região), repartidos por sistemas. Até --legacy-max
+nomes o resultado também é comparado com a comparação todos-com-todos
+(pares perdidos pelo índice; --min-overlap 0 é exato).
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+# Ensure we can import from the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emumanager.deduplication.fuzzy_index import DEFAULT_MIN_OVERLAP, FuzzyNameIndex  # noqa: E402
+from emumanager.library import normalize_game_name  # noqa: E402
+
+WORDS = (
+    "super mario zelda legend of the final fantasy kingdom hearts grand theft auto street "
+    "fighter metal gear solid sonic hedgehog racing world cup tales star wars dragon quest "
+    "castlevania mega man resident evil silent hill tekken soul calibur gran turismo ridge "
+    "racer crash bandicoot spyro jak daxter ratchet clank kirby pokemon metroid donkey kong"
+).split()
+SYLLABLES = "ka ri to mon sha del vor en ix al tra po lu gen zar fi ne os mi ra do be cy qu".split()
+TAGS = ("(USA)", "(Europe)", "(Japan)", "(World)", "(USA) (Rev 1)", "(Europe) (En,Fr,De)")
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    chars = list(name)
+    for _ in range(rng.randint(1, 2)):
+        pos = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.4:
+            chars[pos] = rng.choice(string.ascii_lowercase)
+        elif op < 0.7:
+            chars.insert(pos, rng.choice(string.ascii_lowercase))
+        elif len(chars) > 3:
+            del chars[pos]
+    return "".join(chars)
+
+
+def _vocabulary(rng: random.Random, size: int = 3000) -> list[str]:
+    """Palavras comuns de títulos mais pseudo-palavras (nomes próprios, subtítulos)."""
+    words = list(WORDS) * 20
+    while len(words) < size + len(WORDS) * 20:
+        words.append("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return words
+
+
+def synthetic_names(count: int, systems: int, seed: int = 1) -> dict[int, list[str]]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng)
+    by_system: dict[int, list[str]] = {s: [] for s in range(systems)}
+    for i in range(count):
+        if i and rng.random() < 0.3:
+            # Variante de um título já existente (duplicado plausível)
+            system = rng.randrange(systems)
+            pool = by_system[system] or by_system[0]
+            base = rng.choice(pool).rsplit(" (", 1)[0] if pool else "tetris"
+            name = _typo(base, rng) if rng.random() < 0.5 else base
+        else:
+            system = rng.randrange(systems)
+            name = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(2, 5)))
+        by_system[system].append(f"{name.title()} {rng.choice(TAGS)}.iso")
+    return by_system
+
+
+def indexed_pairs(
+    names: list[str], threshold: float, min_overlap: float
+) -> tuple[set[tuple[int, int]], FuzzyNameIndex]:
+    index = FuzzyNameIndex(names, threshold, min_overlap)
+    pairs = set()
+    for i in range(len(names)):
+        for j in index.candidates(i):
+            if index.could_match(i, j) and SequenceMatcher(None, names[i], names[j]).ratio() >= threshold:
+                pairs.add((i, j))
+    return pairs, index
+
+
+def legacy_pairs(names: list[str], threshold: float) -> set[tuple[int, int]]:
+    return {
+        (i, j)
+        for i in range(len(names))
+        for j in range(i + 1, len(names))
+        if SequenceMatcher(None, names[i], names[j]).ratio() >= threshold
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--systems", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--min-overlap", type=float, default=DEFAULT_MIN_OVERLAP)
+    parser.add_argument("--legacy-max", type=int, default=5000, help="Maior n em que se corre o O(n²)")
+    args = parser.parse_args()
+
+    print(f"{'nomes':>9} {'tempo':>9} {'candidatos':>11} {'pontuados':>10} {'pares':>8} {'O(n²) pares':>12}")
+    for count in (int(size) for size in args.sizes.split(",")):
+        by_system = synthetic_names(count, args.systems)
+        normalized = {s: [normalize_game_name(n) for n in names] for s, names in by_system.items()}
+
+        start = time.perf_counter()
+        probed = bounded = found = 0
+        all_pairs = {}
+        for system, names in normalized.items():
+            pairs, index = indexed_pairs(names, args.threshold, args.min_overlap)
+            all_pairs[system] = pairs
+            probed += index.pairs_probed
+            bounded += index.pairs_bounded
+            found += len(pairs)
+        elapsed = time.perf_counter() - start
+        brute = sum(len(n) * (len(n) - 1) // 2 for n in normalized.values())
+        print(f"{count:>9} {elapsed:>8.2f}s {probed:>11} {bounded:>10} {found:>8} {brute:>12}")
+
+        if count <= args.legacy_max:
+            start = time.perf_counter()
+            missed = 0
+            for system, names in normalized.items():
+                expected = legacy_pairs(names, args.threshold)
+                if all_pairs[system] - expected:
+                    print(f"Pares inválidos no sistema {system}")
+                    return 1
+                missed += len(expected - all_pairs[system])
+            elapsed = time.perf_counter() - start
+            print(f"{'':>9} {elapsed:>8.2f}s  O(n²): {missed} pares perdidos pelo índice")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,33 @@
+import binascii
+import hashlib
+import lzma
+import struct
+import zlib
 from dataclasses import dataclass
-from typing import Optional
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+from emumanager.common.chd import (
+    _ECC_P_OFFSET,
+    CD_FRAME_SIZE,
+    CD_SECTOR_SIZE,
+    CD_SYNC_HEADER,
+    CHD_MAGIC,
+    CHD_MAP_HEADER,
+    CHD_METADATA_HEADER,
+    CHD_V5_HEADER,
+    COMPRESSION_NONE,
+    COMPRESSION_RLE_LARGE,
+    COMPRESSION_RLE_SMALL,
+    COMPRESSION_SELF,
+    COMPRESSION_TYPE_0,
+    ChdHeader,
+    ChdMetadata,
+    _lzma_dict_size,
+    compute_overall_sha1,
+    ecc_generate,
+)
 
 
 @dataclass
@@ -12,3 +40,305 @@ class Args:
     quarantine_dir: Optional[str] = None
     cmd_timeout: Optional[int] = None
     keep_on_failure: bool = False
+
+
+ISO_SECTOR_SIZE = 2048
+CD_SYNC = b"\x00" + b"\xff" * 10 + b"\x00"
+
+
+def _iso_dir_record(name: bytes, extent: int, size: int, is_dir: bool) -> bytes:
+    length = 33 + len(name) + (1 - len(name) % 2)
+    record = bytearray(length)
+    record[0] = length
+    struct.pack_into("<I", record, 2, extent)
+    struct.pack_into(">I", record, 6, extent)
+    struct.pack_into("<I", record, 10, size)
+    struct.pack_into(">I", record, 14, size)
+    record[25] = 0x02 if is_dir else 0
+    record[32] = len(name)
+    record[33 : 33 + len(name)] = name
+    return bytes(record)
+
+
+def build_iso9660(files: dict[str, bytes], filler: bytes = b"") -> bytes:
+    """ISO9660 mínima: raiz + diretorias de um nível, ficheiros a partir do setor 24."""
+    dirs = sorted({name.split("/")[0] for name in files if "/" in name})
+    dir_lba = {"": 19, **{d: 20 + i for i, d in enumerate(dirs)}}
+    next_lba = 24 + (len(filler) + ISO_SECTOR_SIZE - 1) // ISO_SECTOR_SIZE
+    file_lba = {}
+    for name, data in files.items():
+        file_lba[name] = next_lba
+        next_lba += max(1, (len(data) + ISO_SECTOR_SIZE - 1) // ISO_SECTOR_SIZE)
+
+    image = bytearray(next_lba * ISO_SECTOR_SIZE)
+
+    def _put(lba: int, data: bytes) -> None:
+        image[lba * ISO_SECTOR_SIZE : lba * ISO_SECTOR_SIZE + len(data)] = data
+
+    for directory, lba in dir_lba.items():
+        parent = 19
+        records = _iso_dir_record(b"\x00", lba, ISO_SECTOR_SIZE, True)
+        records += _iso_dir_record(b"\x01", parent, ISO_SECTOR_SIZE, True)
+        if not directory:
+            records += b"".join(
+                _iso_dir_record(d.encode(), dir_lba[d], ISO_SECTOR_SIZE, True) for d in dirs
+            )
+        for name, data in files.items():
+            head, _, leaf = name.rpartition("/")
+            if head == directory:
+                records += _iso_dir_record(f"{leaf};1".encode(), file_lba[name], len(data), False)
+        _put(lba, records)
+
+    path_table = struct.pack("<BBIH", 1, 0, 19, 1) + b"\x00\x00"
+    for directory in dirs:
+        name = directory.encode()
+        path_table += struct.pack("<BBIH", len(name), 0, dir_lba[directory], 1) + name
+        path_table += b"\x00" * (len(name) % 2)
+    _put(18, path_table)
+
+    pvd = bytearray(ISO_SECTOR_SIZE)
+    pvd[0:7] = b"\x01CD001\x01"
+    pvd[40:72] = b"TEST_DISC".ljust(32)
+    struct.pack_into("<I", pvd, 132, len(path_table))
+    struct.pack_into("<I", pvd, 140, 18)
+    pvd[156:190] = _iso_dir_record(b"\x00", 19, ISO_SECTOR_SIZE, True)
+    _put(16, pvd)
+    _put(17, b"\xffCD001\x01")
+    _put(24, filler)
+    for name, data in files.items():
+        _put(file_lba[name], data)
+    return bytes(image)
+
+
+def to_raw_sectors(iso: bytes, mode2: bool) -> bytes:
+    """Converte setores de 2048 em setores raw de 2352 (Mode1 ou Mode2/XA Form1)."""
+    sectors = []
+    for offset in range(0, len(iso), ISO_SECTOR_SIZE):
+        header = CD_SYNC + (b"\x00\x02\x00\x02" if mode2 else b"\x00\x02\x00\x01")
+        if mode2:
+            header += b"\x00\x00\x08\x00" * 2
+        sector = header + iso[offset : offset + ISO_SECTOR_SIZE]
+        sectors.append(sector.ljust(2352, b"\x00"))
+    return b"".join(sectors)
+
+
+# Escritor CHD v5 mínimo para fixtures (o leitor vive em emumanager.common.chd)
+
+
+class _BitWriter:
+    def __init__(self):
+        self._value = 0
+        self._bits = 0
+
+    def write(self, value: int, count: int) -> None:
+        if count:
+            self._value = (self._value << count) | (value & ((1 << count) - 1))
+            self._bits += count
+
+    def getvalue(self) -> bytes:
+        padding = -self._bits % 8
+        return (self._value << padding).to_bytes((self._bits + padding) // 8, "big")
+
+
+def _ecc_matches(sector: bytes) -> bool:
+    regenerated = bytearray(sector)
+    ecc_generate(regenerated)
+    return regenerated == sector
+
+
+def _deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_lzma(data: bytes) -> bytes:
+    dict_size = _lzma_dict_size(len(data))
+    filters = [{"id": lzma.FILTER_LZMA1, "dict_size": dict_size, "lc": 3, "lp": 0, "pb": 2}]
+    return lzma.compress(data, format=lzma.FORMAT_RAW, filters=filters)
+
+
+def _compress_zstd(data: bytes) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _compress_cd(
+    base: Callable[[bytes], bytes],
+    subcode: Callable[[bytes], bytes],
+    data: bytes,
+) -> bytes:
+    frames = len(data) // CD_FRAME_SIZE
+    ecc_map = bytearray((frames + 7) // 8)
+    sectors = bytearray()
+    subcodes = bytearray()
+    for frame in range(frames):
+        raw = data[frame * CD_FRAME_SIZE : (frame + 1) * CD_FRAME_SIZE]
+        sector = bytearray(raw[:CD_SECTOR_SIZE])
+        if sector[: len(CD_SYNC_HEADER)] == CD_SYNC_HEADER and _ecc_matches(sector):
+            ecc_map[frame // 8] |= 1 << (frame % 8)
+            sector[: len(CD_SYNC_HEADER)] = bytes(len(CD_SYNC_HEADER))
+            sector[_ECC_P_OFFSET:] = bytes(CD_SECTOR_SIZE - _ECC_P_OFFSET)
+        sectors += sector
+        subcodes += raw[CD_SECTOR_SIZE:]
+    compressed_base = base(bytes(sectors))
+    length_bytes = 2 if len(data) < 65536 else 3
+    return (
+        bytes(ecc_map)
+        + len(compressed_base).to_bytes(length_bytes, "big")
+        + compressed_base
+        + subcode(bytes(subcodes))
+    )
+
+
+_WRITER_CODECS: dict[str, Callable[[bytes], bytes]] = {
+    "zlib": _deflate,
+    "lzma": _compress_lzma,
+    "zstd": _compress_zstd,
+    "cdzl": partial(_compress_cd, _deflate, _deflate),
+    "cdlz": partial(_compress_cd, _compress_lzma, _deflate),
+    "cdzs": partial(_compress_cd, _compress_zstd, _compress_zstd),
+}
+
+
+def write_chd(
+    path: Union[str, Path],
+    data: bytes,
+    *,
+    hunk_bytes: int = 4096,
+    unit_bytes: Optional[int] = None,
+    codec: Optional[str] = "zlib",
+    metadata: Sequence[ChdMetadata] = (),
+) -> ChdHeader:
+    """Escreve um CHD v5 mínimo (um codec, hunks repetidos como SELF).
+
+    ``codec=None`` gera um CHD não comprimido. Os codecs de CD esperam frames
+    de 2448 bytes e ``hunk_bytes`` múltiplo de 2448.
+    """
+    if unit_bytes is None:
+        unit_bytes = CD_FRAME_SIZE if codec and codec.startswith("cd") else 2048
+    hunk_count = (len(data) + hunk_bytes - 1) // hunk_bytes
+    raw_sha1 = hashlib.sha1(data).digest()
+    compressors = (0, 0, 0, 0)
+    if codec is not None:
+        compressors = (int.from_bytes(codec.encode("ascii"), "big"), 0, 0, 0)
+
+    blob = bytearray(CHD_V5_HEADER.size)
+    meta_offset = len(blob) if metadata else 0
+    for index, meta in enumerate(metadata):
+        next_offset = 0
+        if index + 1 < len(metadata):
+            next_offset = len(blob) + CHD_METADATA_HEADER.size + len(meta.data)
+        blob += CHD_METADATA_HEADER.pack(
+            meta.tag.encode("ascii"), (meta.flags << 24) | len(meta.data), next_offset
+        )
+        blob += meta.data
+
+    hunks = [
+        data[i * hunk_bytes : (i + 1) * hunk_bytes].ljust(hunk_bytes, b"\x00")
+        for i in range(hunk_count)
+    ]
+    if codec is None:
+        # Não comprimido: hunks alinhados e um u32 (offset / hunk_bytes) por hunk
+        blob += bytes(-len(blob) % hunk_bytes)
+        map_entries = []
+        for hunk in hunks:
+            map_entries.append(len(blob) // hunk_bytes)
+            blob += hunk
+        map_offset = len(blob)
+        blob += struct.pack(f">{hunk_count}I", *map_entries)
+    else:
+        map_offset = _write_compressed_hunks(blob, hunks, _WRITER_CODECS[codec])
+
+    header = CHD_V5_HEADER.pack(
+        CHD_MAGIC, CHD_V5_HEADER.size, 5, *compressors,
+        len(data), map_offset, meta_offset, hunk_bytes, unit_bytes,
+        raw_sha1, compute_overall_sha1(raw_sha1, metadata), bytes(20),
+    )
+    blob[: CHD_V5_HEADER.size] = header
+    Path(path).write_bytes(blob)
+    return ChdHeader.parse(header, str(path))
+
+
+def _write_compressed_hunks(
+    blob: bytearray,
+    hunks: list[bytes],
+    compress: Callable[[bytes], bytes],
+) -> int:
+    """Acrescenta os hunks e o mapa codificado a ``blob``; devolve o offset do mapa."""
+    first_offset = len(blob)
+    entries: list[tuple[int, int, int]] = []  # (tipo, comprimento ou hunk referido, crc)
+    seen: dict[bytes, int] = {}
+    for index, hunk in enumerate(hunks):
+        if hunk in seen:
+            entries.append((COMPRESSION_SELF, seen[hunk], 0))
+            continue
+        seen[hunk] = index
+        crc = binascii.crc_hqx(hunk, 0xFFFF)
+        compressed = compress(hunk)
+        if len(compressed) < len(hunk):
+            entries.append((COMPRESSION_TYPE_0, len(compressed), crc))
+            blob += compressed
+        else:
+            entries.append((COMPRESSION_NONE, len(hunk), crc))
+            blob += hunk
+
+    length_bits = max(
+        (value for comp, value, _ in entries if comp == COMPRESSION_TYPE_0), default=0
+    ).bit_length()
+    self_bits = max(
+        (value for comp, value, _ in entries if comp == COMPRESSION_SELF), default=0
+    ).bit_length()
+    bits = _BitWriter()
+    # Árvore RLE com 16 códigos de 4 bits: o código de cada tipo é o próprio valor
+    for _ in range(16):
+        bits.write(4, 4)
+    index = 0
+    while index < len(entries):
+        comp = entries[index][0]
+        bits.write(comp, 4)
+        run = 1
+        while index + run < len(entries) and entries[index + run][0] == comp:
+            run += 1
+        remaining = run - 1
+        while remaining >= 3:
+            if remaining < 19:
+                bits.write(COMPRESSION_RLE_SMALL, 4)
+                bits.write(remaining - 3, 4)
+                remaining = 0
+            else:
+                count = min(remaining - 19, 255)
+                bits.write(COMPRESSION_RLE_LARGE, 4)
+                bits.write(count >> 4, 4)
+                bits.write(count & 0xF, 4)
+                remaining -= 19 + count
+        for _ in range(remaining):
+            bits.write(comp, 4)
+        index += run
+
+    rawmap = bytearray()
+    offset = first_offset
+    for comp, value, crc in entries:
+        if comp == COMPRESSION_SELF:
+            bits.write(value, self_bits)
+            rawmap += bytes([comp]) + bytes(3) + value.to_bytes(6, "big") + bytes(2)
+            continue
+        if comp == COMPRESSION_TYPE_0:
+            bits.write(value, length_bits)
+        bits.write(crc, 16)
+        rawmap += bytes([comp]) + value.to_bytes(3, "big") + offset.to_bytes(6, "big")
+        rawmap += crc.to_bytes(2, "big")
+        offset += value
+
+    encoded = bits.getvalue()
+    map_offset = len(blob)
+    blob += CHD_MAP_HEADER.pack(
+        len(encoded),
+        first_offset.to_bytes(6, "big"),
+        binascii.crc_hqx(rawmap, 0xFFFF),
+        length_bits,
+        self_bits,
+        0,
+    )
+    blob += encoded
+    return map_offset
@@ -334,3 +334,66 @@ def test_find_all_duplicates_integration(temp_db, sample_entries):
     for group in all_dups:
         assert group.recommended_keep is not None
         assert group.duplicate_type in ['exact', 'cross_region', 'version', 'fuzzy']
+
+
+def test_find_fuzzy_duplicates_compares_only_within_system(temp_db):
+    """Testa que o fuzzy matching agrupa variantes só dentro do mesmo sistema."""
+    for path, system in [
+        ("/roms/ps1/Metal Gear Solid (USA).bin", "ps1"),
+        ("/roms/ps1/Metal Gear Solld (USA).bin", "ps1"),
+        ("/roms/ps2/Metal Gear Solid (USA).iso", "ps2"),
+        ("/roms/ps1/Silent Hill (USA).bin", "ps1"),
+    ]:
+        temp_db.update_entry(LibraryEntry(path=path, system=system, size=1000, mtime=1.0))
+
+    groups = AdvancedDeduplication(temp_db)._find_fuzzy_duplicates()
+
+    assert [sorted(e.path for e in g.entries) for g in groups] == [
+        ["/roms/ps1/Metal Gear Solid (USA).bin", "/roms/ps1/Metal Gear Solld (USA).bin"]
+    ]
+
+
+def test_fuzzy_name_index_exact_mode_matches_all_pairs():
+    """Testa que o índice sem min_overlap propõe todos os pares acima do limiar."""
+    from difflib import SequenceMatcher
+
+    from emumanager.deduplication.fuzzy_index import FuzzyNameIndex
+
+    names = [
+        "metal gear solid", "metal gear solld", "metal gear solid 2", "metl gear solid",
+        "silent hill", "silent hil", "silent hill 2", "final fantasy x", "final fantasy x 2",
+        "final fantasy ix", "tekken", "tekken 2", "tekken 3", "gran turismo", "gran turismo 2",
+    ]
+    index = FuzzyNameIndex(names, 0.85, min_overlap=0)
+    found = {(i, j) for i in range(len(names)) for j in index.candidates(i) if index.could_match(i, j)}
+    expected = {
+        (i, j)
+        for i in range(len(names))
+        for j in range(i + 1, len(names))
+        if SequenceMatcher(None, names[i], names[j]).ratio() >= 0.85
+    }
+
+    assert expected <= found
+    assert index.pairs_probed < len(names) * (len(names) - 1) // 2
+
+
+def test_analyze_reads_library_once(temp_db, sample_entries, monkeypatch):
+    """Testa que analyze lê a biblioteca uma vez e devolve grupos e estatísticas."""
+    for entry in sample_entries:
+        temp_db.update_entry(entry)
+
+    dedup = AdvancedDeduplication(temp_db)
+    reads = []
+    original = temp_db.iter_entries
+
+    def _counting_iter(*args, **kwargs):
+        reads.append(kwargs.get("columns"))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(temp_db, "iter_entries", _counting_iter)
+    result = dedup.analyze()
+
+    assert len(reads) == 1
+    assert result.statistics == AdvancedDeduplication.summarize(result.groups)
+    assert result.statistics["total_groups"] == len(result.groups)
+    assert {g.duplicate_type for g in result.groups} >= {"exact", "cross_region", "version"}
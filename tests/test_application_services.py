@@ -151,3 +151,32 @@ def test_execute_core_workflow_routes_supported_arguments():
         dry_run=True,
         progress_cb=progress_cb,
     )
+
+
+def test_library_insights_serves_persisted_quality_and_refreshes_stale(temp_db, tmp_path):
+    rom = tmp_path / "Game.gba"
+    rom.write_bytes(b"\x01" * 4096)
+    temp_db.update_entry(LibraryEntry(path=str(rom), system="gba", size=4096, mtime=1.0))
+    service = LibraryInsightsService(temp_db)
+    refreshed = []
+
+    rows = service.get_system_rom_rows("gba", include_quality=True, on_quality=refreshed.append)
+    assert len(service._quality_refreshes) == 1  # nada persistido ainda: vai para o pool
+    for future in service._quality_refreshes:
+        future.result(timeout=10)
+    assert refreshed == rows and rows[0].quality_icon
+    assert temp_db.get_quality_result(str(rom)) is not None
+
+    analyze = MagicMock(side_effect=AssertionError("should be served from the DB"))
+    service._quality_controller.analyze_rom = analyze
+    rows = service.get_system_rom_rows("gba", include_quality=True)
+    assert rows[0].quality_icon == refreshed[0].quality_icon
+    assert service._quality_refreshes == []
+    assert service.get_rom_inspection(str(rom)).quality_score.endswith("/100")
+    analyze.assert_not_called()
+
+    rom.write_bytes(b"\x02" * 8192)  # assinatura mudou: resultado obsoleto
+    rows = service.get_system_rom_rows("gba", include_quality=True)
+    assert rows[0].quality_icon is None
+    assert len(service._quality_refreshes) == 1
+    service.cancel_quality_refresh()
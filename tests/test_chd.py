@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import shutil
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from emumanager.common.chd import (
+    CD_FRAME_SIZE,
+    CD_SECTOR_SIZE,
+    ChdFile,
+    ChdMetadata,
+    ecc_generate,
+    open_chd_image,
+    read_chd_header,
+)
+from emumanager.common.exceptions import CorruptedFileError, DependencyError
+from emumanager.common.walker import WalkRecord
+from emumanager.core.scanner import Scanner
+from emumanager.core.scanner_verification import VERIFY_FULL
+from emumanager.library import LibraryDB, LibraryEntry
+from emumanager.ps2 import metadata as ps2_metadata
+from emumanager.psx import metadata as psx_metadata
+from emumanager.verification import hash_engine, hasher
+from emumanager.verification.dat_parser import DatDb, RomInfo
+from emumanager.workers.verification import HashVerifyWorker
+from tests.helpers import build_iso9660, to_raw_sectors, write_chd
+
+PS2_CNF = b"BOOT2 = cdrom0:\\SLUS_200.02;1\r\nVER = 1.00\r\n"
+PSX_CNF = b"BOOT = cdrom:\\SLUS_005.94;1\r\nTCB = 4\r\n"
+
+
+def _sample_data() -> bytes:
+    rng = random.Random(7)
+    noise = bytes(rng.getrandbits(8) for _ in range(12000))
+    # Zeros e blocos repetidos geram hunks SELF e runs no mapa
+    return noise + bytes(40000) + b"ABCD" * 4096 + noise
+
+
+def _cd_image(iso: bytes) -> tuple[bytes, list[ChdMetadata]]:
+    """Frames de CD (Mode2/XA com ECC válido + subcódigo) e o CHT2 correspondente."""
+    raw = to_raw_sectors(iso, mode2=True)
+    frames = []
+    for offset in range(0, len(raw), CD_SECTOR_SIZE):
+        sector = bytearray(raw[offset : offset + CD_SECTOR_SIZE])
+        ecc_generate(sector)
+        frames.append(bytes(sector) + bytes(CD_FRAME_SIZE - CD_SECTOR_SIZE))
+    count = len(frames)
+    frames.extend([bytes(CD_FRAME_SIZE)] * (-count % 4))
+    track = (
+        f"TRACK:1 TYPE:MODE2_RAW SUBTYPE:NONE FRAMES:{count} "
+        "PREGAP:0 PGTYPE:MODE1 PGSUB:RW POSTGAP:0"
+    )
+    return b"".join(frames), [ChdMetadata("CHT2", 1, track.encode() + b"\x00")]
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma", None])
+def test_chd_round_trip_random_access(tmp_path: Path, codec):
+    data = _sample_data()
+    path = tmp_path / "disc.chd"
+    header = write_chd(path, data, hunk_bytes=4096, codec=codec)
+
+    assert read_chd_header(path) == header
+    assert header.raw_sha1 == hashlib.sha1(data).hexdigest()
+    assert header.logical_bytes == len(data)
+    with ChdFile(path) as chd:
+        assert chd.read() == data
+        chd.seek(50000)
+        assert chd.read(6000) == data[50000:56000]
+        chd.seek(-10, 2)
+        assert chd.read() == data[-10:]
+
+
+def test_chd_reports_corruption_and_missing_codecs(tmp_path: Path):
+    data = _sample_data()
+    path = tmp_path / "disc.chd"
+    write_chd(path, data, hunk_bytes=4096, codec="zlib")
+    blob = bytearray(path.read_bytes())
+    blob[200] ^= 0xFF  # primeiro hunk (ruído, guardado sem compressão)
+    path.write_bytes(blob)
+    with ChdFile(path) as chd, pytest.raises(CorruptedFileError):
+        chd.read(16)
+
+    flac = tmp_path / "flac.chd"
+    write_chd(flac, data, hunk_bytes=4096, codec="zlib")
+    blob = bytearray(flac.read_bytes())
+    blob[16:20] = b"flac"
+    flac.write_bytes(blob)
+    with ChdFile(flac) as chd, pytest.raises(DependencyError):
+        chd.seek(20000)  # zona de zeros: hunk comprimido com o codec 0
+        chd.read(16)
+
+
+@pytest.mark.parametrize("codec", ["cdzl", "cdlz"])
+def test_cd_chd_track_view_serves_iso9660(tmp_path: Path, codec: str):
+    iso = build_iso9660({"SYSTEM.CNF": PSX_CNF}, filler=bytes(256 * 1024))
+    frames, metadata = _cd_image(iso)
+    path = tmp_path / "game.chd"
+    write_chd(path, frames, hunk_bytes=CD_FRAME_SIZE * 8, codec=codec, metadata=metadata)
+
+    with open_chd_image(path) as track:
+        sectors = to_raw_sectors(iso, mode2=True)
+        assert track.size == len(sectors)
+        # Sync e ECC removidos na escrita são reconstruídos na leitura
+        track.seek(16 * CD_SECTOR_SIZE)
+        expected = bytearray(sectors[16 * CD_SECTOR_SIZE : 17 * CD_SECTOR_SIZE])
+        ecc_generate(expected)
+        assert track.read(CD_SECTOR_SIZE) == bytes(expected)
+
+    assert psx_metadata.get_psx_serial(path) == "SLUS-00594"
+
+
+def test_ps2_serial_from_dvd_chd_reads_few_hunks(tmp_path: Path, monkeypatch):
+    iso = build_iso9660({"SYSTEM.CNF": PS2_CNF}, filler=bytes(4 * 1024 * 1024))
+    path = tmp_path / "game.chd"
+    write_chd(path, iso, hunk_bytes=2048 * 8, codec="lzma")
+
+    opened = []
+    original = ChdFile.read_hunk
+
+    def _tracking(self, hunk):
+        opened.append(hunk)
+        return original(self, hunk)
+
+    monkeypatch.setattr(ChdFile, "read_hunk", _tracking)
+    assert ps2_metadata.get_ps2_serial(path) == "SLUS-20002"
+    assert len(set(opened)) <= 4
+
+
+def _redump_dat(iso: bytes) -> DatDb:
+    dat = DatDb()
+    dat.add_rom(
+        RomInfo(
+            game_name="Game (USA)",
+            rom_name="Game (USA).iso",
+            size=len(iso),
+            sha1=hashlib.sha1(iso).hexdigest(),
+        )
+    )
+    return dat
+
+
+def test_scanner_verifies_chd_from_header_sha1(tmp_path: Path):
+    iso = build_iso9660({"SYSTEM.CNF": PS2_CNF}, filler=bytes(1024 * 1024))
+    path = tmp_path / "game.chd"
+    header = write_chd(path, iso, hunk_bytes=2048 * 8, codec="zlib")
+    db = LibraryDB(tmp_path / "library.db")
+    scanner = Scanner(db, None)
+    provider = MagicMock()
+    provider.extract_metadata.return_value = {"serial": "SLUS-20002"}
+    stats = {"added": 0, "updated": 0}
+
+    with patch.object(hasher, "calculate_hashes") as calc:
+        scanner._process_file(path, "ps2", provider, _redump_dat(iso), False, stats, set(), {})
+
+    assert not calc.called
+    entry = db.get_entry(str(path.resolve()))
+    assert (entry.status, entry.match_name) == ("VERIFIED", "Game (USA)")
+    assert entry.extra_metadata["chd_raw_sha1"] == header.raw_sha1
+    assert entry.extra_metadata["serial"] == "SLUS-20002"
+    # O SHA1 do cabeçalho não se confunde com o hash do contentor
+    assert entry.sha1 is None
+
+    # CHD substituído (tamanho e mtime novos): os hashes do contentor antigo não ficam
+    db.update_entry_fields(str(path.resolve()), sha1="old-container-sha1", crc32="deadbeef")
+    write_chd(path, iso, hunk_bytes=2048 * 4, codec="lzma")
+    existing = {entry.path: db.get_entry(entry.path)}
+    assert path.stat().st_size != entry.size
+    with patch.object(hasher, "calculate_hashes") as calc:
+        scanner._process_file(
+            path, "ps2", provider, _redump_dat(iso), False, stats, set(), existing
+        )
+
+    assert not calc.called
+    entry = db.get_entry(str(path.resolve()))
+    assert entry.status == "VERIFIED"
+    assert (entry.sha1, entry.crc32) == (None, None)
+
+
+def test_prehash_skips_chd_verified_by_header(tmp_path: Path):
+    iso = build_iso9660({"SYSTEM.CNF": PS2_CNF})
+    chd = tmp_path / "game.chd"
+    write_chd(chd, iso, hunk_bytes=2048 * 8, codec="zlib")
+    others = [tmp_path / "a.bin", tmp_path / "b.bin"]
+    for other in others:
+        other.write_bytes(other.name.encode())
+    scanner = Scanner(MagicMock(), None)
+    scanner.db.get_cached_hashes.return_value = None
+    scanner.verification_mode = VERIFY_FULL
+    records = [WalkRecord(p, p.stat(), tmp_path) for p in (chd, *others)]
+
+    with patch.object(hash_engine, "hash_many", return_value={}) as hash_many:
+        scanner._prehash_records(records, _redump_dat(iso), False, {})
+
+    assert [job.path for job in hash_many.call_args.args[0]] == others
+
+
+def test_hash_verify_worker_matches_chd_without_hashing(tmp_path: Path):
+    iso = build_iso9660({"SYSTEM.CNF": PS2_CNF})
+    path = tmp_path / "game.chd"
+    header = write_chd(path, iso, hunk_bytes=2048 * 8, codec="zlib")
+    db = LibraryDB(tmp_path / "library.db")
+    db.update_entry(
+        LibraryEntry(
+            path=str(path.resolve()),
+            system="ps2",
+            size=path.stat().st_size,
+            mtime=path.stat().st_mtime,
+            status="UNKNOWN",
+            extra_metadata={"serial": "SLUS-20002"},
+        )
+    )
+    worker = HashVerifyWorker(tmp_path, lambda _msg: None, None, None, _redump_dat(iso), db=db)
+
+    with patch.object(hasher, "calculate_hashes") as calc:
+        worker.run([path])
+
+    assert not calc.called
+    entry = db.get_entry(str(path.resolve()))
+    assert (entry.status, entry.match_name) == ("VERIFIED", "Game (USA)")
+    assert entry.extra_metadata == {"serial": "SLUS-20002", "chd_raw_sha1": header.raw_sha1}
+    assert entry.sha1 is None
+
+
+@pytest.mark.skipif(shutil.which("chdman") is None, reason="chdman não instalado")
+def test_reader_matches_chdman_output(tmp_path: Path):
+    # Fixtures do codificador de referência: apanha erros partilhados por write_chd e pelo leitor
+    iso = build_iso9660({"SYSTEM.CNF": PS2_CNF}, filler=bytes(range(256)) * 1024)
+    (tmp_path / "dvd.iso").write_bytes(iso)
+    subprocess.run(
+        ["chdman", "createdvd", "-i", "dvd.iso", "-o", "dvd.chd", "-c", "zlib"],
+        cwd=tmp_path, check=True, capture_output=True,
+    )
+    header = read_chd_header(tmp_path / "dvd.chd")
+    assert header.raw_sha1 == hashlib.sha1(iso).hexdigest()
+    with ChdFile(tmp_path / "dvd.chd") as chd:
+        assert chd.read() == iso
+
+    sectors = bytearray(to_raw_sectors(build_iso9660({"SYSTEM.CNF": PSX_CNF}), mode2=True))
+    for offset in range(0, len(sectors), CD_SECTOR_SIZE):
+        sector = sectors[offset : offset + CD_SECTOR_SIZE]
+        ecc_generate(sector)
+        sectors[offset : offset + CD_SECTOR_SIZE] = sector
+    (tmp_path / "cd.bin").write_bytes(sectors)
+    (tmp_path / "cd.cue").write_text(
+        'FILE "cd.bin" BINARY\n  TRACK 01 MODE2/2352\n    INDEX 01 00:00:00\n'
+    )
+    subprocess.run(
+        ["chdman", "createcd", "-i", "cd.cue", "-o", "cd.chd", "-c", "cdlz"],
+        cwd=tmp_path, check=True, capture_output=True,
+    )
+    with open_chd_image(tmp_path / "cd.chd") as track:
+        assert track.size == len(sectors)
+        assert track.read() == bytes(sectors)
+    assert psx_metadata.get_psx_serial(tmp_path / "cd.chd") == "SLUS-00594"
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from pathlib import Path
 from emumanager.core.scanner import Scanner
+from emumanager.verification.dat_parser import RomInfo
 
 class TestScanner:
     @pytest.fixture
@@ -68,10 +69,9 @@ class TestScanner:
         # Arrange
         mock_calc.return_value = {"crc32": "1234", "sha1": "abc", "md5": "md5"}
         mock_dat_db = MagicMock()
-        mock_match = MagicMock()
-        mock_match.name = "Super Mario"
-        mock_match.serial = "NES-SM"
-        mock_dat_db.lookup.return_value = [mock_match]
+        mock_dat_db.lookup.return_value = [
+            RomInfo(game_name="Super Mario", rom_name="mario.nes", size=1, dat_name="NES")
+        ]
         
         # Act
         _, info = scanner._handle_verification(
@@ -81,7 +81,7 @@ class TestScanner:
         # Assert
         assert info["status"] == "VERIFIED"
         assert info["match_name"] == "Super Mario"
-        assert info["dat_name"] == "NES-SM"
+        assert "dat_name" not in info  # serial comes from provider metadata
 
     def test_cleanup_removed_entries(self, scanner):
         # Arrange
@@ -112,3 +112,81 @@ class TestScanner:
             # Assert
             assert mock_proc.called
             assert stats["added"] == 0 # Stats are updated inside _process_system
+
+
+class TestLeanVerification:
+    @pytest.fixture
+    def scanner(self):
+        scanner = Scanner(MagicMock(), None)
+        scanner.db.get_cached_hashes.return_value = None
+        return scanner
+
+    @staticmethod
+    def _redump_style_dat(payload: bytes):
+        import hashlib
+        import zlib
+
+        from emumanager.verification.dat_parser import DatDb
+
+        db = DatDb()
+        db.add_rom(
+            RomInfo(
+                game_name="Game",
+                rom_name="game.bin",
+                size=len(payload),
+                crc=f"{zlib.crc32(payload):08x}",
+                md5=hashlib.md5(payload).hexdigest(),
+                sha1=hashlib.sha1(payload).hexdigest(),
+            )
+        )
+        return db
+
+    def _verify(self, scanner, path, dat_db, deep_scan=False):
+        from emumanager.verification import hasher
+
+        with patch.object(hasher, "calculate_hashes", wraps=hasher.calculate_hashes) as calc:
+            hashes, info = scanner._handle_verification(
+                path, None, dat_db, True, {}, "psx", size=path.stat().st_size, deep_scan=deep_scan
+            )
+        return hashes, info, [call.kwargs["algorithms"] for call in calc.call_args_list]
+
+    def test_size_mismatch_defers_hashing(self, scanner, tmp_path):
+        rom = tmp_path / "other.bin"
+        rom.write_bytes(b"not in dat")
+
+        hashes, info, calls = self._verify(scanner, rom, self._redump_style_dat(b"payload"))
+
+        assert calls == []
+        assert hashes == {}
+        assert info["status"] == "UNKNOWN" and info["hash_deferred"]
+
+    def test_deep_scan_hashes_deferred_file(self, scanner, tmp_path):
+        rom = tmp_path / "other.bin"
+        rom.write_bytes(b"not in dat")
+
+        hashes, info, calls = self._verify(
+            scanner, rom, self._redump_style_dat(b"payload"), deep_scan=True
+        )
+
+        assert calls == [("crc32", "sha1", "md5")]
+        assert all(hashes[algo] for algo in ("crc32", "sha1", "md5"))
+        assert "hash_deferred" not in info
+
+    def test_crc_first_then_strongest_hash_only(self, scanner, tmp_path):
+        rom = tmp_path / "game.bin"
+        rom.write_bytes(b"payload")
+
+        hashes, info, calls = self._verify(scanner, rom, self._redump_style_dat(b"payload"))
+
+        assert calls == [("crc32",), ("sha1",)]
+        assert "md5" not in hashes
+        assert (info["status"], info["match_name"]) == ("VERIFIED", "Game")
+
+    def test_crc_miss_skips_strong_hash(self, scanner, tmp_path):
+        rom = tmp_path / "game.bin"
+        rom.write_bytes(b"PAYLOAD")
+
+        _hashes, info, calls = self._verify(scanner, rom, self._redump_style_dat(b"payload"))
+
+        assert calls == [("crc32",)]
+        assert info["status"] == "UNKNOWN"
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import zlib
+from pathlib import Path
+
+import pytest
+
+from emumanager.common.exceptions import DATParseError
+from emumanager.verification import dat_index
+from emumanager.verification.dat_index import (
+    CompiledDatIndex,
+    DatIndexCache,
+    index_path_for,
+    is_index_current,
+    load_dat_index,
+)
+
+from .test_dat_parser import CLRMAMEPRO_DAT_CONTENT, XML_DAT_CONTENT
+
+
+@pytest.fixture
+def xml_dat(tmp_path: Path) -> Path:
+    dats = tmp_path / "dats"
+    dats.mkdir()
+    path = dats / "Nintendo - GameCube.dat"
+    path.write_text(XML_DAT_CONTENT, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    calls = []
+    real_parse = dat_index.parse_dat_file
+
+    def counting_parse(path, **kwargs):
+        calls.append(path)
+        return real_parse(path, **kwargs)
+
+    monkeypatch.setattr(dat_index, "parse_dat_file", counting_parse)
+    return calls
+
+
+def test_compiled_index_matches_parser_lookups(xml_dat: Path):
+    index = load_dat_index(xml_dat)
+
+    assert index.index_path.parent == xml_dat.parent / ".index"
+    assert (index.name, index.version) == ("Nintendo - GameCube", "20231224")
+    assert len(index) == 2
+    luigi = index.lookup(crc="12345678")
+    assert [rom.game_name for rom in luigi] == ["Luigi's Mansion (USA)"]
+    assert luigi[0].size == 1459978240 and luigi[0].dat_name == "Nintendo - GameCube"
+    assert index.lookup(sha1="33221100FFEEDDCCBBAA00998877665544332211")[0].rom_name.startswith(
+        "Super Mario"
+    )
+    assert index.lookup(crc="00000000") == []
+    assert index.lookup() == []
+
+
+def test_index_rebuilds_only_when_source_changes(xml_dat: Path, count_parses):
+    load_dat_index(xml_dat)
+    load_dat_index(xml_dat)
+    assert len(count_parses) == 1
+
+    xml_dat.write_text(CLRMAMEPRO_DAT_CONTENT.replace("12345678", "abcdef01"), encoding="utf-8")
+    stat = xml_dat.stat()
+    os.utime(xml_dat, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    index = load_dat_index(xml_dat)
+    assert len(count_parses) == 2
+    assert index.lookup(crc="abcdef01")[0].game_name == "Luigi's Mansion (USA)"
+
+
+def test_index_cache_prefetches_once_and_survives_pickling(xml_dat: Path, count_parses):
+    cache = DatIndexCache(max_workers=2)
+    cache.prefetch([xml_dat, xml_dat])
+    index = cache.load(xml_dat)
+    cache.close()
+
+    assert len(count_parses) == 1
+    clone = pickle.loads(pickle.dumps(index))
+    assert isinstance(clone, CompiledDatIndex)
+    assert clone.lookup(md5="aabbccddeeff00112233445566778899")[0].game_name.startswith("Luigi")
+    assert index_path_for(xml_dat).exists()
+
+
+def test_read_only_dat_folder_falls_back_to_memory(xml_dat: Path, monkeypatch):
+    from emumanager.verification.dat_parser import DatDb
+    from emumanager.verification.hash_index import GlobalHashIndex
+
+    monkeypatch.setattr(dat_index.os, "access", lambda _path, _mode: False)
+
+    cache = DatIndexCache(max_workers=1)
+    index = cache.load(xml_dat)
+    assert isinstance(index, DatDb)
+    assert index.lookup(crc="12345678")[0].game_name == "Luigi's Mansion (USA)"
+    assert cache.load(xml_dat) is index
+
+    # DAT alterado durante a sessão: volta a ser lido
+    xml_dat.write_text(XML_DAT_CONTENT.replace("12345678", "abcdef01"), encoding="utf-8")
+    stat = xml_dat.stat()
+    os.utime(xml_dat, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.load(xml_dat).lookup(crc="abcdef01")
+    cache.close()
+    assert not index_path_for(xml_dat).exists()
+
+    global_path = xml_dat.parent / "global.sqlite"
+    global_index = GlobalHashIndex(xml_dat.parent, global_path)
+    assert global_index.refresh() == 1
+    assert global_path.exists()
+    assert global_index.lookup(crc="abcdef01")[0].game_name == "Luigi's Mansion (USA)"
+
+
+def test_scanner_verifies_against_compiled_index(tmp_path: Path):
+    from emumanager.core.dat_manager import DATManager
+    from emumanager.core.scanner import Scanner
+    from emumanager.library import LibraryDB
+
+    rom_bytes = b"gamecube-rom"
+    crc = f"{zlib.crc32(rom_bytes):08x}"
+    content = (
+        XML_DAT_CONTENT.replace("12345678", crc)
+        .replace('size="1459978240"', f'size="{len(rom_bytes)}"', 1)
+        .replace("aabbccddeeff00112233445566778899", hashlib.md5(rom_bytes).hexdigest())
+        .replace("11223344556677889900aabbccddeeff00112233", hashlib.sha1(rom_bytes).hexdigest())
+    )
+    dats = tmp_path / "dats"
+    dats.mkdir()
+    (dats / "Nintendo - GameCube.dat").write_text(content, encoding="utf-8")
+    roms = tmp_path / "roms" / "gamecube"
+    roms.mkdir(parents=True)
+    (roms / "luigi.iso").write_bytes(rom_bytes)
+
+    db = LibraryDB(tmp_path / "library.db")
+    manager = DATManager(dats)
+    Scanner(db, dat_manager=manager).scan_directory(tmp_path / "roms")
+    manager.index_cache.close()
+
+    entry = db.get_entry(str((roms / "luigi.iso").resolve()))
+    assert entry.crc32 == crc
+    assert entry.status == "VERIFIED"
+    assert entry.match_name == "Luigi's Mansion (USA)"
+
+
+def test_corrupt_dat_does_not_replace_index(xml_dat: Path):
+    index = load_dat_index(xml_dat)
+    before = index.index_path.read_bytes()
+
+    # Download interrompido: assinatura zip com conteúdo truncado
+    xml_dat.write_bytes(b"PK\x03\x04" + b"\x00" * 64)
+    with pytest.raises(DATParseError):
+        load_dat_index(xml_dat)
+    assert index.index_path.read_bytes() == before
+    assert not is_index_current(xml_dat)
+
+    broken = xml_dat.with_name("broken.zip")
+    broken.write_bytes(b"PK\x03\x04" + b"\x00" * 64)
+    with pytest.raises(DATParseError):
+        load_dat_index(broken)
+    assert not index_path_for(broken).exists()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        # Truncado dentro do segundo bloco game (
+        CLRMAMEPRO_DAT_CONTENT[: CLRMAMEPRO_DAT_CONTENT.index("Super Mario")],
+        "<html><head><title>502 Bad Gateway</title></head>"
+        "<body><center><h1>502 Bad Gateway</h1></center></body></html>\n",
+    ],
+)
+def test_truncated_or_html_dat_is_not_compiled(tmp_path: Path, content: str):
+    dat = tmp_path / "Sony - PlayStation 2.dat"
+    dat.write_text(content, encoding="utf-8")
+    with pytest.raises(DATParseError):
+        load_dat_index(dat)
+    assert not index_path_for(dat).exists()
@@ -111,7 +111,7 @@ def test_parse_invalid_file(tmp_path):
     # Based on code reading, _parse_clrmamepro might try to parse it but find nothing
     db = parse_dat_file(d)
     assert isinstance(db, DatDb)
-    assert len(db.crc_index) == 0
+    assert len(db) == 0
 
 
 def test_dat_db_deduplication():
@@ -126,7 +126,104 @@ def test_dat_db_deduplication():
     )
     db.add_rom(rom)
 
-    # Lookup with multiple hashes should return the same object once
+    # Lookup with multiple hashes should return the ROM once
     results = db.lookup(crc="1111", md5="2222")
     assert len(results) == 1
-    assert results[0] is rom
+    assert (results[0].game_name, results[0].rom_name) == (rom.game_name, rom.rom_name)
+
+
+@pytest.mark.parametrize("container", ["gzip", "zip"])
+def test_parse_compressed_dat(tmp_path, container):
+    import gzip
+    import zipfile
+
+    payload = XML_DAT_CONTENT.encode("utf-8")
+    if container == "gzip":
+        d = tmp_path / "temp.dat.gz"
+        d.write_bytes(gzip.compress(payload))
+    else:
+        d = tmp_path / "temp.zip"
+        with zipfile.ZipFile(d, "w") as archive:
+            archive.writestr("readme.txt", "ignore me")
+            archive.writestr("Nintendo - GameCube.dat", payload)
+
+    db = parse_dat_file(d)
+
+    assert db.name == "Nintendo - GameCube"
+    assert db.lookup(crc="87654321")[0].game_name == "Super Mario Sunshine (USA)"
+
+
+def test_parse_mame_style_xml_machines(tmp_path):
+    d = tmp_path / "mame.xml"
+    d.write_text(
+        '<?xml version="1.0"?>\n<mame build="0.260">\n'
+        '  <machine name="pacman"><description>Pac-Man</description>\n'
+        '    <rom name="pacman.6e" size="4096" crc="c1e6ab10" sha1="e87e059c5be45753f7e9f33dff851f16d6751181"/>\n'
+        '    <rom name="pacman.6f" size="4096" crc="1a6fb2d4"/>\n'
+        "  </machine>\n</mame>\n",
+        encoding="utf-8",
+    )
+
+    db = parse_dat_file(d)
+
+    assert [rom.rom_name for rom in db.lookup(crc="1A6FB2D4")] == ["pacman.6f"]
+    assert db.lookup(sha1="e87e059c5be45753f7e9f33dff851f16d6751181")[0].game_name == "pacman"
+
+
+def test_clrmamepro_tokenizer_handles_quotes_and_chunk_boundaries(tmp_path):
+    import io
+
+    from emumanager.verification import dat_parser
+
+    content = (
+        'clrmamepro ( name "Sony - PlayStation (Redump)" version 2024 )\n'
+        'game ( name "Crash (Demo)" description "x"\n'
+        '    rom ( name "Track (1).bin" size 2048 crc deadbeef sha1 '
+        "0123456789abcdef0123456789abcdef01234567 )\n"
+        "    rom ( name track2.bin size 16 crc 0badf00d ) )\n"
+        'game ( name "Truncated" rom ( name "t.bin" crc 11111111'
+    )
+    d = tmp_path / "quoted.dat"
+    d.write_text(content, encoding="utf-8")
+    records = [
+        (rom.game_name, rom.rom_name, rom.size, rom.crc, rom.sha1)
+        for rom in parse_dat_file(d).iter_roms()
+    ]
+
+    assert sorted(records) == [
+        ("Crash (Demo)", "Track (1).bin", 2048, "deadbeef", "0123456789abcdef0123456789abcdef01234567"),
+        ("Crash (Demo)", "track2.bin", 16, "0badf00d", None),
+    ]
+
+    # Qualquer tamanho de bloco tem de produzir exatamente os mesmos registos
+    raw = content.encode("utf-8")
+    for chunk_size in (1, 3, 7, 64):
+        tokens = list(dat_parser._iter_clrmamepro_tokens(io.BytesIO(raw), chunk_size))
+        assert tokens == list(dat_parser._iter_clrmamepro_tokens(io.BytesIO(raw), len(raw) + 1))
+
+
+def test_compact_dat_db_round_trip_merge_and_pickle():
+    import pickle
+
+    from emumanager.verification.dat_parser import merge_dbs
+
+    first = DatDb()
+    first.add_rom(RomInfo("Game A", "a.bin", 10, crc="0000ABCD", md5="AA" * 16, dat_name="Set 1"))
+    first.add_rom(RomInfo("Game A", "a2.bin", 20, crc="not-hex", sha1="bb" * 20, dat_name="Set 1"))
+    second = DatDb()
+    second.add_rom(RomInfo("Game B", "b.bin", 30, crc="abcd", dat_name="Set 2"))
+
+    merge_dbs(first, second)
+    merged = pickle.loads(pickle.dumps(first))
+
+    assert len(merged) == 3
+    assert [(r.rom_name, r.dat_name) for r in merged.lookup(crc="ABCD")] == [
+        ("a.bin", "Set 1"),
+        ("b.bin", "Set 2"),
+    ]
+    assert merged.lookup(md5="aa" * 16)[0] == RomInfo(
+        "Game A", "a.bin", 10, crc="0000abcd", md5="aa" * 16, dat_name="Set 1"
+    )
+    assert merged.lookup(sha1="BB" * 20)[0].crc is None
+    assert merged.lookup(sha1="bb" * 19 + "cc") == []
+    assert merged.lookup(crc="zz") == []
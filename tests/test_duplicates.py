@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from emumanager.library import LibraryDB, LibraryEntry, normalize_game_name
@@ -59,3 +60,113 @@ def test_find_duplicates_by_hash_groups_same_sha1(tmp_path: Path):
     # sorted by size desc
     assert Path(g.entries[0].path).name == "a.nes"
     assert Path(g.entries[1].path).name == "b.nes"
+
+
+def test_staged_finder_reads_only_colliding_files(tmp_path: Path):
+    from emumanager.deduplication import StagedDuplicateFinder
+    from emumanager.workers.duplicates import worker_find_duplicates
+
+    db = LibraryDB(db_path=tmp_path / "library.db")
+    payload = bytes(range(256)) * 4
+    # Mesmo início, meio e fim; só diferem num byte fora das amostras
+    tweaked = bytearray(payload)
+    tweaked[100] ^= 0xFF
+    files = {
+        "a.iso": payload,
+        "b.iso": payload,
+        "c.iso": payload[:-1] + b"\x00",  # mesmo tamanho, fim diferente
+        "d.iso": bytes(tweaked),
+        "e.iso": b"unique",
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+        db.update_entry(_mk_entry(str(tmp_path / name), size=len(data)))
+
+    finder = StagedDuplicateFinder(db, sample_size=16)
+    groups = finder.run()
+
+    assert [sorted(Path(e.path).name for e in g.entries) for g in groups] == [["a.iso", "b.iso"]]
+    assert groups[0].kind == "content"
+    assert finder.stats.sampled == 4  # e.iso nunca é lido
+    assert finder.stats.fully_hashed == 3  # a, b e d colidem no fingerprint
+    assert finder.stats.wasted_bytes == len(payload)
+
+    # Resultados e fingerprints persistidos: nova execução não lê nada
+    reopened = LibraryDB(db_path=tmp_path / "library.db")
+    assert [g.key for g in reopened.find_duplicates_by_content()] == [groups[0].key]
+    again = StagedDuplicateFinder(reopened, sample_size=16)
+    again.run()
+    assert again.stats.bytes_read == 0
+
+    result = worker_find_duplicates(reopened, include_name=False)
+    assert [g["kind"] for g in result["groups"]] == ["content"]
+
+
+def test_staged_finder_ignores_stale_library_sha1(tmp_path: Path):
+    from emumanager.deduplication import StagedDuplicateFinder
+
+    db = LibraryDB(db_path=tmp_path / "library.db")
+    payload = bytes(range(256)) * 4
+    tweaked = bytearray(payload)
+    tweaked[100] ^= 0xFF
+    for name, data in (("a.iso", payload), ("b.iso", bytes(tweaked))):
+        path = tmp_path / name
+        path.write_bytes(data)
+        entry = _mk_entry(str(path), size=len(data), sha1="s1")
+        entry.mtime = path.stat().st_mtime
+        db.update_entry(entry)
+    # b.iso reescrito no lugar com o mesmo tamanho depois do scan
+    stale = tmp_path / "b.iso"
+    os.utime(stale, ns=(stale.stat().st_atime_ns, stale.stat().st_mtime_ns + 10**9))
+
+    finder = StagedDuplicateFinder(db, sample_size=16)
+
+    assert finder.run() == []
+    assert finder.stats.fully_hashed == 1
+
+
+def test_find_duplicates_by_hash_reports_each_entry_once(tmp_path: Path):
+    db = LibraryDB(db_path=tmp_path / "library.db")
+    a = _mk_entry(str(tmp_path / "a.iso"), size=30, sha1="s1")
+    a.md5 = "m1"
+    b = _mk_entry(str(tmp_path / "b.iso"), size=20, sha1="s1")
+    b.md5 = "m1"
+    c = _mk_entry(str(tmp_path / "c.iso"), size=10)  # só md5: junta-se ao grupo sha1
+    c.md5 = "m1"
+    d = _mk_entry(str(tmp_path / "d.iso"), size=5)
+    d.md5 = "m2"
+    e = _mk_entry(str(tmp_path / "e.iso"), size=5)
+    e.md5 = "m2"
+    for entry in (a, b, c, d, e):
+        db.update_entry(entry)
+
+    groups = db.find_duplicates_by_hash(prefer=("sha1", "md5"))
+
+    assert [(g.kind, g.key, [Path(x.path).name for x in g.entries]) for g in groups] == [
+        ("sha1", "s1", ["a.iso", "b.iso", "c.iso"]),
+        ("md5", "m2", ["d.iso", "e.iso"]),
+    ]
+
+    summaries = db.summarize_duplicates_by_hash(prefer=("sha1", "md5"))
+    assert {(s.kind, s.key): (s.count, s.wasted_bytes) for s in summaries} == {
+        ("sha1", "s1"): (2, 20),
+        ("md5", "m1"): (3, 30),
+        ("md5", "m2"): (2, 5),
+    }
+
+    # CRC32 partilhado: y2 (sem sha1) junta-se ao grupo s3, y (sha1 diferente) não
+    x = _mk_entry(str(tmp_path / "x.bin"), size=8, sha1="s3")
+    x2 = _mk_entry(str(tmp_path / "x2.bin"), size=8, sha1="s3")
+    y = _mk_entry(str(tmp_path / "y.bin"), size=7, sha1="s4")
+    y2 = _mk_entry(str(tmp_path / "y2.bin"), size=7)
+    for entry in (x, x2, y, y2):
+        entry.crc32 = "c1"
+        db.update_entry(entry)
+
+    groups = db.find_duplicates_by_hash(prefer=("sha1", "md5", "crc32"))
+
+    assert [(g.kind, g.key, [Path(x.path).name for x in g.entries]) for g in groups] == [
+        ("sha1", "s1", ["a.iso", "b.iso", "c.iso"]),
+        ("sha1", "s3", ["x.bin", "x2.bin", "y2.bin"]),
+        ("md5", "m2", ["d.iso", "e.iso"]),
+    ]
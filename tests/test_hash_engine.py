@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import pytest
+
+from emumanager.common.exceptions import WorkflowCancelledError
+from emumanager.verification import hash_engine, hasher
+from emumanager.verification.hash_engine import HashJob, hash_many
+
+
+def _files(tmp_path: Path, count: int, size: int = 4096) -> list[Path]:
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"f{i}.bin"
+        path.write_bytes(bytes([i]) * size)
+        paths.append(path)
+    return paths
+
+
+def test_hash_many_matches_single_file_hashes(tmp_path):
+    paths = _files(tmp_path, 5)
+    missing = tmp_path / "missing.bin"
+    jobs = [*paths[:4], HashJob(paths[4], ("md5",)), missing]
+
+    results = hash_many(jobs, algorithms=("crc32", "sha1"), max_workers=3)
+
+    for path in paths[:4]:
+        data = path.read_bytes()
+        assert results[path].hashes == {
+            "crc32": f"{zlib.crc32(data):08x}",
+            "sha1": hashlib.sha1(data).hexdigest(),
+        }
+    assert results[paths[4]].hashes == {"md5": hashlib.md5(paths[4].read_bytes()).hexdigest()}
+    assert not results[missing].ok and results[missing].error
+
+
+def test_hash_many_respects_per_device_limit_and_reports_bytes(tmp_path, monkeypatch):
+    paths = _files(tmp_path, 6, size=64 * 1024)
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+    real = hasher.calculate_hashes
+
+    def slow_hash(path, **kwargs):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        try:
+            time.sleep(0.05)
+            return real(path, **kwargs)
+        finally:
+            with lock:
+                active["now"] -= 1
+
+    monkeypatch.setattr(hash_engine.hasher, "calculate_hashes", slow_hash)
+    reports = []
+
+    results = hash_many(paths, max_workers=6, per_device_limit=2, progress_cb=reports.append)
+
+    assert len(results) == 6 and all(r.ok for r in results.values())
+    # Todos os ficheiros estão no mesmo dispositivo
+    assert active["peak"] == 2
+    assert reports[-1].done_bytes == reports[-1].total_bytes == 6 * 64 * 1024
+    assert reports[-1].files_done == 6
+
+
+def test_hash_many_cancels_between_chunks(tmp_path):
+    big = tmp_path / "big.bin"
+    big.write_bytes(b"x" * (256 * 1024))
+    cancel = threading.Event()
+    seen = []
+
+    def cancel_after_first_chunk(done):
+        seen.append(done)
+        cancel.set()
+
+    with pytest.raises(WorkflowCancelledError):
+        hasher.calculate_hashes(big, chunk_size=4096, progress_cb=cancel_after_first_chunk, cancel_event=cancel)
+    assert seen == [4096]
+
+    assert hash_many([big], chunk_size=4096, cancel_event=cancel) == {}
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import zlib
+from pathlib import Path
+
+import pytest
+
+from emumanager.verification.dat_manager import find_dat_for_system, system_for_dat_name
+from emumanager.verification.hash_index import GlobalHashIndex
+from emumanager.workers.distributor import worker_distribute_root
+
+
+def _dat_for(name: str, games: dict[str, bytes]) -> str:
+    lines = [f'clrmamepro (\n    name "{name}"\n    version "20240101"\n)\n']
+    for game, payload in games.items():
+        lines.append(
+            f'game (\n    name "{game}"\n'
+            f'    rom ( name "{game}.bin" size {len(payload)} '
+            f"crc {zlib.crc32(payload) & 0xFFFFFFFF:08x} "
+            f"md5 {hashlib.md5(payload).hexdigest()} "
+            f"sha1 {hashlib.sha1(payload).hexdigest()} )\n)\n"
+        )
+    return "".join(lines)
+
+
+@pytest.fixture
+def dats_root(tmp_path: Path) -> Path:
+    root = tmp_path / "dats"
+    (root / "redump").mkdir(parents=True)
+    (root / "redump" / "Sony - PlayStation 2 (20240101).dat").write_text(
+        _dat_for("Sony - PlayStation 2", {"Okami (USA)": b"ps2-payload" * 64})
+    )
+    (root / "redump" / "Sony - PlayStation (20240101).dat").write_text(
+        _dat_for("Sony - PlayStation", {"Vib-Ribbon (Europe)": b"psx-payload" * 64})
+    )
+    return root
+
+
+def test_system_for_dat_name_prefers_longest_keyword(dats_root: Path):
+    assert system_for_dat_name("Sony - PlayStation 2 (20240101)") == "ps2"
+    assert system_for_dat_name("Sony - PlayStation Portable") == "psp"
+    assert system_for_dat_name("Sony - PlayStation (20240101)") == "psx"
+    assert find_dat_for_system(dats_root, "psx").name == "Sony - PlayStation (20240101).dat"
+
+
+def test_identify_many_resolves_system_and_title_across_dats(dats_root: Path, tmp_path: Path):
+    okami = tmp_path / "random_name.iso"
+    okami.write_bytes(b"ps2-payload" * 64)
+    vib = tmp_path / "vib.bin"
+    vib.write_bytes(b"psx-payload" * 64)
+    unknown = tmp_path / "unknown.bin"
+    unknown.write_bytes(b"nothing")
+
+    index = GlobalHashIndex(dats_root)
+    results = index.identify_many([okami, vib, unknown])
+
+    assert [r.path for r in results] == [okami, vib, unknown]
+    assert (results[0].match.system_id, results[0].match.game_name) == ("ps2", "Okami (USA)")
+    assert (results[1].match.system_id, results[1].match.dat_name) == ("psx", "Sony - PlayStation")
+    assert results[2].match is None
+    assert results[2].hashes["sha1"] == hashlib.sha1(b"nothing").hexdigest()
+
+    # CRC só conta quando o tamanho também coincide
+    crc = results[0].hashes["crc32"]
+    assert index.identify({"crc32": crc}, size=okami.stat().st_size)
+    assert index.identify({"crc32": crc}, size=1) == []
+
+    # Also usable as a DatDb (lookup) from a worker process
+    clone = pickle.loads(pickle.dumps(index))
+    assert clone.lookup(sha1=results[1].hashes["sha1"])[0].game_name == "Vib-Ribbon (Europe)"
+
+
+def test_refresh_only_reimports_changed_dats(dats_root: Path):
+    index = GlobalHashIndex(dats_root)
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    ps2 = dats_root / "redump" / "Sony - PlayStation 2 (20240101).dat"
+    ps2.write_text(_dat_for("Sony - PlayStation 2", {"Rez (USA)": b"rez"}))
+    os.utime(ps2, ns=(1, 1))
+    assert index.refresh() == 1
+    assert index.lookup(sha1=hashlib.sha1(b"rez").hexdigest())[0].game_name == "Rez (USA)"
+    assert index.lookup(sha1=hashlib.sha1(b"ps2-payload" * 64).hexdigest()) == []
+
+    (dats_root / "redump" / "Sony - PlayStation (20240101).dat").unlink()
+    index.refresh()
+    assert index.dat_count() == 1
+
+
+def test_distribute_root_routes_by_dat_hash(dats_root: Path, tmp_path: Path):
+    roms = tmp_path / "roms"
+    roms.mkdir()
+    # Extensão ambígua: só o hash permite saber que é PS2
+    (roms / "disc.bin").write_bytes(b"ps2-payload" * 64)
+
+    result = worker_distribute_root(roms, lambda _msg: None, hash_index=GlobalHashIndex(dats_root))
+
+    assert result.success_count == 1
+    assert (roms / "ps2" / "disc.bin").exists()
@@ -1,4 +1,9 @@
-from emumanager.verification.hasher import calculate_hashes
+import os
+import zlib
+
+from emumanager.verification import hasher
+from emumanager.verification.hasher import calculate_hashes, crc32_combine
+
 
 def test_calculate_hashes_file(tmp_path):
     f = tmp_path / "test.bin"
@@ -18,3 +23,26 @@ def test_calculate_hashes_empty_file(tmp_path):
 
     hashes = calculate_hashes(f, algorithms=("crc32",))
     assert hashes["crc32"] == "00000000"
+
+
+def test_crc32_combine_matches_streaming_crc():
+    for len_a, len_b in [(0, 0), (1, 0), (0, 7), (1000, 1), (4096, 65537)]:
+        a, b = os.urandom(len_a), os.urandom(len_b)
+        assert crc32_combine(zlib.crc32(a), zlib.crc32(b), len(b)) == zlib.crc32(a + b)
+
+
+def test_parallel_crc32_is_bit_identical(tmp_path, monkeypatch):
+    data = os.urandom(3 * 4096 + 17)
+    f = tmp_path / "image.iso"
+    f.write_bytes(data)
+    expected = f"{zlib.crc32(data):08x}"
+
+    for workers in (1, 2, 3, 8):
+        assert hasher.parallel_crc32(f, workers=workers, chunk_size=1024) == expected
+
+    # calculate_hashes só divide o ficheiro acima do limiar
+    monkeypatch.setattr(hasher, "PARALLEL_CRC_MIN_SIZE", 1)
+    progress = []
+    res = hasher.calculate_hashes(f, algorithms=("crc32",), chunk_size=1024, crc_workers=4, progress_cb=progress.append)
+    assert res == {"crc32": expected}
+    assert max(progress) == len(data)
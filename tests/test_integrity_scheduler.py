@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from emumanager.core.integrity_scheduler import (
+    INTEGRITY_FAILURE_LABEL,
+    IntegrityScheduler,
+    integrity_tool_for,
+    verify_timeout,
+)
+from emumanager.library import LibraryDB, LibraryEntry
+
+
+def _fake_verify(path: str, system: str, size: int):
+    del system, size
+    return (not path.endswith("bad.chd")), "fake"
+
+
+def _add(db: LibraryDB, path: Path, system: str = "ps2") -> None:
+    path.write_bytes(b"chd")
+    db.update_entry(LibraryEntry(path=str(path), system=system, size=3, mtime=0.0, status="VERIFIED"))
+
+
+def test_integrity_tool_selection_and_timeout_scales_with_size():
+    assert integrity_tool_for(Path("a.chd"), "ps2") == "chd"
+    assert integrity_tool_for(Path("a.chd"), "psx") == "chd"
+    assert integrity_tool_for(Path("a.rvz"), "dolphin") == "rvz"
+    assert integrity_tool_for(Path("a.iso"), "ps2") is None
+    assert verify_timeout(5 * 1024**3) > verify_timeout(0) + 60
+
+
+def test_scheduler_only_rechecks_changed_or_expired_files(tmp_path: Path):
+    db = LibraryDB(tmp_path / "library.db")
+    good, bad = tmp_path / "good.chd", tmp_path / "bad.chd"
+    _add(db, good)
+    _add(db, bad)
+    _add(db, tmp_path / "plain.iso")
+    scheduler = IntegrityScheduler(db, max_workers=2, verify_fn=_fake_verify)
+
+    stats = scheduler.run()
+
+    assert stats == {"due": 2, "passed": 1, "failed": 1, "inconclusive": 0}
+    failed = db.get_entry(str(bad))
+    assert (failed.status, failed.match_name) == ("CORRUPT", INTEGRITY_FAILURE_LABEL)
+    assert db.get_entry(str(good)).status == "VERIFIED"
+    assert scheduler.due_tasks() == []
+
+    stat = good.stat()
+    os.utime(good, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert [task.path for task in scheduler.due_tasks()] == [str(good)]
+
+    expired = IntegrityScheduler(db, revalidate_days=0, verify_fn=_fake_verify)
+    assert len(expired.due_tasks()) == 2
+    assert len(scheduler.due_tasks(force=True)) == 2
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+
+import pytest
+
+from emumanager.common.exceptions import WorkflowCancelledError
+from emumanager.config import PerformanceConfig, get_performance_config, set_performance_config
+from emumanager.verification import hasher, io_strategy
+
+
+@pytest.fixture
+def profile(tmp_path, monkeypatch):
+    path = tmp_path / "io_profile.json"
+    monkeypatch.setenv(io_strategy.PROFILE_ENV, str(path))
+    monkeypatch.setattr(io_strategy, "_device_choice", {})
+    previous = get_performance_config()
+    set_performance_config(PerformanceConfig())
+    yield path
+    set_performance_config(previous)
+
+
+@pytest.mark.parametrize("strategy", io_strategy.IO_STRATEGIES)
+def test_every_strategy_hashes_identically(tmp_path, strategy):
+    data = os.urandom(10_000)
+    f = tmp_path / "game.iso"
+    f.write_bytes(data)
+
+    res = hasher.calculate_hashes(f, algorithms=("sha1",), chunk_size=1024, io_strategy=strategy, drop_cache=True)
+    assert res == {"sha1": hashlib.sha1(data).hexdigest()}
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert hasher.calculate_hashes(empty, algorithms=("crc32",), io_strategy=strategy) == {"crc32": "00000000"}
+
+
+def test_mmap_cancellation_releases_mapping(tmp_path):
+    f = tmp_path / "big.bin"
+    f.write_bytes(b"x" * 8192)
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(WorkflowCancelledError):
+        hasher.calculate_hashes(f, chunk_size=1024, io_strategy=io_strategy.IO_MMAP, cancel_event=cancel)
+
+
+def test_calibrate_persists_choice_per_mount(tmp_path, profile):
+    roms = tmp_path / "roms"
+    roms.mkdir()
+    (roms / "a.bin").write_bytes(os.urandom(64 * 1024))
+
+    result = io_strategy.calibrate(roms)
+
+    stored = json.loads(profile.read_text())
+    assert stored[result["mount"]]["strategy"] == result["strategy"]
+    assert set(result["mb_per_sec"]) <= set(io_strategy.IO_STRATEGIES)
+    assert io_strategy.strategy_for(roms / "a.bin") == result["strategy"]
+
+    # Uma estratégia explícita na configuração ignora a calibração
+    get_performance_config().io_strategy = io_strategy.IO_MMAP
+    assert io_strategy.strategy_for(roms / "a.bin") == io_strategy.IO_MMAP
+
+
+def test_invalid_io_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        PerformanceConfig(io_strategy="odirect")
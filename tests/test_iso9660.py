@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import gzip
+import struct
+from pathlib import Path
+
+import pytest
+
+from emumanager.common.iso9660 import Iso9660Image, read_image_file
+from emumanager.ps2 import metadata as ps2_metadata
+from emumanager.psp import metadata as psp_metadata
+from emumanager.psx import metadata as psx_metadata
+from tests.helpers import build_iso9660, to_raw_sectors
+
+
+def _sfo(key: str, value: str) -> bytes:
+    key_table = key.encode() + b"\x00"
+    data_table = value.encode() + b"\x00"
+    key_start = 0x14 + 0x10
+    header = b"\x00PSF\x01\x01\x00\x00"
+    header += struct.pack("<III", key_start, key_start + len(key_table), 1)
+    entry = struct.pack("<HHIII", 0, 0x0204, len(data_table), len(data_table), 0)
+    return header + entry + key_table + data_table
+
+
+PS2_CNF = b"BOOT2 = cdrom0:\\SLUS_200.02;1\r\nVER = 1.00\r\n"
+
+
+@pytest.mark.parametrize("layout", ["iso", "mode1", "mode2"])
+def test_iso9660_resolves_files_by_directory_record(tmp_path: Path, layout: str):
+    sfo = _sfo("DISC_ID", "ULUS10041")
+    iso = build_iso9660(
+        {"SYSTEM.CNF": PS2_CNF, "PSP_GAME/PARAM.SFO": sfo},
+        filler=b"\x00" * (2 * 1024 * 1024),
+    )
+    if layout != "iso":
+        iso = to_raw_sectors(iso, mode2=layout == "mode2")
+    path = tmp_path / f"disc.{'iso' if layout == 'iso' else 'bin'}"
+    path.write_bytes(iso)
+
+    with open(path, "rb") as fh:
+        image = Iso9660Image.open(fh)
+        assert image is not None
+        assert image.volume_id == "TEST_DISC"
+        assert image.read_file("SYSTEM.CNF") == PS2_CNF
+        assert image.read_file("psp_game/param.sfo") == sfo
+        assert image.read_file("PSP_GAME/MISSING.BIN") is None
+        assert image.find("PSP_GAME").is_dir
+        # PVD, path table, diretorias e os dois ficheiros: poucos setores
+        assert image.bytes_read <= 8 * 2352
+
+    assert path.stat().st_size > 2 * 1024 * 1024
+
+
+def test_iso9660_rejects_non_iso_data(tmp_path: Path):
+    path = tmp_path / "random.iso"
+    path.write_bytes(b"SLUS_200.02" * 10000)
+    with open(path, "rb") as fh:
+        assert Iso9660Image.open(fh) is None
+    assert read_image_file(path, "SYSTEM.CNF") is None
+
+
+def test_ps2_serial_comes_from_root_system_cnf(tmp_path: Path):
+    # O filler contém um BOOT2 falso que o varrimento cego encontraria primeiro
+    decoy = b"BOOT2 = cdrom0:\\SLES_999.99;1"
+    iso = build_iso9660({"SYSTEM.CNF": PS2_CNF}, filler=decoy)
+    path = tmp_path / "game.iso"
+    path.write_bytes(iso)
+    assert ps2_metadata.get_ps2_serial(path) == "SLUS-20002"
+
+    gz_path = tmp_path / "game.iso.gz"
+    with gzip.open(gz_path, "wb") as gz:
+        gz.write(iso)
+    assert ps2_metadata.get_ps2_serial(gz_path) == "SLUS-20002"
+
+
+def test_psx_serial_from_raw_mode2_bin(tmp_path: Path):
+    iso = build_iso9660({"SYSTEM.CNF": b"BOOT = cdrom:\\SLUS_005.94;1\r\nTCB = 4\r\n"})
+    path = tmp_path / "game.bin"
+    path.write_bytes(to_raw_sectors(iso, mode2=True))
+    assert psx_metadata.get_psx_serial(path) == "SLUS-00594"
+
+
+def test_psp_sfo_resolved_through_iso9660(tmp_path: Path):
+    iso = build_iso9660({"PSP_GAME/PARAM.SFO": _sfo("DISC_ID", "ULUS10041")})
+    path = tmp_path / "game.iso"
+    path.write_bytes(iso)
+    assert psp_metadata.get_metadata(path)["serial"] == "ULUS10041"
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from emumanager.library import FileIdentity, HashCacheRecord, LibraryDB, LibraryEntry
+from emumanager.workers.common import BaseWorker
+
+
+def _mk_entry(path: str, system: str = "nes", size: int = 1, **kwargs) -> LibraryEntry:
+    return LibraryEntry(path=path, system=system, size=size, mtime=0.0, **kwargs)
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> LibraryDB:
+    return LibraryDB(tmp_path / "library.db")
+
+
+def test_update_entries_writes_all_rows_in_batches(db: LibraryDB):
+    entries = [_mk_entry(f"/roms/nes/{i}.nes", size=i, extra_metadata={"i": i}) for i in range(25)]
+
+    written = db.update_entries(entries, batch_size=10)
+
+    assert written == 25
+    assert len(db.get_all_entries()) == 25
+    assert db.get_entry("/roms/nes/7.nes").extra_metadata == {"i": 7}
+
+
+def test_batch_writer_defers_until_flush_and_keeps_order(db: LibraryDB):
+    with db.batch_writer(batch_size=100) as writer:
+        writer.upsert(_mk_entry("/roms/a.nes"))
+        writer.update_fields("/roms/a.nes", status="VERIFIED", sha1="abc", bogus="x")
+        writer.upsert(_mk_entry("/roms/b.nes"))
+        writer.remove("/roms/b.nes")
+        assert len(writer) == 4
+        assert db.get_entry("/roms/a.nes") is None
+
+    entry = db.get_entry("/roms/a.nes")
+    assert entry.status == "VERIFIED"
+    assert entry.sha1 == "abc"
+    assert db.get_entry("/roms/b.nes") is None
+
+
+def test_batch_writer_flushes_pending_writes_on_error(db: LibraryDB):
+    with pytest.raises(RuntimeError):
+        with db.batch_writer() as writer:
+            writer.upsert(_mk_entry("/roms/a.nes"))
+            raise RuntimeError("cancelled")
+
+    assert db.get_entry("/roms/a.nes") is not None
+
+
+def test_scanner_worker_scan_persists_and_prunes(tmp_path: Path, monkeypatch):
+    from emumanager.workers.scanner import ScannerWorker
+
+    monkeypatch.chdir(tmp_path)
+    roms = tmp_path / "roms" / "nes"
+    roms.mkdir(parents=True)
+    (roms / "game.nes").write_bytes(b"nes")
+
+    worker = ScannerWorker(tmp_path, lambda _msg: None)
+    worker.db.update_entry(_mk_entry(str(tmp_path / "roms" / "nes" / "gone.nes")))
+    stats = worker.scan()
+
+    paths = {entry.path for entry in worker.db.get_all_entries()}
+    assert paths == {str((roms / "game.nes").resolve())}
+    assert stats["success"] == 1
+
+
+def test_iter_entries_projects_filters_and_orders(db: LibraryDB):
+    db.update_entries(
+        [
+            _mk_entry("/roms/b.iso", system="ps2", size=2, sha1="bb", extra_metadata={"k": 1}),
+            _mk_entry("/roms/a.iso", system="ps2", size=1, sha1="aa"),
+            _mk_entry("/roms/c.nes", system="nes", size=3, sha1=""),
+        ]
+    )
+
+    rows = list(
+        db.iter_entries(
+            columns=("size", "sha1"),
+            where={"system": "ps2"},
+            require=("sha1",),
+            order_by=("sha1",),
+            batch=1,
+        )
+    )
+
+    assert [row.path for row in rows] == ["/roms/a.iso", "/roms/b.iso"]
+    assert rows[1].size == 2
+    assert rows[1].system is None
+    assert rows[1].extra_metadata == {}
+
+    full = next(db.iter_entries(where={"path": ["/roms/b.iso"]}))
+    assert full.extra_metadata == {"k": 1}
+
+
+def test_iter_entries_rejects_unknown_columns(db: LibraryDB):
+    from emumanager.common.exceptions import ValidationError
+
+    with pytest.raises(ValidationError):
+        list(db.iter_entries(columns=("path; DROP TABLE library",)))
+
+
+class _TaggingWorker(BaseWorker):
+    def _process_item(self, item: Path) -> str:
+        self.db.update_entry_fields(str(item), status="VERIFIED", match_name=item.stem)
+        self.db.log_action(str(item), "TAGGED")
+        return "success"
+
+
+def test_parallel_worker_writes_through_single_writer(tmp_path: Path):
+    db = LibraryDB(tmp_path / "library.db")
+    items = [tmp_path / f"rom{i}.bin" for i in range(6)]
+    db.update_entries(_mk_entry(str(item)) for item in items)
+
+    worker = _TaggingWorker(tmp_path, lambda _msg: None, db=db)
+    result = worker.run(items, parallel=True)
+
+    assert result.success_count == 6
+    assert {entry.status for entry in db.get_all_entries()} == {"VERIFIED"}
+    assert len(db.get_recent_actions()) == 6
+
+
+def test_writer_service_acknowledges_and_reports_failures(tmp_path: Path):
+    from emumanager.library_db_writer import LibraryWriterService
+
+    db = LibraryDB(tmp_path / "library.db")
+    with LibraryWriterService(db, batch_size=2) as service:
+        proxy = service.proxy()
+        proxy.update_entry(_mk_entry("/roms/a.nes"))
+        proxy.update_entry_fields("/roms/a.nes", status="VERIFIED")
+        proxy.queue.put(("drop_table", (), {}))
+        proxy.remove_entry("/roms/missing.nes")
+    ack = service.stop()
+
+    assert ack.committed == 3
+    assert ack.failed == 1
+    assert proxy.get_entry("/roms/a.nes").status == "VERIFIED"
+
+
+def test_hash_cache_roundtrip_and_backfill_keeps_existing_row(db: LibraryDB):
+    identity = FileIdentity(dev=1, ino=42, size=3, mtime_ns=10)
+    db.store_cached_hashes(identity, HashCacheRecord(sha1="aa", fingerprint="fp", path="/a"))
+
+    with db.batch_writer() as writer:
+        db.store_cached_hashes(
+            identity, HashCacheRecord(sha1="zz", path="/b"), writer=writer, overwrite=False
+        )
+
+    cached = db.get_cached_hashes(identity)
+    assert (cached.sha1, cached.fingerprint, cached.path) == ("aa", "fp", "/a")
+    assert db.get_cached_hashes(FileIdentity(dev=1, ino=42, size=3, mtime_ns=11)) is None
+    assert db.prune_hash_cache(older_than=float("inf")) == 1
+
+
+def test_scanner_reuses_cached_hashes_after_rename(tmp_path: Path, monkeypatch):
+    from unittest.mock import MagicMock
+
+    from emumanager.core.scanner import Scanner
+    from emumanager.verification import hasher
+
+    db = LibraryDB(tmp_path / "library.db")
+    scanner = Scanner(db)
+    original = tmp_path / "a.nes"
+    original.write_bytes(b"rom-data")
+    dat_db = MagicMock()
+    dat_db.lookup.return_value = []
+
+    calls = []
+    real_calculate = hasher.calculate_hashes
+
+    def counting_calculate(path, *args, **kwargs):
+        calls.append(path)
+        return real_calculate(path, *args, **kwargs)
+
+    monkeypatch.setattr(hasher, "calculate_hashes", counting_calculate)
+    stats = {"added": 0, "updated": 0}
+    scanner._process_file(original, "nes", None, dat_db, False, stats, set(), {})
+    renamed = original.rename(tmp_path / "b.nes")
+    scanner._process_file(renamed, "nes", None, dat_db, False, stats, set(), {})
+
+    assert len(calls) == 1
+    first = db.get_entry(str(original.resolve()))
+    second = db.get_entry(str(renamed.resolve()))
+    assert second.sha1 == first.sha1 and second.crc32 == first.crc32
+    assert dat_db.lookup.call_count == 2
+
+
+def test_scanner_caches_provider_metadata_and_deterministic_failures(tmp_path: Path):
+    from unittest.mock import MagicMock
+
+    from emumanager.common.exceptions import UnsupportedFormatError
+    from emumanager.core.scanner import Scanner
+
+    db = LibraryDB(tmp_path / "library.db")
+    scanner = Scanner(db)
+    good = tmp_path / "good.chd"
+    bad = tmp_path / "bad.xyz"
+    good.write_bytes(b"chd")
+    bad.write_bytes(b"???")
+
+    provider = MagicMock()
+
+    def extract(path):
+        if path == bad:
+            raise UnsupportedFormatError("ps2", ".xyz")
+        return {"serial": "SLUS-00001", "title": "Game"}
+
+    provider.extract_metadata.side_effect = extract
+
+    def scan(deep_scan=False):
+        stats = {"added": 0, "updated": 0}
+        for path in (good, bad):
+            scanner._process_file(path, "ps2", provider, None, deep_scan, stats, set(), {})
+
+    scan()
+    scan()
+    assert provider.extract_metadata.call_count == 2
+    assert db.get_entry(str(good.resolve())).extra_metadata["serial"] == "SLUS-00001"
+    assert db.get_cached_metadata(str(bad.resolve()), 3, bad.stat().st_mtime_ns).error == (
+        "UnsupportedFormatError"
+    )
+
+    scan(deep_scan=True)
+    assert provider.extract_metadata.call_count == 4
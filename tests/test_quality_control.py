@@ -332,3 +332,35 @@ def test_issue_type_enum():
     assert IssueType.INVALID_HEADER.value == "INVALID_HEADER"
     assert IssueType.INVALID_CHECKSUM.value == "INVALID_CHECKSUM"
     assert IssueType.TRUNCATED_FILE.value == "TRUNCATED_FILE"
+
+
+def test_quality_engine_covers_whole_library_and_reuses_results(temp_db, tmp_path):
+    """Testa o engine paralelo: sem limite de 1000 linhas, stream com cache e cancelamento."""
+    import threading
+
+    from emumanager.quality import QualityEngine
+
+    rom = tmp_path / "real.gba"
+    rom.write_bytes(b"\x01" * 4096)
+    with temp_db.batch_writer() as writer:
+        writer.upsert(LibraryEntry(path=str(rom), system="gba", size=4096, mtime=1.0))
+        for i in range(1100):
+            writer.upsert(LibraryEntry(path=f"/missing/{i}.gba", system="gba", size=1, mtime=1.0))
+
+    progress = []
+    engine = QualityEngine(temp_db, max_workers=2, shard_size=50)
+    stats = engine.run(progress_cb=lambda p, _msg: progress.append(p))
+
+    assert stats.total == 1101 and stats.analyzed == 1101
+    assert stats.by_level["CORRUPT"] == 1100  # ficheiros inexistentes
+    assert progress[-1] == 1.0
+    assert QualityController(temp_db).get_quality_statistics("gba", max_workers=2) == stats.as_dict()
+
+    # Só o ficheiro real tem assinatura persistida: é servido da base de dados
+    again = QualityEngine(temp_db, max_workers=2, shard_size=50).run()
+    assert (again.cached, again.analyzed) == (1, 1100)
+
+    cancel = threading.Event()
+    cancel.set()
+    cancelled = QualityEngine(temp_db, max_workers=2, shard_size=50).run(cancel_event=cancel)
+    assert cancelled.cancelled and cancelled.total < 1101
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from emumanager.common.walker import LibraryWalker, WalkRules, group_by_root
+
+
+def _touch(path: Path, data: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_walker_prunes_ignored_dirs_and_yields_stat(tmp_path: Path):
+    nes = tmp_path / "nes"
+    _touch(nes / "a.nes", b"abc")
+    _touch(nes / "sub" / "deep" / "b.nes")
+    _touch(nes / ".discs" / "hidden.cue")
+    _touch(nes / "_QUARANTINE" / "bad.nes")
+    _touch(nes / "logs" / "scan.log")
+    _touch(nes / ".DS_Store")
+
+    records = [record for batch in LibraryWalker(max_workers=4).walk([nes]) for record in batch]
+
+    by_name = {record.path.name: record for record in records}
+    assert set(by_name) == {"a.nes", "b.nes"}
+    assert by_name["a.nes"].stat.st_size == 3
+    assert by_name["b.nes"].path == (nes / "sub" / "deep" / "b.nes").resolve()
+    assert all(record.root == nes for record in records)
+
+
+def test_walker_treats_ps3_game_folder_as_single_record(tmp_path: Path):
+    ps3 = tmp_path / "ps3"
+    _touch(ps3 / "Game [BLUS00001]" / "PS3_GAME" / "PARAM.SFO")
+    _touch(ps3 / "Game [BLUS00001]" / "PS3_GAME" / "USRDIR" / "EBOOT.BIN")
+
+    records = [record for batch in LibraryWalker().walk([ps3]) for record in batch]
+
+    assert [record.path.name for record in records] == ["Game [BLUS00001]"]
+    assert records[0].is_dir
+
+
+def test_walker_batches_grouped_in_root_order(tmp_path: Path):
+    roots = [tmp_path / name for name in ("gba", "nes", "snes")]
+    for root in roots:
+        for index in range(5):
+            _touch(root / f"dir{index % 2}" / f"{index}.rom")
+
+    walker = LibraryWalker(WalkRules(), max_workers=8, batch_size=2)
+    batches = list(walker.walk(roots))
+
+    assert max(len(batch) for batch in batches) == 2
+    grouped = [(root, len(list(records))) for root, records in group_by_root(batches)]
+    assert grouped == [(root, 5) for root in roots]
+
+
+def test_walker_stops_when_cancelled(tmp_path: Path):
+    _touch(tmp_path / "nes" / "a.nes")
+    cancel = threading.Event()
+    cancel.set()
+
+    assert list(LibraryWalker().walk([tmp_path / "nes"], cancel_event=cancel)) == []